@@ -0,0 +1,56 @@
+import datetime as dt
+from typing import Literal, Optional
+
+from app.db import get_async_session_maker
+from app.services import export
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import sessionmaker
+
+router = APIRouter(tags=["export"])
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _stream(
+    maker: sessionmaker,
+    fmt: Literal["ndjson", "csv"],
+    date_from: Optional[dt.date],
+    date_to: Optional[dt.date],
+    events: bool,
+    gzip: bool,
+) -> StreamingResponse:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    filename = f"games.{fmt}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        export.stream(maker, fmt, date_from, date_to, events=events, gzip=gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/games.ndjson")
+async def export_games_ndjson(
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    events: bool = False,
+    gzip: bool = False,
+    maker: sessionmaker = Depends(get_async_session_maker),
+):
+    """
+    Весь архив игр, по игре на строку: места, роли, очки и (``events``)
+    события. Серверный курсор — память не растёт с размером архива.
+    """
+    return _stream(maker, "ndjson", date_from, date_to, events, gzip)
+
+
+@router.get("/games.csv")
+async def export_games_csv(
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    gzip: bool = False,
+    maker: sessionmaker = Depends(get_async_session_maker),
+):
+    """Строка на место: колонки игры + место, роль, фолы и очки игрока."""
+    return _stream(maker, "csv", date_from, date_to, False, gzip)
@@ -0,0 +1,314 @@
+import asyncio
+import datetime as dt
+from typing import Any, Optional
+
+from app.core import fastjson
+from app.core.config import get_settings
+from app.core.cursor import InvalidCursor
+from app.core.enums import GameState
+from app.crud import events as events_crud
+from app.crud import games_async as crud
+from app.crud.games import GameConflict, SeatChange
+from app.db import get_async_session
+from app.schemas.events import EventBatch, EventBatchAck
+from app.schemas.games import (
+    GameHeader,
+    GamePlayer,
+    GameSetup,
+    GameSetupOut,
+    GameStateChange,
+)
+from app.schemas.pagination import Page
+from app.services import live_state, replay
+from app.services.broadcast import Subscriber, hub
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(tags=["games"])
+settings = get_settings()
+
+HEADER_FIELDS = fastjson.fields_of(GameHeader)
+CLOSED = (GameState.finished, GameState.aborted)  # лог больше не растёт
+
+
+def _publish(game_id: int, kind: str, body: Any) -> None:
+    """Зрителям игры: ``{"type": kind, kind: body}``; модели — в JSON‑виде."""
+    if isinstance(body, BaseModel):
+        body = body.model_dump(mode="json")
+    hub.publish(game_id, {"type": kind, kind: body})
+
+
+@router.get("/", response_model=list[GameHeader])
+async def list_games(
+    skip: int = 0,
+    limit: int = 50,
+    session: AsyncSession = Depends(get_async_session),
+):
+    rows = await crud.list_game_headers(session, skip=skip, limit=limit)
+    if settings.json_fast_path:
+        return fastjson.rows_response(rows, HEADER_FIELDS)
+    return rows
+
+
+@router.get("/page", response_model=Page[GameHeader])
+async def list_games_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        games, next_cursor = await crud.list_games_page(
+            session, cursor=cursor, limit=limit
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if settings.json_fast_path:
+        return fastjson.page_response(games, HEADER_FIELDS, next_cursor)
+    return Page[GameHeader](items=games, next_cursor=next_cursor)
+
+
+@router.post("/setup", response_model=GameSetupOut, status_code=201)
+async def setup_game(
+    data: GameSetup,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Старт игры за один запрос: Game, недостающие Player по никам
+    и все места — одной транзакцией.
+    """
+    try:
+        out = await crud.setup(session, data)
+    except IntegrityError as exc:  # FK: rule_set_id / gm_id
+        await session.rollback()
+        raise HTTPException(
+            status_code=422, detail="Unknown rule_set_id or gm_id"
+        ) from exc
+    _publish(out.game.id, "setup", out)
+    return out
+
+
+@router.post("/{game_id}/state", response_model=GameHeader)
+async def change_state(
+    game_id: int,
+    change: GameStateChange,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Один условный UPDATE; 409 — недопустимый переход или устаревшая версия."""
+    finished_at = None
+    if change.state is GameState.finished:  # колонка без TZ — храним UTC
+        finished_at = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+    try:
+        game = await crud.update_state(
+            session,
+            game_id,
+            change.state,
+            expected_version=change.expected_version,
+            finished_at=finished_at,
+            winner=change.winner,
+            actor_id=change.actor_id,
+        )
+    except GameConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    _publish(game_id, "game", GameHeader.model_validate(game))
+    if game.state in CLOSED:
+        hub.close(game_id)
+    return game
+
+
+def _publish_seat(game_id: int, change: SeatChange) -> GamePlayer:
+    seat = GamePlayer.model_validate(change.seat._mapping)
+    _publish(game_id, "seat", seat)
+    if change.event is not None:
+        _publish(game_id, "events", [change.event])
+    return seat
+
+
+@router.post("/{game_id}/seats/{seat_no}/fouls", response_model=GamePlayer)
+async def add_foul(
+    game_id: int,
+    seat_no: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        change = await crud.add_foul(session, game_id, seat_no)
+    except GameConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return _publish_seat(game_id, change)
+
+
+@router.post("/{game_id}/seats/{seat_no}/removal", response_model=GamePlayer)
+async def remove_player(
+    game_id: int,
+    seat_no: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    try:
+        change = await crud.remove_player(session, game_id, seat_no)
+    except GameConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    return _publish_seat(game_id, change)
+
+
+@router.post("/{game_id}/events:batch", response_model=EventBatchAck)
+async def ingest_events(
+    game_id: int,
+    batch: EventBatch,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Автосейв живой игры. Идемпотентен: повтор уже принятых client_seq
+    ничего не пишет. Пустой батч просто возвращает текущий acked_seq.
+    """
+    game = await crud.get(session, game_id)
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if game.state in CLOSED:
+        raise HTTPException(status_code=409, detail="Game is closed for events")
+
+    try:
+        inserted, acked = await events_crud.ingest_batch(session, game_id, batch.events)
+    except events_crud.UnknownEventType as exc:
+        raise HTTPException(
+            status_code=422, detail=f"Unknown event codes: {exc}"
+        ) from exc
+    if inserted:
+        _publish(game_id, "events", inserted)
+        await live_state.snapshot_if_due(session, game_id, acked)
+    return EventBatchAck(acked_seq=acked, inserted=len(inserted))
+
+
+@router.get("/{game_id}/state", response_model=live_state.LiveGameState)
+async def get_live_state(
+    game_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Resume после реконнекта: последний снапшот + только хвост событий."""
+    if await crud.get(session, game_id) is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    state, _ = await live_state.resume(session, game_id)
+    return state
+
+
+# ─────────────────────────── replay ───────────────────────────
+async def _replay(session: AsyncSession, game_id: int) -> replay.Replay:
+    game = await crud.get(session, game_id)
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if game.state not in CLOSED:
+        raise HTTPException(
+            status_code=409, detail="Replay is available for finished games only"
+        )
+    return await replay.load(session, game)
+
+
+@router.get("/{game_id}/replay", response_model=replay.Frame)
+async def get_replay_frame(
+    game_id: int,
+    at: Optional[int] = Query(
+        None, ge=0, description="Событий применено; по умолчанию — все"
+    ),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Стол после ``at`` событий: места, фолы, удаления, выставления."""
+    game_replay = await _replay(session, game_id)
+    if at is not None and at > game_replay.total:
+        raise HTTPException(
+            status_code=400, detail=f"at is past the last event ({game_replay.total})"
+        )
+    return game_replay.frame(game_replay.total if at is None else at)
+
+
+@router.get("/{game_id}/replay.ndjson")
+async def stream_replay(
+    game_id: int,
+    start: int = Query(0, ge=0),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Таймлайн кадрами /replay по строке, с ``start`` до конца — одним проходом."""
+    game_replay = await _replay(session, game_id)
+    if start > game_replay.total:
+        raise HTTPException(
+            status_code=400,
+            detail=f"start is past the last event ({game_replay.total})",
+        )
+    # лог уже в памяти — тело не трогает сессию
+    return StreamingResponse(
+        replay.ndjson(game_replay, start), media_type="application/x-ndjson"
+    )
+
+
+# ─────────────────────────── live fan‑out ───────────────────────────
+@router.websocket("/{game_id}/live")
+async def live_ws(websocket: WebSocket, game_id: int):
+    """Поток новых событий игры; ``resync`` — клиент отстал, перечитать /state."""
+    await websocket.accept()
+    sub = hub.subscribe(game_id)
+    tasks = [
+        asyncio.create_task(_forward(websocket, sub)),
+        asyncio.create_task(_until_disconnect(websocket)),
+    ]
+    try:
+        # на тихой игре send молчит — отключение видно только по receive
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(game_id, sub)
+
+
+async def _forward(websocket: WebSocket, sub: Subscriber) -> None:
+    try:
+        async for message in sub:
+            await websocket.send_text(message)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+async def _until_disconnect(websocket: WebSocket) -> None:
+    """Входящие сообщения зрителя не нужны — читаем только ради disconnect."""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.get("/{game_id}/live.sse")
+async def live_sse(
+    game_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    То же, что WebSocket /live, но Server‑Sent Events — для оверлеев стрима.
+    Закрытая игра уже не получит ни события, ни ``hub.close`` — 409 сразу,
+    а не поток, который никогда не кончится.
+    """
+    game = await crud.get(session, game_id)
+    if game is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    if game.state in CLOSED:
+        raise HTTPException(status_code=409, detail="Game is closed")
+    return StreamingResponse(_sse(game_id), media_type="text/event-stream")
+
+
+async def _sse(game_id: int):
+    # подписка — уже в генераторе: если клиент ушёл до первого байта,
+    # Starlette генератор не запустит и подписчик не повиснет в хабе
+    sub = hub.subscribe(game_id)
+    try:
+        async for message in sub:
+            yield f"data: {message}\n\n"
+    finally:
+        hub.unsubscribe(game_id, sub)
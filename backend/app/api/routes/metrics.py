@@ -0,0 +1,11 @@
+from app.core.metrics import CONTENT_TYPE, registry
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text format: пулы sync/async engine'ов и прочие метрики."""
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
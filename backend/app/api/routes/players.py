@@ -1,27 +1,108 @@
-from app.db import get_session
+from typing import Literal, Optional
+
+from app.core import fastjson
+from app.core.config import get_settings
+from app.core.cursor import InvalidCursor, decode_cursor, encode_cursor
+from app.db import get_async_session
 from app.models.player import Player
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from app.models.stats import PlayerStats
+from app.schemas.pagination import Page
+from app.schemas.players import PlayerMatch, PlayerStatsRead
+from app.services import nickname_search
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import col, select, tuple_
 
 router = APIRouter(tags=["players"])
+settings = get_settings()
+
+PLAYER_COLUMNS = fastjson.columns_for(Player, Player.__table__)
+PLAYER_FIELDS = fastjson.fields_of(Player)
 
 
 @router.get("/", response_model=list[Player])
-def list_players(
+async def list_players(
     skip: int = 0,
     limit: int = 50,
-    session: Session = Depends(get_session),  # <—
+    session: AsyncSession = Depends(get_async_session),  # <—
 ):
-    players = session.exec(select(Player).offset(skip).limit(limit)).all()
+    if settings.json_fast_path:
+        stmt = select(*PLAYER_COLUMNS).offset(skip).limit(limit)
+        return fastjson.rows_response(
+            (await session.execute(stmt)).all(), PLAYER_FIELDS
+        )
+    players = (await session.scalars(select(Player).offset(skip).limit(limit))).all()
     return players
 
 
+@router.get("/page", response_model=Page[Player])
+async def list_players_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    order: Literal["id", "nickname"] = "id",
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Keyset‑пагинация: ``next_cursor`` из ответа передаётся в следующий запрос."""
+    if order == "id":
+        keys = (col(Player.id),)
+    else:
+        keys = (col(Player.nickname), col(Player.id))
+
+    fast = settings.json_fast_path
+    entity = PLAYER_COLUMNS if fast else (Player,)
+    stmt = select(*entity).order_by(*keys).limit(limit + 1)
+    if cursor is not None:
+        try:
+            last = decode_cursor(cursor, len(keys))
+            if not isinstance(last[-1], int):
+                raise InvalidCursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(tuple_(*keys) > tuple_(*last))
+
+    result = await session.execute(stmt)
+    rows = result.all() if fast else result.scalars().all()
+    players = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        tail = players[-1]
+        values = (tail.id,) if order == "id" else (tail.nickname, tail.id)
+        next_cursor = encode_cursor(*values)
+    if fast:
+        return fastjson.page_response(players, PLAYER_FIELDS, next_cursor)
+    return Page[Player](items=players, next_cursor=next_cursor)
+
+
+@router.get("/search", response_model=list[PlayerMatch])
+async def search_players(
+    q: str = Query(..., min_length=1, max_length=32),
+    limit: int = Query(10, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Автокомплит для быстрого добавления: сначала префикс, потом опечатки."""
+    return await nickname_search.search(session, q, limit)
+
+
 @router.get("/{player_id}", response_model=Player)
-def get_player(
+async def get_player(
     player_id: int,
-    session: Session = Depends(get_session),  # <—
+    session: AsyncSession = Depends(get_async_session),  # <—
 ):
-    player = session.get(Player, player_id)
+    player = await session.get(Player, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     return player
+
+
+@router.get("/{player_id}/stats", response_model=PlayerStatsRead)
+async def get_player_stats(
+    player_id: int,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Одна строка PlayerStats по PK — без скана gameplayer."""
+    stats = await session.get(PlayerStats, player_id)
+    if stats is not None:
+        return stats
+    if await session.get(Player, player_id) is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return PlayerStatsRead(player_id=player_id)  # ещё не сыграл ни одной игры
@@ -0,0 +1,77 @@
+import datetime as dt
+from typing import Optional
+
+from app.db import get_async_session
+from app.models.player import Player
+from app.schemas.stats import FactionWins, LeaderboardRow
+from app.services import rollups
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+router = APIRouter(tags=["stats"])
+
+
+def _range(date_from: Optional[dt.date], date_to: Optional[dt.date]):
+    date_to = date_to or dt.date.today()
+    date_from = date_from or dt.date.min
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from is after date_to")
+    return date_from, date_to
+
+
+@router.get("/leaderboard", response_model=list[LeaderboardRow])
+async def leaderboard(
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    limit: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Top‑N по очкам за период — из роллапов, без скана gameplayer."""
+    date_from, date_to = _range(date_from, date_to)
+    rows = await session.execute(rollups.leaderboard_stmt(date_from, date_to))
+    top = rollups.top_n(rows, limit)
+    if not top:
+        return []
+    nicknames = dict(
+        (
+            await session.execute(
+                select(Player.id, Player.nickname).where(
+                    Player.id.in_([r.player_id for r in top])  # type: ignore[union-attr]
+                )
+            )
+        )
+        .tuples()
+        .all()
+    )
+    return [
+        LeaderboardRow(
+            player_id=r.player_id,
+            nickname=nicknames.get(r.player_id, ""),
+            points=r.points,
+            games=r.games,
+            wins=r.wins,
+        )
+        for r in top
+    ]
+
+
+@router.get("/factions", response_model=FactionWins)
+async def faction_wins(
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    players_qty: Optional[int] = Query(None, ge=7, le=10),
+    session: AsyncSession = Depends(get_async_session),
+):
+    date_from, date_to = _range(date_from, date_to)
+    rows = await session.execute(
+        rollups.faction_wins_stmt(date_from, date_to, players_qty)
+    )
+    wins = rollups.wins_by_faction(rows)
+    return FactionWins(
+        date_from=date_from,
+        date_to=date_to,
+        players_qty=players_qty,
+        wins=wins,
+        total=sum(wins.values()),
+    )
@@ -0,0 +1,63 @@
+"""
+Обслуживание лога событий (cron, раз в сутки):
+
+    python -m app.commands.archive_events                  # архив игр старше 90 дней
+    python -m app.commands.archive_events --older-than 30 --months-ahead 6
+
+1. месячные секции gameevent на ``--months-ahead`` вперёд (+ перенос из default);
+2. события завершённых игр старше ``--older-than`` дней → gameeventarchive;
+3. DROP опустевших секций до той же границы.
+
+Секции — только Postgres; на остальных базах выполняется лишь шаг 2.
+"""
+
+import argparse
+import datetime as dt
+import logging
+import time
+
+from app.db import sync_session_maker
+from app.services import event_archive
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--older-than",
+        type=int,
+        default=event_archive.ARCHIVE_AFTER.days,
+        help="дней с finished_at",
+    )
+    parser.add_argument("--months-ahead", type=int, default=event_archive.MONTHS_AHEAD)
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=event_archive.ARCHIVE_BATCH,
+        help="игр на транзакцию",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    older_than = dt.timedelta(days=args.older_than)
+    started = time.perf_counter()
+    with sync_session_maker() as session:
+        created = event_archive.ensure_partitions(
+            session.connection(), args.months_ahead
+        )
+        session.commit()
+        games = event_archive.archive(session, older_than, batch=args.batch)
+        cutoff = (dt.datetime.now(dt.timezone.utc) - older_than).date()
+        dropped = event_archive.drop_empty_partitions(session, cutoff)
+    log.info(
+        "partitions +%d -%d, %d games archived in %.1fs",
+        len(created),
+        len(dropped),
+        games,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
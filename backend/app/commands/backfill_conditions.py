@@ -0,0 +1,35 @@
+"""
+Маски условий (gameplayer.conditions) для игр, завершённых до движка
+очков, и импортированных игр с логом — один раз после миграции
+d8e4b1f6a293, затем пересчёт очков:
+
+    python -m app.commands.backfill_conditions [--batch-size N]
+    python -m app.commands.rescore <rule_set_id>
+
+Игры без лога остаются с NULL, и rescore их не трогает.
+"""
+
+import argparse
+import logging
+import time
+
+from app.db import sync_session_maker
+from app.services import scoring
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=scoring.BACKFILL_BATCH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    started = time.perf_counter()
+    with sync_session_maker() as session:
+        games = scoring.backfill_conditions(session, batch_size=args.batch_size)
+    log.info("%s games backfilled in %.1fs", games, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Импорт архива игр (NDJSON или CSV в формате /export/games.*) чанками:
+
+    python -m app.commands.import_games archive.ndjson --gm-id <uuid>
+    python -m app.commands.import_games legacy.csv --format csv --chunk 5000
+    python -m app.commands.import_games archive.ndjson --restart   # забыть прогресс
+
+Прогресс хранится в importcheckpoint под ``--source`` (по умолчанию — имя
+файла): после падения та же команда продолжит с первой незагруженной игры.
+"""
+
+import argparse
+import logging
+import time
+import uuid
+from pathlib import Path
+
+from app.db import sync_session_maker
+from app.services import importer
+
+log = logging.getLogger(__name__)
+
+
+def _report(p: importer.Progress) -> None:
+    log.info(
+        "%d records: %d games, %d rejected | %.0f games/s, %.0f rows/s",
+        p.records,
+        p.games,
+        p.rejected,
+        p.games_per_second,
+        p.rows_per_second,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=sorted(importer.READERS))
+    parser.add_argument("--source", help="ключ checkpoint'а (по умолчанию — имя файла)")
+    parser.add_argument("--gm-id", type=uuid.UUID, help="ведущий для игр без gm_id")
+    parser.add_argument(
+        "--rule-set-id", type=int, default=1, help="для игр без rule_set_id"
+    )
+    parser.add_argument("--chunk", type=int, default=importer.CHUNK)
+    parser.add_argument(
+        "--restart", action="store_true", help="начать источник с начала"
+    )
+    parser.add_argument(
+        "--no-rebuild", action="store_true", help="не пересобирать агрегаты"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    fmt = args.format or args.path.suffix.lstrip(".").lower()
+    if fmt not in importer.READERS:
+        parser.error(f"cannot guess format of {args.path.name}; pass --format")
+    source = args.source or args.path.name
+
+    started = time.perf_counter()
+    with sync_session_maker() as session, args.path.open(
+        newline="", encoding="utf-8"
+    ) as fh:
+        if args.restart:
+            importer.reset(session, source)
+        progress = importer.run(
+            session,
+            importer.READERS[fmt](fh),
+            source=source,
+            gm_id=args.gm_id,
+            rule_set_id=args.rule_set_id,
+            chunk=args.chunk,
+            on_chunk=_report,
+        )
+        if not args.no_rebuild:
+            importer.rebuild(session)
+    log.info(
+        "%s: %d games loaded this run (%d rows) in %.1fs, %.0f rows/s",
+        source,
+        progress.loaded,
+        progress.rows,
+        time.perf_counter() - started,
+        progress.rows_per_second,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Обслуживание агрегатов PlayerStats и роллапов дашборда:
+
+    python -m app.commands.player_stats rebuild   # пересобрать с нуля (оба)
+    python -m app.commands.player_stats check     # сверить с пересчётом, exit 1 при расхождении
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+from app.db import sync_session_maker
+from app.services import player_stats, rollups
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("action", choices=["rebuild", "check"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    started = time.perf_counter()
+    with sync_session_maker() as session:
+        if args.action == "rebuild":
+            rows = player_stats.rebuild(session)
+            rollups.rebuild(session)
+            log.info("rebuilt %s players in %.1fs", rows, time.perf_counter() - started)
+            return
+        mismatched = player_stats.check(session)
+    if mismatched:
+        log.error("%s players out of sync: %s", len(mismatched), mismatched[:50])
+        sys.exit(1)
+    log.info("player stats consistent (%.1fs)", time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Пересчёт очков всех игр RuleSet после правки правил:
+
+    python -m app.commands.rescore <rule_set_id> [--batch-size N]
+"""
+
+import argparse
+import logging
+import time
+
+from app.db import sync_session_maker
+from app.services import scoring
+
+log = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("rule_set_id", type=int)
+    parser.add_argument("--batch-size", type=int, default=scoring.RESCORE_BATCH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    started = time.perf_counter()
+    with sync_session_maker() as session:
+        rows = scoring.rescore_rule_set(
+            session, args.rule_set_id, batch_size=args.batch_size
+        )
+    elapsed = time.perf_counter() - started
+    log.info(
+        "rule_set=%s: %s gameplayer rows in %.1fs (%.0f rows/s)",
+        args.rule_set_id,
+        rows,
+        elapsed,
+        rows / elapsed if elapsed else 0,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 from urllib.parse import urlparse, urlunparse
 
 from pydantic import PostgresDsn
@@ -12,6 +13,29 @@ class Settings(BaseSettings):
 
     database_url: PostgresDsn
     secret_key: str
+    # старт воркера: check — сверить alembic head и упасть при расхождении,
+    # create — create_all (только dev), off — не ходить в БД при старте
+    schema_mode: Literal["check", "create", "off"] = "check"
+    # пул соединений (на каждый engine: sync и async — свой пул)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0  # сек ожидания свободного соединения
+    db_pool_recycle: int = 1800  # сек; -1 — не пересоздавать
+    # pre-ping — лишний round-trip на каждый checkout; при recycle меньше
+    # idle-таймаута PgBouncer/сервера его можно выключить
+    db_pool_pre_ping: bool = True
+    # предупреждать в лог, если одна форма SQL повторилась больше N раз
+    # за HTTP‑запрос (N+1 от ленивых relationship)
+    sql_repeat_warn: int = 10
+    # кэш GET‑ответов (app.core.httpcache): TTL, записей и байт на процесс
+    http_cache_ttl: float = 30.0
+    http_cache_max_entries: int = 2048
+    http_cache_max_bytes: int = 32 * 1024 * 1024
+    # большие списки — строками через orjson, без валидации response_model
+    # (app.core.fastjson)
+    json_fast_path: bool = False
+    # перемотка завершённых игр (app.services.replay): игр в LRU на процесс
+    replay_cache_games: int = 128
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -19,6 +43,17 @@ class Settings(BaseSettings):
         case_sensitive=False,
     )
 
+    @property
+    def pool_options(self) -> dict:
+        """kwargs пула для create_engine/create_async_engine."""
+        return {
+            "pool_size": self.db_pool_size,
+            "max_overflow": self.db_max_overflow,
+            "pool_timeout": self.db_pool_timeout,
+            "pool_recycle": self.db_pool_recycle,
+            "pool_pre_ping": self.db_pool_pre_ping,
+        }
+
     @property
     def sync_dsn(self) -> str:
         parsed = urlparse(str(self.database_url))
@@ -31,6 +66,13 @@ class Settings(BaseSettings):
         new = parsed._replace(scheme="postgresql+asyncpg")
         return urlunparse(new)
 
+    @property
+    def listen_dsn(self) -> str:
+        """DSN для «голого» asyncpg (LISTEN/NOTIFY) — без драйвера в схеме."""
+        parsed = urlparse(str(self.database_url))
+        new = parsed._replace(scheme="postgresql")
+        return urlunparse(new)
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,35 @@
+"""Opaque‑курсоры для keyset‑пагинации.
+
+Курсор — это base64url от JSON‑массива значений ключа сортировки
+последней строки страницы, например ``["2025-07-23", 42]``.
+Клиент не должен разбирать его содержимое.
+"""
+
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+from typing import Any
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или выдан для другого порядка сортировки."""
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values],
+        separators=(",", ":"),
+    )
+    return urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error) as exc:
+        raise InvalidCursor(cursor) from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(cursor)
+    return values
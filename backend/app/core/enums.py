@@ -8,6 +8,19 @@ class GameRole(str, Enum):
     don = "Don"
 
 
+class Faction(str, Enum):
+    city = "city"
+    mafia = "mafia"
+
+
+ROLE_FACTION = {
+    GameRole.citizen: Faction.city,
+    GameRole.sheriff: Faction.city,
+    GameRole.mafia: Faction.mafia,
+    GameRole.don: Faction.mafia,
+}
+
+
 class UserRole(str, Enum):
     organizer = "organizer"
     gm = "gm"
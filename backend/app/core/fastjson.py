@@ -0,0 +1,63 @@
+"""
+Быстрый путь JSON для больших списков (``settings.json_fast_path``).
+
+Ручка выбирает колонки (Row) вместо ORM‑объектов и возвращает
+``RowsJSONResponse``: orjson кодирует словари напрямую, без валидации
+каждой строки через response_model. Сам response_model на ручке остаётся —
+OpenAPI не меняется. Ключи берутся из полей той же модели, а значения
+кодируются так же (enum → value, UUID/datetime → строка ISO), поэтому
+JSON совпадает с обычным путём.
+"""
+
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import Any, Optional, Sequence
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import Row, Table
+
+# как у pydantic: aware‑datetime в UTC → "Z", а не "+00:00"
+_OPTIONS = orjson.OPT_UTC_Z
+
+
+class RowsJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=_OPTIONS)
+
+
+def fields_of(model: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(model.model_fields)
+
+
+def columns_for(model: type[BaseModel], table: Table) -> list[Any]:
+    """Колонки ``table`` в порядке полей модели — для ``select(*...)``."""
+    return [table.c[name] for name in model.model_fields]
+
+
+def project(rows: Sequence[Row[Any]], fields: Sequence[str]) -> list[dict[str, Any]]:
+    """Row → dict с ключами ``fields`` в их порядке; лишние колонки отбрасываются."""
+    if not rows:
+        return []
+    keys = rows[0]._fields
+    if tuple(keys) == tuple(fields):
+        return [dict(zip(fields, row)) for row in rows]
+    pick = itemgetter(*(keys.index(name) for name in fields))
+    return [dict(zip(fields, pick(row))) for row in rows]
+
+
+def rows_response(rows: Sequence[Row[Any]], fields: Sequence[str]) -> RowsJSONResponse:
+    return RowsJSONResponse(project(rows, fields))
+
+
+def page_response(
+    rows: Sequence[Row[Any]], fields: Sequence[str], next_cursor: Optional[str]
+) -> RowsJSONResponse:
+    """То же для ``Page[T]``: порядок ключей как в схеме Page."""
+    return RowsJSONResponse(
+        {"items": project(rows, fields), "next_cursor": next_cursor}
+    )
@@ -0,0 +1,376 @@
+"""
+ETag / If-None-Match и процессный кэш ответов для читающих эндпоинтов.
+
+Версии данных — счётчики изменений по таблице и по строке (``changes``).
+Их двигают события Session: ORM‑flush (PK известен) и Core‑DML через
+``session.execute`` (только таблица). Изменения копятся в транзакции и
+применяются на after_commit; на Postgres они же уходят в
+``NOTIFY respcache`` внутри транзакции, и остальные воркеры двигают свои
+счётчики.
+
+Версию назначает получатель — свои монотонные часы воркера
+(``_clock``): каждое применённое изменение строго больше всех выданных
+раньше версий. Штампу отправителя не доверяем: транзакции коммитятся не
+в порядке своих штампов, а часы хостов расходятся, и изменение с «более
+старым» штампом иначе не сдвинуло бы версию. Нижняя граница версий
+(``_epoch``) — старт процесса: данных, изменённых до него, воркер не
+видел, поэтому своих старых ETag он не подтверждает.
+
+Версии у воркеров свои, так что ETag одного воркера другой не
+подтверждает: клиент при переходе на другой воркер получит лишний 200
+вместо 304 — но никогда не устаревший ответ.
+
+ETag = хеш (путь, query, версия зависимости). Совпал If-None-Match → 304
+без обращения к БД. 200‑ответ кладётся в TTL+LRU‑кэш вместе с ETag и
+отдаётся, пока версия не сдвинулась.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+
+CHANNEL = "respcache"
+INSERT, ROW, TABLE = "insert", "row", "table"
+_NOTIFY_LIMIT = 7000  # payload pg_notify < 8000 байт
+
+Change = tuple[str, Any, str]  # (таблица, PK или None, вид)
+
+
+# ─────────────────────────── версии ───────────────────────────
+class ChangeLog:
+    """
+    ``table_version`` — для списков: любое изменение таблицы.
+    ``row_version`` — для одной строки: её изменение или изменение таблицы
+    без известного PK (Core UPDATE/DELETE). Строк помнится не больше
+    ``max_rows``; вытесненная строка поднимает «пол» всей таблицы, так что
+    версия никогда не откатывается назад.
+    """
+
+    def __init__(self, max_rows: int = 100_000) -> None:
+        self.max_rows = max_rows
+        self._clock = 0
+        self._epoch = self._tick()  # старт процесса / потеря NOTIFY
+        self._tables: dict[str, int] = {}
+        self._floors: dict[str, int] = {}
+        self._rows: OrderedDict[tuple[str, Any], int] = OrderedDict()
+
+    def table_version(self, table: str) -> int:
+        return max(self._epoch, self._tables.get(table, 0))
+
+    def row_version(self, table: str, key: Any) -> int:
+        return max(
+            self._epoch, self._floors.get(table, 0), self._rows.get((table, key), 0)
+        )
+
+    def _tick(self) -> int:
+        """Следующая версия: строго больше всех выданных раньше."""
+        self._clock = max(self._clock + 1, time.time_ns())
+        return self._clock
+
+    def apply(self, changes: Iterable[Change]) -> None:
+        stamp = self._tick()
+        for table, key, kind in changes:
+            self._tables[table] = max(self._tables.get(table, 0), stamp)
+            if kind == TABLE:
+                self._floors[table] = max(self._floors.get(table, 0), stamp)
+            elif kind == ROW:
+                self._rows[(table, key)] = max(self._rows.pop((table, key), 0), stamp)
+        while len(self._rows) > self.max_rows:
+            (table, _), old = self._rows.popitem(last=False)
+            self._floors[table] = max(self._floors.get(table, 0), old)
+
+    def reset(self) -> None:
+        """Всё считается изменённым (например, NOTIFY могли потерять)."""
+        self._epoch = self._tick()
+
+    def notify(self, payload: Optional[str]) -> None:
+        """Обработчик NOTIFY respcache; None — реконнект listener'а."""
+        if payload is None:
+            self.reset()
+            return
+        data = json.loads(payload)
+        self.apply(tuple(c) for c in data["c"])
+
+
+changes = ChangeLog()
+
+
+# ─────────────────────────── Session hooks ───────────────────────────
+_PENDING = "httpcache_changes"
+
+
+def _pending(session: Session) -> list[Change]:
+    return session.info.setdefault(_PENDING, [])
+
+
+def touch(session: Session, *tables: str, kind: str = INSERT) -> None:
+    """Запись мимо Session.execute (COPY): отметить таблицы вручную."""
+    _pending(session).extend((table, None, kind) for table in tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context: Any) -> None:
+    pending = _pending(session)
+    for obj in session.new:
+        pending.append((inspect(obj).mapper.local_table.name, None, INSERT))
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in [*dirty, *session.deleted]:
+        state = inspect(obj)
+        key = state.identity
+        table = state.mapper.local_table.name
+        if key is None:
+            pending.append((table, None, TABLE))
+        else:
+            pending.append((table, key[0] if len(key) == 1 else list(key), ROW))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state: ORMExecuteState) -> None:
+    if not (state.is_insert or state.is_update or state.is_delete):
+        return
+    table = getattr(state.statement, "table", None)
+    name = getattr(table, "name", None)
+    if name is not None:
+        _pending(state.session).append(
+            (name, None, INSERT if state.is_insert else TABLE)
+        )
+
+
+def _payload(pending: list[Change]) -> str:
+    payload = json.dumps({"c": pending}, default=str)
+    if len(payload) > _NOTIFY_LIMIT:  # много строк — сворачиваем до таблиц
+        tables = sorted({t for t, _, _ in pending})
+        payload = json.dumps({"c": [[t, None, TABLE] for t in tables]})
+    return payload
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session: Session) -> None:
+    pending = session.info.get(_PENDING)
+    if not pending:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(select(func.pg_notify(CHANNEL, _payload(pending))))
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if pending:
+        changes.apply(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+# ─────────────────────────── TTL + LRU ───────────────────────────
+cache_hits = registry.counter("http_cache_hits_total", "Response cache hits")
+cache_misses = registry.counter("http_cache_misses_total", "Response cache misses")
+
+
+@dataclass
+class CachedResponse:
+    etag: str
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers)
+
+
+class ResponseCache:
+    def __init__(
+        self, ttl: float = 30.0, max_entries: int = 2048, max_bytes: int = 32 << 20
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Any, CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _drop(self, key: Any) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+    def get(self, key: Any, etag: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None and (
+            entry.etag != etag or entry.expires < time.monotonic()
+        ):
+            self._drop(key)  # версия сдвинулась или TTL вышел
+            entry = None
+        if entry is None:
+            self.misses += 1
+            cache_misses.inc()
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        cache_hits.inc()
+        return entry
+
+    def put(
+        self, key: Any, etag: str, headers: list[tuple[bytes, bytes]], body: bytes
+    ) -> None:
+        entry = CachedResponse(etag, headers, body, time.monotonic() + self.ttl)
+        if entry.size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self.bytes += entry.size
+        while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.bytes = 0
+
+
+_settings = get_settings()
+cache = ResponseCache(
+    _settings.http_cache_ttl,
+    _settings.http_cache_max_entries,
+    _settings.http_cache_max_bytes,
+)
+
+not_modified = registry.counter(
+    "http_cache_not_modified_total", "304 answered from ETag"
+)
+registry.gauge("http_cache_hit_ratio", "Response cache hit ratio").set_function(
+    lambda: cache.hit_ratio
+)
+registry.gauge("http_cache_entries", "Cached responses").set_function(
+    lambda: len(cache)
+)
+registry.gauge("http_cache_bytes", "Memory held by cached responses").set_function(
+    lambda: cache.bytes
+)
+
+
+# ─────────────────────────── middleware ───────────────────────────
+@dataclass(frozen=True)
+class Rule:
+    """GET‑путь (fullmatch) → таблица; с per_row группа 1 — PK строки."""
+
+    pattern: re.Pattern
+    table: str
+    per_row: bool = False
+
+    def version(self, match: re.Match) -> int:
+        if self.per_row:
+            return changes.row_version(self.table, int(match.group(1)))
+        return changes.table_version(self.table)
+
+
+RULES = (
+    Rule(re.compile(r"/players/?"), "player"),
+    Rule(re.compile(r"/players/(\d+)"), "player", per_row=True),
+    Rule(re.compile(r"/games/?"), "game"),
+    Rule(re.compile(r"/games/page"), "game"),
+)
+
+
+def make_etag(path: str, query: str, version: int) -> str:
+    digest = hashlib.blake2b(f"{path}?{query}|{version}".encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+class HTTPCacheMiddleware:
+    """ASGI: 304 по If-None-Match и кэш 200‑ответов для путей из RULES."""
+
+    def __init__(
+        self,
+        app,  # noqa: ANN001
+        cache: ResponseCache = cache,
+        rules: tuple[Rule, ...] = RULES,
+    ):
+        self.app = app
+        self.cache = cache
+        self.rules = rules
+
+    def _match(self, path: str) -> Optional[tuple[Rule, re.Match]]:
+        for rule in self.rules:
+            if m := rule.pattern.fullmatch(path):
+                return rule, m
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        found = None
+        if scope["type"] == "http" and scope["method"] == "GET":
+            found = self._match(scope["path"])
+        if found is None:
+            await self.app(scope, receive, send)
+            return
+
+        rule, match = found
+        path, query = scope["path"], scope["query_string"].decode("latin-1")
+        # версия — до вызова ручки: запись во время ответа даст новый ETag
+        etag = make_etag(path, query, rule.version(match))
+        validators = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+
+        inm = dict(scope["headers"]).get(b"if-none-match")
+        if inm is not None and _etag_matches(inm.decode("latin-1"), etag):
+            not_modified.inc()
+            await send(
+                {"type": "http.response.start", "status": 304, "headers": validators}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        key = (path, query)
+        entry = self.cache.get(key, etag)
+        if entry is not None:
+            headers = [*entry.headers, (b"x-cache", b"hit")]
+            await send(
+                {"type": "http.response.start", "status": 200, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": entry.body})
+            return
+
+        start: dict = {}
+        chunks: list[bytes] = []
+
+        async def _send(message) -> None:  # noqa: ANN001
+            if message["type"] == "http.response.start":
+                start.update(message)
+                if message["status"] == 200:
+                    headers = [*message.get("headers", ()), *validators]
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body" and start.get("status") == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body"):
+                    headers = [*start.get("headers", ()), *validators]
+                    self.cache.put(key, etag, headers, b"".join(chunks))
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,173 @@
+"""
+Минимальные метрики в текстовом формате Prometheus (без prometheus_client).
+
+Counter/Histogram копятся в процессе; Gauge — функция, которая читается
+в момент скрейпа (например, ``pool.checkedout()``). ``/metrics`` отдаёт
+``registry.render()``. При нескольких воркерах uvicorn каждый отдаёт свои
+значения — Prometheus различает их по instance.
+"""
+
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Iterable, Optional
+
+Labels = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str):
+        self.name = name
+        self.doc = doc
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str):
+        super().__init__(name, doc)
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(key)} {_num(value)}"
+
+
+class Gauge(_Metric):
+    """Значение читается при скрейпе из зарегистрированных функций."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str):
+        super().__init__(name, doc)
+        self._readers: dict[Labels, Callable[[], float]] = {}
+
+    def set_function(self, fn: Callable[[], float], **labels: str) -> None:
+        self._readers[tuple(sorted(labels.items()))] = fn
+
+    def samples(self) -> Iterable[str]:
+        for key, fn in sorted(self._readers.items(), key=lambda kv: kv[0]):
+            yield f"{self.name}{_labels(key)} {_num(fn())}"
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, n: int) -> None:
+        self.counts = [0] * (n + 1)  # последний — +Inf
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, doc: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, doc)
+        self.buckets = tuple(sorted(buckets))
+        self._children: dict[Labels, _HistogramChild] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, labels: dict[str, str]) -> _HistogramChild:
+        key = tuple(sorted(labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(
+                    key, _HistogramChild(len(self.buckets))
+                )
+        return child
+
+    def observe(self, value: float, **labels: str) -> None:
+        child = self._child(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[i] += 1
+            child.sum += value
+
+    def count(self, **labels: str) -> int:
+        child = self._children.get(tuple(sorted(labels.items())))
+        return sum(child.counts) if child else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, child in sorted(self._children.items(), key=lambda kv: kv[0]):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, n in zip((*self.buckets, float("inf")), counts):
+                cumulative += n
+                le = 'le="' + _num(bound) + '"'
+                yield f"{self.name}_bucket{_labels(key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(key)} {_num(total)}"
+            yield f"{self.name}_count{_labels(key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing  # повторный импорт/второй engine — та же метрика
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, doc: str) -> Counter:
+        return self._register(Counter(name, doc))  # type: ignore[return-value]
+
+    def gauge(self, name: str, doc: str) -> Gauge:
+        return self._register(Gauge(name, doc))  # type: ignore[return-value]
+
+    def histogram(
+        self, name: str, doc: str, buckets: Optional[tuple[float, ...]] = None
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, doc, buckets or DEFAULT_BUCKETS)
+        )
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines += metric.header()
+            lines += metric.samples()
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
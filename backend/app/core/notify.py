@@ -0,0 +1,86 @@
+"""
+Postgres LISTEN/NOTIFY между воркерами uvicorn.
+
+Один выделенный asyncpg‑коннект на процесс слушает каналы и вызывает
+зарегистрированные обработчики. После обрыва соединения коннект
+переподнимается, а обработчики получают ``None``: уведомления за время
+простоя могли потеряться, кэши надо считать устаревшими.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import asyncpg
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[Optional[str]], None]
+
+
+class PgListener:
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Handler]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def on(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(payload)
+            except Exception:  # обработчик не должен ронять listener
+                log.exception("NOTIFY handler for %s failed", channel)
+
+    async def start(self, dsn: str) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(dsn))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, dsn: str) -> None:
+        delay = 1.0
+        while True:
+            try:
+                await self._listen(dsn)
+            except Exception:  # любой сбой — переподключение, а не смерть задачи
+                log.exception("LISTEN connection failed, retry in %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            else:
+                delay = 1.0  # коннект жил до обрыва — переподнимаем сразу
+
+    async def _listen(self, dsn: str) -> None:
+        """Одна сессия LISTEN: возвращается, когда соединение оборвалось."""
+        conn = await asyncpg.connect(dsn)
+        try:
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda _conn: lost.set())
+            for channel in self._handlers:
+                await conn.add_listener(
+                    channel, lambda _c, _pid, ch, payload: self._dispatch(ch, payload)
+                )
+                self._dispatch(channel, None)  # что‑то могли пропустить до LISTEN
+            await lost.wait()
+        finally:
+            await _close(conn)
+
+
+async def _close(conn: asyncpg.Connection) -> None:
+    """Best‑effort: оборванный коннект может не закрыться штатно."""
+    try:
+        await conn.close(timeout=5)
+    except Exception:
+        log.warning("LISTEN connection close failed", exc_info=True)
+        conn.terminate()
+
+
+listener = PgListener()
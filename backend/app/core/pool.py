@@ -0,0 +1,75 @@
+"""
+Пулы соединений с метриками для ``/metrics``.
+
+Ожидание соединения SQLAlchemy событием не отдаёт, поэтому пулы —
+тонкие подклассы, которые замеряют ``_do_get`` (очередь + при
+необходимости connect). Счётчики checkout/checkin/connect берутся из
+pool events, занятость и overflow читаются у пула в момент скрейпа.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.core.metrics import registry
+
+# ожидание соединения: от «мгновенно» до pool_timeout
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+pool_wait = registry.histogram(
+    "db_pool_wait_seconds", "Time to acquire a connection from the pool", WAIT_BUCKETS
+)
+pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that failed with pool timeout"
+)
+pool_checkouts = registry.counter("db_pool_checkouts_total", "Connection checkouts")
+pool_connects = registry.counter("db_pool_connects_total", "New DBAPI connections")
+pool_checked_out = registry.gauge("db_pool_checked_out", "Connections in use")
+pool_overflow = registry.gauge("db_pool_overflow", "Connections above pool_size")
+pool_size = registry.gauge("db_pool_size", "Configured pool_size")
+
+
+class _TimedMixin:
+    metrics_label = "default"
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except PoolTimeout:
+            pool_timeouts.inc(engine=self.metrics_label)
+            raise
+        finally:
+            pool_wait.observe(time.perf_counter() - started, engine=self.metrics_label)
+
+
+class TimedQueuePool(_TimedMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument(pool: Pool, label: str) -> None:
+    """Подписывает пул engine'а на метрики под меткой ``engine=label``."""
+    if isinstance(pool, _TimedMixin):
+        pool.metrics_label = label
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_conn, record, proxy):  # noqa: ANN001
+        pool_checkouts.inc(engine=label)
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_conn, record):  # noqa: ANN001
+        pool_connects.inc(engine=label)
+
+    if isinstance(pool, QueuePool):
+        pool_checked_out.set_function(pool.checkedout, engine=label)
+        pool_overflow.set_function(lambda: max(pool.overflow(), 0), engine=label)
+        pool_size.set_function(pool.size, engine=label)
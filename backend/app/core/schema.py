@@ -0,0 +1,35 @@
+"""
+Сверка схемы при старте воркера: ревизия alembic в БД должна совпадать
+с head из migrations/. Дешевле create_all и не маскирует
+забытое ``alembic upgrade head``.
+"""
+
+from functools import lru_cache
+from pathlib import Path
+
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.engine import Connection
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+
+
+class SchemaMismatch(RuntimeError):
+    def __init__(self, database: frozenset[str], code: frozenset[str]):
+        super().__init__(
+            f"database is at {sorted(database) or 'no revision'}, "
+            f"code expects {sorted(code)}; run `alembic upgrade head`"
+        )
+        self.database = database
+        self.code = code
+
+
+@lru_cache
+def code_heads() -> frozenset[str]:
+    return frozenset(ScriptDirectory(str(MIGRATIONS_DIR)).get_heads())
+
+
+def check_head(conn: Connection) -> None:
+    database = frozenset(MigrationContext.configure(conn).get_current_heads())
+    if database != code_heads():
+        raise SchemaMismatch(database, code_heads())
@@ -0,0 +1,126 @@
+"""
+SQL на запрос: число запросов, время в БД и повторяющиеся «формы» запросов.
+
+Хуки ``before/after_cursor_execute`` висят на классе ``Engine`` (все
+engine'ы процесса, включая async через greenlet) и пишут в ``QueryStats``
+текущего контекста. ``SQLTraceMiddleware`` открывает такой контекст на
+каждый HTTP‑запрос, добавляет ``Server-Timing`` и предупреждает в лог,
+если одна форма запроса повторилась больше ``sql_repeat_warn`` раз —
+типичный N+1 от ленивого ``Game.players`` / ``GamePlayer.player``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+# (?, ?, ?) / ($1, $2) / (%(a)s, %(b)s) → (?): IN с разной длиной — одна форма
+_PARAMS = re.compile(
+    r"\(\s*(?:\?|\$\d+|%\(\w+\)s)(?:\s*,\s*(?:\?|\$\d+|%\(\w+\)s))*\s*\)"
+)
+_ROWS = re.compile(r"\(\?\)(?:, \(\?\))+")  # VALUES (?), (?), … → (?)
+_SPACES = re.compile(r"\s+")
+
+
+def shape(statement: str) -> str:
+    return _ROWS.sub("(?)", _PARAMS.sub("(?)", _SPACES.sub(" ", statement).strip()))
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Формы, выполненные больше threshold раз, по убыванию."""
+        return [(s, n) for s, n in self.shapes.most_common() if n > threshold]
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_stats", default=None)
+_START = "_sqltrace_start"
+
+# наблюдатели за завершёнными HTTP‑запросами (тесты: query_budget)
+observers: list[Callable[[str, QueryStats], None]] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    if _current.get() is not None:
+        conn.info.setdefault(_START, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after(conn, cursor, statement, parameters, context, executemany):  # noqa: ANN001
+    stats = _current.get()
+    starts = conn.info.get(_START)
+    if stats is None or not starts:
+        return
+    stats.seconds += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.shapes[shape(statement)] += 1
+
+
+@contextmanager
+def track() -> Iterator[QueryStats]:
+    """Считает SQL внутри блока (и в задачах/потоках, унаследовавших контекст)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def server_timing(stats: QueryStats, total: float) -> str:
+    return (
+        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", '
+        f"app;dur={total * 1000:.1f}"
+    )
+
+
+class SQLTraceMiddleware:
+    """ASGI: QueryStats на каждый HTTP‑запрос + Server-Timing + N+1 в лог."""
+
+    def __init__(self, app, repeat_warn: int = 10) -> None:  # noqa: ANN001
+        self.app = app
+        self.repeat_warn = repeat_warn
+
+    async def __call__(self, scope, receive, send) -> None:  # noqa: ANN001
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with track() as stats:
+
+            async def _send(message) -> None:  # noqa: ANN001
+                if message["type"] == "http.response.start":
+                    value = server_timing(stats, time.perf_counter() - started)
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", value.encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, _send)
+            finally:
+                self._report(scope, stats)
+
+    def _report(self, scope, stats: QueryStats) -> None:  # noqa: ANN001
+        where = f"{scope.get('method', '')} {scope.get('path', '')}"
+        for statement, n in stats.repeated(self.repeat_warn):
+            log.warning("N+1? query ran %dx in %s: %s", n, where, statement[:200])
+        for observer in observers:
+            observer(where, stats)
@@ -0,0 +1,83 @@
+"""
+Диалектные INSERT'ы: ON CONFLICT есть и у Postgres, и у SQLite (тесты);
+пакетная вставка — COPY на Postgres, executemany на остальных.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import enum
+import io
+import json
+from typing import Any, Union
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def insert_for(session: Union[Session, AsyncSession], table: Any) -> Any:
+	"""``insert(table)`` того диалекта, к которому привязана сессия."""
+	name = session.get_bind().dialect.name
+	if name == "postgresql":
+		return postgresql.insert(table)
+	if name == "sqlite":
+		return sqlite.insert(table)
+	raise NotImplementedError(f"ON CONFLICT is not supported for {name!r}")
+
+
+def _copy_value(value: Any) -> str:
+	if value is None:
+		return r"\N"
+	if isinstance(value, enum.Enum):
+		value = value.name  # sa.Enum хранит имена членов
+	elif isinstance(value, bool):
+		value = "t" if value else "f"
+	elif isinstance(value, dict):
+		value = json.dumps(value, separators=(",", ":"), default=str)
+	elif isinstance(value, (dt.date, dt.datetime)):
+		value = value.isoformat()
+	return (
+		str(value)
+		.replace("\\", "\\\\")
+		.replace("\t", "\\t")
+		.replace("\n", "\\n")
+		.replace("\r", "\\r")
+	)
+
+
+def bulk_insert(session: Session, table: Any, rows: list[dict[str, Any]]) -> None:
+	"""
+	Много строк в текущей транзакции: на Postgres — COPY FROM STDIN (text)
+	через psycopg2, иначе executemany. Session‑события COPY не видят —
+	вызывающий сам отмечает изменённые таблицы (httpcache.touch).
+	"""
+	if not rows:
+		return
+	if session.get_bind().dialect.name != "postgresql":
+		session.execute(insert(table), rows)
+		return
+	cols = list(rows[0])
+	buf = io.StringIO()
+	for row in rows:
+		buf.write("\t".join(_copy_value(row[c]) for c in cols))
+		buf.write("\n")
+	buf.seek(0)
+	names = ", ".join(f'"{c}"' for c in cols)
+	with session.connection().connection.dbapi_connection.cursor() as cur:
+		cur.copy_expert(f'COPY "{table.name}" ({names}) FROM STDIN', buf)
+
+
+def reserve_ids(session: Session, table: Any, n: int) -> list[int]:
+	"""
+	``n`` id для ``table`` до вставки (COPY не умеет RETURNING): на Postgres —
+	из serial‑последовательности, иначе max(id)+1… (один писатель, тесты).
+	"""
+	if n <= 0:
+		return []
+	if session.get_bind().dialect.name == "postgresql":
+		stmt = text("SELECT nextval(pg_get_serial_sequence(:t, 'id')) FROM generate_series(1, :n)")
+		return list(session.scalars(stmt, {"t": f'"{table.name}"', "n": n}))
+	start = session.scalar(select(func.max(table.c.id))) or 0
+	return list(range(start + 1, start + n + 1))
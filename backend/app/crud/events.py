@@ -0,0 +1,259 @@
+"""
+CRUD‑layer для GameEvent: пакетная запись автосейва живой игры и
+аналитические запросы по логу (statement builders — годятся и для sync,
+и для async сессии).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import ColumnElement, Select, and_, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.dialect import insert_for
+from app.models.event import EventType, GameEvent
+from app.models.game import Game, GamePlayer
+from app.schemas.events import EventIn
+from app.services import event_archive
+from app.services import refcache as refdata  # модулем: цикл через scoring
+from app.services.event_archive import EventRow
+
+
+class UnknownEventType(ValueError):
+	"""В батче есть коды, которых нет в справочнике eventtype."""
+
+	def __init__(self, codes: set[str]):
+		super().__init__(", ".join(sorted(codes)))
+		self.codes = codes
+
+
+FIRST_SEQ = 1  # клиент нумерует события игры с 0 или 1
+
+
+async def acked_seq(session: AsyncSession, game_id: int) -> Optional[int]:
+	"""
+	Наибольший client_seq, до которого лог игры без дыр (от первого
+	события). Не max: два перекрывшихся автосейва могут закоммититься не по
+	порядку, и max «подтвердил» бы ещё не записанный батч.
+	"""
+	nxt = GameEvent.__table__.alias("nxt")
+	island_end = (
+		select(func.min(GameEvent.client_seq))
+		.where(
+			GameEvent.game_id == game_id,
+			~select(nxt.c.id)
+			.where(nxt.c.game_id == game_id, nxt.c.client_seq == GameEvent.client_seq + 1)
+			.exists(),
+		)
+		.scalar_subquery()
+	)
+	stmt = select(func.min(GameEvent.client_seq), island_end).where(GameEvent.game_id == game_id)
+	first, end = (await session.execute(stmt)).one()
+	if first is None or first > FIRST_SEQ:
+		return None  # начало лога ещё не дошло
+	return end
+
+
+async def ingest_batch(
+		session: AsyncSession,
+		game_id: int,
+		events: Sequence[EventIn],
+) -> tuple[list[dict[str, Any]], Optional[int]]:
+	"""
+	Записывает батч одним multi‑row INSERT ... ON CONFLICT DO NOTHING.
+
+	Повторы отсеиваются по уже записанным client_seq этой игры, а не по
+	ключу: уникальный ключ на Postgres — (game_id, client_seq, ts), и
+	повтор с другим ts он бы пропустил. Батчи одной игры идут по очереди
+	(advisory‑lock до commit), так что между проверкой и INSERT никто не
+	вклинится. Фильтра «всё, что ≤ acked» нет — батч, закоммиченный позже
+	соседнего, молча терялся бы. Возвращает (реально вставленные события из
+	RETURNING, acked_seq) — их сразу раздают зрителям без перечитывания.
+	"""
+	if not events:
+		return [], await acked_seq(session, game_id)
+
+	codes = {e.code for e in events}
+	type_ids = await refdata.refcache.resolve_event_types(session, codes)  # без запроса
+	if missing := codes - type_ids.keys():
+		raise UnknownEventType(missing)
+
+	if session.get_bind().dialect.name == "postgresql":
+		lock = func.pg_advisory_xact_lock(func.hashtext(GameEvent.__tablename__), game_id)
+		await session.execute(select(lock))
+	stored = set(
+		await session.scalars(
+			select(GameEvent.client_seq).where(
+				GameEvent.game_id == game_id,
+				GameEvent.client_seq.in_([e.client_seq for e in events]),  # type: ignore[union-attr]
+			)
+		)
+	)
+	events = [e for e in events if e.client_seq not in stored]
+	if not events:
+		await session.commit()  # отпустить lock
+		return [], await acked_seq(session, game_id)
+
+	stmt = (
+		insert_for(session, GameEvent.__table__)
+		.values(
+			[
+				{
+					"game_id": game_id,
+					"client_seq": e.client_seq,
+					"event_type_id": type_ids[e.code],
+					"ts": e.ts,
+					"payload": e.payload,
+				}
+				for e in events
+			]
+		)
+		.on_conflict_do_nothing()
+		.returning(
+			GameEvent.id,
+			GameEvent.client_seq,
+			GameEvent.ts,
+			GameEvent.event_type_id,
+			GameEvent.payload,
+		)
+	)
+	rows = (await session.execute(stmt)).all()
+	await session.commit()
+
+	codes_by_id = {v: k for k, v in type_ids.items()}
+	inserted = [
+		{
+			"id": r.id,
+			"client_seq": r.client_seq,
+			"code": codes_by_id[r.event_type_id],
+			"ts": r.ts,
+			"payload": r.payload,
+		}
+		for r in sorted(rows, key=lambda r: r.client_seq)
+	]
+	return inserted, await acked_seq(session, game_id)
+
+
+async def game_logs(
+		session: AsyncSession,
+		game_ids: Sequence[int],
+		after_seq: Optional[int] = None,
+) -> dict[int, list[EventRow]]:
+	"""Логи игр в порядке игры: архивный blob + горячие строки (event_archive.merge)."""
+	hot = (await session.execute(event_archive.hot_stmt(game_ids, after_seq))).tuples().all()
+	archived = (await session.execute(event_archive.archived_stmt(game_ids))).tuples().all()
+	return event_archive.merge(hot, archived, after_seq)
+
+
+async def game_log(session: AsyncSession, game_id: int) -> list[EventRow]:
+	"""Весь лог одной игры — ``game_logs`` для одного id."""
+	return (await game_logs(session, [game_id])).get(game_id, [])
+
+
+# ───────────────────────────── аналитика ─────────────────────────────
+# Фильтры по target_seat / actor_seat идут по генерируемым колонкам, выбор
+# типа — по ix_gameevent_type_game, лог одной игры — по ix_gameevent_game_ts.
+def type_id(code: str) -> Any:
+	"""id типа подзапросом: на Postgres — один InitPlan, индекс по параметру."""
+	return select(EventType.id).where(EventType.code == code).scalar_subquery()
+
+
+def payload_contains(dialect: str, **fragment: Any) -> ColumnElement[bool]:
+	"""
+	``payload @> fragment`` — на Postgres идёт по GIN (jsonb_path_ops);
+	в остальных диалектах — равенство ключей верхнего уровня.
+	"""
+	if dialect == "postgresql":
+		return GameEvent.payload.op("@>")(cast(literal(json.dumps(fragment)), JSONB))  # type: ignore[attr-defined]
+	clauses = []
+	for key, value in fragment.items():
+		path, doc = f"$.{key}", literal(json.dumps(value))
+		# json_type отличает true от 1, json_extract сравнивает значение
+		clauses += [
+			func.json_type(GameEvent.payload, path) == func.json_type(doc, "$"),
+			func.json_extract(GameEvent.payload, path) == func.json_extract(doc, "$"),
+		]
+	return and_(*clauses)
+
+
+def events_stmt(
+		code: str,
+		*,
+		target_seat: Optional[int] = None,
+		actor_seat: Optional[int] = None,
+		game_ids: Optional[Sequence[int]] = None,
+) -> Select[Any]:
+	stmt = select(GameEvent).where(GameEvent.event_type_id == type_id(code))
+	if target_seat is not None:
+		stmt = stmt.where(GameEvent.target_seat == target_seat)
+	if actor_seat is not None:
+		stmt = stmt.where(GameEvent.actor_seat == actor_seat)
+	if game_ids is not None:
+		stmt = stmt.where(GameEvent.game_id.in_(game_ids))  # type: ignore[attr-defined]
+	return stmt.order_by(GameEvent.game_id, GameEvent.ts)
+
+
+def _in_range(stmt: Select[Any], date_from: Optional[dt.date], date_to: Optional[dt.date]) -> Select[Any]:
+	if date_from is None and date_to is None:
+		return stmt
+	stmt = stmt.join(Game, Game.id == GameEvent.game_id)
+	if date_from is not None:
+		stmt = stmt.where(Game.date >= date_from)
+	if date_to is not None:
+		stmt = stmt.where(Game.date <= date_to)
+	return stmt
+
+
+def fouls_by_player_stmt(
+		player_id: Optional[int] = None,
+		date_from: Optional[dt.date] = None,
+		date_to: Optional[dt.date] = None,
+) -> Select[Any]:
+	"""(player_id, fouls): место фола → игрок через uq_game_seat, без разбора JSON."""
+	stmt = (
+		select(GamePlayer.player_id, func.count().label("fouls"))
+		.select_from(GameEvent)
+		.join(
+			GamePlayer,
+			and_(
+				GamePlayer.game_id == GameEvent.game_id,
+				GamePlayer.seat_no == GameEvent.target_seat,
+			),
+		)
+		.where(GameEvent.event_type_id == type_id("foul"))
+		.group_by(GamePlayer.player_id)
+	)
+	if player_id is not None:
+		stmt = stmt.where(GamePlayer.player_id == player_id)
+	return _in_range(stmt, date_from, date_to)
+
+
+def first_night_kills_stmt(
+		date_from: Optional[dt.date] = None,
+		date_to: Optional[dt.date] = None,
+) -> Select[Any]:
+	"""
+	(game_id, target_seat, ts) отстрелов первой ночи: до kill в той же игре
+	ровно одна фаза «night». Подзапрос читает лог игры по (game_id, ts).
+	"""
+	phase = GameEvent.__table__.alias("phase")
+	nights = (
+		select(func.count())
+		.where(
+			phase.c.game_id == GameEvent.game_id,
+			phase.c.event_type_id == type_id("phase"),
+			phase.c.payload["phase"].as_string() == "night",
+			phase.c.ts <= GameEvent.ts,
+		)
+		.scalar_subquery()
+	)
+	stmt = (
+		select(GameEvent.game_id, GameEvent.target_seat, GameEvent.ts)
+		.where(GameEvent.event_type_id == type_id("kill"), nights == 1)
+		.order_by(GameEvent.game_id)
+	)
+	return _in_range(stmt, date_from, date_to)
@@ -1,17 +1,64 @@
-"""CRUD‑layer for Game (чистая работа с БД, без бизнес‑логики)."""
+"""
+CRUD‑layer for Game. Кроме запросов — то, что должно случиться в той же
+транзакции: очки и агрегаты при завершении игры, событие лога при
+действии с местом (единственный путь записи ``foul`` / ``remove``).
+"""
 
 from __future__ import annotations
 
 import datetime as dt
-from typing import Any, Optional, Sequence, cast
+from enum import Enum
+from functools import cache
+from typing import Any, NamedTuple, Optional, Sequence, cast
 from uuid import UUID
 
-from sqlalchemy import desc, select
+from sqlalchemy import Row, Select, desc, insert, literal, select, tuple_, update
 from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.sql.base import ExecutableOption
 
-from app.core.enums import GameState
-from app.models.game import Game
-from app.schemas.games import GameCreate
+from app.core.cursor import InvalidCursor, decode_cursor, encode_cursor
+from app.core.enums import Faction, GameState
+from app.crud import players
+from app.models.event import EventType, GameEvent, VoteRound
+from app.models.extras import GameAudit
+from app.models.game import Game, GamePlayer
+from app.schemas.games import GameCreate, GameHeader, GameSetup, GameSetupOut, SeatOut
+from app.services import event_archive, player_stats, rollups, scoring
+from app.services.live_state import FOUL_LIMIT
+from app.services.refcache import refcache
+
+
+# ─────────────────────────── LOAD PROFILES ─────────────────────────
+class LoadProfile(str, Enum):
+	"""
+	Что подгружать вместе с Game. Связи модели ленивые, поэтому всё,
+	кроме header, запрашивается явно — одним SELECT ... IN на связь.
+	"""
+
+	header = "header"  # только строка game
+	with_players = "with_players"  # + gameplayer
+	with_events = "with_events"  # + gameevent
+	full = "full"  # + gameplayer/extrapoints, gameevent, voteround/voteitem
+
+
+@cache
+def _profile_options(profile: LoadProfile) -> tuple[ExecutableOption, ...]:
+	# лениво: selectinload() конфигурирует мапперы, а при импорте модуля
+	# ещё не все модели (User, GameAudit, ...) зарегистрированы
+	return {
+		LoadProfile.header: (),
+		LoadProfile.with_players: (selectinload(Game.players),),
+		LoadProfile.with_events: (selectinload(Game.events),),
+		LoadProfile.full: (
+			selectinload(Game.players).selectinload(GamePlayer.extra_points),
+			selectinload(Game.events),
+			selectinload(Game.vote_rounds).selectinload(VoteRound.items),
+		),
+	}[profile]
+
+
+# колонки для лёгких списков: без ORM‑объектов и identity map
+HEADER_COLUMNS = tuple(Game.__table__.c)
 
 
 # ───────────────────────────── CREATE ──────────────────────────────
@@ -23,23 +70,82 @@ def create(session: Session, game_in: GameCreate, gm_id: UUID) -> Game:
 	return obj
 
 
+# ───────────────────────────── SETUP ───────────────────────────────
+# Игра + недостающие Player + все места: 3–4 statement'а и один COMMIT.
+def _setup_game_stmt(data: GameSetup) -> Any:
+	return (
+		insert(Game)
+		.values(
+			players_qty=data.players_qty,
+			rule_set_id=data.rule_set_id,
+			gm_id=data.gm_id,
+			state=GameState.draft,
+		)
+		.returning(*HEADER_COLUMNS)
+	)
+
+
+def _seats_stmt(game_id: int, data: GameSetup, ids: dict[str, int]) -> Any:
+	return insert(GamePlayer).values(
+		[
+			{
+				"game_id": game_id,
+				"player_id": ids[seat.nickname.casefold()],
+				"seat_no": seat_no,
+				"role": seat.role,
+			}
+			for seat_no, seat in enumerate(data.seats, start=1)
+		]
+	)
+
+
+def _setup_result(
+		game: Row[Any], data: GameSetup, ids: dict[str, int], created: set[int]
+) -> GameSetupOut:
+	seats = []
+	for seat_no, seat in enumerate(data.seats, start=1):
+		player_id = ids[seat.nickname.casefold()]
+		seats.append(
+			SeatOut(
+				seat_no=seat_no,
+				player_id=player_id,
+				nickname=seat.nickname,
+				role=seat.role,
+				created=player_id in created,
+			)
+		)
+	return GameSetupOut(game=GameHeader.model_validate(game), seats=seats)
+
+
+def setup(session: Session, data: GameSetup) -> GameSetupOut:
+	nicknames = [s.nickname for s in data.seats]
+	game = session.execute(_setup_game_stmt(data)).one()
+	new = session.execute(players.new_players_stmt(session, nicknames)).tuples().all()
+	ids = players.ids_by_nickname(new)
+	if missing := [n for n in nicknames if n.casefold() not in ids]:
+		rows = session.execute(players.existing_players_stmt(missing))
+		ids.update(players.ids_by_nickname(rows.tuples().all()))
+	session.execute(_seats_stmt(game.id, data, ids))
+	session.commit()
+	return _setup_result(game, data, ids, {player_id for player_id, _ in new})
+
+
 # ────────────────────────────── READ ───────────────────────────────
 def get(
 		session: Session,
 		game_id: int,
 		*,
 		with_players: bool = False,
+		profile: LoadProfile | None = None,
 ) -> Optional[Game]:
-	if not with_players:
+	if profile is None:
+		profile = LoadProfile.with_players if with_players else LoadProfile.header
+
+	if profile is LoadProfile.header:
 		# .get() → Any; подсказываем mypy через cast
 		return cast(Optional[Game], session.get(Game, game_id))
 
-	stmt = (
-		select(Game)
-		.filter_by(id=game_id)  # избегаем "bool vs ColumnElement"
-		.options(selectinload(Game.players))
-	)
-	return cast(Optional[Game], session.scalar(stmt))
+	return cast(Optional[Game], session.scalar(_get_stmt(game_id, profile)))
 
 
 def list_games(
@@ -47,18 +153,251 @@ def list_games(
 		*,
 		skip: int = 0,
 		limit: int = 100,
+		profile: LoadProfile = LoadProfile.header,
 ) -> Sequence[Game]:
-	gtbl = Game.__table__.c
-	stmt = (
+	stmt = _list_stmt(select(Game), skip, limit).options(*_profile_options(profile))
+	return cast(Sequence[Game], session.scalars(stmt).all())
+
+
+def list_game_headers(
+		session: Session,
+		*,
+		skip: int = 0,
+		limit: int = 100,
+) -> Sequence[Row[Any]]:
+	"""То же, что list_games, но проекцией колонок — для списочных эндпоинтов."""
+	return session.execute(_list_stmt(select(*HEADER_COLUMNS), skip, limit)).all()
+
+
+def list_games_page(
+		session: Session,
+		*,
+		cursor: str | None = None,
+		limit: int = 100,
+) -> tuple[Sequence[Row[Any]], Optional[str]]:
+	"""
+	Keyset‑пагинация по (date, id) DESC: вместо OFFSET — условие
+	«строго после последней строки прошлой страницы», поэтому глубокие
+	страницы стоят столько же, сколько первая (индекс ix_game_date_id).
+	Возвращает проекцию колонок, как list_game_headers.
+	"""
+	rows = session.execute(_page_stmt(cursor, limit)).all()
+	return _page_result(rows, limit)
+
+
+# ─────────────── statement builders (общие с games_async) ───────────────
+def _get_stmt(game_id: int, profile: LoadProfile) -> Select[Any]:
+	return (
 		select(Game)
-		.order_by(
-			desc(cast(Any, gtbl.date)),  # type stubs think .date is python date
-			desc(cast(Any, gtbl.id)),
-		)
-		.offset(skip)
-		.limit(limit)
+		.filter_by(id=game_id)  # избегаем "bool vs ColumnElement"
+		.options(*_profile_options(profile))
 	)
-	return cast(Sequence[Game], session.scalars(stmt).all())
+
+
+def _ordered(stmt: Select[Any]) -> Select[Any]:
+	gtbl = Game.__table__.c
+	return stmt.order_by(
+		desc(cast(Any, gtbl.date)),  # type stubs think .date is python date
+		desc(cast(Any, gtbl.id)),
+	)
+
+
+def _list_stmt(stmt: Select[Any], skip: int, limit: int) -> Select[Any]:
+	return _ordered(stmt).offset(skip).limit(limit)
+
+
+def _page_stmt(cursor: str | None, limit: int) -> Select[Any]:
+	gtbl = Game.__table__.c
+	# +1 строка — узнать, есть ли следующая страница
+	stmt = _ordered(select(*HEADER_COLUMNS)).limit(limit + 1)
+	if cursor is not None:
+		last_date, last_id = decode_cursor(cursor, 2)
+		try:
+			last_date, last_id = dt.date.fromisoformat(last_date), int(last_id)
+		except (TypeError, ValueError) as exc:
+			raise InvalidCursor(cursor) from exc
+		stmt = stmt.where(tuple_(gtbl.date, gtbl.id) < tuple_(last_date, last_id))
+	return stmt
+
+
+def _page_result(
+		rows: Sequence[Row[Any]], limit: int
+) -> tuple[Sequence[Row[Any]], Optional[str]]:
+	games = rows[:limit]
+	next_cursor = None
+	if len(rows) > limit:
+		last = games[-1]
+		next_cursor = encode_cursor(last.date, last.id)
+	return games, next_cursor
+
+
+# ─────────────────────────── TRANSITIONS ───────────────────────────
+# Откуда можно прийти в каждое состояние. finished → live — правка
+# организатором («переоткрыть» игру), aborted — терминальное.
+ALLOWED_FROM: dict[GameState, frozenset[GameState]] = {
+	GameState.draft: frozenset(),
+	GameState.live: frozenset({GameState.draft, GameState.finished}),
+	GameState.finished: frozenset({GameState.live}),
+	GameState.aborted: frozenset({GameState.draft, GameState.live}),
+}
+
+
+class GameConflict(Exception):
+	"""Условный UPDATE не нашёл строку в ожидаемом состоянии."""
+
+
+class InvalidTransition(GameConflict):
+	def __init__(self, current: GameState, target: GameState):
+		super().__init__(f"{current.value} → {target.value} is not allowed")
+		self.current = current
+		self.target = target
+
+
+class StaleGameVersion(GameConflict):
+	def __init__(self, expected: int, actual: int):
+		super().__init__(f"game version is {actual}, expected {expected}")
+		self.expected = expected
+		self.actual = actual
+
+
+def _transition_stmt(
+		game_id: int,
+		new_state: GameState,
+		sources: frozenset[GameState],
+		expected_version: int | None,
+		finished_at: dt.datetime | None,
+		aborted: bool | None,
+		winner: Faction | None,
+) -> Any:
+	"""UPDATE game SET … WHERE id AND state IN (…) [AND version] RETURNING game."""
+	values: dict[str, Any] = {"state": new_state, "version": Game.version + 1}
+	if finished_at is not None:
+		values["finished_at"] = finished_at
+	if aborted is not None:
+		values["aborted"] = aborted
+	if winner is not None:
+		values["winner_faction"] = winner
+	stmt = update(Game).where(
+		Game.id == game_id,
+		Game.state.in_(sources),  # type: ignore[attr-defined]
+	)
+	if expected_version is not None:
+		stmt = stmt.where(Game.version == expected_version)
+	return (
+		stmt.values(values)
+		.returning(Game)
+		.execution_options(populate_existing=True, synchronize_session=False)
+	)
+
+
+def _conflict(
+		session: Session,
+		game_id: int,
+		new_state: GameState,
+		sources: frozenset[GameState],
+		expected_version: int | None,
+) -> Optional[GameConflict]:
+	"""UPDATE промахнулся: почему? None — игры нет (только на пути ошибки)."""
+	row = session.execute(
+		select(Game.state, Game.version).where(Game.id == game_id)
+	).one_or_none()
+	if row is None:
+		return None
+	if row.state not in sources:
+		return InvalidTransition(row.state, new_state)
+	return StaleGameVersion(cast(int, expected_version), row.version)
+
+
+def _score(session: Session, obj: Game) -> None:
+	"""Очки завершённой игры; RuleSet берётся из кэша справочников."""
+	compiled = refcache.rule_set(session, obj.rule_set_id)
+	scoring.score_game(session, cast(int, obj.id), compiled)
+
+
+def _apply_aggregates(session: Session, game_id: int, sign: int = 1) -> None:
+	player_stats.apply_game(session, game_id, sign)
+	rollups.apply_game(session, game_id, sign)
+
+
+def _update_state(
+		session: Session,
+		game_id: int,
+		new_state: GameState,
+		sources: frozenset[GameState],
+		expected_version: int | None,
+		finished_at: dt.datetime | None,
+		aborted: bool | None,
+		winner: Faction | None,
+) -> Optional[Game]:
+	stmt = _transition_stmt(
+		game_id, new_state, sources, expected_version, finished_at, aborted, winner
+	)
+	return cast(Optional[Game], session.scalars(stmt).one_or_none())
+
+
+def _transition(
+		session: Session,
+		game_id: int,
+		new_state: GameState,
+		expected_version: int | None,
+		finished_at: dt.datetime | None,
+		aborted: bool | None,
+		winner: Faction | None,
+		actor_id: UUID | None,
+) -> Optional[Game]:
+	"""
+	Смена состояния + очки + агрегаты в одной транзакции (без commit).
+	Горячий путь (draft → live → finished) — один условный UPDATE по
+	источникам без finished; SELECT и второй UPDATE — только если он
+	промахнулся (переоткрытие игры или конфликт). Sync, чтобы async‑версия
+	звала её через run_sync; при GameConflict транзакцию откатывает вызывающий.
+	"""
+	allowed = ALLOWED_FROM[new_state]
+	sources = allowed - {GameState.finished}
+	obj = _update_state(
+		session, game_id, new_state, sources, expected_version, finished_at, aborted, winner
+	)
+	reopening = False
+	if obj is None and GameState.finished in allowed:
+		# промах: может, это переоткрытие — тогда вклад снимаем по старым
+		# очкам/победителю, до изменений; UPDATE подтвердит, что игра finished
+		current = session.scalar(select(Game.state).where(Game.id == game_id))
+		if current is GameState.finished:
+			reopening = True
+			_apply_aggregates(session, game_id, sign=-1)
+			obj = _update_state(
+				session,
+				game_id,
+				new_state,
+				frozenset({GameState.finished}),
+				expected_version,
+				finished_at,
+				aborted,
+				winner,
+			)
+	if obj is None:
+		if (exc := _conflict(session, game_id, new_state, allowed, expected_version)) is not None:
+			raise exc
+		return None
+
+	if reopening:
+		# архивный лог — снова в горячий: дедупликация повторов автосейва
+		# и acked_seq смотрят только в gameevent
+		event_archive.restore(session, game_id)
+		session.add(
+			GameAudit(
+				game_id=game_id,
+				user_id=actor_id or obj.gm_id,
+				field="state",
+				old_value=GameState.finished.value,
+				new_value=new_state.value,
+			)
+		)
+	if new_state is GameState.finished:
+		_score(session, obj)
+		session.flush()
+		_apply_aggregates(session, game_id)
+	return obj
 
 
 # ───────────────────────────── UPDATE ──────────────────────────────
@@ -67,23 +406,137 @@ def update_state(
 		game_id: int,
 		new_state: GameState,
 		*,
+		expected_version: int | None = None,
 		finished_at: dt.datetime | None = None,
 		aborted: bool | None = None,
+		winner: Faction | None = None,
+		actor_id: UUID | None = None,
 ) -> Optional[Game]:
-	obj = cast(Optional[Game], session.get(Game, game_id))
-	if obj is None:
-		return None
+	"""
+	Переход по ALLOWED_FROM; с ``expected_version`` — ещё и оптимистичная
+	блокировка. Конфликт → InvalidTransition / StaleGameVersion, None —
+	игры нет. Уход из finished пишет GameAudit от ``actor_id`` (по умолчанию —
+	ведущий) и откатывает вклад игры в агрегаты; вход в finished — начисляет.
+	"""
+	try:
+		obj = _transition(
+			session, game_id, new_state, expected_version, finished_at, aborted, winner, actor_id
+		)
+	except GameConflict:
+		session.rollback()
+		raise
+	session.commit()
+	return obj
 
-	obj.state = new_state
-	if finished_at is not None:
-		obj.finished_at = finished_at
-	if aborted is not None:
-		obj.aborted = aborted
 
-	session.add(obj)
+# ───────────────────────────── SEATS ───────────────────────────────
+# Горячий путь живой игры: одно условное UPDATE … RETURNING на действие.
+class SeatConflict(GameConflict):
+	"""Игрок уже удалён, места нет или игра не live."""
+
+
+def _seat_stmt(game_id: int, seat_no: int, values: dict[str, Any]) -> Any:
+	gp = GamePlayer.__table__
+	live = (
+		select(Game.id)
+		.where(Game.id == game_id, Game.state == GameState.live)
+		.exists()
+	)
+	return (
+		update(gp)
+		.where(
+			gp.c.game_id == game_id,
+			gp.c.seat_no == seat_no,
+			gp.c.removed.is_(False),
+			live,
+		)
+		.values(values)
+		.returning(*gp.c)
+	)
+
+
+def _foul_stmt(game_id: int, seat_no: int) -> Any:
+	fouls = GamePlayer.__table__.c.fouls_count
+	return _seat_stmt(
+		game_id,
+		seat_no,
+		{
+			"fouls_count": fouls + 1,
+			"removed": fouls + 1 >= FOUL_LIMIT,
+		},
+	)
+
+
+def _removal_stmt(game_id: int, seat_no: int) -> Any:
+	return _seat_stmt(game_id, seat_no, {"removed": True})
+
+
+FOUL, REMOVE = "foul", "remove"  # schemas.events.SEAT_CODES: автосейв их не пишет
+
+
+class SeatChange(NamedTuple):
+	seat: Row[Any]  # строка gameplayer после UPDATE
+	event: Optional[dict[str, Any]]  # то же действие в логе; None — кода нет в eventtype
+
+
+def _seat_event_stmt(game_id: int, code: str, seat_no: int) -> Any:
+	"""
+	INSERT … SELECT события места: лог (LiveGameState, аналитика, зрители)
+	не расходится с gameplayer. Кода нет в справочнике — ни одной строки.
+	"""
+	c = GameEvent.__table__.c
+	src = select(
+		literal(game_id),
+		EventType.id,
+		literal(dt.datetime.now(dt.timezone.utc), c.ts.type),
+		literal({"target_seat": seat_no}, c.payload.type),
+	).where(EventType.code == code)
+	return (
+		insert(GameEvent.__table__)
+		.from_select(["game_id", "event_type_id", "ts", "payload"], src)
+		.returning(c.id, c.client_seq, c.ts, c.payload)
+	)
+
+
+def _seat_change(seat: Row[Any], code: str, event: Optional[Row[Any]]) -> SeatChange:
+	if event is None:
+		return SeatChange(seat, None)
+	return SeatChange(seat, {"code": code, **event._asdict()})
+
+
+def _seat_update(
+		session: Session, game_id: int, seat_no: int, stmt: Any, code: str, message: str
+) -> SeatChange:
+	row = session.execute(stmt).one_or_none()
+	if row is None:
+		session.rollback()
+		raise SeatConflict(message)
+	event = session.execute(_seat_event_stmt(game_id, code, seat_no)).one_or_none()
 	session.commit()
-	session.refresh(obj)
-	return obj
+	return _seat_change(row, code, event)
+
+
+def add_foul(session: Session, game_id: int, seat_no: int) -> SeatChange:
+	"""+1 фол; на FOUL_LIMIT игрок удаляется тем же UPDATE."""
+	return _seat_update(
+		session,
+		game_id,
+		seat_no,
+		_foul_stmt(game_id, seat_no),
+		FOUL,
+		f"seat {seat_no} of game {game_id} cannot take a foul",
+	)
+
+
+def remove_player(session: Session, game_id: int, seat_no: int) -> SeatChange:
+	return _seat_update(
+		session,
+		game_id,
+		seat_no,
+		_removal_stmt(game_id, seat_no),
+		REMOVE,
+		f"seat {seat_no} of game {game_id} cannot be removed",
+	)
 
 
 # ───────────────────────────── DELETE ──────────────────────────────
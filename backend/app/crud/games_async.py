@@ -0,0 +1,187 @@
+"""Async‑версия CRUD для Game поверх AsyncSession (asyncpg).
+
+Поведение и сигнатуры повторяют app.crud.games; SQL строится теми же
+statement builders, поэтому запросы у двух путей идентичны.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any, Optional, Sequence, cast
+from uuid import UUID
+
+from sqlalchemy import Row, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import Faction, GameState
+from app.crud import players
+from app.crud.games import (
+	FOUL,
+	HEADER_COLUMNS,
+	REMOVE,
+	GameConflict,
+	LoadProfile,
+	SeatChange,
+	SeatConflict,
+	_foul_stmt,
+	_get_stmt,
+	_list_stmt,
+	_page_result,
+	_page_stmt,
+	_profile_options,
+	_removal_stmt,
+	_seat_change,
+	_seat_event_stmt,
+	_seats_stmt,
+	_setup_game_stmt,
+	_setup_result,
+	_transition,
+)
+from app.models.game import Game
+from app.schemas.games import GameCreate, GameSetup, GameSetupOut
+
+
+# ───────────────────────────── CREATE ──────────────────────────────
+async def create(session: AsyncSession, game_in: GameCreate, gm_id: UUID) -> Game:
+	obj = Game(**game_in.model_dump(), gm_id=gm_id, state=GameState.draft)
+	session.add(obj)
+	await session.commit()
+	await session.refresh(obj)
+	return obj
+
+
+# ───────────────────────────── SETUP ───────────────────────────────
+async def setup(session: AsyncSession, data: GameSetup) -> GameSetupOut:
+	nicknames = [s.nickname for s in data.seats]
+	game = (await session.execute(_setup_game_stmt(data))).one()
+	new = (await session.execute(players.new_players_stmt(session, nicknames))).tuples().all()
+	ids = players.ids_by_nickname(new)
+	if missing := [n for n in nicknames if n.casefold() not in ids]:
+		rows = await session.execute(players.existing_players_stmt(missing))
+		ids.update(players.ids_by_nickname(rows.tuples().all()))
+	await session.execute(_seats_stmt(game.id, data, ids))
+	await session.commit()
+	return _setup_result(game, data, ids, {player_id for player_id, _ in new})
+
+
+# ────────────────────────────── READ ───────────────────────────────
+async def get(
+		session: AsyncSession,
+		game_id: int,
+		*,
+		with_players: bool = False,
+		profile: LoadProfile | None = None,
+) -> Optional[Game]:
+	if profile is None:
+		profile = LoadProfile.with_players if with_players else LoadProfile.header
+
+	if profile is LoadProfile.header:
+		return cast(Optional[Game], await session.get(Game, game_id))
+
+	return cast(Optional[Game], await session.scalar(_get_stmt(game_id, profile)))
+
+
+async def list_games(
+		session: AsyncSession,
+		*,
+		skip: int = 0,
+		limit: int = 100,
+		profile: LoadProfile = LoadProfile.header,
+) -> Sequence[Game]:
+	stmt = _list_stmt(select(Game), skip, limit).options(*_profile_options(profile))
+	return cast(Sequence[Game], (await session.scalars(stmt)).all())
+
+
+async def list_game_headers(
+		session: AsyncSession,
+		*,
+		skip: int = 0,
+		limit: int = 100,
+) -> Sequence[Row[Any]]:
+	stmt = _list_stmt(select(*HEADER_COLUMNS), skip, limit)
+	return (await session.execute(stmt)).all()
+
+
+async def list_games_page(
+		session: AsyncSession,
+		*,
+		cursor: str | None = None,
+		limit: int = 100,
+) -> tuple[Sequence[Row[Any]], Optional[str]]:
+	rows = (await session.execute(_page_stmt(cursor, limit))).all()
+	return _page_result(rows, limit)
+
+
+# ───────────────────────────── UPDATE ──────────────────────────────
+async def update_state(
+		session: AsyncSession,
+		game_id: int,
+		new_state: GameState,
+		*,
+		expected_version: int | None = None,
+		finished_at: dt.datetime | None = None,
+		aborted: bool | None = None,
+		winner: Faction | None = None,
+		actor_id: UUID | None = None,
+) -> Optional[Game]:
+	try:
+		obj = await session.run_sync(
+			_transition,
+			game_id,
+			new_state,
+			expected_version,
+			finished_at,
+			aborted,
+			winner,
+			actor_id,
+		)
+	except GameConflict:
+		await session.rollback()
+		raise
+	await session.commit()
+	return cast(Optional[Game], obj)
+
+
+# ───────────────────────────── SEATS ───────────────────────────────
+async def _seat_update(
+		session: AsyncSession, game_id: int, seat_no: int, stmt: Any, code: str, message: str
+) -> SeatChange:
+	row = (await session.execute(stmt)).one_or_none()
+	if row is None:
+		await session.rollback()
+		raise SeatConflict(message)
+	event = (await session.execute(_seat_event_stmt(game_id, code, seat_no))).one_or_none()
+	await session.commit()
+	return _seat_change(row, code, event)
+
+
+async def add_foul(session: AsyncSession, game_id: int, seat_no: int) -> SeatChange:
+	return await _seat_update(
+		session,
+		game_id,
+		seat_no,
+		_foul_stmt(game_id, seat_no),
+		FOUL,
+		f"seat {seat_no} of game {game_id} cannot take a foul",
+	)
+
+
+async def remove_player(session: AsyncSession, game_id: int, seat_no: int) -> SeatChange:
+	return await _seat_update(
+		session,
+		game_id,
+		seat_no,
+		_removal_stmt(game_id, seat_no),
+		REMOVE,
+		f"seat {seat_no} of game {game_id} cannot be removed",
+	)
+
+
+# ───────────────────────────── DELETE ──────────────────────────────
+async def delete(session: AsyncSession, game_id: int) -> bool:
+	obj = cast(Optional[Game], await session.get(Game, game_id))
+	if obj is None:
+		return False
+	await session.delete(obj)
+	await session.commit()
+	return True
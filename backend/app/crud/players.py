@@ -0,0 +1,34 @@
+"""
+CRUD‑layer для Player: statement builders поиска и заведения игроков по
+никам — общие для setup игры (sync и async) и импорта архива.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+from sqlalchemy import select
+
+from app.crud.dialect import insert_for
+from app.models.player import Player
+
+
+def new_players_stmt(session: Any, nicknames: Sequence[str]) -> Any:
+	"""Только реально вставленные строки: конфликтующие RETURNING не вернёт."""
+	return (
+		insert_for(session, Player.__table__)
+		.values([{"nickname": n} for n in nicknames])
+		.on_conflict_do_nothing(index_elements=["nickname"])
+		.returning(Player.id, Player.nickname)
+	)
+
+
+def existing_players_stmt(nicknames: Sequence[str]) -> Any:
+	return select(Player.id, Player.nickname).where(
+		Player.nickname.in_(nicknames)  # type: ignore[attr-defined]
+	)
+
+
+def ids_by_nickname(rows: Sequence[Any]) -> dict[str, int]:
+	"""(id, nickname) → {ник в casefold: id}; ник в БД — CITEXT."""
+	return {nickname.casefold(): player_id for player_id, nickname in rows}
@@ -0,0 +1,84 @@
+"""CRUD‑layer для справочников (RuleSet/RuleItem/EventType) — правки организатора.
+
+Каждая правка в той же транзакции увеличивает refdataversion и шлёт
+NOTIFY, чтобы все воркеры сбросили RefCache.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.enums import Condition, GameRole
+from app.crud.dialect import insert_for
+from app.models.event import EventType
+from app.models.refdata import RefDataVersion
+from app.models.rule import RuleItem, RuleSet
+from app.services.refcache import CHANNEL
+
+
+def bump_version(session: Session) -> int:
+	"""version += 1 (строка создаётся при первом вызове) + NOTIFY при COMMIT."""
+	tbl = RefDataVersion.__table__
+	stmt = (
+		insert_for(session, tbl)
+		.values(id=1, version=1)
+		.on_conflict_do_update(
+			index_elements=[tbl.c.id], set_={"version": tbl.c.version + 1}
+		)
+		.returning(tbl.c.version)
+	)
+	version = session.execute(stmt).scalar_one()
+	if session.get_bind().dialect.name == "postgresql":
+		session.execute(select(func.pg_notify(CHANNEL, str(version))))
+	return version
+
+
+def set_active(session: Session, rule_set_id: int) -> int:
+	session.execute(update(RuleSet).values(is_active=RuleSet.id == rule_set_id))
+	version = bump_version(session)
+	session.commit()
+	return version
+
+
+def upsert_rule_item(
+		session: Session,
+		rule_set_id: int,
+		condition: Condition,
+		role_filter: Optional[GameRole],
+		delta: float,
+) -> int:
+	stmt = select(RuleItem).where(
+		RuleItem.rule_set_id == rule_set_id,
+		RuleItem.condition == condition,
+		RuleItem.role_filter.is_(None)
+		if role_filter is None
+		else RuleItem.role_filter == role_filter,
+	)
+	item = session.scalar(stmt)
+	if item is None:
+		item = RuleItem(
+			rule_set_id=rule_set_id,
+			condition=condition,
+			role_filter=role_filter,
+			delta=delta,
+		)
+	else:
+		item.delta = delta
+	session.add(item)
+	version = bump_version(session)
+	session.commit()
+	return version
+
+
+def add_event_type(
+		session: Session, code: str, description: Optional[str] = None
+) -> EventType:
+	obj = EventType(code=code, description=description)
+	session.add(obj)
+	session.flush()
+	bump_version(session)
+	session.commit()
+	return obj
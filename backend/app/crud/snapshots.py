@@ -0,0 +1,71 @@
+"""CRUD‑layer для снапшотов состояния живой игры."""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import events as events_crud
+from app.models.event import GameEvent
+from app.models.snapshot import GameStateSnapshot
+from app.services.event_archive import EventRow
+
+
+async def latest(session: AsyncSession, game_id: int) -> Optional[GameStateSnapshot]:
+	stmt = (
+		select(GameStateSnapshot)
+		.where(GameStateSnapshot.game_id == game_id)
+		.order_by(desc(GameStateSnapshot.client_seq))
+		.limit(1)
+	)
+	return await session.scalar(stmt)
+
+
+async def tail_length(session: AsyncSession, game_id: int, upto_seq: int) -> int:
+	"""
+	Событий с client_seq после последнего снапшота и не дальше ``upto_seq``
+	(acked_seq) — без чтения самих событий.
+	"""
+	last = (
+		select(func.max(GameStateSnapshot.client_seq))
+		.where(GameStateSnapshot.game_id == game_id)
+		.scalar_subquery()
+	)
+	stmt = select(func.count()).where(
+		GameEvent.game_id == game_id,
+		GameEvent.client_seq > func.coalesce(last, -1),
+		GameEvent.client_seq <= upto_seq,
+	)
+	return await session.scalar(stmt)
+
+
+async def save(
+		session: AsyncSession,
+		game_id: int,
+		event_id: int,
+		client_seq: int,
+		events_applied: int,
+		state: dict[str, Any],
+) -> GameStateSnapshot:
+	obj = GameStateSnapshot(
+		game_id=game_id,
+		event_id=event_id,
+		client_seq=client_seq,
+		events_applied=events_applied,
+		state=state,
+	)
+	session.add(obj)
+	await session.commit()
+	return obj
+
+
+async def events_after(
+		session: AsyncSession,
+		game_id: int,
+		after_seq: Optional[int] = None,
+) -> list[EventRow]:
+	"""Хвост лога после ``after_seq`` в порядке игры — вместе с архивной частью."""
+	logs = await events_crud.game_logs(session, [game_id], after_seq)
+	return logs.get(game_id, [])
@@ -1,14 +1,41 @@
+import pkgutil
+from importlib import import_module
 from typing import AsyncGenerator, Generator
 
+import app.models as models_pkg
 from app.core.config import get_settings
+from app.core.pool import TimedAsyncQueuePool, TimedQueuePool, instrument
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Mapper, sessionmaker
 from sqlmodel import Session, SQLModel, create_engine
 
 settings = get_settings()
 
-sync_engine = create_engine(settings.sync_dsn, pool_pre_ping=True)
-async_engine = create_async_engine(settings.async_dsn, pool_pre_ping=True, future=True)
+
+def import_models() -> None:
+    """Все модули app.models — для create_all и строковых Relationship."""
+    for mod in pkgutil.iter_modules(models_pkg.__path__, "app.models."):
+        import_module(mod.name)
+
+
+# страховка, а не ускорение старта: роутеры и так импортируют почти все
+# модели при загрузке app.main; хук догружает остальные (сейчас user и
+# imports) перед первой конфигурацией мапперов, чтобы строковые Relationship
+# разрешались при любом порядке импорта
+event.listen(Mapper, "before_configured", import_models, once=True)
+
+sync_engine = create_engine(
+    settings.sync_dsn, poolclass=TimedQueuePool, **settings.pool_options
+)
+async_engine = create_async_engine(
+    settings.async_dsn,
+    poolclass=TimedAsyncQueuePool,
+    future=True,
+    **settings.pool_options,
+)
+instrument(sync_engine.pool, "sync")
+instrument(async_engine.sync_engine.pool, "async")
 
 sync_session_maker = sessionmaker(sync_engine, class_=Session, expire_on_commit=False)
 async_session_maker = sessionmaker(
@@ -26,6 +53,24 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+def get_async_session_maker() -> sessionmaker:
+    """
+    Для потоковых ответов: сессию открывает сам генератор тела — выход из
+    yield‑зависимостей FastAPI выполняет до отправки тела.
+    """
+    return async_session_maker
+
+
 async def init_db() -> None:
+    """create_all — только для dev (SCHEMA_MODE=create)."""
+    import_models()
     async with async_engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+
+
+async def check_schema() -> None:
+    """Fail fast, если БД не на alembic head (SCHEMA_MODE=check)."""
+    from app.core.schema import check_head
+
+    async with async_engine.connect() as conn:
+        await conn.run_sync(check_head)
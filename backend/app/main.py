@@ -1,14 +1,21 @@
 from contextlib import asynccontextmanager
 
 import uvicorn
+from app.api.routes.export import router as export_router
+from app.api.routes.games import router as games_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.players import router as players_router
+from app.api.routes.stats import router as stats_router
+from app.core import httpcache
 from app.core.config import get_settings
-from app.db import init_db
+from app.core.notify import listener
+from app.core.sqltrace import SQLTraceMiddleware
+from app.db import async_engine, async_session_maker, check_schema, init_db
+from app.services import event_archive
+from app.services.refcache import CHANNEL, refcache
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-# from app.api.routes.games   import router as games_router
-# from app.api.routes.stats   import router as stats_router
 # from app.api.routes.events  import router as events_router
 
 settings = get_settings()
@@ -17,10 +24,24 @@ settings = get_settings()
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # → код до старта приложения
-    # например, создаём таблицы (dev/staging)
-    await init_db()
+    if settings.schema_mode == "create":
+        await init_db()  # dev: таблицы без миграций
+    elif settings.schema_mode == "check":
+        await check_schema()  # prod: миграции уже прогнаны, только сверка
+    if settings.schema_mode != "off":
+        async with async_session_maker() as session:
+            await refcache.refresh_async(session)  # справочники в память
+        async with async_engine.begin() as conn:
+            await conn.run_sync(
+                event_archive.ensure_partitions
+            )  # месяцы gameevent наперёд (Postgres)
+    if async_engine.dialect.name == "postgresql":
+        listener.on(CHANNEL, refcache.invalidate)
+        listener.on(httpcache.CHANNEL, httpcache.changes.notify)
+        await listener.start(settings.listen_dsn)
     yield
     # ← код при выключении (если нужен)
+    await listener.stop()
 
 
 app = FastAPI(
@@ -38,12 +59,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag/304 и кэш ответов для списков и карточек (внутри SQLTrace — 304 видно в Server-Timing)
+app.add_middleware(httpcache.HTTPCacheMiddleware)
+
+# число SQL / время в БД на запрос → Server-Timing, N+1 → warning в лог
+app.add_middleware(SQLTraceMiddleware, repeat_warn=settings.sql_repeat_warn)
+
 # Ваши роутеры
 app.include_router(players_router, prefix="/players", tags=["Players"])
-# app.include_router(games_router, prefix="/games",   tags=["Games"])
-# app.include_router(stats_router, prefix="/stats",   tags=["Stats"])
+app.include_router(games_router, prefix="/games", tags=["Games"])
+app.include_router(stats_router, prefix="/stats", tags=["Stats"])
+app.include_router(export_router, prefix="/export", tags=["Export"])
+app.include_router(metrics_router, prefix="/metrics")
 # app.include_router(events_router, prefix="/events",  tags=["Events"])
 
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -1,8 +1,22 @@
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import JSON, Column, DateTime, String
+from sqlalchemy import (
+    JSON,
+    Column,
+    Computed,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import Mapped
+from sqlalchemy.sql.expression import ColumnElement
 from sqlmodel import Field, Relationship, SQLModel
 
 if TYPE_CHECKING:
@@ -26,13 +40,88 @@ class EventType(SQLModel, table=True):
     events: Mapped[list["GameEvent"]] = Relationship(back_populates="event_type")
 
 
+class payload_int(ColumnElement):
+    """
+    ``payload[key]`` как smallint: JSON‑целое в пределах smallint, иначе
+    NULL (строка, дробное, слишком большое) — одинаково на Postgres и
+    SQLite. Выражение для Computed‑колонок: кривой payload от клиента не
+    должен ронять INSERT.
+    """
+
+    inherit_cache = False
+    type = SmallInteger()
+
+    def __init__(self, key: str):
+        self.key = key
+
+
+SMALLINT_MIN, SMALLINT_MAX = -32768, 32767
+
+
+@compiles(payload_int, "postgresql")
+def _payload_int_pg(element: payload_int, compiler, **kw) -> str:  # noqa: ANN001
+    # regex до CAST: ≤ 5 цифр без точки/экспоненты, так что CAST не падает;
+    # вложенный CASE — порядок проверок гарантирован, в отличие от AND
+    k = element.key
+    text = f"(payload ->> '{k}')"
+    return (
+        f"CASE WHEN jsonb_typeof(payload -> '{k}') = 'number' "
+        f"AND {text} ~ '^-?[0-9]{{1,5}}$' "
+        f"THEN CASE WHEN CAST({text} AS INTEGER) "
+        f"BETWEEN {SMALLINT_MIN} AND {SMALLINT_MAX} "
+        f"THEN CAST({text} AS SMALLINT) END END"
+    )
+
+
+@compiles(payload_int)
+def _payload_int_default(element: payload_int, compiler, **kw) -> str:  # noqa: ANN001
+    value = f"json_extract(payload, '$.{element.key}')"
+    return (
+        f"CASE WHEN json_type(payload, '$.{element.key}') = 'integer' "
+        f"AND {value} BETWEEN {SMALLINT_MIN} AND {SMALLINT_MAX} THEN {value} END"
+    )
+
+
 class GameEvent(SQLModel, table=True):
     """
     События живой игры со ссылкой на EventType.
+
+    ``payload`` на Postgres — JSONB с GIN (jsonb_path_ops, запросы ``@>``);
+    горячие ключи вынесены в генерируемые колонки ``target_seat`` /
+    ``actor_seat`` — по ним фильтруют и джойнят с gameplayer без разбора
+    JSON. Пишет их только база: в INSERT они не попадают.
+
+    На Postgres таблица секционирована по месяцам ``ts`` (миграция
+    gameevent_partition_by_month, секции ведёт
+    app.services.event_archive.ensure_partitions), поэтому там PK —
+    (id, ts), а уникальный ключ — (game_id, client_seq, ts). События
+    старых завершённых игр переезжают в ``GameEventArchive``.
     """
 
+    __table_args__ = (
+        # тот же ключ, что у секционированной таблицы на Postgres (ts — ключ
+        # секционирования); повторы client_seq отсеивает crud.events.ingest_batch.
+        # PK остаётся (id): составной PK лишил бы SQLite автоинкремента id
+        UniqueConstraint("game_id", "client_seq", "ts", name="uq_gameevent_game_seq"),
+        # лог игры по времени: live_state, экспорт, «до второй ночи»
+        Index("ix_gameevent_game_ts", "game_id", "ts"),
+        # «все фолы/убийства» по типу → по играм
+        Index("ix_gameevent_type_game", "event_type_id", "game_id"),
+        Index(
+            "ix_gameevent_payload",
+            "payload",
+            postgresql_using="gin",
+            postgresql_ops={"payload": "jsonb_path_ops"},
+        ).ddl_if(
+            dialect="postgresql"
+        ),  # btree по JSON в SQLite бесполезен
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     game_id: int = Field(foreign_key="game.id")
+    client_seq: Optional[int] = Field(
+        default=None, description="Порядковый номер события на клиенте GM"
+    )
     ts: datetime = Field(
         default_factory=lambda: datetime.now(timezone.utc),
         sa_column=Column(
@@ -44,14 +133,49 @@ class GameEvent(SQLModel, table=True):
     event_type_id: int = Field(foreign_key="eventtype.id", nullable=False)
     payload: dict = Field(
         default_factory=dict,
-        sa_column=Column(JSON, nullable=False),
+        sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False),
         description="Дополнительные данные события, структура зависит от type",
     )
+    target_seat: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            SmallInteger, Computed(payload_int("target_seat"), persisted=True)
+        ),
+        description="payload.target_seat (генерируется базой)",
+    )
+    actor_seat: Optional[int] = Field(
+        default=None,
+        sa_column=Column(
+            SmallInteger, Computed(payload_int("actor_seat"), persisted=True)
+        ),
+        description="payload.actor_seat (генерируется базой)",
+    )
 
     game: Mapped[Optional["Game"]] = Relationship(back_populates="events")
     event_type: Mapped[Optional[EventType]] = Relationship(back_populates="events")
 
 
+class GameEventArchive(SQLModel, table=True):
+    """
+    Холодный лог завершённой игры одной строкой: zlib(orjson) списка
+    ``[id, client_seq, ts, code, payload]`` в порядке игры (формат и
+    порядок — app/services/event_archive.py). Переоткрытая игра пишет и в
+    gameevent — читатели (resume, экспорт) склеивают обе части.
+    """
+
+    game_id: int = Field(foreign_key="game.id", primary_key=True)
+    events: int = Field(nullable=False, description="Событий в blob")
+    first_ts: datetime = Field(
+        sa_column=Column(DateTime(timezone=True), nullable=False)
+    )
+    last_ts: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    blob: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    archived_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(DateTime(timezone=True), nullable=False),
+    )
+
+
 class VoteRound(SQLModel, table=True):
     """
     Раунд голосования: указывает, какой по счёту, и собирает голоса.
@@ -17,7 +17,7 @@ class ExtraPoints(SQLModel, table=True):
     """
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    game_player_id: int = Field(foreign_key="gameplayer.id", nullable=False)
+    game_player_id: int = Field(foreign_key="gameplayer.id", nullable=False, index=True)
     delta: float = Field(nullable=False, description="Плюс/минус очков")
     reason: str = Field(nullable=True, max_length=255, description="Причина изменения")
     created_at: datetime = Field(
@@ -2,8 +2,8 @@ import datetime as dt
 from typing import TYPE_CHECKING, List, Optional
 from uuid import UUID
 
-from app.core.enums import GameRole, GameState
-from sqlalchemy import CheckConstraint, UniqueConstraint
+from app.core.enums import Faction, GameRole, GameState
+from sqlalchemy import CheckConstraint, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped
 from sqlmodel import Field, Relationship, SQLModel
 
@@ -17,6 +17,8 @@ if TYPE_CHECKING:
 class Game(SQLModel, table=True):
     __table_args__ = (
         CheckConstraint("players_qty BETWEEN 7 AND 10", name="ck_players_qty_7_10"),
+        # keyset‑пагинация списка игр: ORDER BY date DESC, id DESC
+        Index("ix_game_date_id", "date", "id"),
     )
 
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -28,12 +30,14 @@ class Game(SQLModel, table=True):
     started_at: dt.datetime | None = Field(default=None)
     finished_at: dt.datetime | None = Field(default=None)
     aborted: bool = Field(default=False)
+    winner_faction: Optional[Faction] = Field(default=None)
+    # оптимистичная блокировка: +1 на каждый переход (crud.games.update_state)
+    version: int = Field(default=0, nullable=False)
 
     rule_set: Mapped[Optional["RuleSet"]] = Relationship(back_populates="games")
     players: Mapped[list["GamePlayer"]] = Relationship(back_populates="game")
-    events: Mapped[list["GameEvent"]] = Relationship(
-        back_populates="game", sa_relationship_kwargs={"lazy": "selectin"}
-    )
+    # грузится только по запросу — см. LoadProfile в app/crud/games.py
+    events: Mapped[list["GameEvent"]] = Relationship(back_populates="game")
     vote_rounds: Mapped[list["VoteRound"]] = Relationship(back_populates="game")
     audits: Mapped[list["GameAudit"]] = Relationship(back_populates="game")
 
@@ -49,6 +53,11 @@ class GamePlayer(SQLModel, table=True):
     fouls_count: int = Field(default=0)
     removed: bool = Field(default=False)
     total_points: float = Field(default=0.0)
+    conditions: Optional[int] = Field(
+        default=None,
+        description="Битовая маска выполненных Condition (см. scoring); "
+        "NULL — игра ещё не считалась движком очков",
+    )
 
     game: Mapped[Optional["Game"]] = Relationship(back_populates="players")
     player: Mapped[Optional["Player"]] = Relationship(back_populates="games")
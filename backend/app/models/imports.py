@@ -0,0 +1,19 @@
+import datetime as dt
+
+from sqlmodel import Field, SQLModel
+
+
+class ImportCheckpoint(SQLModel, table=True):
+    """
+    Прогресс импорта архива (app/services/importer.py): сколько записей
+    источника уже в базе. Двигается в той же транзакции, что и чанк, —
+    повторный запуск продолжает со следующей записи.
+    """
+
+    source: str = Field(primary_key=True, max_length=255)
+    records: int = Field(default=0, nullable=False)  # прочитано из источника
+    games: int = Field(default=0, nullable=False)  # из них загружено
+    rejected: int = Field(default=0, nullable=False)  # не прошли валидацию
+    updated_at: dt.datetime = Field(
+        default_factory=lambda: dt.datetime.now(dt.timezone.utc), nullable=False
+    )
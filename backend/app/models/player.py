@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Optional
 from uuid import UUID
 
+from sqlalchemy import Index, Text, cast, func
 from sqlalchemy.dialects.postgresql import CITEXT
 from sqlalchemy.orm import Mapped
 from sqlmodel import CheckConstraint, Field, Relationship, SQLModel
@@ -40,3 +41,12 @@ class Player(SQLModel, table=True):
     # связи
     games: Mapped[list["GamePlayer"]] = Relationship(back_populates="player")
     user: Mapped[Optional["User"]] = Relationship(back_populates="players")
+
+
+# автокомплит/нечёткий поиск: LIKE 'q%' и % (pg_trgm) по lower(nickname)
+Index(
+    "ix_player_nickname_trgm",
+    func.lower(cast(Player.nickname, Text)).label("nickname_lower"),
+    postgresql_using="gin",
+    postgresql_ops={"nickname_lower": "gin_trgm_ops"},
+)
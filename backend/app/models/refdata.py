@@ -0,0 +1,11 @@
+from sqlmodel import Field, SQLModel
+
+
+class RefDataVersion(SQLModel, table=True):
+    """
+    Счётчик версии справочников (EventType, RuleSet/RuleItem).
+    Одна строка id=1; увеличивается при каждой правке организатором.
+    """
+
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0, nullable=False)
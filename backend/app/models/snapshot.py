@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import Field, SQLModel
+
+
+class GameStateSnapshot(SQLModel, table=True):
+    """
+    Снимок LiveGameState после событий с client_seq ≤ ``client_seq`` —
+    подтверждённого префикса лога (acked_seq), куда поздний батч уже не
+    вклинится. Resume = последний снимок + события с большим client_seq и
+    события без client_seq.
+    """
+
+    __table_args__ = (Index("ix_gamestatesnapshot_game_seq", "game_id", "client_seq"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    game_id: int = Field(foreign_key="game.id", nullable=False)
+    event_id: int = Field(
+        nullable=False, description="Последний свёрнутый GameEvent.id"
+    )
+    client_seq: int = Field(
+        nullable=False, description="Свёрнуты все события с client_seq ≤ этого"
+    )
+    events_applied: int = Field(nullable=False)
+    state: dict = Field(
+        default_factory=dict,
+        sa_column=Column(JSON, nullable=False),
+        description="LiveGameState.to_dict()",
+    )
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), nullable=False
+    )
@@ -0,0 +1,50 @@
+import datetime as dt
+from typing import Optional
+
+from app.core.enums import Faction
+from sqlmodel import Field, SQLModel
+
+
+class PlayerStats(SQLModel, table=True):
+    """
+    Агрегаты профиля игрока по завершённым (не прерванным) играм.
+    Поддерживается инкрементально в crud.games.update_state —
+    см. app/services/player_stats.py; полная пересборка —
+    ``python -m app.commands.player_stats``.
+    """
+
+    player_id: Optional[int] = Field(
+        default=None, primary_key=True, foreign_key="player.id"
+    )
+    games: int = Field(default=0, nullable=False)
+    wins: int = Field(default=0, nullable=False)
+    city_games: int = Field(default=0, nullable=False)
+    city_wins: int = Field(default=0, nullable=False)
+    mafia_games: int = Field(default=0, nullable=False)
+    mafia_wins: int = Field(default=0, nullable=False)
+    points: float = Field(default=0.0, nullable=False)
+
+
+class PlayerDailyStats(SQLModel, table=True):
+    """
+    Роллап лидерборда: вклад игр одного дня (span="day") или месяца
+    (span="month", date — 1‑е число) в очки игрока. Запрос за диапазон
+    берёт целые месяцы из month‑строк и только края — из day‑строк.
+    """
+
+    span: str = Field(primary_key=True, max_length=5)
+    date: dt.date = Field(primary_key=True)
+    player_id: int = Field(primary_key=True, foreign_key="player.id")
+    games: int = Field(default=0, nullable=False)
+    wins: int = Field(default=0, nullable=False)
+    points: float = Field(default=0.0, nullable=False)
+
+
+class FactionDailyStats(SQLModel, table=True):
+    """Роллап побед фракций по дню/месяцу и размеру стола (см. PlayerDailyStats)."""
+
+    span: str = Field(primary_key=True, max_length=5)
+    date: dt.date = Field(primary_key=True)
+    winner_faction: Faction = Field(primary_key=True)
+    players_qty: int = Field(primary_key=True)
+    games: int = Field(default=0, nullable=False)
@@ -0,0 +1,116 @@
+from datetime import datetime
+from typing import Annotated, Any, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, model_validator
+
+from app.core.enums import Faction, GameRole
+
+MAX_BATCH_SIZE = 1000
+
+Seat = Annotated[int, Field(ge=1, le=10)]
+
+
+# ───── payload по кодам (формат — app/services/live_state.py) ─────
+class _Payload(BaseModel):
+    model_config = ConfigDict(extra="allow")  # лишние ключи клиента не мешают
+
+
+class DealRolesPayload(_Payload):
+    roles: dict[int, GameRole]
+
+
+class PhasePayload(_Payload):
+    phase: Literal["day", "night"]
+
+
+class NominatePayload(_Payload):
+    actor_seat: Seat
+    target_seat: Seat
+
+
+class VotePayload(_Payload):
+    round_no: int = Field(ge=1)
+    counts: dict[int, int]
+
+
+class TargetPayload(_Payload):
+    target_seat: Seat
+
+
+class RemovePayload(TargetPayload):
+    reason: Optional[str] = None
+
+
+class BestMovePayload(_Payload):
+    actor_seat: Seat
+    guesses: list[int]
+
+
+class FinishPayload(_Payload):
+    winner: Faction
+
+
+PAYLOADS: dict[str, type[_Payload]] = {
+    "deal_roles": DealRolesPayload,
+    "phase": PhasePayload,
+    "nominate": NominatePayload,
+    "vote": VotePayload,
+    "foul": TargetPayload,
+    "kill": TargetPayload,
+    "vote_out": TargetPayload,
+    "remove": RemovePayload,
+    "best_move": BestMovePayload,
+    "finish": FinishPayload,
+}
+
+
+# фол и удаление пишут только эндпоинты мест (crud.games.add_foul /
+# remove_player): они же двигают gameplayer, и лог с местами не расходится
+SEAT_CODES = frozenset({"foul", "remove"})
+
+
+class EventIn(BaseModel):
+    """Событие из автосейва GM. ``ts`` ставит клиент — повтор батча шлёт тот же."""
+
+    client_seq: int = Field(ge=0)
+    code: str
+    ts: datetime
+    payload: dict[str, Any] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def check_payload(cls, model):
+        """Payload известных кодов — до INSERT: кривое событие ломало бы свёртку лога."""
+        if model.code in SEAT_CODES:
+            raise ValueError(
+                f"{model.code} is recorded by /games/{{id}}/seats/{{seat_no}}/…, "
+                "not by the autosave"
+            )
+        schema = PAYLOADS.get(model.code)
+        if schema is not None:
+            try:
+                schema.model_validate(model.payload)
+            except ValidationError as exc:
+                errors = "; ".join(
+                    f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()
+                )
+                raise ValueError(f"invalid {model.code} payload: {errors}") from None
+        return model
+
+
+class EventBatch(BaseModel):
+    events: list[EventIn] = Field(default_factory=list, max_length=MAX_BATCH_SIZE)
+
+    @model_validator(mode="after")
+    def check_order(cls, model):
+        seqs = [e.client_seq for e in model.events]
+        if any(a >= b for a, b in zip(seqs, seqs[1:])):
+            raise ValueError("client_seq must be strictly increasing within a batch")
+        return model
+
+
+class EventBatchAck(BaseModel):
+    acked_seq: Optional[int] = Field(
+        description="Наибольший client_seq, до которого лог игры сохранён без "
+        "пропусков; после реконнекта клиент досылает всё, что больше"
+    )
+    inserted: int
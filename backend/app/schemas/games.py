@@ -1,9 +1,10 @@
 from collections import Counter
 from datetime import date, datetime
-from typing import Optional
+from typing import Iterable, Optional, Union
+from uuid import UUID
 
-from app.core.enums import GameRole, GameState
-from pydantic import BaseModel, field_validator, model_validator
+from app.core.enums import Faction, GameRole, GameState
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 
 
 class GamePlayer(BaseModel):
@@ -15,6 +16,31 @@ class GamePlayer(BaseModel):
     role: GameRole
 
 
+def validate_roles(roles: Iterable[GameRole], players_qty: int) -> None:
+    """Правила раздачи ролей; общие для GameFinished и GameSetup."""
+    roles_amount = Counter(roles)
+    if roles_amount[GameRole.sheriff] != 1:
+        raise ValueError("There must be exactly 1 sheriff")
+    if roles_amount[GameRole.don] != 1:
+        raise ValueError("There must be exactly 1 don")
+    mafia = roles_amount[GameRole.mafia] + roles_amount[GameRole.don]
+    city = roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]
+    if mafia not in {2, 3}:
+        raise ValueError("Total mafia (don + mafias) must be 2 or 3")
+    if mafia == 2 and city != 6 and city != 5:
+        raise ValueError(
+            f"There can't be 2 mafias and {roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]} citizens"
+        )
+    if mafia == 3 and (
+        roles_amount[GameRole.citizen] != 6 and roles_amount[GameRole.citizen] != 5
+    ):
+        raise ValueError(
+            f"There can't be 3 mafias and {roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]} citizens"
+        )
+    if city + mafia != players_qty:
+        raise ValueError("Sum of roles doesn't match players_qty")
+
+
 class GameBase(BaseModel):
     id: int
     date: date
@@ -36,30 +62,67 @@ class GameFinished(GameBase):
 
     @model_validator(mode="after")
     def check_roles(cls, model):
-        roles_amount = Counter(p.role for p in model.players)
-        if roles_amount[GameRole.sheriff] != 1:
-            raise ValueError("There must be exactly 1 sheriff")
-        if roles_amount[GameRole.don] != 1:
-            raise ValueError("There must be exactly 1 don")
-        mafia = roles_amount[GameRole.mafia] + roles_amount[GameRole.don]
-        city = roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]
-        if mafia not in {2, 3}:
-            raise ValueError("Total mafia (don + mafias) must be 2 or 3")
-        if mafia == 2 and city != 6 and city != 5:
-            raise ValueError(
-                f"There can't be 2 mafias and {roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]} citizens"
-            )
-        if mafia == 3 and (
-            roles_amount[GameRole.citizen] != 6 and roles_amount[GameRole.citizen] != 5
-        ):
-            raise ValueError(
-                f"There can't be 3 mafias and {roles_amount[GameRole.citizen] + roles_amount[GameRole.sheriff]} citizens"
-            )
-        if city + mafia != model.players_qty:
-            raise ValueError("Sum of roles doesn't match players_qty")
+        validate_roles((p.role for p in model.players), model.players_qty)
         return model
 
 
+# ─────────────── импорт архива (app/services/importer.py) ───────────────
+class ArchivedExtraPoints(BaseModel):
+    delta: float
+    reason: Optional[str] = Field(default=None, max_length=255)
+
+
+class ArchivedSeat(BaseModel):
+    seat_no: int = Field(ge=1, le=10)
+    nickname: str = Field(min_length=1, max_length=32)
+    role: GameRole
+    fouls_count: int = Field(default=0, ge=0)
+    removed: bool = False
+    total_points: float = 0.0
+    conditions: Optional[int] = None  # нет — из событий или NULL (см. importer)
+    extra_points: list[ArchivedExtraPoints] = []
+
+
+class ArchivedEvent(BaseModel):
+    seq: Optional[int] = None
+    ts: datetime
+    code: str = Field(min_length=1)
+    payload: dict = {}
+
+
+class ArchivedGame(BaseModel):
+    """
+    Завершённая игра из старой системы/таблиц — правила GameFinished, но
+    игроки по никам (id в нашей базе у них ещё нет). ``id`` — ключ в
+    источнике, только для сообщений; ведущий и RuleSet — из источника или
+    значения по умолчанию импорта.
+    """
+
+    id: Union[int, str, None] = None
+    date: date
+    players_qty: int = Field(ge=7, le=10)
+    rule_set_id: Optional[int] = None
+    gm_id: Optional[UUID] = None
+    started_at: datetime
+    finished_at: datetime
+    aborted: bool = False
+    winner_faction: Optional[Faction] = None
+    seats: list[ArchivedSeat]
+    events: list[ArchivedEvent] = []
+
+    @model_validator(mode="after")
+    def check_game(self):
+        if self.finished_at < self.started_at:
+            raise ValueError("finished_at is before started_at")
+        if len({s.seat_no for s in self.seats}) != len(self.seats):
+            raise ValueError("Seat numbers must be unique")
+        nicknames = {s.nickname.casefold() for s in self.seats}  # CITEXT
+        if len(nicknames) != len(self.seats):
+            raise ValueError("Nicknames at the table must be unique")
+        validate_roles((s.role for s in self.seats), self.players_qty)
+        return self
+
+
 class GameCreate(BaseModel):
     players_qty: int = 10
     rule_set_id: int
@@ -69,3 +132,65 @@ class GameCreate(BaseModel):
         if not (7 <= v <= 10):
             raise ValueError("players_qty must be between 7 and 10")
         return v
+
+
+class SeatIn(BaseModel):
+    nickname: str = Field(min_length=1, max_length=32)
+    role: GameRole
+
+
+class GameSetup(GameCreate):
+    """
+    Всё для старта игры одним запросом: места — в порядке ``seats``
+    (seat_no = индекс + 1), неизвестные ники заводятся как новые Player.
+    """
+
+    gm_id: UUID  # пока нет авторизации — ведущий передаётся явно
+    seats: list[SeatIn] = Field(min_length=7, max_length=10)
+
+    @model_validator(mode="after")
+    def check_seats(self):
+        nicknames = [s.nickname.casefold() for s in self.seats]  # CITEXT
+        if len(set(nicknames)) != len(nicknames):
+            raise ValueError("Nicknames at the table must be unique")
+        validate_roles((s.role for s in self.seats), self.players_qty)
+        return self
+
+
+class SeatOut(BaseModel):
+    seat_no: int
+    player_id: int
+    nickname: str
+    role: GameRole
+    created: bool  # игрок заведён этим запросом
+
+
+class GameHeader(BaseModel):
+    """Строка списка «Game Records» — только колонки самой игры."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    date: date
+    players_qty: int
+    rule_set_id: int
+    gm_id: UUID
+    state: GameState
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    aborted: bool = False
+    winner_faction: Optional[Faction] = None
+    version: int = 0
+
+
+class GameStateChange(BaseModel):
+    state: GameState
+    # версия из последнего GameHeader; None — без оптимистичной блокировки
+    expected_version: Optional[int] = None
+    winner: Optional[Faction] = None
+    actor_id: Optional[UUID] = None
+
+
+class GameSetupOut(BaseModel):
+    game: GameHeader
+    seats: list[SeatOut]
@@ -0,0 +1,12 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Страница keyset‑пагинации; ``next_cursor`` = None — страниц больше нет."""
+
+    items: list[T]
+    next_cursor: Optional[str] = None
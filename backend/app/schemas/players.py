@@ -0,0 +1,45 @@
+from pydantic import BaseModel, ConfigDict, computed_field
+
+
+def _rate(wins: int, games: int) -> float:
+    return wins / games if games else 0.0
+
+
+class PlayerStatsRead(BaseModel):
+    """Профиль игрока: счётчики из PlayerStats + производные доли побед."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    player_id: int
+    games: int = 0
+    wins: int = 0
+    city_games: int = 0
+    city_wins: int = 0
+    mafia_games: int = 0
+    mafia_wins: int = 0
+    points: float = 0.0
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def win_rate(self) -> float:
+        return _rate(self.wins, self.games)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def city_win_rate(self) -> float:
+        return _rate(self.city_wins, self.city_games)
+
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def mafia_win_rate(self) -> float:
+        return _rate(self.mafia_wins, self.mafia_games)
+
+
+class PlayerMatch(BaseModel):
+    """Кандидат автокомплита: score 1.0 — совпадение по префиксу, иначе триграммы."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    nickname: str
+    score: float
@@ -0,0 +1,24 @@
+from datetime import date
+
+from app.core.enums import Faction
+from pydantic import BaseModel, ConfigDict
+
+
+class LeaderboardRow(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    player_id: int
+    nickname: str
+    points: float
+    games: int
+    wins: int
+
+
+class FactionWins(BaseModel):
+    """Данные для круговой диаграммы побед фракций за период."""
+
+    date_from: date
+    date_to: date
+    players_qty: int | None = None
+    wins: dict[Faction, int]
+    total: int
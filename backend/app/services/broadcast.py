@@ -0,0 +1,103 @@
+"""
+Fan‑out живых игр зрителям (WebSocket / SSE).
+
+Каждое сообщение кодируется в JSON один раз и раскладывается по
+ограниченным очередям подписчиков через ``put_nowait`` — публикация
+никогда не ждёт клиента. Подписчик, чья очередь переполнилась,
+отключается с сообщением ``resync``: он переподключается и берёт
+актуальное состояние из ``GET /games/{id}/state``.
+
+Хаб живёт в процессе: зрители видят события, записанные этим же
+воркером uvicorn. Публикуют только async‑роуты — из того же event loop,
+что и подписчики, поэтому очереди трогаются без блокировок.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import defaultdict
+from typing import Any, AsyncIterator, Optional
+
+RESYNC = json.dumps({"type": "resync"})
+
+
+class Subscriber:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize)
+        self.evicted = False
+
+    def offer(self, message: str) -> bool:
+        """Неблокирующая доставка; False — очередь полна, подписчика пора выкинуть."""
+        if self.evicted:
+            return True
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def end(self) -> None:
+        """Конец потока — после всего уже опубликованного."""
+        if self.evicted:
+            return
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self.evict()
+
+    def evict(self) -> None:
+        self.evicted = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)  # разбудить consumer'а
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while (message := await self.queue.get()) is not None:
+            yield message
+        if self.evicted:
+            yield RESYNC
+
+
+class GameHub:
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._games: dict[int, set[Subscriber]] = defaultdict(set)
+        self.evictions = 0
+
+    def subscribe(self, game_id: int) -> Subscriber:
+        sub = Subscriber(self.queue_size)
+        self._games[game_id].add(sub)
+        return sub
+
+    def unsubscribe(self, game_id: int, sub: Subscriber) -> None:
+        subs = self._games.get(game_id)
+        if subs is None:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._games[game_id]
+
+    def close(self, game_id: int) -> None:
+        """Завершает потоки всех подписчиков игры (игра закончена)."""
+        for sub in self._games.pop(game_id, ()):
+            sub.end()
+
+    def subscribers(self, game_id: int) -> int:
+        return len(self._games.get(game_id, ()))
+
+    def publish(self, game_id: int, message: dict[str, Any]) -> int:
+        """Рассылает сообщение всем подписчикам игры; возвращает число адресатов."""
+        subs = self._games.get(game_id)
+        if not subs:
+            return 0
+        data = json.dumps(message, default=str)
+        for sub in list(subs):
+            if not sub.offer(data):
+                sub.evict()
+                self.unsubscribe(game_id, sub)
+                self.evictions += 1
+        return len(subs)
+
+
+hub = GameHub()
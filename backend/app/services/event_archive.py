@@ -0,0 +1,390 @@
+"""
+Хранение лога событий по возрасту.
+
+Горячий лог — gameevent. На Postgres он секционирован по месяцам ``ts``
+(RANGE, секции ``gameevent_yYYYYmMM`` + ``gameevent_default``):
+autovacuum и индексы живут в пределах месяца, а пустой старый месяц
+удаляется DROP'ом, а не DELETE + vacuum. ``ensure_partitions`` держит
+секции на ``MONTHS_AHEAD`` месяцев вперёд и переносит в свои месяцы то, что
+упало в default (часы клиента, импорт старого архива). Зовётся на старте
+приложения и из ``python -m app.commands.archive_events``.
+
+Холодный лог — gameeventarchive: ``archive`` сворачивает события
+закрытых игр старше ``ARCHIVE_AFTER`` в одну сжатую строку на игру и
+удаляет их из gameevent в той же транзакции. При переоткрытии игры
+``restore`` возвращает blob в gameevent (дедупликация автосейва смотрит
+только туда). Читатели на это не полагаются — лог игры в общем случае
+blob + горячие строки:
+читатели (resume, очки, экспорт, replay) склеивают их через ``merge`` /
+``read_logs`` (async — crud.events.game_logs).
+
+Порядок лога — ``order_key``: по client_seq (автосейв может закоммитить
+поздний батч раньше соседнего, так что id порядок игры не отражает), за
+ними события без client_seq (эндпоинты мест, импорт) — по (ts, id).
+
+Аналитика по target_seat / actor_seat (crud.events) видит только горячий
+лог.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import zlib
+from collections import defaultdict
+from typing import Any, Iterable, NamedTuple, Optional, Sequence
+
+import orjson
+from sqlalchemy import Connection, delete, exists, func, insert, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.enums import GameState
+from app.crud.dialect import insert_for
+from app.models.event import EventType, GameEvent, GameEventArchive
+from app.models.game import Game
+
+log = logging.getLogger(__name__)
+
+ARCHIVE_AFTER = dt.timedelta(days=90)  # от finished_at (started_at, date)
+ARCHIVE_BATCH = 500  # игр на транзакцию
+MONTHS_AHEAD = 3  # секций вперёд от текущего месяца
+LEVEL = 9  # zlib: пишется один раз, читается редко
+
+TABLE = "gameevent"
+DEFAULT = "gameevent_default"
+COLUMNS = "id, game_id, ts, event_type_id, payload, client_seq"  # без генерируемых
+
+
+class EventRow(NamedTuple):
+    """Строка лога в формате читателей gameevent (resume, экспорт)."""
+
+    id: int
+    client_seq: Optional[int]
+    ts: dt.datetime
+    code: str
+    payload: dict[str, Any]
+
+
+def order_key(e: EventRow) -> tuple[Any, ...]:
+    """Порядок игры: client_seq, затем события без него по (ts, id)."""
+    return (e.client_seq is None, e.client_seq or 0, e.ts, e.id)
+
+
+def _in_tail(seq: Optional[int], after_seq: Optional[int]) -> bool:
+    return after_seq is None or seq is None or seq > after_seq
+
+
+# ─────────────────────────── формат blob ───────────────────────────
+def pack(rows: Iterable[EventRow]) -> bytes:
+    return zlib.compress(orjson.dumps([list(r) for r in rows]), LEVEL)
+
+
+def unpack(blob: bytes, after_seq: Optional[int] = None) -> list[EventRow]:
+    """
+    События в порядке записи; с ``after_seq`` — только хвост: client_seq
+    больше ``after_seq`` и все события без client_seq.
+    """
+    rows = []
+    for id_, seq, ts, code, payload in orjson.loads(zlib.decompress(blob)):
+        if _in_tail(seq, after_seq):
+            rows.append(
+                EventRow(id_, seq, dt.datetime.fromisoformat(ts), code, payload)
+            )
+    return rows
+
+
+def archived_stmt(game_ids: Sequence[int]) -> Any:
+    return select(GameEventArchive.game_id, GameEventArchive.blob).where(
+        GameEventArchive.game_id.in_(game_ids)  # type: ignore[attr-defined]
+    )
+
+
+def hot_stmt(game_ids: Sequence[int], after_seq: Optional[int] = None) -> Any:
+    """Горячие строки игр: (game_id, *EventRow) по game_id и ``order_key``."""
+    stmt = (
+        select(
+            GameEvent.game_id,
+            GameEvent.id,
+            GameEvent.client_seq,
+            GameEvent.ts,
+            EventType.code,
+            GameEvent.payload,
+        )
+        .join(EventType, EventType.id == GameEvent.event_type_id)
+        .where(GameEvent.game_id.in_(game_ids))  # type: ignore[attr-defined]
+        .order_by(
+            GameEvent.game_id,
+            GameEvent.client_seq.nulls_last(),  # type: ignore[union-attr]
+            GameEvent.ts,
+            GameEvent.id,
+        )
+    )
+    if after_seq is not None:
+        seq: Any = GameEvent.client_seq
+        stmt = stmt.where(or_(seq.is_(None), seq > after_seq))
+    return stmt
+
+
+def merge(
+    hot: Iterable[Sequence[Any]],
+    archived: Iterable[tuple[int, bytes]],
+    after_seq: Optional[int] = None,
+) -> dict[int, list[EventRow]]:
+    """
+    Полный лог по играм: blob из ``archived_stmt`` + строки ``hot_stmt``,
+    в порядке ``order_key``. Игра может быть и там, и там (переоткрыли
+    после архивации) — тогда склеиваются обе части.
+    """
+    logs: defaultdict[int, list[EventRow]] = defaultdict(list)
+    for game_id, blob in archived:
+        logs[game_id] = unpack(blob, after_seq)
+    for game_id, *row in hot:
+        logs[game_id].append(EventRow(*row))
+    for events in logs.values():
+        events.sort(key=order_key)
+    return logs
+
+
+def read_logs(
+    session: Session, game_ids: Sequence[int], after_seq: Optional[int] = None
+) -> dict[int, list[EventRow]]:
+    hot = session.execute(hot_stmt(game_ids, after_seq)).tuples().all()
+    archived = session.execute(archived_stmt(game_ids)).tuples().all()
+    return merge(hot, archived, after_seq)
+
+
+# ─────────────────────────── секции (Postgres) ───────────────────────────
+def _month(day: dt.date, shift: int = 0) -> dt.date:
+    n = day.year * 12 + day.month - 1 + shift
+    return dt.date(n // 12, n % 12 + 1, 1)
+
+
+def partition_name(month: dt.date) -> str:
+    return f"{TABLE}_y{month.year}m{month.month:02d}"
+
+
+def _bound(month: dt.date) -> str:
+    return (
+        f"'{month.isoformat()} 00:00:00+00'"  # явный UTC: не зависит от TimeZone сессии
+    )
+
+
+def partitioned(conn: Connection) -> bool:
+    """gameevent секционирован (Postgres после миграции; create_all — нет)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    stmt = text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table"
+        " WHERE partrelid = to_regclass(:t))"
+    )
+    return bool(conn.scalar(stmt, {"t": TABLE}))
+
+
+def _partitions(conn: Connection) -> set[str]:
+    stmt = text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits"
+        " WHERE inhparent = to_regclass(:t)"
+    )
+    return set(conn.scalars(stmt, {"t": TABLE}))
+
+
+def ensure_partitions(
+    conn: Connection,
+    ahead: int = MONTHS_AHEAD,
+    today: Optional[dt.date] = None,
+) -> list[str]:
+    """
+    Создаёт недостающие месячные секции: текущий месяц + ``ahead`` и все
+    месяцы, чьи строки лежат в default (их строки переезжают в новую
+    секцию). Возвращает созданные секции; не на Postgres — no-op.
+    """
+    if not partitioned(conn):
+        return []
+    # несколько воркеров на старте: DDL по очереди
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:t))"), {"t": TABLE})
+    current = _month(today or dt.datetime.now(dt.timezone.utc).date())
+    months = {_month(current, k) for k in range(ahead + 1)}
+    months |= set(
+        conn.scalars(
+            text(
+                "SELECT DISTINCT date_trunc('month', ts AT TIME ZONE 'UTC')::date"
+                f" FROM {DEFAULT}"
+            )
+        )
+    )
+    existing = _partitions(conn)
+
+    created = []
+    for month in sorted(months):
+        name = partition_name(month)
+        if name in existing:
+            continue
+        lo, hi = _bound(month), _bound(_month(month, 1))
+        in_range = f"ts >= {lo} AND ts < {hi}"
+        if conn.scalar(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT} WHERE {in_range})")
+        ):
+            # CREATE … PARTITION OF упадёт, пока такие строки лежат в default
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name}"
+                    f" (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING GENERATED)"
+                )
+            )
+            conn.execute(
+                text(
+                    f"INSERT INTO {name} ({COLUMNS})"
+                    f" SELECT {COLUMNS} FROM {DEFAULT} WHERE {in_range}"
+                )
+            )
+            conn.execute(text(f"DELETE FROM {DEFAULT} WHERE {in_range}"))
+            conn.execute(
+                text(
+                    f"ALTER TABLE {TABLE} ATTACH PARTITION {name}"
+                    f" FOR VALUES FROM ({lo}) TO ({hi})"
+                )
+            )
+        else:
+            conn.execute(
+                text(
+                    f"CREATE TABLE {name} PARTITION OF {TABLE}"
+                    f" FOR VALUES FROM ({lo}) TO ({hi})"
+                )
+            )
+        created.append(name)
+    return created
+
+
+def drop_empty_partitions(session: Session, before: dt.date) -> list[str]:
+    """
+    Удаляет пустые месячные секции, целиком лежащие до ``before``. Каждая —
+    своей транзакцией: ACCESS EXCLUSIVE держится на одну секцию, а не на
+    все до конца прохода.
+    """
+    if not partitioned(session.connection()):
+        return []
+    dropped = []
+    for name in sorted(_partitions(session.connection()) - {DEFAULT}):
+        year, month = int(name[-7:-3]), int(name[-2:])  # gameevent_yYYYYmMM
+        if _month(dt.date(year, month, 1), 1) > before:
+            continue
+        # блокировка до проверки: вставка в старый месяц не проскочит между ними
+        session.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+        if not session.scalar(text(f"SELECT EXISTS (SELECT 1 FROM {name})")):
+            session.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+        session.commit()
+    return dropped
+
+
+# ─────────────────────────── архивация ───────────────────────────
+def candidates_stmt(cutoff: dt.datetime, limit: int) -> Any:
+    """
+    Закрытые до ``cutoff`` игры, у которых ещё есть горячие события. У
+    прерванной игры finished_at нет — её возраст считается от started_at
+    или даты игры.
+    """
+    closed_at = func.coalesce(Game.finished_at, Game.started_at, Game.date)
+    return (
+        select(Game.id)
+        .where(
+            Game.state.in_(  # type: ignore[attr-defined]
+                (GameState.finished, GameState.aborted)
+            ),
+            closed_at < cutoff,
+            exists().where(GameEvent.game_id == Game.id),
+        )
+        .order_by(Game.id)
+        .limit(limit)
+    )
+
+
+def _archive_batch(session: Session, game_ids: list[int]) -> int:
+    # событие, пришедшее после архивации, дописывается к старому blob
+    values = [
+        {
+            "game_id": game_id,
+            "events": len(events),
+            "first_ts": min(e.ts for e in events),
+            "last_ts": max(e.ts for e in events),
+            "blob": pack(events),
+            "archived_at": dt.datetime.now(dt.timezone.utc),
+        }
+        for game_id, events in read_logs(session, game_ids).items()
+        if events
+    ]
+    if values:
+        stmt = insert_for(session, GameEventArchive.__table__)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["game_id"],
+            set_={
+                c: stmt.excluded[c]
+                for c in ("events", "first_ts", "last_ts", "blob", "archived_at")
+            },
+        )
+        session.execute(stmt, values)
+        hot = GameEvent.game_id.in_(game_ids)  # type: ignore[attr-defined]
+        session.execute(delete(GameEvent).where(hot))
+    return len(values)
+
+
+def restore(session: Session, game_id: int) -> int:
+    """
+    Возвращает архивную часть лога в gameevent (без commit) — при
+    переоткрытии игры: дедупликация повторов и acked_seq автосейва смотрят
+    только в горячий лог. Новые id раздаются в порядке игры. Возвращает
+    число вернувшихся событий; архива нет — 0.
+    """
+    blob = session.scalar(
+        select(GameEventArchive.blob).where(GameEventArchive.game_id == game_id)
+    )
+    if blob is None:
+        return 0
+    events = sorted(unpack(blob), key=order_key)
+    codes = {e.code for e in events}
+    type_ids = dict(
+        session.execute(
+            select(EventType.code, EventType.id).where(
+                EventType.code.in_(codes)  # type: ignore[attr-defined]
+            )
+        )
+        .tuples()
+        .all()
+    )
+    if events:
+        session.execute(
+            insert(GameEvent.__table__),
+            [
+                {
+                    "game_id": game_id,
+                    "client_seq": e.client_seq,
+                    "ts": e.ts,
+                    "event_type_id": type_ids[e.code],
+                    "payload": e.payload,
+                }
+                for e in events
+            ],
+        )
+    session.execute(
+        delete(GameEventArchive).where(
+            GameEventArchive.game_id == game_id  # type: ignore[arg-type]
+        )
+    )
+    return len(events)
+
+
+def archive(
+    session: Session,
+    older_than: dt.timedelta = ARCHIVE_AFTER,
+    *,
+    batch: int = ARCHIVE_BATCH,
+    now: Optional[dt.datetime] = None,
+) -> int:
+    """Переносит события старых завершённых игр в архив; → число игр."""
+    cutoff = (now or dt.datetime.now(dt.timezone.utc)) - older_than
+    total = 0
+    while game_ids := list(session.scalars(candidates_stmt(cutoff, batch))):
+        total += _archive_batch(session, game_ids)
+        session.commit()
+        log.info("archived events of %d games (%d so far)", len(game_ids), total)
+    return total
@@ -0,0 +1,201 @@
+"""
+Потоковая выгрузка архива игр (NDJSON / CSV) с ограниченной памятью.
+
+Один запрос game ⟕ gameplayer ⟕ player, упорядоченный по (game.id,
+seat_no), читается серверным курсором (``session.stream`` +
+``yield_per``). Соседние строки одной игры склеиваются в документ и сразу
+уходят клиенту, так что в памяти только текущая игра и пачка курсора, а не
+весь архив. События (``events=True``) догружаются пачками по
+``EVENT_BATCH`` игр через ``game_id IN (…)`` — без декартова произведения
+мест и событий в основном запросе; архивная часть лога — из
+gameeventarchive (crud.events.game_logs). События идут в порядке игры
+(event_archive.order_key) — том же, что у resume, очков и replay.
+
+CSV — одна строка на место (игра повторяется в каждой строке), без
+событий: вложенный список в плоскую таблицу не ложится.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import io
+import zlib
+from typing import Any, AsyncIterator, Literal, Optional
+
+import orjson
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import events as events_crud
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+
+YIELD_PER = 1000  # строк курсора за один fetch
+EVENT_BATCH = 200  # игр на один запрос событий
+FLUSH_BYTES = 64 * 1024  # тело уходит кусками не меньше этого
+
+GAME_FIELDS = (
+    "id",
+    "date",
+    "state",
+    "players_qty",
+    "rule_set_id",
+    "gm_id",
+    "started_at",
+    "finished_at",
+    "aborted",
+    "winner_faction",
+)
+SEAT_FIELDS = (
+    "seat_no",
+    "player_id",
+    "nickname",
+    "role",
+    "fouls_count",
+    "removed",
+    "total_points",
+    "conditions",
+)
+CSV_HEADER = [f"game_{f}" if f != "id" else "game_id" for f in GAME_FIELDS] + list(
+    SEAT_FIELDS
+)
+
+
+def games_stmt(date_from: Optional[dt.date], date_to: Optional[dt.date]) -> Select[Any]:
+    game, seat = Game.__table__.c, GamePlayer.__table__.c
+    stmt = (
+        select(
+            *(game[f] for f in GAME_FIELDS),
+            *(seat[f] for f in SEAT_FIELDS if f != "nickname"),
+            Player.nickname,
+        )
+        .select_from(Game)
+        .outerjoin(GamePlayer, GamePlayer.game_id == Game.id)
+        .outerjoin(Player, Player.id == GamePlayer.player_id)
+        .order_by(game.id, seat.seat_no)
+    )
+    if date_from is not None:
+        stmt = stmt.where(game.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(game.date <= date_to)
+    return stmt
+
+
+# ─────────────────────────── строки → игры ───────────────────────────
+async def iter_games(
+    session: AsyncSession,
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    *,
+    events: bool = False,
+) -> AsyncIterator[dict[str, Any]]:
+    """Игры по возрастанию id, каждая — dict с ``seats`` (и ``events``)."""
+    stmt = games_stmt(date_from, date_to).execution_options(yield_per=YIELD_PER)
+    result = await session.stream(stmt)
+    batch: list[dict[str, Any]] = []
+    current: Optional[dict[str, Any]] = None
+    try:
+        async for row in result.mappings():
+            if current is None or current["id"] != row["id"]:
+                if current is not None:
+                    batch.append(current)
+                current = {f: row[f] for f in GAME_FIELDS}
+                current["seats"] = []
+            if row["seat_no"] is not None:  # игра без мест — outer join дал NULL
+                current["seats"].append({f: row[f] for f in SEAT_FIELDS})
+            if len(batch) >= (EVENT_BATCH if events else 1):
+                for game in await _with_events(session, batch, events):
+                    yield game
+                batch = []
+    finally:
+        await result.close()
+    if current is not None:
+        batch.append(current)
+    for game in await _with_events(session, batch, events):
+        yield game
+
+
+async def _with_events(
+    session: AsyncSession, games: list[dict[str, Any]], events: bool
+) -> list[dict[str, Any]]:
+    if not events or not games:
+        return games
+    logs = await events_crud.game_logs(session, [g["id"] for g in games])
+    for game in games:
+        game["events"] = [
+            {"seq": e.client_seq, "ts": e.ts, "code": e.code, "payload": e.payload}
+            for e in logs.get(game["id"], [])
+        ]
+    return games
+
+
+# ─────────────────────────── форматы ───────────────────────────
+async def ndjson(games: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for game in games:
+        yield orjson.dumps(game, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (dt.date, dt.datetime)):
+        return value.isoformat()
+    return getattr(value, "value", value)  # Enum → value
+
+
+async def csv_rows(games: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(CSV_HEADER)
+    async for game in games:
+        head = [_csv_value(game[f]) for f in GAME_FIELDS]
+        for seat in game["seats"] or [dict.fromkeys(SEAT_FIELDS)]:
+            writer.writerow(head + [_csv_value(seat[f]) for f in SEAT_FIELDS])
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+
+
+async def buffered(
+    chunks: AsyncIterator[bytes], size: int = FLUSH_BYTES
+) -> AsyncIterator[bytes]:
+    """Склеивает мелкие куски: одна игра — сотни байт, send на каждую дорог."""
+    parts: list[bytes] = []
+    pending = 0
+    async for chunk in chunks:
+        parts.append(chunk)
+        pending += len(chunk)
+        if pending >= size:
+            yield b"".join(parts)
+            parts, pending = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+async def gzipped(chunks: AsyncIterator[bytes], level: int = 6) -> AsyncIterator[bytes]:
+    """gzip на лету: zlib с wbits=31 пишет заголовок и трейлер gzip."""
+    z = zlib.compressobj(level, zlib.DEFLATED, 31)
+    async for chunk in chunks:
+        if out := z.compress(chunk):
+            yield out
+    yield z.flush()
+
+
+async def stream(
+    maker: sessionmaker,
+    fmt: Literal["ndjson", "csv"],
+    date_from: Optional[dt.date] = None,
+    date_to: Optional[dt.date] = None,
+    *,
+    events: bool = False,
+    gzip: bool = False,
+) -> AsyncIterator[bytes]:
+    """Тело ответа целиком; сессия живёт, пока тело не дочитано."""
+    async with maker() as session:
+        games = iter_games(session, date_from, date_to, events=events)
+        chunks = ndjson(games) if fmt == "ndjson" else csv_rows(games)
+        chunks = buffered(chunks)
+        if gzip:
+            chunks = gzipped(chunks)
+        async for chunk in chunks:
+            yield chunk
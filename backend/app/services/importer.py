@@ -0,0 +1,347 @@
+"""
+Импорт архива игр из старой системы и таблиц: NDJSON (формат
+/export/games.ndjson, события и extra_points — необязательно) или CSV
+(строка на место, формат /export/games.csv).
+
+Источник читается потоком и режется на чанки по ``CHUNK`` записей. Каждая
+запись валидируется ``ArchivedGame`` (правила ролей GameFinished, игроки —
+по никам); не прошедшие пропускаются с предупреждением в лог. Чанк — одна
+транзакция:
+
+* игроки — сначала из словаря уже разрешённых ников, остальные одним
+  INSERT … ON CONFLICT DO NOTHING RETURNING + SELECT конфликтных (как
+  crud.games.setup);
+* id игр и мест резервируются заранее (``reserve_ids``), и все строки
+  game / gameplayer / extrapoints / gameevent уходят через COPY на
+  Postgres или executemany на остальных (``bulk_insert``);
+* ``ImportCheckpoint`` источника двигается в той же транзакции.
+
+Маска условий места (``conditions``) — из источника, иначе свёртка
+импортированных событий игры; у игр без событий она остаётся NULL:
+очки таблицы маской не воспроизвести, и rescore такие места не трогает.
+
+После падения повторный запуск с тем же ``source`` пропускает уже
+загруженные записи. PlayerStats и роллапы пересобираются один раз в конце
+(``rebuild``), а не на каждую игру.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, Union
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import httpcache
+from app.core.enums import Faction, GameState
+from app.crud.dialect import bulk_insert, reserve_ids
+from app.crud.players import existing_players_stmt, ids_by_nickname, new_players_stmt
+from app.models.event import EventType, GameEvent
+from app.models.extras import ExtraPoints
+from app.models.game import Game, GamePlayer
+from app.models.imports import ImportCheckpoint
+from app.models.rule import RuleSet
+from app.models.user import User
+from app.schemas.games import ArchivedGame
+from app.services import live_state, player_stats, rollups, scoring
+from app.services.export import GAME_FIELDS, SEAT_FIELDS
+
+log = logging.getLogger(__name__)
+
+CHUNK = 2000  # игр на транзакцию
+TABLES = ("game", "gameplayer", "extrapoints", "gameevent")
+
+Record = Union[str, dict[str, Any]]  # строка NDJSON или игра, собранная из CSV
+
+
+class Rejected(ValueError):
+    """Запись валидна по схеме, но не ложится в эту базу (FK, справочники)."""
+
+
+@dataclass
+class Progress:
+    """records/games/rejected — с учётом прошлых запусков, остальное — этого."""
+
+    records: int = 0
+    games: int = 0
+    rejected: int = 0
+    loaded: int = 0  # игр этим запуском
+    rows: int = 0  # строк всех таблиц этим запуском
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def games_per_second(self) -> float:
+        return self.loaded / self.seconds if self.seconds else 0.0
+
+
+# ─────────────────────────── чтение источника ───────────────────────────
+def read_ndjson(fh: IO[str]) -> Iterator[Record]:
+    """Строки как есть: JSON разбирает pydantic (model_validate_json)."""
+    for line in fh:
+        if line.strip():
+            yield line
+
+
+def read_csv(fh: IO[str]) -> Iterator[Record]:
+    """Соседние строки одного game_id → одна игра; пустые ячейки — нет значения."""
+    game: Optional[dict[str, Any]] = None
+    for row in csv.DictReader(fh):
+        row = {k: v for k, v in row.items() if v not in ("", None)}
+        key = row.get("game_id")
+        if game is None or key != game.get("id"):
+            if game is not None:
+                yield game
+            game = {f: row[f"game_{f}"] for f in GAME_FIELDS if f"game_{f}" in row}
+            if key is not None:
+                game["id"] = key
+            game["seats"] = []
+        if "seat_no" in row:
+            game["seats"].append({f: row[f] for f in SEAT_FIELDS if f in row})
+    if game is not None:
+        yield game
+
+
+READERS: dict[str, Callable[[IO[str]], Iterator[Record]]] = {
+    "ndjson": read_ndjson,
+    "csv": read_csv,
+}
+
+
+def _validate(record: Record) -> ArchivedGame:
+    if isinstance(record, str):
+        return ArchivedGame.model_validate_json(record)
+    return ArchivedGame.model_validate(record)
+
+
+# ─────────────────────────── загрузка чанка ───────────────────────────
+def _masks(game: ArchivedGame) -> dict[int, Optional[int]]:
+    """Маски мест: из источника, иначе по событиям игры (как score_game)."""
+    masks = {s.seat_no: s.conditions for s in game.seats}
+    if not game.events or None not in masks.values():
+        return masks
+    # порядок игры, как event_archive.order_key; id ещё нет — sorted устойчив
+    events = sorted(game.events, key=lambda e: (e.seq is None, e.seq or 0, e.ts))
+    state = live_state.fold(
+        live_state.LiveGameState(0), ((None, e.code, e.payload) for e in events)
+    )
+    winner = game.winner_faction or (state.winner and Faction(state.winner))
+    roles = {s.seat_no: s.role for s in game.seats}
+    for seat in game.seats:
+        if masks[seat.seat_no] is None:
+            masks[seat.seat_no] = scoring.condition_mask(
+                state, seat.seat_no, seat.role, winner, roles
+            )
+    return masks
+
+
+class Loader:
+    """Справочники и уже разрешённые ники живут между чанками одного запуска."""
+
+    def __init__(self, session: Session, gm_id: Optional[UUID], rule_set_id: int):
+        self.session = session
+        self.gm_id = gm_id
+        self.rule_set_id = rule_set_id
+        self.players: dict[str, int] = (
+            {}
+        )  # nickname.casefold() → id, только закоммиченные
+        self.event_types = dict(
+            session.execute(select(EventType.code, EventType.id)).tuples().all()
+        )
+        self.rule_sets = set(session.scalars(select(RuleSet.id)))
+        self.users: set[UUID] = set()
+
+    def prefetch_users(self, games: Iterable[ArchivedGame]) -> None:
+        """Ведущие чанка одним SELECT — для проверки FK в ``resolve``."""
+        gm_ids = {g.gm_id or self.gm_id for g in games} - {None} - self.users
+        if gm_ids:
+            stmt = select(User.id).where(User.id.in_(gm_ids))  # type: ignore[attr-defined]
+            self.users |= set(self.session.scalars(stmt))
+
+    def resolve(self, game: ArchivedGame) -> ArchivedGame:
+        """Значения по умолчанию + то, что иначе уронит весь чанк на FK."""
+        game.gm_id = game.gm_id or self.gm_id
+        game.rule_set_id = game.rule_set_id or self.rule_set_id
+        if game.gm_id is None:
+            raise Rejected("gm_id is missing and no default GM was given")
+        if game.gm_id not in self.users:
+            raise Rejected(f"unknown gm_id {game.gm_id}")
+        if game.rule_set_id not in self.rule_sets:
+            raise Rejected(f"unknown rule_set_id {game.rule_set_id}")
+        unknown = {e.code for e in game.events} - self.event_types.keys()
+        if unknown:
+            raise Rejected(f"unknown event codes {sorted(unknown)}")
+        return game
+
+    def _player_ids(self, nicknames: Iterable[str]) -> dict[str, int]:
+        wanted: dict[str, str] = {}
+        for n in nicknames:
+            wanted.setdefault(n.casefold(), n)  # первое написание ника — в Player
+        ids = {k: self.players[k] for k in wanted if k in self.players}
+        missing = [n for k, n in wanted.items() if k not in ids]
+        if missing:
+            new = self.session.execute(new_players_stmt(self.session, missing))
+            ids.update(ids_by_nickname(new.tuples().all()))
+        if existing := [n for n in missing if n.casefold() not in ids]:
+            found = self.session.execute(existing_players_stmt(existing))
+            ids.update(ids_by_nickname(found.tuples().all()))
+        return ids
+
+    def load(self, games: list[ArchivedGame]) -> tuple[int, dict[str, int]]:
+        """Все строки чанка в текущей транзакции; → (строк, ники чанка)."""
+        if not games:
+            return 0, {}
+        session = self.session
+        players = self._player_ids(s.nickname for g in games for s in g.seats)
+        game_ids = reserve_ids(session, Game.__table__, len(games))
+        n_seats = sum(len(g.seats) for g in games)
+        seat_ids = iter(reserve_ids(session, GamePlayer.__table__, n_seats))
+
+        rows: dict[str, list[dict[str, Any]]] = {t: [] for t in TABLES}
+        for game_id, game in zip(game_ids, games):
+            masks = _masks(game)
+            rows["game"].append(
+                {
+                    "id": game_id,
+                    "players_qty": game.players_qty,
+                    "rule_set_id": game.rule_set_id,
+                    "gm_id": game.gm_id,
+                    "state": GameState.finished,
+                    "date": game.date,
+                    "started_at": game.started_at,
+                    "finished_at": game.finished_at,
+                    "aborted": game.aborted,
+                    "winner_faction": game.winner_faction,
+                    "version": 0,
+                }
+            )
+            for seat in game.seats:
+                seat_id = next(seat_ids)
+                rows["gameplayer"].append(
+                    {
+                        "id": seat_id,
+                        "game_id": game_id,
+                        "player_id": players[seat.nickname.casefold()],
+                        "seat_no": seat.seat_no,
+                        "role": seat.role,
+                        "fouls_count": seat.fouls_count,
+                        "removed": seat.removed,
+                        "total_points": seat.total_points,
+                        "conditions": masks[seat.seat_no],
+                    }
+                )
+                rows["extrapoints"] += [
+                    {
+                        "game_player_id": seat_id,
+                        "delta": extra.delta,
+                        "reason": extra.reason,
+                        "created_at": game.finished_at,
+                    }
+                    for extra in seat.extra_points
+                ]
+            rows["gameevent"] += [
+                {
+                    "game_id": game_id,
+                    "client_seq": event.seq,
+                    "ts": event.ts,
+                    "event_type_id": self.event_types[event.code],
+                    "payload": event.payload,
+                }
+                for event in game.events
+            ]
+
+        for model in (Game, GamePlayer, ExtraPoints, GameEvent):
+            bulk_insert(session, model.__table__, rows[model.__tablename__])
+        httpcache.touch(session, *TABLES)
+        return sum(map(len, rows.values())), players
+
+
+def _batched(it: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    it = iter(it)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
+
+
+def run(
+    session: Session,
+    records: Iterable[Record],
+    *,
+    source: str,
+    gm_id: Optional[UUID] = None,
+    rule_set_id: int = 1,
+    chunk: int = CHUNK,
+    on_chunk: Optional[Callable[[Progress], None]] = None,
+) -> Progress:
+    """
+    Загружает ``records`` чанками, продолжая с checkpoint ``source``.
+    Исключение посреди чанка откатывает только его — checkpoint остаётся
+    на последнем закоммиченном.
+    """
+    checkpoint = session.get(ImportCheckpoint, source) or ImportCheckpoint(
+        source=source
+    )
+    progress = Progress(checkpoint.records, checkpoint.games, checkpoint.rejected)
+    if checkpoint.records:
+        log.info("%s: resuming after %d records", source, checkpoint.records)
+    loader = Loader(session, gm_id, rule_set_id)
+    started = time.perf_counter()
+
+    for batch in _batched(itertools.islice(records, checkpoint.records, None), chunk):
+        parsed: list[tuple[int, ArchivedGame]] = []
+        for pos, record in enumerate(batch, start=progress.records + 1):
+            try:
+                parsed.append((pos, _validate(record)))
+            except ValidationError as exc:
+                log.warning(
+                    "%s #%d rejected: %s", source, pos, exc.errors(include_url=False)
+                )
+        loader.prefetch_users(g for _, g in parsed)
+        games: list[ArchivedGame] = []
+        for pos, game in parsed:
+            try:
+                games.append(loader.resolve(game))
+            except Rejected as exc:
+                log.warning("%s #%d (id=%s) rejected: %s", source, pos, game.id, exc)
+
+        rows, players = loader.load(games)
+        checkpoint.records += len(batch)
+        checkpoint.games += len(games)
+        checkpoint.rejected += len(batch) - len(games)
+        checkpoint.updated_at = dt.datetime.now(dt.timezone.utc)
+        session.add(checkpoint)
+        session.commit()
+        loader.players.update(players)
+
+        progress.records, progress.games = checkpoint.records, checkpoint.games
+        progress.rejected = checkpoint.rejected
+        progress.loaded += len(games)
+        progress.rows += rows
+        progress.seconds = time.perf_counter() - started
+        if on_chunk is not None:
+            on_chunk(progress)
+    return progress
+
+
+def rebuild(session: Session) -> None:
+    """Агрегаты после импорта: дешевле одной пересборкой, чем по игре."""
+    player_stats.rebuild(session)
+    rollups.rebuild(session)
+
+
+def reset(session: Session, source: str) -> None:
+    """Забыть прогресс источника (загруженные игры остаются в базе)."""
+    checkpoint = session.get(ImportCheckpoint, source)
+    if checkpoint is not None:
+        session.delete(checkpoint)
+        session.commit()
@@ -0,0 +1,279 @@
+"""
+Состояние живой игры как свёртка лога GameEvent.
+
+Каждый ``EventType.code`` обрабатывается своим reducer'ом, который
+мутирует компактный ``LiveGameState``. Формат payload по кодам:
+
+* ``deal_roles`` — ``{"roles": {"1": "Citizen", "2": "Don", ...}}``
+* ``phase``      — ``{"phase": "day" | "night"}``
+* ``nominate``   — ``{"actor_seat": 2, "target_seat": 5}``
+* ``vote``       — ``{"round_no": 1, "counts": {"5": 4, "7": 3}}``
+* ``foul``       — ``{"target_seat": 3}``
+* ``kill``       — ``{"target_seat": 4}`` (ночной отстрел)
+* ``vote_out``   — ``{"target_seat": 5}``
+* ``remove``     — ``{"target_seat": 6, "reason": "casper"}``
+* ``best_move``  — ``{"actor_seat": 4, "guesses": [1, 2, 3]}``
+* ``finish``     — ``{"winner": "city" | "mafia"}``
+
+Незнакомые коды пропускаются (но учитываются в ``applied``), так что
+старые снапшоты переживают появление новых типов событий.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import GameRole
+from app.crud import snapshots as snapshots_crud
+
+log = logging.getLogger(__name__)
+
+FOUL_LIMIT = 4  # четвёртый фол — удаление из-за стола
+
+Reducer = Callable[["LiveGameState", dict[str, Any]], None]
+_REDUCERS: dict[str, Reducer] = {}
+
+
+def reduces(code: str) -> Callable[[Reducer], Reducer]:
+    def register(fn: Reducer) -> Reducer:
+        _REDUCERS[code] = fn
+        return fn
+
+    return register
+
+
+@dataclass
+class SeatState:
+    role: Optional[GameRole] = None
+    fouls: int = 0
+    removed: bool = False
+    removal: Optional[str] = None  # kill | vote_out | fouls | casper | …
+
+
+@dataclass
+class LiveGameState:
+    game_id: int
+    seats: dict[int, SeatState] = field(default_factory=dict)
+    phase: str = "day"
+    day: int = 1
+    night: int = 0
+    nominations: list[tuple[int, int]] = field(default_factory=list)
+    vote_rounds: list[dict[int, int]] = field(default_factory=list)
+    first_night_killed: Optional[int] = None
+    best_move: Optional[tuple[int, list[int]]] = None
+    winner: Optional[str] = None
+    applied: int = 0  # сколько событий свёрнуто
+    last_event_id: Optional[int] = None
+
+    def seat(self, seat_no: int) -> SeatState:
+        return self.seats.setdefault(int(seat_no), SeatState())
+
+    # ── сериализация для снапшотов (JSON‑ключи всегда строки) ──
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["seats"] = {str(k): v for k, v in data["seats"].items()}
+        data["vote_rounds"] = [
+            {str(k): v for k, v in r.items()} for r in data["vote_rounds"]
+        ]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "LiveGameState":
+        data = dict(data)
+        data["seats"] = {
+            int(k): SeatState(**{**v, "role": v["role"] and GameRole(v["role"])})
+            for k, v in data["seats"].items()
+        }
+        data["nominations"] = [tuple(n) for n in data["nominations"]]
+        data["vote_rounds"] = [
+            {int(k): v for k, v in r.items()} for r in data["vote_rounds"]
+        ]
+        if data["best_move"] is not None:
+            actor, guesses = data["best_move"]
+            data["best_move"] = (actor, list(guesses))
+        return cls(**data)
+
+    def copy(self) -> "LiveGameState":
+        """Глубокая копия без JSON‑круга: чекпоинты replay снимаются часто."""
+        best_move = self.best_move and (self.best_move[0], list(self.best_move[1]))
+        return replace(
+            self,
+            seats={k: replace(v) for k, v in self.seats.items()},
+            nominations=list(self.nominations),
+            vote_rounds=[dict(r) for r in self.vote_rounds],
+            best_move=best_move,
+        )
+
+
+def apply(
+    state: LiveGameState,
+    code: str,
+    payload: dict[str, Any],
+    event_id: Optional[int] = None,
+) -> LiveGameState:
+    reducer = _REDUCERS.get(code)
+    if reducer is not None:
+        try:
+            reducer(state, payload)
+        except (KeyError, TypeError, ValueError, AttributeError) as exc:
+            # ingest проверяет payload (schemas.events.PAYLOADS), но старый
+            # или импортированный лог мог записаться и без проверки — одно
+            # кривое событие не должно ронять свёртку всей игры
+            log.warning(
+                "event %s (%s) skipped: bad payload %r: %r",
+                event_id,
+                code,
+                payload,
+                exc,
+            )
+    state.applied += 1
+    if event_id is not None:
+        state.last_event_id = event_id
+    return state
+
+
+def fold(
+    state: LiveGameState,
+    events: Iterable[tuple[Optional[int], str, dict[str, Any]]],
+) -> LiveGameState:
+    """Применяет ``(event_id, code, payload)`` по порядку."""
+    for event_id, code, payload in events:
+        apply(state, code, payload, event_id)
+    return state
+
+
+def _remove(state: LiveGameState, seat_no: int, reason: str) -> None:
+    seat = state.seat(seat_no)
+    if not seat.removed:
+        seat.removed = True
+        seat.removal = reason
+
+
+# ───────────────────────────── reducers ─────────────────────────────
+@reduces("deal_roles")
+def _deal_roles(state: LiveGameState, payload: dict[str, Any]) -> None:
+    for seat_no, role in payload["roles"].items():
+        state.seat(seat_no).role = GameRole(role)
+
+
+@reduces("phase")
+def _phase(state: LiveGameState, payload: dict[str, Any]) -> None:
+    phase = payload["phase"]
+    if phase == state.phase:
+        return
+    state.phase = phase
+    if phase == "night":
+        state.night += 1
+    else:
+        state.day += 1
+    state.nominations.clear()
+    state.vote_rounds.clear()
+
+
+@reduces("nominate")
+def _nominate(state: LiveGameState, payload: dict[str, Any]) -> None:
+    state.nominations.append((payload["actor_seat"], payload["target_seat"]))
+
+
+@reduces("vote")
+def _vote(state: LiveGameState, payload: dict[str, Any]) -> None:
+    state.vote_rounds.append({int(k): v for k, v in payload["counts"].items()})
+
+
+@reduces("foul")
+def _foul(state: LiveGameState, payload: dict[str, Any]) -> None:
+    seat = state.seat(payload["target_seat"])
+    seat.fouls += 1
+    if seat.fouls >= FOUL_LIMIT:
+        _remove(state, payload["target_seat"], "fouls")
+
+
+@reduces("kill")
+def _kill(state: LiveGameState, payload: dict[str, Any]) -> None:
+    if state.night == 1 and state.first_night_killed is None:
+        state.first_night_killed = payload["target_seat"]
+    _remove(state, payload["target_seat"], "kill")
+
+
+@reduces("vote_out")
+def _vote_out(state: LiveGameState, payload: dict[str, Any]) -> None:
+    _remove(state, payload["target_seat"], "vote_out")
+
+
+@reduces("remove")
+def _remove_event(state: LiveGameState, payload: dict[str, Any]) -> None:
+    _remove(state, payload["target_seat"], payload.get("reason", "removed"))
+
+
+@reduces("best_move")
+def _best_move(state: LiveGameState, payload: dict[str, Any]) -> None:
+    state.best_move = (payload["actor_seat"], list(payload["guesses"]))
+
+
+@reduces("finish")
+def _finish(state: LiveGameState, payload: dict[str, Any]) -> None:
+    state.winner = payload["winner"]
+
+
+# ─────────────────────────── snapshots / resume ───────────────────────────
+SNAPSHOT_EVERY = 200  # новый снапшот, когда хвост после прошлого ≥ N событий
+
+
+async def _from_snapshot(
+    session: AsyncSession, game_id: int
+) -> tuple[LiveGameState, Optional[int]]:
+    """Последний снапшот (или пустое состояние) и client_seq, где он режет лог."""
+    snap = await snapshots_crud.latest(session, game_id)
+    if snap is None:
+        return LiveGameState(game_id), None
+    return LiveGameState.from_dict(snap.state), snap.client_seq
+
+
+async def resume(session: AsyncSession, game_id: int) -> tuple[LiveGameState, int]:
+    """Последний снапшот + хвост. Возвращает (state, длина хвоста)."""
+    state, after = await _from_snapshot(session, game_id)
+    tail = await snapshots_crud.events_after(session, game_id, after)
+    return fold(state, ((r.id, r.code, r.payload) for r in tail)), len(tail)
+
+
+async def snapshot_if_due(
+    session: AsyncSession,
+    game_id: int,
+    acked: Optional[int],
+    every: int = SNAPSHOT_EVERY,
+) -> Optional[LiveGameState]:
+    """
+    Зовётся после записи событий с acked_seq батча. Снапшот покрывает только
+    client_seq ≤ ``acked``: дальше могут быть дыры, и поздний батч встал бы
+    в порядке игры раньше уже свёрнутых событий. Длину хвоста считает
+    запросом, а сворачивает лог и пишет снапшот, только когда
+    подтверждённый хвост дорос до ``every``.
+    """
+    if acked is None:
+        return None
+    if await snapshots_crud.tail_length(session, game_id, acked) < every:
+        return None
+    state, after = await _from_snapshot(session, game_id)
+    tail = await snapshots_crud.events_after(session, game_id, after)
+    fold(
+        state,
+        (
+            (r.id, r.code, r.payload)
+            for r in tail
+            if r.client_seq is not None and r.client_seq <= acked
+        ),
+    )
+    if state.last_event_id is not None:
+        await snapshots_crud.save(
+            session,
+            game_id,
+            state.last_event_id,
+            acked,
+            state.applied,
+            state.to_dict(),
+        )
+    return state
@@ -0,0 +1,205 @@
+"""
+Поиск игрока по нику для быстрого добавления за стол: префикс + «опечатки».
+
+На Postgres всё делает один запрос по GIN‑индексу pg_trgm
+(``ix_player_nickname_trgm``). На остальных диалектах (SQLite в тестах)
+— процессный индекс: префиксное дерево + инвертированный индекс триграмм
+(numpy: подсчёт общих триграмм для всех ников одним bincount).
+Индекс догружается по ``player.id > max_id`` перед каждым поиском, так что
+новые игроки видны сразу и без событий ORM (переименования не отслеживаются —
+для этого есть ``reset``).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from sqlalchemy import Text, bindparam, case, cast, func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.player import Player
+
+SIMILARITY_THRESHOLD = 0.3  # как pg_trgm.similarity_threshold по умолчанию
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Триграммы в духе pg_trgm: слова в нижнем регистре, «  w » с краёв."""
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+@dataclass(frozen=True)
+class Match:
+    id: int
+    nickname: str
+    score: float  # 1.0 — совпадение по префиксу
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.ids: list[int] = []
+
+
+class NicknameIndex:
+    """Префиксное дерево + триграммы по нижнему регистру ников."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self._root = _Node()
+        self._nicknames: dict[int, str] = {}
+        self._postings: dict[str, list[int]] = {}
+        self._arrays: dict[str, np.ndarray] = {}  # кэш postings → ndarray
+        self._sizes = np.zeros(1024, dtype=np.int32)  # |триграммы(ник)| по id
+        self.max_id = 0
+
+    def __len__(self) -> int:
+        return len(self._nicknames)
+
+    def add(self, player_id: int, nickname: str) -> None:
+        node = self._root
+        for ch in nickname.lower():
+            node = node.children.setdefault(ch, _Node())
+        node.ids.append(player_id)
+        grams = trigrams(nickname)
+        for g in grams:
+            self._postings.setdefault(g, []).append(player_id)
+            self._arrays.pop(g, None)
+        if player_id >= len(self._sizes):
+            self._sizes = np.resize(
+                self._sizes, max(player_id + 1, 2 * len(self._sizes))
+            )
+        self._sizes[player_id] = len(grams)
+        self._nicknames[player_id] = nickname
+        self.max_id = max(self.max_id, player_id)
+
+    def catch_up(self, session: Session) -> int:
+        """Догружает игроков с id > max_id; возвращает число добавленных."""
+        rows = session.execute(
+            select(Player.id, Player.nickname)
+            .where(Player.id > self.max_id)
+            .order_by(Player.id)
+        ).all()
+        for player_id, nickname in rows:
+            self.add(player_id, nickname)
+        return len(rows)
+
+    # ── поиск ──
+    def _prefix(self, prefix: str) -> Iterator[int]:
+        """id в лексикографическом порядке ников с данным префиксом."""
+        node: Optional[_Node] = self._root
+        for ch in prefix:
+            node = node.children.get(ch) if node else None
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.ids
+            stack.extend(
+                node.children[ch] for ch in sorted(node.children, reverse=True)
+            )
+
+    def _posting(self, gram: str) -> np.ndarray:
+        arr = self._arrays.get(gram)
+        if arr is None:
+            arr = self._arrays[gram] = np.asarray(
+                self._postings.get(gram, ()), dtype=np.int64
+            )
+        return arr
+
+    def _fuzzy(self, grams: set[str], k: int, exclude: set[int]) -> list[Match]:
+        """
+        Векторно: bincount по postings триграмм запроса даёт |A ∩ B| для
+        всех ников сразу, дальше similarity = c / (|A| + |B| − c) и top‑k.
+        """
+        if not grams or k <= 0:
+            return []
+        ids = np.concatenate([self._posting(g) for g in grams])
+        if not len(ids):
+            return []
+        common = np.bincount(ids, minlength=self.max_id + 1)
+        hit = np.flatnonzero(common)
+        c = common[hit]
+        score = c / (len(grams) + self._sizes[hit] - c)
+        keep = score >= SIMILARITY_THRESHOLD
+        hit, score = hit[keep], score[keep]
+        if exclude:
+            keep = ~np.isin(hit, list(exclude))
+            hit, score = hit[keep], score[keep]
+        if len(hit) > k:
+            top = np.argpartition(-score, k - 1)[:k]
+            hit, score = hit[top], score[top]
+        ranked = sorted(
+            zip(score.tolist(), hit.tolist()),
+            key=lambda t: (-t[0], self._nicknames[t[1]].lower()),
+        )
+        return [Match(pid, self._nicknames[pid], s) for s, pid in ranked]
+
+    def search(self, q: str, k: int) -> list[Match]:
+        q = q.strip().lower()
+        if not q:
+            return []
+        out: list[Match] = []
+        for player_id in self._prefix(q):
+            out.append(Match(player_id, self._nicknames[player_id], 1.0))
+            if len(out) == k:
+                return out
+        out.extend(self._fuzzy(trigrams(q), k - len(out), {m.id for m in out}))
+        return out
+
+
+index = NicknameIndex()
+
+
+# ─────────────────────────── Postgres ───────────────────────────
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_stmt(q: str, k: int) -> Any:
+    """
+    Префикс и триграммы одним запросом: оба условия идут по
+    GIN(lower(nickname) gin_trgm_ops), префиксные совпадения — первыми.
+    """
+    nick = func.lower(cast(Player.nickname, Text))
+    q_param = bindparam("q", q.strip().lower())
+    is_prefix = nick.like(
+        bindparam("prefix", _escape_like(q.strip().lower()) + "%"), escape="\\"
+    )
+    score = case((is_prefix, literal(1.0)), else_=func.similarity(nick, q_param))
+    return (
+        select(Player.id, Player.nickname, score.label("score"))
+        .where(is_prefix | nick.op("%")(q_param))
+        .order_by(score.desc(), nick)
+        .limit(k)
+    )
+
+
+async def search(session: AsyncSession, q: str, k: int = 10) -> list[Match]:
+    if not q.strip():
+        return []
+    if session.get_bind().dialect.name == "postgresql":
+        rows = await session.execute(search_stmt(q, k))
+        return [Match(r.id, r.nickname, float(r.score)) for r in rows]
+    await session.run_sync(index.catch_up)
+    return index.search(q, k)
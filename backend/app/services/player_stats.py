@@ -0,0 +1,153 @@
+"""
+Инкрементальные агрегаты PlayerStats.
+
+Игра учитывается, пока она в ``GameState.finished`` и не ``aborted``.
+При входе в finished к строкам игроков прибавляется вклад игры, при
+выходе из него (правка организатора) — вычитается тот же вклад, поэтому
+дельту надо снимать *до* изменения состояния и очков. Всё в транзакции
+вызывающего; ``rebuild`` и ``check`` — для обслуживания.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Mapping
+
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.enums import ROLE_FACTION, Faction, GameState
+from app.crud.dialect import insert_for
+from app.models.game import Game, GamePlayer
+from app.models.stats import PlayerStats
+
+COUNTERS = ("games", "wins", "city_games", "city_wins", "mafia_games", "mafia_wins")
+COLUMNS = (*COUNTERS, "points")
+POINTS_TOLERANCE = 1e-6
+
+
+def counted():
+    """Условие «игра идёт в статистику» — общее для всех агрегатов."""
+    return and_(Game.state == GameState.finished, Game.aborted.is_(False))
+
+
+def _upsert(session: Session, deltas: Mapping[int, dict[str, float]]) -> None:
+    """``stats += delta`` для каждого игрока одним INSERT … ON CONFLICT."""
+    if not deltas:
+        return
+    tbl = PlayerStats.__table__
+    stmt = insert_for(session, tbl).values(
+        [{"player_id": pid, **delta} for pid, delta in deltas.items()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tbl.c.player_id],
+        set_={c: tbl.c[c] + stmt.excluded[c] for c in COLUMNS},
+    )
+    session.execute(stmt)
+
+
+def game_delta(session: Session, game_id: int) -> dict[int, dict[str, float]]:
+    """Вклад игры в агрегаты (пусто, если игра сейчас не учитывается)."""
+    rows = session.execute(
+        select(
+            GamePlayer.player_id,
+            GamePlayer.role,
+            GamePlayer.total_points,
+            Game.winner_faction,
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .where(Game.id == game_id, counted())
+    ).all()
+    deltas: dict[int, dict[str, float]] = {}
+    for player_id, role, points, winner in rows:
+        faction = ROLE_FACTION[role]
+        won = int(faction is winner)
+        d = deltas.setdefault(player_id, dict.fromkeys(COLUMNS, 0))
+        d["games"] += 1
+        d["wins"] += won
+        d[f"{faction.value}_games"] += 1
+        d[f"{faction.value}_wins"] += won
+        d["points"] += points
+    return deltas
+
+
+def apply_game(session: Session, game_id: int, sign: int = 1) -> None:
+    """Прибавляет (sign=1) или вычитает (sign=-1) вклад игры."""
+    deltas = game_delta(session, game_id)
+    if sign != 1:
+        deltas = {pid: {c: v * sign for c, v in d.items()} for pid, d in deltas.items()}
+    _upsert(session, deltas)
+
+
+def add_points(session: Session, points: Iterable[tuple[int, float]]) -> None:
+    """Поправка очков после пересчёта RuleSet: пары (player_id, delta)."""
+    deltas: dict[int, dict[str, float]] = {}
+    for player_id, delta in points:
+        if delta:
+            d = deltas.setdefault(player_id, dict.fromkeys(COLUMNS, 0))
+            d["points"] += delta
+    _upsert(session, deltas)
+
+
+# ─────────────────────────── rebuild / check ───────────────────────────
+def recompute_stmt():
+    """Агрегаты с нуля: один GROUP BY по gameplayer ⨝ game."""
+    city = GamePlayer.role.in_(
+        [r for r, f in ROLE_FACTION.items() if f is Faction.city]
+    )
+    mafia = ~city
+    won = or_(
+        and_(city, Game.winner_faction == Faction.city),
+        and_(mafia, Game.winner_faction == Faction.mafia),
+    )
+
+    def _sum(cond):
+        return func.coalesce(func.sum(case((cond, 1), else_=0)), 0)
+
+    return (
+        select(
+            GamePlayer.player_id,
+            func.count().label("games"),
+            _sum(won).label("wins"),
+            _sum(city).label("city_games"),
+            _sum(and_(city, won)).label("city_wins"),
+            _sum(mafia).label("mafia_games"),
+            _sum(and_(mafia, won)).label("mafia_wins"),
+            func.coalesce(func.sum(GamePlayer.total_points), 0.0).label("points"),
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .where(counted())
+        .group_by(GamePlayer.player_id)
+    )
+
+
+def rebuild(session: Session) -> int:
+    """Полная пересборка таблицы; возвращает число игроков."""
+    tbl = PlayerStats.__table__
+    session.execute(delete(tbl))
+    session.execute(insert(tbl).from_select(["player_id", *COLUMNS], recompute_stmt()))
+    count = session.scalar(select(func.count()).select_from(tbl)) or 0
+    session.commit()
+    return count
+
+
+def check(session: Session) -> list[int]:
+    """player_id, у которых агрегаты расходятся с пересчётом с нуля."""
+    expected = {row.player_id: row for row in session.execute(recompute_stmt())}
+    stored = {row.player_id: row for row in session.scalars(select(PlayerStats))}
+    mismatched = []
+    for pid in expected.keys() | stored.keys():
+        want, have = expected.get(pid), stored.get(pid)
+        if want is None or have is None:
+            row = want or have
+            # строка из одних нулей равносильна отсутствию строки
+            if (
+                any(getattr(row, c) for c in COUNTERS)
+                or abs(row.points) > POINTS_TOLERANCE
+            ):
+                mismatched.append(pid)
+            continue
+        if any(getattr(want, c) != getattr(have, c) for c in COUNTERS) or (
+            abs(want.points - have.points) > POINTS_TOLERANCE
+        ):
+            mismatched.append(pid)
+    return sorted(mismatched)
@@ -0,0 +1,126 @@
+"""
+Процессный кэш справочников: EventType.code → id и скомпилированные RuleSet.
+
+Загружается целиком при старте и перечитывается только при смене
+``refdataversion.version``. Правки организатора увеличивают версию и
+шлют ``NOTIFY refdata`` — каждый воркер помечает кэш устаревшим и
+перечитывает его при следующем обращении. Если LISTEN недоступен
+(SQLite, обрыв), версия сверяется не чаще раза в ``check_interval`` секунд.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.event import EventType
+from app.models.refdata import RefDataVersion
+from app.models.rule import RuleItem, RuleSet
+
+# модулем, а не именами: scoring через live_state и crud.events сам
+# импортирует refcache
+from app.services import scoring
+
+CHANNEL = "refdata"
+
+
+class RefCache:
+    def __init__(self, check_interval: float = 30.0):
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._event_types: dict[str, int] = {}
+        self._rule_sets: dict[int, scoring.CompiledRuleSet] = {}
+        self._active_rule_set_id: Optional[int] = None
+        self._stale = True
+        self._checked_at = 0.0
+
+    # ── инвалидация ──
+    def invalidate(self, payload: Optional[str] = None) -> None:
+        """Обработчик NOTIFY: payload — новая версия (или None при реконнекте)."""
+        if payload is None or self.version is None or int(payload) != self.version:
+            self._stale = True
+
+    def needs_refresh(self) -> bool:
+        return self._stale or time.monotonic() - self._checked_at > self.check_interval
+
+    # ── загрузка (sync; из async — через run_sync) ──
+    def refresh(self, session: Session) -> None:
+        version = session.scalar(select(RefDataVersion.version)) or 0
+        self._checked_at = time.monotonic()
+        if not self._stale and version == self.version:
+            return
+        self._load(session, version)
+
+    def _load(self, session: Session, version: int) -> None:
+        self._event_types = dict(
+            session.execute(select(EventType.code, EventType.id)).tuples().all()
+        )
+        items: dict[int, list[RuleItem]] = {}
+        for item in session.scalars(select(RuleItem)):
+            items.setdefault(item.rule_set_id, []).append(item)
+        rule_sets = session.execute(select(RuleSet.id, RuleSet.is_active)).all()
+        self._rule_sets = {
+            rs.id: scoring.compile_rule_set(rs.id, items.get(rs.id, ()))
+            for rs in rule_sets
+        }
+        self._active_rule_set_id = next(
+            (rs.id for rs in rule_sets if rs.is_active), None
+        )
+        self.version = version
+        self._stale = False
+        self.reloads += 1
+
+    async def refresh_async(self, session: AsyncSession) -> None:
+        if self.needs_refresh():
+            await session.run_sync(self.refresh)
+
+    # ── чтение ──
+    def event_type_ids(self, codes: Iterable[str]) -> dict[str, int]:
+        """Известные коды → id; отсутствующие в ответ не попадают."""
+        found = {c: self._event_types[c] for c in codes if c in self._event_types}
+        self.hits += len(found)
+        return found
+
+    async def resolve_event_types(
+        self, session: AsyncSession, codes: set[str]
+    ) -> dict[str, int]:
+        """Как event_type_ids, но при промахе один раз перечитывает справочник."""
+        await self.refresh_async(session)
+        found = self.event_type_ids(codes)
+        if len(found) < len(codes):
+            self.misses += len(codes) - len(found)
+            self._stale = True  # тип могли добавить в другом воркере без NOTIFY
+            await session.run_sync(self.refresh)
+            found = self.event_type_ids(codes)
+        return found
+
+    def rule_set(self, session: Session, rule_set_id: int) -> scoring.CompiledRuleSet:
+        if self.needs_refresh():
+            self.refresh(session)
+        compiled = self._rule_sets.get(rule_set_id)
+        if compiled is not None:
+            self.hits += 1
+            return compiled
+        self.misses += 1
+        self._stale = True
+        self.refresh(session)
+        return self._rule_sets[rule_set_id]
+
+    def active_rule_set(self, session: Session) -> Optional[scoring.CompiledRuleSet]:
+        if self.needs_refresh():
+            self.refresh(session)
+        if self._active_rule_set_id is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._rule_sets[self._active_rule_set_id]
+
+
+refcache = RefCache()
@@ -0,0 +1,166 @@
+"""
+Перемотка завершённой игры: состояние стола после любого события лога.
+
+Лог игры (gameevent или архив) читается и сворачивается один раз; каждые
+``CHECKPOINT_EVERY`` событий в ``Replay`` откладывается копия
+LiveGameState. Позиция ``at`` — ближайший чекпоинт не дальше ``at`` плюс
+не больше K−1 reducer'ов, так что перемотка туда‑сюда стоит O(K) на шаг, а
+не O(at). Таймлайн целиком — один проход свёртки (``timeline``).
+
+``Replay`` игр живут в ``ReplayCache`` (LRU по играм на процесс) под
+версией игры: переоткрытие (finished → live) сдвигает Game.version, и
+устаревшая запись пересобирается при следующем обращении.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.metrics import registry
+from app.crud import events as events_crud
+from app.models.game import Game
+from app.services.event_archive import EventRow
+from app.services.export import FLUSH_BYTES
+from app.services.live_state import LiveGameState, apply
+
+CHECKPOINT_EVERY = 32  # K: событий между чекпоинтами
+NDJSON = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+
+
+@dataclass
+class FrameEvent:
+    seq: Optional[int]
+    ts: datetime
+    code: str
+    payload: dict[str, Any]
+
+
+@dataclass
+class Frame:
+    """Состояние после ``at`` событий из ``total`` (0 — до первого)."""
+
+    at: int
+    total: int
+    event: Optional[FrameEvent]  # событие номер ``at``
+    state: LiveGameState
+
+
+@dataclass
+class Replay:
+    game_id: int
+    events: list[EventRow]
+    every: int = CHECKPOINT_EVERY
+    # [i] — состояние после i·K событий
+    checkpoints: list[LiveGameState] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        state = LiveGameState(self.game_id)
+        self.checkpoints = [state.copy()]
+        for n, e in enumerate(self.events, start=1):
+            apply(state, e.code, e.payload, e.id)
+            if n % self.every == 0:
+                self.checkpoints.append(state.copy())
+
+    @property
+    def total(self) -> int:
+        return len(self.events)
+
+    def state_at(self, at: int) -> LiveGameState:
+        """Копия чекпоинта ≤ ``at`` + меньше K событий; чекпоинты не меняются."""
+        if not 0 <= at <= self.total:
+            raise IndexError(at)
+        state = self.checkpoints[at // self.every].copy()
+        for e in self.events[state.applied : at]:
+            apply(state, e.code, e.payload, e.id)
+        return state
+
+    def _frame(self, at: int, state: LiveGameState) -> Frame:
+        event = None
+        if at:
+            e = self.events[at - 1]
+            event = FrameEvent(e.client_seq, e.ts, e.code, e.payload)
+        return Frame(at, self.total, event, state)
+
+    def frame(self, at: int) -> Frame:
+        return self._frame(at, self.state_at(at))
+
+    def timeline(self, start: int = 0) -> Iterator[Frame]:
+        """
+        Кадры ``start``…``total`` за один проход. Состояние в кадрах — один
+        и тот же объект: сериализовать сразу, не копить.
+        """
+        state = self.state_at(start)
+        yield self._frame(start, state)
+        for at in range(start + 1, self.total + 1):
+            e = self.events[at - 1]
+            apply(state, e.code, e.payload, e.id)
+            yield self._frame(at, state)
+
+
+def ndjson(replay: Replay, start: int = 0) -> Iterator[bytes]:
+    """Таймлайн по кадру на строку, кусками не меньше FLUSH_BYTES."""
+    parts: list[bytes] = []
+    pending = 0
+    for frame in replay.timeline(start):
+        line = orjson.dumps(frame, option=NDJSON)
+        parts.append(line)
+        pending += len(line)
+        if pending >= FLUSH_BYTES:
+            yield b"".join(parts)
+            parts, pending = [], 0
+    if parts:
+        yield b"".join(parts)
+
+
+# ─────────────────────────── LRU по играм ───────────────────────────
+replay_hits = registry.counter("replay_cache_hits_total", "Replay cache hits")
+replay_misses = registry.counter("replay_cache_misses_total", "Replay cache misses")
+
+
+class ReplayCache:
+    def __init__(self, max_games: int = 128) -> None:
+        self.max_games = max_games
+        self._entries: OrderedDict[int, tuple[int, Replay]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, game_id: int, version: int) -> Optional[Replay]:
+        entry = self._entries.get(game_id)
+        if entry is None or entry[0] != version:
+            replay_misses.inc()
+            return None
+        self._entries.move_to_end(game_id)
+        replay_hits.inc()
+        return entry[1]
+
+    def put(self, game_id: int, version: int, replay: Replay) -> None:
+        self._entries[game_id] = (version, replay)
+        self._entries.move_to_end(game_id)
+        while len(self._entries) > self.max_games:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+cache = ReplayCache(get_settings().replay_cache_games)
+registry.gauge("replay_cache_games", "Games held by the replay cache").set_function(
+    lambda: len(cache)
+)
+
+
+async def load(session: AsyncSession, game: Game) -> Replay:
+    """Replay игры из кэша или из лога (один запрос, свёртка один раз)."""
+    replay = cache.get(game.id, game.version)
+    if replay is None:
+        replay = Replay(game.id, await events_crud.game_log(session, game.id))
+        cache.put(game.id, game.version, replay)
+    return replay
@@ -0,0 +1,291 @@
+"""
+Дневные/месячные роллапы для дашборда клуба.
+
+Каждая учтённая игра (см. ``player_stats.counted``) пишет свой вклад
+дважды: в строку своего дня и в строку своего месяца. Диапазон
+[date_from, date_to] режется на целые месяцы (month‑строки) и хвосты по
+краям (day‑строки), так что за 5 лет читается ~60 месячных строк на ключ
+вместо ~1800 дневных. Top‑N считается ограниченной кучей по сгруппированным
+строкам.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import heapq
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import and_, case, delete, false, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.enums import ROLE_FACTION, Faction
+from app.crud.dialect import insert_for
+from app.models.game import Game, GamePlayer
+from app.models.stats import FactionDailyStats, PlayerDailyStats
+from app.services.player_stats import counted
+
+DAY, MONTH = "day", "month"
+PLAYER_COLUMNS = ("games", "wins", "points")
+LAST_DAY = dt.date(9999, 11, 30)  # дальше «+1 день» / следующий месяц не представимы
+
+
+def _month(d: dt.date) -> dt.date:
+    return d.replace(day=1)
+
+
+def _next_month(d: dt.date) -> dt.date:
+    return (d.replace(day=28) + dt.timedelta(days=4)).replace(day=1)
+
+
+def _upsert(
+    session: Session, model: Any, keys: Sequence[str], rows: list[dict]
+) -> None:
+    if not rows:
+        return
+    tbl = model.__table__
+    stmt = insert_for(session, tbl).values(rows)
+    cols = [c for c in rows[0] if c not in keys]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[tbl.c[k] for k in keys],
+        set_={c: tbl.c[c] + stmt.excluded[c] for c in cols},
+    )
+    session.execute(stmt)
+
+
+def _upsert_players(session: Session, deltas: dict[tuple[dt.date, int], dict]) -> None:
+    rows = [
+        {"span": span, "date": bucket, "player_id": pid, **delta}
+        for (day, pid), delta in deltas.items()
+        for span, bucket in ((DAY, day), (MONTH, _month(day)))
+    ]
+    _upsert(session, PlayerDailyStats, ("span", "date", "player_id"), rows)
+
+
+# ─────────────────────────── incremental ───────────────────────────
+def apply_game(session: Session, game_id: int, sign: int = 1) -> None:
+    """Прибавляет (sign=1) или вычитает (sign=-1) вклад игры в роллапы."""
+    rows = session.execute(
+        select(
+            Game.date,
+            Game.winner_faction,
+            Game.players_qty,
+            GamePlayer.player_id,
+            GamePlayer.role,
+            GamePlayer.total_points,
+        )
+        .join(GamePlayer, GamePlayer.game_id == Game.id)
+        .where(Game.id == game_id, counted())
+    ).all()
+    if not rows:
+        return
+
+    day, winner, qty = rows[0].date, rows[0].winner_faction, rows[0].players_qty
+    deltas: dict[tuple[dt.date, int], dict] = {}
+    for r in rows:
+        d = deltas.setdefault((day, r.player_id), dict.fromkeys(PLAYER_COLUMNS, 0))
+        d["games"] += sign
+        d["wins"] += sign * int(ROLE_FACTION[r.role] is winner)
+        d["points"] += sign * r.total_points
+    _upsert_players(session, deltas)
+
+    if winner is not None:
+        _upsert(
+            session,
+            FactionDailyStats,
+            ("span", "date", "winner_faction", "players_qty"),
+            [
+                {
+                    "span": span,
+                    "date": bucket,
+                    "winner_faction": winner,
+                    "players_qty": qty,
+                    "games": sign,
+                }
+                for span, bucket in ((DAY, day), (MONTH, _month(day)))
+            ],
+        )
+
+
+def add_points(session: Session, deltas: Iterable[tuple[dt.date, int, float]]) -> None:
+    """Поправка очков после пересчёта RuleSet: (дата игры, player_id, delta)."""
+    merged: dict[tuple[dt.date, int], dict] = {}
+    for day, player_id, delta in deltas:
+        d = merged.setdefault((day, player_id), dict.fromkeys(PLAYER_COLUMNS, 0))
+        d["points"] += delta
+    _upsert_players(session, merged)
+
+
+def rebuild(session: Session) -> None:
+    """Пересобирает оба роллапа с нуля (дни — SQL, месяцы — из дней)."""
+    city = GamePlayer.role.in_(
+        [r for r, f in ROLE_FACTION.items() if f is Faction.city]
+    )
+    won = or_(
+        and_(city, Game.winner_faction == Faction.city),
+        and_(~city, Game.winner_faction == Faction.mafia),
+    )
+    p_tbl, f_tbl = PlayerDailyStats.__table__, FactionDailyStats.__table__
+    session.execute(delete(p_tbl))
+    session.execute(delete(f_tbl))
+
+    players = (
+        select(
+            Game.date,
+            GamePlayer.player_id,
+            func.count(),
+            func.sum(case((won, 1), else_=0)),
+            func.sum(GamePlayer.total_points),
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .where(counted())
+        .group_by(Game.date, GamePlayer.player_id)
+    )
+    factions = (
+        select(Game.date, Game.winner_faction, Game.players_qty, func.count())
+        .where(counted(), Game.winner_faction.is_not(None))
+        .group_by(Game.date, Game.winner_faction, Game.players_qty)
+    )
+
+    months: dict[tuple, list] = {}
+    day_rows = []
+    for day, pid, games, wins, points in session.execute(players):
+        day_rows.append(
+            {
+                "span": DAY,
+                "date": day,
+                "player_id": pid,
+                "games": games,
+                "wins": wins,
+                "points": points,
+            }
+        )
+        m = months.setdefault((_month(day), pid), [0, 0, 0.0])
+        m[0] += games
+        m[1] += wins
+        m[2] += points
+    day_rows += [
+        {
+            "span": MONTH,
+            "date": month,
+            "player_id": pid,
+            "games": games,
+            "wins": wins,
+            "points": points,
+        }
+        for (month, pid), (games, wins, points) in months.items()
+    ]
+
+    f_months: dict[tuple, int] = {}
+    f_rows = []
+    for day, faction, qty, games in session.execute(factions):
+        f_rows.append(
+            {
+                "span": DAY,
+                "date": day,
+                "winner_faction": faction,
+                "players_qty": qty,
+                "games": games,
+            }
+        )
+        key = (_month(day), faction, qty)
+        f_months[key] = f_months.get(key, 0) + games
+    f_rows += [
+        {
+            "span": MONTH,
+            "date": month,
+            "winner_faction": faction,
+            "players_qty": qty,
+            "games": games,
+        }
+        for (month, faction, qty), games in f_months.items()
+    ]
+
+    if day_rows:
+        session.execute(insert(p_tbl), day_rows)
+    if f_rows:
+        session.execute(insert(f_tbl), f_rows)
+    session.commit()
+
+
+# ─────────────────────────── range queries ───────────────────────────
+def range_filter(model: Any, date_from: dt.date, date_to: dt.date):
+    """
+    WHERE для [date_from, date_to]: целые месяцы — month‑строки,
+    неполные месяцы по краям — day‑строки. ``date_to`` позже LAST_DAY
+    обрезается до него.
+    """
+    if date_from > LAST_DAY:
+        return false()
+    date_to = min(date_to, LAST_DAY)
+    m_from = date_from if date_from.day == 1 else _next_month(date_from)
+    m_to = _month(date_to + dt.timedelta(days=1))  # первый не покрытый целиком
+    if m_from >= m_to:
+        return and_(model.span == DAY, model.date.between(date_from, date_to))
+    return or_(
+        and_(model.span == MONTH, model.date >= m_from, model.date < m_to),
+        and_(
+            model.span == DAY,
+            or_(
+                and_(model.date >= date_from, model.date < m_from),
+                and_(model.date >= m_to, model.date <= date_to),
+            ),
+        ),
+    )
+
+
+def leaderboard_stmt(date_from: dt.date, date_to: dt.date):
+    m = PlayerDailyStats
+    return (
+        select(
+            m.player_id,
+            func.sum(m.points).label("points"),
+            func.sum(m.games).label("games"),
+            func.sum(m.wins).label("wins"),
+        )
+        .where(range_filter(m, date_from, date_to))
+        .group_by(m.player_id)
+        .having(func.sum(m.games) > 0)
+    )
+
+
+def top_n(rows: Iterable[Any], n: int) -> list[Any]:
+    """Куча на n элементов: O(rows · log n), без сортировки всего списка."""
+    return heapq.nlargest(n, rows, key=lambda r: (r.points, r.wins, -r.player_id))
+
+
+def faction_wins_stmt(
+    date_from: dt.date, date_to: dt.date, players_qty: int | None = None
+):
+    m = FactionDailyStats
+    stmt = (
+        select(m.winner_faction, func.sum(m.games))
+        .where(range_filter(m, date_from, date_to))
+        .group_by(m.winner_faction)
+    )
+    if players_qty is not None:
+        stmt = stmt.where(m.players_qty == players_qty)
+    return stmt
+
+
+def leaderboard(
+    session: Session, date_from: dt.date, date_to: dt.date, n: int = 10
+) -> list[Any]:
+    return top_n(session.execute(leaderboard_stmt(date_from, date_to)), n)
+
+
+def faction_wins(
+    session: Session,
+    date_from: dt.date,
+    date_to: dt.date,
+    players_qty: int | None = None,
+) -> dict[Faction, int]:
+    return wins_by_faction(
+        session.execute(faction_wins_stmt(date_from, date_to, players_qty))
+    )
+
+
+def wins_by_faction(result: Any) -> dict[Faction, int]:
+    """Результат faction_wins_stmt → {фракция: игр}, с нулями для отсутствующих."""
+    wins = dict.fromkeys(Faction, 0)
+    wins.update((f, int(g)) for f, g in result.tuples().all() if g)
+    return wins
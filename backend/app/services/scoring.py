@@ -0,0 +1,338 @@
+"""
+Подсчёт очков по RuleSet.
+
+RuleSet компилируется один раз в плотную таблицу ``Condition × GameRole``
+(строка с ``role_filter=None`` задаёт значение для всех ролей, строка с
+конкретной ролью его переопределяет). Выполненные игроком условия
+хранятся битовой маской ``GamePlayer.conditions``, поэтому пересчёт
+истории под изменённый RuleSet — чистая векторная арифметика:
+
+    points = (bits(mask) · table[:, role]) + extra_points
+
+NULL в ``conditions`` — маска неизвестна (игра до движка очков, импорт
+без лога): такие места при пересчёте пропускаются.
+
+Функции работают на sync ``Session`` и не коммитят; из async‑кода их
+зовут через ``AsyncSession.run_sync``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+from sqlalchemy import (
+    Float,
+    Integer,
+    bindparam,
+    column,
+    exists,
+    func,
+    or_,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.orm import Session
+
+from app.core.enums import ROLE_FACTION, Condition, Faction, GameRole, GameState
+from app.models.event import GameEvent, GameEventArchive
+from app.models.extras import ExtraPoints
+from app.models.game import Game, GamePlayer
+from app.models.rule import RuleItem
+
+# модулем, не именами: live_state → crud.snapshots → crud.events → refcache →
+# scoring замыкается на ещё не загруженный live_state
+from app.services import event_archive, live_state, player_stats, rollups
+
+CONDITIONS: tuple[Condition, ...] = tuple(Condition)
+ROLES: tuple[GameRole, ...] = tuple(GameRole)
+COND_BIT = {c: 1 << i for i, c in enumerate(CONDITIONS)}
+ROLE_INDEX = {r: i for i, r in enumerate(ROLES)}
+
+RESCORE_BATCH = 10_000  # строк gameplayer на один UPDATE
+BACKFILL_BATCH = 500  # игр на транзакцию backfill_conditions
+
+
+@dataclass(frozen=True)
+class CompiledRuleSet:
+    rule_set_id: int
+    table: np.ndarray  # float64[len(CONDITIONS), len(ROLES)]
+
+    def score(
+        self, masks: np.ndarray, roles: np.ndarray, extras: np.ndarray
+    ) -> np.ndarray:
+        """Очки для массивов (mask, role_index, extra) одинаковой длины."""
+        bits = (masks[:, None] >> np.arange(len(CONDITIONS))) & 1
+        return (bits * self.table[:, roles].T).sum(axis=1) + extras
+
+
+def compile_rule_set(rule_set_id: int, items: Iterable[RuleItem]) -> CompiledRuleSet:
+    table = np.zeros((len(CONDITIONS), len(ROLES)))
+    specific = []
+    for item in items:
+        row = CONDITIONS.index(Condition(item.condition))
+        if item.role_filter is None:
+            table[row, :] = item.delta
+        else:
+            specific.append((row, ROLE_INDEX[GameRole(item.role_filter)], item.delta))
+    for row, col, delta in specific:  # конкретная роль важнее «любой»
+        table[row, col] = delta
+    table.setflags(write=False)
+    return CompiledRuleSet(rule_set_id, table)
+
+
+def load_compiled(session: Session, rule_set_id: int) -> CompiledRuleSet:
+    items = session.scalars(select(RuleItem).where(RuleItem.rule_set_id == rule_set_id))
+    return compile_rule_set(rule_set_id, items)
+
+
+# ─────────────────────────── conditions ───────────────────────────
+def condition_mask(
+    state: live_state.LiveGameState,
+    seat_no: int,
+    role: GameRole,
+    winner: Optional[Faction],
+    roles_by_seat: dict[int, GameRole],
+) -> int:
+    """
+    Какие Condition выполнил игрок на месте ``seat_no``.
+
+    Лучший ход: отстрелянный в первую ночь называет подозреваемых;
+    DUO/TRIO — угадано 2/3 чёрных, варианты *_SHERIFF — если
+    отстрелян шериф.
+    """
+    mask = 0
+    faction = ROLE_FACTION[role]
+    if winner is Faction.city and faction is Faction.city:
+        mask |= COND_BIT[Condition.CITY_WIN]
+    if winner is Faction.mafia and faction is Faction.mafia:
+        mask |= COND_BIT[Condition.MAFIA_WIN]
+    if state.first_night_killed == seat_no:
+        mask |= COND_BIT[Condition.FIRST_NIGHT_KILLED]
+        if state.best_move is not None and state.best_move[0] == seat_no:
+            guessed = sum(
+                ROLE_FACTION.get(roles_by_seat.get(s, GameRole.citizen))
+                is Faction.mafia
+                for s in state.best_move[1]
+            )
+            sheriff = role is GameRole.sheriff
+            if guessed == 2:
+                cond = (
+                    Condition.BEST_MOVE_GUESS_DUO_SHERIFF
+                    if sheriff
+                    else Condition.BEST_MOVE_GUESS_DUO
+                )
+                mask |= COND_BIT[cond]
+            elif guessed >= 3:
+                cond = (
+                    Condition.BEST_MOVE_GUESS_TRIO_SHERIFF
+                    if sheriff
+                    else Condition.BEST_MOVE_GUESS_TRIO
+                )
+                mask |= COND_BIT[cond]
+    return mask
+
+
+def _extras(session: Session, ids: np.ndarray) -> np.ndarray:
+    """Сумма ExtraPoints для каждого gameplayer.id из (отсортированного) ids."""
+    if len(ids) == 0:
+        return np.zeros(0)
+    gp_id = ExtraPoints.game_player_id
+    rows = session.execute(
+        select(gp_id, func.sum(ExtraPoints.delta))
+        .where(gp_id.between(int(ids[0]), int(ids[-1])))
+        .group_by(gp_id)
+    )
+    by_id = dict(rows.tuples().all())
+    return np.fromiter((by_id.get(i, 0.0) for i in ids.tolist()), dtype=np.float64)
+
+
+_COLUMN_TYPES = {"conditions": Integer, "total_points": Float}
+
+
+def _bulk_update(session: Session, ids: np.ndarray, **columns: np.ndarray) -> None:
+    """Один UPDATE на батч: UPDATE ... FROM (VALUES ...) на Postgres."""
+    names = list(columns)
+    rows = list(zip(ids.tolist(), *(columns[n].tolist() for n in names)))
+    if session.get_bind().dialect.name == "postgresql":
+        data = values(
+            column("id", Integer),
+            *(column(n, _COLUMN_TYPES[n]) for n in names),
+            name="v",
+        ).data(rows)
+        gp = GamePlayer.__table__
+        session.execute(
+            update(gp).where(gp.c.id == data.c.id).values({n: data.c[n] for n in names})
+        )
+    else:  # SQLite (тесты): executemany внутри процесса и так дёшев
+        gp = GamePlayer.__table__
+        session.execute(
+            update(gp)
+            .where(gp.c.id == bindparam("b_id"))
+            .values({n: bindparam(f"b_{n}") for n in names}),
+            [dict(zip(["b_id", *(f"b_{n}" for n in names)], row)) for row in rows],
+        )
+
+
+# ─────────────────────────── one game ───────────────────────────
+def _masks(
+    session: Session,
+    game_id: int,
+    players: list[Any],
+    winner_faction: Optional[Faction],
+) -> np.ndarray:
+    """Маски условий мест ``players`` (id, seat_no, role) по логу игры."""
+    log = event_archive.read_logs(session, [game_id]).get(game_id, [])
+    state = live_state.fold(
+        live_state.LiveGameState(game_id), ((e.id, e.code, e.payload) for e in log)
+    )
+    winner = winner_faction or (state.winner and Faction(state.winner))
+    roles_by_seat = {p.seat_no: p.role for p in players}
+    return np.fromiter(
+        (
+            condition_mask(state, p.seat_no, p.role, winner, roles_by_seat)
+            for p in players
+        ),
+        dtype=np.int64,
+        count=len(players),
+    )
+
+
+def _players(session: Session, game_id: int) -> list[Any]:
+    return list(
+        session.execute(
+            select(GamePlayer.id, GamePlayer.seat_no, GamePlayer.role)
+            .where(GamePlayer.game_id == game_id)
+            .order_by(GamePlayer.id)
+        ).all()
+    )
+
+
+def score_game(
+    session: Session,
+    game_id: int,
+    compiled: Optional[CompiledRuleSet] = None,
+) -> None:
+    """Пересчитывает conditions и total_points всех игроков завершённой игры."""
+    game = session.execute(
+        select(Game.rule_set_id, Game.winner_faction).where(Game.id == game_id)
+    ).one()
+    if compiled is None or compiled.rule_set_id != game.rule_set_id:
+        compiled = load_compiled(session, game.rule_set_id)
+
+    players = _players(session, game_id)
+    if not players:
+        return
+
+    ids = np.fromiter((p.id for p in players), dtype=np.int64, count=len(players))
+    masks = _masks(session, game_id, players, game.winner_faction)
+    roles = np.fromiter((ROLE_INDEX[p.role] for p in players), dtype=np.int64)
+    extra = _extras(session, ids)
+    _bulk_update(
+        session,
+        ids,
+        conditions=masks,
+        total_points=compiled.score(masks, roles, extra),
+    )
+
+
+def backfill_conditions(session: Session, *, batch_size: int = BACKFILL_BATCH) -> int:
+    """
+    Маски для мест с ``conditions IS NULL`` (игры до движка очков, импорт)
+    по логу завершённой игры; total_points не трогает — их пересчитает
+    ``rescore_rule_set``. Игры без лога остаются NULL: маску не из чего
+    восстановить, и rescore их пропускает. Коммитит каждый батч игр.
+    Возвращает число игр с восстановленными масками.
+    """
+    has_log = or_(
+        exists().where(GameEvent.game_id == Game.id),
+        exists().where(GameEventArchive.game_id == Game.id),
+    )
+    base = (
+        select(Game.id, Game.winner_faction)
+        .where(
+            Game.state == GameState.finished,
+            exists().where(
+                GamePlayer.game_id == Game.id,
+                GamePlayer.conditions.is_(None),  # type: ignore[union-attr]
+            ),
+            has_log,
+        )
+        .order_by(Game.id)
+        .limit(batch_size)
+    )
+
+    done, last_id = 0, 0
+    while True:
+        games = session.execute(base.where(Game.id > last_id)).all()
+        if not games:
+            return done
+        for game_id, winner_faction in games:
+            players = _players(session, game_id)
+            ids = np.fromiter((p.id for p in players), dtype=np.int64)
+            masks = _masks(session, game_id, players, winner_faction)
+            _bulk_update(session, ids, conditions=masks)
+        session.commit()
+        done += len(games)
+        last_id = games[-1][0]
+
+
+# ─────────────────────────── bulk re‑score ───────────────────────────
+def rescore_rule_set(
+    session: Session,
+    rule_set_id: int,
+    *,
+    batch_size: int = RESCORE_BATCH,
+) -> int:
+    """
+    Пересчитывает total_points всех игр под RuleSet по сохранённым маскам.
+    Места без маски (``conditions IS NULL`` — очки пришли не из движка, см.
+    ``backfill_conditions``) не трогает: их очки из маски не получить.
+    Идёт keyset‑батчами по gameplayer.id и коммитит каждый батч.
+    Возвращает число обновлённых строк.
+    """
+    compiled = load_compiled(session, rule_set_id)
+    base = (
+        select(
+            GamePlayer.id,
+            GamePlayer.conditions,
+            GamePlayer.role,
+            GamePlayer.player_id,
+            GamePlayer.total_points,
+            Game.date,
+            player_stats.counted(),
+        )
+        .join(Game, Game.id == GamePlayer.game_id)
+        .where(
+            Game.rule_set_id == rule_set_id,
+            GamePlayer.conditions.is_not(None),  # type: ignore[union-attr]
+        )
+        .order_by(GamePlayer.id)
+        .limit(batch_size)
+    )
+
+    done, last_id = 0, 0
+    while True:
+        rows = session.execute(base.where(GamePlayer.id > last_id)).all()
+        if not rows:
+            return done
+        n = len(rows)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+        masks = np.fromiter((r[1] for r in rows), dtype=np.int64, count=n)
+        roles = np.fromiter((ROLE_INDEX[r[2]] for r in rows), dtype=np.int64, count=n)
+        extra = _extras(session, ids)
+        points = compiled.score(masks, roles, extra)
+        _bulk_update(session, ids, total_points=points)
+        # PlayerStats.points держим в согласии с новыми очками
+        deltas = [
+            (r[5], r[3], new - r[4])
+            for r, new in zip(rows, points.tolist())
+            if r[6] and new != r[4]
+        ]
+        player_stats.add_points(session, ((pid, d) for _, pid, d in deltas))
+        rollups.add_points(session, deltas)
+        session.commit()
+        done += n
+        last_id = int(ids[-1])
@@ -0,0 +1,115 @@
+"""
+Дашборд клуба по роллапам: Top‑10 и победы фракций за 5 лет
+(по умолчанию 200k игр × 10 мест, 200 игроков). Цель — < 20 ms на запрос.
+
+    python benchmarks/bench_dashboard.py --games 200000
+    python benchmarks/bench_dashboard.py --url postgresql+psycopg2://…/mafia_bench
+"""
+
+import argparse
+import datetime as dt
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import common
+from sqlalchemy import create_engine, insert, select
+from sqlmodel import Session, SQLModel
+
+from app.core.enums import Faction, GameRole, GameState
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+from app.services import rollups
+
+ROLES = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [
+    GameRole.citizen
+] * 6
+YEARS = 5
+
+
+def seed(session: Session, games: int, rnd: random.Random) -> dt.date:
+    start = dt.date.today() - dt.timedelta(days=365 * YEARS)
+    gm = uuid.uuid4()
+    session.execute(insert(Player), [{"nickname": f"db_{i}"} for i in range(200)])
+    players = session.scalars(select(Player.id).limit(200)).all()
+
+    chunk = 5000
+    for offset in range(0, games, chunk):
+        n = min(chunk, games - offset)
+        game_ids = session.scalars(
+            insert(Game).returning(Game.id),
+            [
+                {
+                    "rule_set_id": 1,
+                    "gm_id": gm,
+                    "state": GameState.finished,
+                    "date": start + dt.timedelta(days=rnd.randrange(365 * YEARS)),
+                    "winner_faction": rnd.choice(list(Faction)),
+                }
+                for _ in range(n)
+            ],
+        ).all()
+        session.execute(
+            insert(GamePlayer),
+            [
+                {
+                    "game_id": g,
+                    "player_id": pid,
+                    "seat_no": seat,
+                    "role": role,
+                    "total_points": rnd.random() * 3,
+                }
+                for g in game_ids
+                for seat, (pid, role) in enumerate(
+                    zip(rnd.sample(players, len(ROLES)), ROLES), start=1
+                )
+            ],
+        )
+        session.commit()
+    return start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", help="SQLAlchemy URL; по умолчанию временный SQLite")
+    args = parser.parse_args()
+
+    common.import_models()
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'dashboard.sqlite'}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+    rnd = random.Random(7)
+
+    with Session(engine) as session:
+        started = time.perf_counter()
+        start = seed(session, args.games, rnd)
+        print(f"seeded {args.games} games in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        rollups.rebuild(session)
+        print(f"rebuilt rollups in {time.perf_counter() - started:.1f}s")
+
+        end = dt.date.today()
+        full, random_ranges = [], []
+        for i in range(args.queries):
+            if i % 2:
+                a = start + dt.timedelta(days=rnd.randrange(365 * YEARS))
+                b = a + dt.timedelta(days=rnd.randrange(365 * YEARS))
+                date_from, date_to, samples = a, min(b, end), random_ranges
+            else:
+                date_from, date_to, samples = start, end, full
+            t0 = time.perf_counter()
+            rollups.leaderboard(session, date_from, date_to, 10)
+            rollups.faction_wins(session, date_from, date_to)
+            samples.append((time.perf_counter() - t0) * 1000)
+
+    print(common.summary("dashboard 5y", full))
+    print(common.summary("dashboard random", random_ranges))
+
+
+if __name__ == "__main__":
+    main()
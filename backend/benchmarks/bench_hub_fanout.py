@@ -0,0 +1,76 @@
+"""
+Нагрузочный тест GameHub: 1 000 локальных подписчиков одной игры.
+
+Публикатор шлёт сообщения с темпом автосейва, часть подписчиков
+нарочно медленная. Меряем стоимость publish (кодирование + раскладка
+по очередям) и задержку доставки; медленные должны вылетать с
+``resync``, не тормозя остальных:
+
+    python benchmarks/bench_hub_fanout.py --subscribers 1000 --messages 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import common  # noqa: F401
+from common import summary
+
+from app.services.broadcast import RESYNC, GameHub
+
+
+async def consume(sub, latencies: list[float], delay: float) -> None:
+    async for message in sub:
+        if message == RESYNC:
+            return
+        sent = json.loads(message)["sent"]
+        latencies.append((time.perf_counter() - sent) * 1000)
+        if delay:
+            await asyncio.sleep(delay)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=1000)
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005)
+    parser.add_argument("--slow-share", type=float, default=0.05)
+    parser.add_argument("--queue-size", type=int, default=64)
+    args = parser.parse_args()
+
+    hub = GameHub(queue_size=args.queue_size)
+    latencies: list[float] = []
+    slow_every = int(1 / args.slow_share) if args.slow_share else 0
+    tasks, subs = [], []
+    for i in range(args.subscribers):
+        sub = hub.subscribe(1)
+        subs.append(sub)
+        delay = 1.0 if slow_every and i % slow_every == 0 else 0.0
+        tasks.append(asyncio.create_task(consume(sub, latencies, delay)))
+    await asyncio.sleep(0)
+
+    publish_ms: list[float] = []
+    event = {
+        "type": "events",
+        "events": [{"code": "foul", "payload": {"target_seat": 3}}],
+    }
+    for _ in range(args.messages):
+        started = time.perf_counter()
+        hub.publish(1, {**event, "sent": started})
+        publish_ms.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(args.interval)
+
+    hub.close(1)  # дождаться хвоста доставки у оставшихся
+    await asyncio.gather(*tasks)
+
+    print(
+        f"subscribers={args.subscribers} messages={args.messages} "
+        f"evicted={sum(s.evicted for s in subs)}"
+    )
+    print(summary("publish (fan-out)", publish_ms))
+    print(summary("delivery latency", latencies))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,108 @@
+"""
+Resume живой игры на 2 000 событий: полный replay лога против
+«последний снапшот + хвост». Самодостаточный — SQLite во временном файле:
+
+    python benchmarks/bench_live_state_resume.py --events 2000 --every 200
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import common
+from common import summary
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from app.models.event import EventType, GameEvent
+from app.models.game import Game
+from app.models.rule import RuleSet
+from app.services import live_state
+from app.services.live_state import LiveGameState, fold
+
+CODES = ["nominate", "vote", "foul", "phase"]
+
+
+def payload(code: str, rnd: random.Random) -> dict:
+    seat = rnd.randint(1, 10)
+    if code == "nominate":
+        return {"actor_seat": rnd.randint(1, 10), "target_seat": seat}
+    if code == "vote":
+        return {"round_no": 1, "counts": {str(seat): rnd.randint(1, 9)}}
+    if code == "phase":
+        return {"phase": rnd.choice(["day", "night"])}
+    return {"target_seat": seat}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=live_state.SNAPSHOT_EVERY)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    common.import_models()
+    db = Path(tempfile.mkdtemp()) / "resume.sqlite"
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db}")
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    rnd = random.Random(42)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        session.add(RuleSet(id=1, name="Bench", is_active=True))
+        session.add_all(EventType(code=c) for c in CODES)
+        game = Game(rule_set_id=1, gm_id=uuid.uuid4())
+        session.add(game)
+        await session.commit()
+        rows = await session.execute(select(EventType.code, EventType.id))
+        type_ids = dict(rows.tuples().all())
+
+        # лог пишется батчами, как автосейв, со снапшотом после каждого батча
+        batch = 20
+        for start in range(0, args.events, batch):
+            rows = []
+            for seq in range(start + 1, min(start + batch, args.events) + 1):
+                code = rnd.choice(CODES)
+                rows.append(
+                    {
+                        "game_id": game.id,
+                        "client_seq": seq,
+                        "event_type_id": type_ids[code],
+                        "payload": payload(code, rnd),
+                    }
+                )
+            await session.execute(insert(GameEvent), rows)
+            await session.commit()
+            acked = rows[-1]["client_seq"]
+            await live_state.snapshot_if_due(session, game.id, acked, every=args.every)
+
+        full_ms, resume_ms = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            tail = await session.execute(
+                select(GameEvent.id, EventType.code, GameEvent.payload)
+                .join(EventType, EventType.id == GameEvent.event_type_id)
+                .where(GameEvent.game_id == game.id)
+                .order_by(GameEvent.client_seq)
+            )
+            full = fold(LiveGameState(game.id), tail.tuples())
+            full_ms.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            state, tail_len = await live_state.resume(session, game.id)
+            resume_ms.append((time.perf_counter() - started) * 1000)
+            assert state == full
+
+    print(f"events={args.events} snapshot_every={args.every} tail={tail_len}")
+    print(summary("full replay", full_ms))
+    print(summary("snapshot + tail", resume_ms))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
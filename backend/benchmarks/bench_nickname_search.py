@@ -0,0 +1,80 @@
+"""
+Автокомплит ников: 100k игроков, случайные префиксы и ники с опечаткой.
+По умолчанию — процессный индекс (фолбэк для SQLite); с --url postgresql+asyncpg://…
+запросы идут в pg_trgm. Цель — p99 < 10 ms.
+
+    python benchmarks/bench_nickname_search.py --players 100000
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+import common
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import Session, SQLModel
+
+from app.models.player import Player
+from app.services import nickname_search
+
+SYLLABLES = ["ka", "ro", "mi", "sha", "to", "ly", "an", "vi", "ko", "st", "er", "ni"]
+
+
+def nickname(rnd: random.Random, i: int) -> str:
+    word = "".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+    return f"{word.capitalize()}{i}"
+
+
+def typo(rnd: random.Random, nick: str) -> str:
+    pos = rnd.randrange(len(nick))
+    return nick[:pos] + rnd.choice(string.ascii_lowercase) + nick[pos + 1 :]
+
+
+async def run(url: str, queries: list[str], limit: int) -> list[float]:
+    engine = create_async_engine(url)
+    samples = []
+    async with AsyncSession(engine) as session:
+        await nickname_search.search(session, "warmup", limit)  # загрузка индекса
+        for q in queries:
+            t0 = time.perf_counter()
+            await nickname_search.search(session, q, limit)
+            samples.append((time.perf_counter() - t0) * 1000)
+    await engine.dispose()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--players", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--url", help="async SQLAlchemy URL; по умолчанию SQLite")
+    args = parser.parse_args()
+
+    common.import_models()
+    rnd = random.Random(7)
+    path = Path(tempfile.mkdtemp()) / "nick.sqlite"
+    sync_url = (
+        args.url.replace("+asyncpg", "+psycopg2") if args.url else f"sqlite:///{path}"
+    )
+    engine = create_engine(sync_url)
+    SQLModel.metadata.create_all(engine)
+    nicks = [nickname(rnd, i) for i in range(args.players)]
+    with Session(engine) as session:
+        session.execute(insert(Player), [{"nickname": n} for n in nicks])
+        session.commit()
+
+    prefixes = [n[: rnd.randint(1, 5)] for n in rnd.sample(nicks, args.queries // 2)]
+    typos = [typo(rnd, n) for n in rnd.sample(nicks, args.queries // 2)]
+    url = args.url or f"sqlite+aiosqlite:///{path}"
+    print(common.summary("prefix", asyncio.run(run(url, prefixes, args.limit))))
+    print(common.summary("fuzzy", asyncio.run(run(url, typos, args.limit))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Перемотка завершённой игры: каждая позиция заново с начала лога против
+``Replay`` с чекпоинтами каждые K событий. Без базы — лог в памяти:
+
+    python benchmarks/bench_replay_scrub.py --events 400 --every 32
+"""
+
+import argparse
+import datetime as dt
+import random
+import time
+
+import common
+from bench_live_state_resume import CODES, payload
+from common import summary
+
+from app.services import replay
+from app.services.event_archive import EventRow
+from app.services.live_state import LiveGameState, fold
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=400)
+    parser.add_argument("--every", type=int, default=replay.CHECKPOINT_EVERY)
+    parser.add_argument("--seeks", type=int, default=2000, help="случайных позиций")
+    args = parser.parse_args()
+
+    common.import_models()
+    rnd = random.Random(42)
+    ts = dt.datetime(2026, 1, 1, tzinfo=dt.timezone.utc)
+    events = []
+    for i in range(args.events):
+        code = rnd.choice(CODES)
+        events.append(
+            EventRow(i + 1, i, ts + dt.timedelta(seconds=i), code, payload(code, rnd))
+        )
+    positions = [rnd.randint(0, args.events) for _ in range(args.seeks)]
+
+    started = time.perf_counter()
+    game = replay.Replay(1, events, every=args.every)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    naive_ms, seek_ms = [], []
+    for at in positions:
+        started = time.perf_counter()
+        full = fold(LiveGameState(1), ((e.id, e.code, e.payload) for e in events[:at]))
+        naive_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        state = game.state_at(at)
+        seek_ms.append((time.perf_counter() - started) * 1000)
+        assert state == full
+
+    started = time.perf_counter()
+    size = sum(map(len, replay.ndjson(game)))
+    timeline_ms = (time.perf_counter() - started) * 1000
+
+    print(
+        f"events={args.events} every={args.every} checkpoints={len(game.checkpoints)} build={build_ms:.2f} ms"
+    )
+    print(summary("replay from start", naive_ms))
+    print(summary("checkpoint + tail", seek_ms))
+    print(f"timeline ndjson: {size / 1024:.0f} KiB in {timeline_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Массовый пересчёт очков под изменённый RuleSet (по умолчанию 100k игр
+× 10 мест). SQLite во временном файле, либо свой Postgres через --url:
+
+    python benchmarks/bench_rescore.py --games 100000
+    python benchmarks/bench_rescore.py --url postgresql+psycopg2://…/mafia_bench
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import common
+from sqlalchemy import create_engine, insert, select
+from sqlmodel import Session, SQLModel
+
+from app.core.enums import Condition, GameRole, GameState
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+from app.models.rule import RuleItem, RuleSet
+from app.services import scoring
+
+ROLES = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [
+    GameRole.citizen
+] * 6
+
+
+def seed(session: Session, games: int, rnd: random.Random) -> int:
+    rs = RuleSet(name=f"bench_{uuid.uuid4().hex[:8]}")
+    session.add(rs)
+    session.flush()
+    session.add_all(
+        RuleItem(rule_set_id=rs.id, condition=c, role_filter=None, delta=1.0)
+        for c in Condition
+    )
+    gm = uuid.uuid4()
+    session.execute(insert(Player), [{"nickname": f"rs_{i}"} for i in range(200)])
+    players = session.scalars(select(Player.id).limit(200)).all()
+
+    chunk = 5000
+    for start in range(0, games, chunk):
+        n = min(chunk, games - start)
+        game_ids = session.scalars(
+            insert(Game).returning(Game.id),
+            [
+                {"rule_set_id": rs.id, "gm_id": gm, "state": GameState.finished}
+                for _ in range(n)
+            ],
+        ).all()
+        session.execute(
+            insert(GamePlayer),
+            [
+                {
+                    "game_id": g,
+                    "player_id": rnd.choice(players),
+                    "seat_no": seat,
+                    "role": role,
+                    "conditions": rnd.getrandbits(len(Condition)),
+                }
+                for g in game_ids
+                for seat, role in enumerate(ROLES, start=1)
+            ],
+        )
+        session.commit()
+    return rs.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=scoring.RESCORE_BATCH)
+    parser.add_argument("--url", help="SQLAlchemy URL; по умолчанию временный SQLite")
+    args = parser.parse_args()
+
+    common.import_models()
+    url = args.url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'rescore.sqlite'}"
+    engine = create_engine(url)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        started = time.perf_counter()
+        rs_id = seed(session, args.games, random.Random(7))
+        print(f"seeded {args.games} games in {time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        rows = scoring.rescore_rule_set(session, rs_id, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+    print(
+        f"rescored {rows} gameplayer rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+pytest-benchmark поверх датасета из datagen.py (запуск — через suite.py).
+
+SQLite‑датасет строится один раз на (scale, seed) в .benchmarks/data/ и
+копируется во временный файл на каждую сессию: мутирующие бенчи (create,
+setup, update_state, …) не портят кэш. С ``--bench-url`` база Postgres
+заливается, только если в ней ещё нет игр.
+"""
+
+import random
+import shutil
+from typing import AsyncGenerator, Iterator
+
+import common
+import pytest
+from datagen import SCALES, Spec, cached_sqlite, load
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine, func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+
+common.import_models()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("club dataset")
+    group.addoption("--scale", choices=SCALES, default="1k")
+    group.addoption("--seed", type=int, default=42)
+    group.addoption("--bench-url", default=None, help="Postgres вместо SQLite")
+
+
+@pytest.fixture(scope="session")
+def spec(request: pytest.FixtureRequest) -> Spec:
+    opt = request.config.getoption
+    return Spec(SCALES[opt("--scale")], seed=opt("--seed"))
+
+
+def _sqlite(spec: Spec, tmp_dir) -> str:
+    cached = cached_sqlite(spec)
+    db = tmp_dir / cached.name
+    shutil.copy(cached, db)
+    return f"sqlite:///{db}"
+
+
+@pytest.fixture(scope="session")
+def bench_url(request: pytest.FixtureRequest, spec: Spec, tmp_path_factory) -> str:
+    url = request.config.getoption("--bench-url")
+    if url is None:
+        return _sqlite(spec, tmp_path_factory.mktemp("club"))
+    from app.models.game import Game
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        empty = not conn.scalar(select(func.count()).select_from(Game))
+    if empty:
+        load(engine, spec)
+    engine.dispose()
+    return url
+
+
+@pytest.fixture(scope="session")
+def bench_engine(bench_url: str) -> Iterator[Engine]:
+    engine = create_engine(bench_url, connect_args=_connect_args(bench_url))
+    yield engine
+    engine.dispose()
+
+
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if url.startswith("sqlite") else {}
+
+
+@pytest.fixture()
+def session(bench_engine: Engine) -> Iterator[Session]:
+    from app.services.refcache import refcache
+
+    with Session(bench_engine, expire_on_commit=False) as sess:
+        refcache.refresh(sess)  # update_state → finished считает очки по кэшу
+        yield sess
+
+
+@pytest.fixture()
+def rnd(spec: Spec) -> random.Random:
+    """Свой генератор на тест — те же id при каждом прогоне."""
+    return random.Random(spec.seed)
+
+
+@pytest.fixture(scope="session")
+def client(bench_url: str) -> Iterator[TestClient]:
+    from app.db import get_async_session
+    from app.main import app
+
+    url = make_url(bench_url)
+    async_url = url.set(
+        drivername=(
+            "sqlite+aiosqlite"
+            if url.get_backend_name() == "sqlite"
+            else "postgresql+asyncpg"
+        )
+    )
+    # NullPool: TestClient гоняет каждый запрос в своём event loop
+    engine = create_async_engine(async_url, poolclass=NullPool)
+
+    async def _session() -> AsyncGenerator[AsyncSession, None]:
+        async with AsyncSession(engine, expire_on_commit=False) as sess:
+            yield sess
+
+    app.dependency_overrides[get_async_session] = _session
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,447 @@
+"""
+Детерминированный синтетический клуб для бенчмарков: N игроков, M игр за
+5 лет с валидной раздачей ролей (``validate_roles``), живыми событиями в
+формате ``live_state``, раундами голосования и доп. очками.
+
+Один и тот же ``--seed`` даёт те же строки байт в байт: id проставляются
+явно, случайность — только из ``random.Random(seed)``. Загрузка — COPY
+в Postgres (схема уже прогнана alembic) или executemany в SQLite
+(схема — create_all). База должна быть пустой.
+
+    python benchmarks/datagen.py --scale 100k --out /tmp/club-100k.sqlite
+    python benchmarks/datagen.py --scale 1M --url postgresql+psycopg2://…/mafia_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import hashlib
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import common
+from sqlalchemy import Engine, Integer, create_engine, func, select, text
+from sqlmodel import Session, SQLModel
+
+from app.core.enums import ROLE_FACTION, Faction, GameRole, GameState, UserRole
+from app.crud.dialect import bulk_insert
+from app.schemas.games import validate_roles
+
+log = logging.getLogger("datagen")
+
+DATA_DIR = common.BACKEND_ROOT / ".benchmarks" / "data"
+SCALES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+START = dt.date(2021, 1, 1)
+DAYS = 5 * 365
+EVENT_CODES = (
+    "deal_roles",
+    "phase",
+    "nominate",
+    "vote",
+    "foul",
+    "kill",
+    "vote_out",
+    "remove",
+    "best_move",
+    "finish",
+)
+# доля столов по числу игроков
+QTY_WEIGHTS = {10: 70, 9: 15, 8: 10, 7: 5}
+_SYLLABLES = (
+    "ka ra mi to ne su lo vi da ze gor an ton ser ol ga le na dim pa sha ma "
+    "kot fox wolf owl bear don cat ray max neo rex"
+).split()
+
+
+def roles_for(qty: int) -> list[GameRole]:
+    """Раздача для стола на qty мест: дон, шериф, 1–2 мафии, остальные — мирные."""
+    mafia = 1 if qty <= 8 else 2
+    roles = [GameRole.don, GameRole.sheriff] + [GameRole.mafia] * mafia
+    roles += [GameRole.citizen] * (qty - len(roles))
+    validate_roles(roles, qty)
+    return roles
+
+
+ROLES = {qty: roles_for(qty) for qty in QTY_WEIGHTS}
+
+
+@dataclass(frozen=True)
+class Spec:
+    games: int
+    players: Optional[int] = None  # по умолчанию — games / 20, не меньше 100
+    seed: int = 42
+
+    @property
+    def n_players(self) -> int:
+        return self.players or max(100, self.games // 20)
+
+
+# ─────────────────────────── generator ───────────────────────────
+class ClubGenerator:
+    """Строки по таблицам (dict колонка → значение) в порядке внешних ключей."""
+
+    def __init__(self, spec: Spec) -> None:
+        self.spec = spec
+        self.rnd = random.Random(spec.seed)
+        self.gm_id = uuid.UUID(int=self.rnd.getrandbits(128))
+        self.event_type_ids = {code: i for i, code in enumerate(EVENT_CODES, start=1)}
+        n = spec.n_players
+        # завсегдатаи: 10% клуба занимают ~80% мест
+        self.regulars = list(range(1, max(10, n // 10) + 1))
+        self.guests = list(range(len(self.regulars) + 1, n + 1))
+        self._ids = dict.fromkeys(
+            ("gameplayer", "gameevent", "voteround", "voteitem", "extrapoints"), 0
+        )
+
+    def _next(self, table: str) -> int:
+        self._ids[table] += 1
+        return self._ids[table]
+
+    def nickname(self, i: int) -> str:
+        word = "".join(
+            self.rnd.choice(_SYLLABLES) for _ in range(self.rnd.randint(2, 3))
+        )
+        return f"{word}_{i}"[:32]
+
+    def reference(self) -> Iterator[tuple[str, list[dict]]]:
+        yield "user", [
+            {
+                "id": self.gm_id,
+                "email": "gm@bench.local",
+                "hashed_password": "x",
+                "is_active": True,
+                "is_superuser": False,
+                "is_verified": True,
+                "role": UserRole.gm,
+            }
+        ]
+        yield "ruleset", [
+            {
+                "id": 1,
+                "name": "Default",
+                "is_active": True,
+                "created_at": dt.datetime(2021, 1, 1, tzinfo=dt.timezone.utc),
+            }
+        ]
+        yield "eventtype", [
+            {"id": i, "code": c} for c, i in self.event_type_ids.items()
+        ]
+        created = dt.datetime(2021, 1, 1, tzinfo=dt.timezone.utc)
+        yield "player", [
+            {
+                "id": i,
+                "nickname": self.nickname(i),
+                "is_registered": False,
+                "created_at": created,
+            }
+            for i in range(1, self.spec.n_players + 1)
+        ]
+
+    def _seat_players(self, qty: int) -> list[int]:
+        from_regulars = min(
+            len(self.regulars), sum(self.rnd.random() < 0.8 for _ in range(qty))
+        )
+        picked = self.rnd.sample(self.regulars, from_regulars)
+        rest = qty - from_regulars
+        pool = self.guests if len(self.guests) >= rest else self.regulars
+        picked += [
+            p for p in self.rnd.sample(pool, rest + from_regulars) if p not in picked
+        ][:rest]
+        return picked
+
+    def _state(self, i: int) -> GameState:
+        tail = self.spec.games - i
+        if tail <= 2:
+            return GameState.draft
+        if tail <= 5:
+            return GameState.live
+        return GameState.aborted if self.rnd.random() < 0.02 else GameState.finished
+
+    def simulate(
+        self,
+        game_id: int,
+        roles: dict[int, GameRole],
+        started: dt.datetime,
+        out: dict,
+        full: bool,
+    ) -> tuple[Optional[Faction], dict[int, int]]:
+        """События живой игры и голосования; (победитель, фолы по местам)."""
+        rnd, seq = self.rnd, 0
+        fouls = dict.fromkeys(roles, 0)
+
+        def event(code: str, payload: dict) -> None:
+            nonlocal seq
+            seq += 1
+            out["gameevent"].append(
+                {
+                    "id": self._next("gameevent"),
+                    "game_id": game_id,
+                    "client_seq": seq,
+                    "ts": (started + dt.timedelta(seconds=45 * seq)).replace(
+                        tzinfo=dt.timezone.utc
+                    ),
+                    "event_type_id": self.event_type_ids[code],
+                    "payload": payload,
+                }
+            )
+
+        event("deal_roles", {"roles": {str(s): r.value for s, r in roles.items()}})
+        alive = set(roles)
+        faction = {s: ROLE_FACTION[r] for s, r in roles.items()}
+        vote_no = 0
+        stop_at = None if full else rnd.randint(3, 10)
+
+        def winner() -> Optional[Faction]:
+            mafia = sum(faction[s] is Faction.mafia for s in alive)
+            if mafia == 0:
+                return Faction.city
+            return Faction.mafia if mafia >= len(alive) - mafia else None
+
+        while winner() is None and (stop_at is None or seq < stop_at):
+            event("phase", {"phase": "night"})
+            target = rnd.choice([s for s in alive if faction[s] is Faction.city])
+            event("kill", {"target_seat": target})
+            alive.discard(target)
+            if winner() is not None:
+                break
+            if vote_no == 0 and rnd.random() < 0.5:
+                guesses = rnd.sample(sorted(alive), min(3, len(alive)))
+                event("best_move", {"actor_seat": target, "guesses": guesses})
+            event("phase", {"phase": "day"})
+            for s in rnd.sample(sorted(alive), min(2, len(alive))):
+                if rnd.random() < 0.15:
+                    fouls[s] += 1
+                    event("foul", {"target_seat": s})
+            nominated = rnd.sample(sorted(alive), min(rnd.randint(1, 3), len(alive)))
+            for target in nominated:
+                event(
+                    "nominate",
+                    {"actor_seat": rnd.choice(sorted(alive)), "target_seat": target},
+                )
+            counts = dict.fromkeys(nominated, 0)
+            for _ in alive:
+                counts[rnd.choice(nominated)] += 1
+            event("vote", {"counts": {str(s): c for s, c in counts.items()}})
+            vote_no += 1
+            round_id = self._next("voteround")
+            out["voteround"].append(
+                {"id": round_id, "game_id": game_id, "round_no": vote_no}
+            )
+            out["voteitem"] += [
+                {
+                    "id": self._next("voteitem"),
+                    "vote_round_id": round_id,
+                    "target_seat": s,
+                    "count": c,
+                }
+                for s, c in counts.items()
+            ]
+            out_seat = max(counts, key=lambda s: (counts[s], -s))
+            event("vote_out", {"target_seat": out_seat})
+            alive.discard(out_seat)
+
+        if not full:
+            return None, fouls
+        won = winner()
+        event("finish", {"winner": won.value})
+        return won, fouls
+
+    def games(self, chunk: int = 2000) -> Iterator[tuple[str, list[dict]]]:
+        """Игры пачками по chunk; внутри пачки — таблицы в порядке FK."""
+        tables = (
+            "game",
+            "gameplayer",
+            "gameevent",
+            "voteround",
+            "voteitem",
+            "extrapoints",
+        )
+        out: dict[str, list[dict]] = {t: [] for t in tables}
+        per_day: dict[dt.date, int] = {}
+        for i in range(1, self.spec.games + 1):
+            self._game(i, out, per_day)
+            if i % chunk == 0 or i == self.spec.games:
+                for t in tables:
+                    if out[t]:
+                        yield t, out[t]
+                out = {t: [] for t in tables}
+
+    def _game(self, game_id: int, out: dict, per_day: dict[dt.date, int]) -> None:
+        rnd = self.rnd
+        day = START + dt.timedelta(days=(game_id - 1) * DAYS // self.spec.games)
+        slot = per_day[day] = per_day.get(day, 0) + 1
+        started = dt.datetime.combine(day, dt.time(19)) + dt.timedelta(
+            minutes=70 * (slot - 1)
+        )
+        state = self._state(game_id)
+        qty = rnd.choices(list(QTY_WEIGHTS), weights=list(QTY_WEIGHTS.values()))[0]
+        roles = ROLES[qty][:]
+        rnd.shuffle(roles)
+        seat_roles = dict(enumerate(roles, start=1))
+
+        winner, fouls = None, dict.fromkeys(seat_roles, 0)
+        if state is not GameState.draft:
+            winner, fouls = self.simulate(
+                game_id, seat_roles, started, out, full=state is GameState.finished
+            )
+        finished = started + dt.timedelta(minutes=rnd.randint(35, 75))
+        out["game"].append(
+            {
+                "id": game_id,
+                "players_qty": qty,
+                "rule_set_id": 1,
+                "gm_id": self.gm_id,
+                "state": state,
+                "date": day,
+                "started_at": None if state is GameState.draft else started,
+                "finished_at": (
+                    finished
+                    if state in (GameState.finished, GameState.aborted)
+                    else None
+                ),
+                "aborted": state is GameState.aborted,
+                "winner_faction": winner,
+                "version": {GameState.draft: 0, GameState.live: 1}.get(state, 2),
+            }
+        )
+
+        best = rnd.choice(list(seat_roles))
+        for (seat, role), player_id in zip(seat_roles.items(), self._seat_players(qty)):
+            gp_id = self._next("gameplayer")
+            points = 0.0
+            if winner is not None and ROLE_FACTION[role] is winner:
+                points = 1.0 + (0.3 if seat == best else 0.0)
+            if state is GameState.finished and rnd.random() < 0.01:
+                delta = rnd.choice((0.5, -0.5, 0.25))
+                points += delta
+                out["extrapoints"].append(
+                    {
+                        "id": self._next("extrapoints"),
+                        "game_player_id": gp_id,
+                        "delta": delta,
+                        "reason": "bonus" if delta > 0 else "penalty",
+                        "created_at": finished.replace(tzinfo=dt.timezone.utc),
+                    }
+                )
+            out["gameplayer"].append(
+                {
+                    "id": gp_id,
+                    "game_id": game_id,
+                    "player_id": player_id,
+                    "seat_no": seat,
+                    "role": role,
+                    "fouls_count": fouls[seat],
+                    "removed": False,
+                    "total_points": round(points, 2),
+                    "conditions": None,  # очки случайные, маской не получить
+                }
+            )
+
+
+def generate(spec: Spec, chunk: int = 2000) -> Iterator[tuple[str, list[dict]]]:
+    gen = ClubGenerator(spec)
+    yield from gen.reference()
+    yield from gen.games(chunk)
+
+
+# ─────────────────────────── loaders ───────────────────────────
+def _reset_sequences(conn: Any) -> None:
+    for tbl in SQLModel.metadata.sorted_tables:
+        pk = tbl.c.get("id")
+        if pk is None or not isinstance(pk.type, Integer):
+            continue
+        conn.execute(
+            text(
+                "SELECT setval(pg_get_serial_sequence(:t, 'id'), "
+                f'COALESCE((SELECT max(id) FROM "{tbl.name}"), 1))'
+            ),
+            {"t": f'"{tbl.name}"'},
+        )
+
+
+def load(engine: Engine, spec: Spec, chunk: int = 2000) -> None:
+    """Заливает клуб в пустую базу и пересобирает агрегаты."""
+    from app.services import player_stats, rollups
+
+    common.import_models()
+    postgres = engine.dialect.name == "postgresql"
+    if not postgres:
+        SQLModel.metadata.create_all(engine)
+    tables = SQLModel.metadata.tables
+    with Session(engine) as session:
+        if session.scalar(select(func.count()).select_from(tables["game"])):
+            raise SystemExit("datagen: в базе уже есть игры — нужна пустая база")
+        for name, rows in generate(spec, chunk):
+            bulk_insert(session, tables[name], rows)  # COPY на Postgres
+            session.commit()
+        if postgres:
+            _reset_sequences(session.connection())
+            session.commit()
+
+        player_stats.rebuild(session)
+        rollups.rebuild(session)
+
+
+def _schema_tag() -> str:
+    """Отпечаток DDL моделей: после миграции старый кэш не подхватится."""
+    from sqlalchemy.dialects import sqlite
+    from sqlalchemy.schema import CreateIndex, CreateTable
+
+    common.import_models()
+    dialect = sqlite.dialect()
+    ddl = []
+    for table in SQLModel.metadata.sorted_tables:
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        ddl += sorted(
+            str(CreateIndex(ix).compile(dialect=dialect)) for ix in table.indexes
+        )
+    return hashlib.blake2b("\n".join(ddl).encode(), digest_size=4).hexdigest()
+
+
+def cached_sqlite(spec: Spec) -> Path:
+    """SQLite‑датасет в .benchmarks/data/, строится один раз на (games, seed, схема)."""
+    cached = DATA_DIR / f"club-{spec.games}-seed{spec.seed}-{_schema_tag()}.sqlite"
+    if not cached.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        partial = cached.with_suffix(".partial")
+        partial.unlink(missing_ok=True)
+        engine = create_engine(f"sqlite:///{partial}")
+        load(engine, spec)
+        engine.dispose()
+        partial.rename(cached)
+    return cached
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--games", type=int, help="вместо --scale")
+    parser.add_argument("--players", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="SQLAlchemy URL (Postgres — через COPY)")
+    parser.add_argument(
+        "--out", default="club.sqlite", help="файл SQLite, если нет --url"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    spec = Spec(args.games or SCALES[args.scale], args.players, args.seed)
+    engine = create_engine(args.url or f"sqlite:///{args.out}")
+    started = time.perf_counter()
+    load(engine, spec)
+    log.info(
+        "loaded %d games / %d players in %.1fs",
+        spec.games,
+        spec.n_players,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
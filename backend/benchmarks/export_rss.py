@@ -0,0 +1,112 @@
+"""
+Пиковый RSS выгрузки /export/games.* на разных масштабах датасета.
+
+Каждый масштаб — отдельный процесс (пик RSS только растёт), который
+прогоняет весь конвейер app.services.export (курсор → игры → формат →
+буфер → gzip) в /dev/null. Стриминг честный, если пик почти не зависит от
+числа игр; прогон падает, если пик вырос больше чем на ``--max-growth`` МБ.
+
+    python benchmarks/export_rss.py                        # 1k и 100k, SQLite
+    python benchmarks/export_rss.py --scales 1k,100k,1M --events --gzip
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import common
+from datagen import SCALES, Spec, cached_sqlite
+
+
+def _rss_mb() -> float:
+    """Пик RSS процесса. VmHWM сбрасывается на exec, а ru_maxrss на Linux
+    тянет пик родителя (тот мог только что строить датасет)."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # КБ на Linux
+
+
+async def _export(url: str, fmt: str, events: bool, gzip: bool) -> dict:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.services import export
+
+    common.import_models()
+    engine = create_async_engine(url)
+    maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    before = _rss_mb()
+    started = time.perf_counter()
+    size = 0
+    async for chunk in export.stream(maker, fmt, events=events, gzip=gzip):
+        size += len(chunk)
+    await engine.dispose()
+    return {
+        "bytes": size,
+        "seconds": round(time.perf_counter() - started, 2),
+        "rss_before_mb": round(before, 1),
+        "peak_rss_mb": round(_rss_mb(), 1),
+    }
+
+
+def child(args: argparse.Namespace) -> None:
+    result = asyncio.run(_export(args.child, args.format, args.events, args.gzip))
+    print(json.dumps(result))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--scales", default="1k,100k", help="через запятую, из " + ",".join(SCALES)
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--events", action="store_true")
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument(
+        "--max-growth", type=float, default=32.0, help="МБ пика между масштабами"
+    )
+    parser.add_argument(
+        "--child", help=argparse.SUPPRESS
+    )  # async URL, внутренний режим
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return 0
+
+    flags = (
+        [f"--format={args.format}"]
+        + ["--events"] * args.events
+        + ["--gzip"] * args.gzip
+    )
+    peaks = []
+    for scale in args.scales.split(","):
+        db = cached_sqlite(Spec(SCALES[scale], seed=args.seed))
+        out = subprocess.run(
+            [sys.executable, __file__, f"--child=sqlite+aiosqlite:///{db}", *flags],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(out.splitlines()[-1])
+        peaks.append(result["peak_rss_mb"])
+        print(
+            f"{scale:>5}: {result['bytes'] / 2**20:9.1f} MB out in {result['seconds']:7.2f}s  "
+            f"rss before {result['rss_before_mb']:6.1f} MB  peak {result['peak_rss_mb']:6.1f} MB"
+        )
+    growth = max(peaks) - min(peaks)
+    print(f"peak RSS growth: {growth:.1f} MB (limit {args.max_growth:g})")
+    return 0 if growth <= args.max_growth else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+Нагрузка «турнирный вечер»: N столов в live одновременно (автосейв каждые
+2 секунды) + зрители, читающие статистику. Ходит по HTTP в настоящий
+uvicorn (Postgres), чтобы мерить воркеры, пул и блокировки целиком.
+
+Каждый GM‑корутин играет игры по кругу: POST /games/setup → live →
+events:batch по тикам (события — из datagen.ClubGenerator.simulate; фолы
+и удаления идут не в батч, а в /seats/{n}/fouls и /removal) → finished. Читатели выбирают эндпоинт по
+весам ``--mix``. В конце — rps и p50/p95/p99 по эндпоинтам, время в БД из
+Server-Timing и ожидание соединения из /metrics (db_pool_wait_seconds).
+
+    python benchmarks/loadtest.py --spawn --workers 4 --tables 40 --readers 200
+    python benchmarks/loadtest.py --base-url http://10.0.0.5:8000 --duration 300
+
+База берётся из DATABASE_URL (как у сервера): перед стартом туда
+добавляются ведущий и справочник событий, если их нет. С несколькими
+воркерами /metrics отдаёт пул только того воркера, что ответил на скрейп.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import os
+import random
+import re
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import common
+import httpx
+from datagen import EVENT_CODES, ROLES, ClubGenerator, Spec
+from sqlalchemy import create_engine, select
+from sqlmodel import Session
+
+from app.core.enums import GameRole, UserRole
+from app.schemas.events import SEAT_CODES
+
+SEAT_ACTIONS = {"foul": "fouls", "remove": "removal"}  # код → POST /seats/{n}/…
+READ_MIX = "leaderboard=3,factions=1,player_stats=3,search=2,games_page=2,live_state=4"
+_DB_DUR = re.compile(r"db;dur=([\d.]+)")
+_BUCKET = re.compile(
+    r'db_pool_wait_seconds_(bucket|sum|count)\{engine="(\w+)"(?:,le="([^"]+)")?\} (\S+)'
+)
+
+
+# ─────────────────────────── measurements ───────────────────────────
+@dataclass
+class Endpoint:
+    latency_ms: list[float] = field(default_factory=list)
+    db_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.endpoints: dict[str, Endpoint] = defaultdict(Endpoint)
+
+    async def call(
+        self, client: httpx.AsyncClient, name: str, method: str, url: str, **kw
+    ) -> Optional[httpx.Response]:
+        """Запрос с замером; name — шаблон пути, чтобы /games/17 и /games/18 шли в одну строку."""
+        ep = self.endpoints[name]
+        started = time.perf_counter()
+        try:
+            resp = await client.request(method, url, **kw)
+        except httpx.HTTPError:
+            ep.errors += 1
+            return None
+        ep.latency_ms.append((time.perf_counter() - started) * 1000)
+        if m := _DB_DUR.search(resp.headers.get("server-timing", "")):
+            ep.db_ms.append(float(m.group(1)))
+        if resp.status_code >= 400:
+            ep.errors += 1
+        return resp
+
+    def report(self, elapsed: float) -> str:
+        lines = [
+            f"{'endpoint':<34}{'n':>7}{'err':>6}{'rps':>8}"
+            f"{'p50':>9}{'p95':>9}{'p99':>9}{'db p50':>9}{'db p95':>9}   (ms)"
+        ]
+        for name, ep in sorted(self.endpoints.items()):
+            lat, db = ep.latency_ms, ep.db_ms
+            lines.append(
+                f"{name:<34}{len(lat):>7}{ep.errors:>6}{len(lat) / elapsed:>8.1f}"
+                f"{common.percentile(lat, 50):>9.1f}{common.percentile(lat, 95):>9.1f}"
+                f"{common.percentile(lat, 99):>9.1f}"
+                f"{common.percentile(db, 50):>9.1f}{common.percentile(db, 95):>9.1f}"
+            )
+        total = sum(len(ep.latency_ms) for ep in self.endpoints.values())
+        lines.append(f"{'total':<34}{total:>7}{'':>6}{total / elapsed:>8.1f}")
+        return "\n".join(lines)
+
+
+def parse_pool_wait(text: str) -> dict[str, dict]:
+    """/metrics → {engine: {"buckets": {le: cumulative}, "sum": s, "count": n}}."""
+    out: dict[str, dict] = defaultdict(lambda: {"buckets": {}, "sum": 0.0, "count": 0})
+    for kind, engine, le, value in _BUCKET.findall(text):
+        if kind == "bucket":
+            out[engine]["buckets"][float(le)] = float(value)
+        else:
+            out[engine][kind] = float(value)
+    return out
+
+
+def pool_wait_report(before: dict, after: dict) -> str:
+    """Разница скрейпов: среднее и верхние границы корзин для p95/p99."""
+    lines = []
+    for engine, a in sorted(after.items()):
+        b = before.get(engine, {"buckets": {}, "sum": 0.0, "count": 0})
+        n = a["count"] - b["count"]
+        if n <= 0:
+            continue
+        buckets = sorted(
+            (le, a["buckets"][le] - b["buckets"].get(le, 0)) for le in a["buckets"]
+        )
+
+        def quantile(q: float) -> float:
+            return next(le for le, c in buckets if c >= q * n)
+
+        lines.append(
+            f"pool wait [{engine}] checkouts={int(n)} "
+            f"mean={(a['sum'] - b['sum']) / n * 1000:.2f} ms "
+            f"p95<={quantile(0.95) * 1000:g} ms p99<={quantile(0.99) * 1000:g} ms"
+        )
+    return "\n".join(lines) or "pool wait: no /metrics data"
+
+
+# ─────────────────────────── workload ───────────────────────────
+def prepare(db_url: str) -> uuid.UUID:
+    """Ведущий и справочник событий — то, что API само не создаёт."""
+    from app.crud import rules
+    from app.models.event import EventType
+    from app.models.user import User
+
+    common.import_models()
+    with Session(create_engine(db_url)) as session:
+        gm = session.scalar(select(User).where(User.email == "loadtest-gm@bench.local"))
+        if gm is None:
+            gm = User(
+                id=uuid.uuid4(),
+                email="loadtest-gm@bench.local",
+                hashed_password="x",
+                role=UserRole.gm,
+            )
+            session.add(gm)
+            session.commit()
+        known = set(session.scalars(select(EventType.code)))
+        for code in EVENT_CODES:
+            if code not in known:
+                rules.add_event_type(session, code)
+        return gm.id
+
+
+class Table:
+    """Один стол: сценарий игры из datagen, разрезанный на автосейвы."""
+
+    def __init__(self, gen: ClubGenerator, rnd: random.Random, pool: int) -> None:
+        qty = rnd.choice([10, 10, 10, 9, 8])
+        roles = ROLES[qty][:]
+        rnd.shuffle(roles)
+        self.roles: dict[int, GameRole] = dict(enumerate(roles, start=1))
+        # игроки повторяются между столами — как в клубе, PlayerStats растут
+        self.nicknames = [f"lt_{n}" for n in rnd.sample(range(pool), qty)]
+        out: dict[str, list] = defaultdict(list)
+        now = dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+        self.winner, _ = gen.simulate(0, self.roles, now, out, full=True)
+        # client_seq — без дыр по событиям автосейва: места пишутся мимо батча
+        self.events = []
+        seq = 0
+        for e in out["gameevent"]:
+            code = EVENT_CODES[e["event_type_id"] - 1]
+            if code not in SEAT_CODES:
+                seq += 1
+            self.events.append(
+                {
+                    "client_seq": None if code in SEAT_CODES else seq,
+                    "code": code,
+                    "ts": e["ts"].isoformat(),
+                    "payload": e["payload"],
+                }
+            )
+
+
+async def gm(
+    client: httpx.AsyncClient,
+    rec: Recorder,
+    gm_id: uuid.UUID,
+    seed: int,
+    args: argparse.Namespace,
+    deadline: float,
+    live_ids: set[int],
+) -> None:
+    rnd = random.Random(seed)
+    gen = ClubGenerator(Spec(games=1, seed=seed))
+    await asyncio.sleep(rnd.random() * args.autosave)  # столы не в такт
+    while time.monotonic() < deadline:
+        table = Table(gen, rnd, args.players)
+        body = {
+            "players_qty": len(table.roles),
+            "rule_set_id": 1,
+            "gm_id": str(gm_id),
+            "seats": [
+                {"nickname": n, "role": r.value}
+                for n, r in zip(table.nicknames, table.roles.values())
+            ],
+        }
+        resp = await rec.call(
+            client, "POST /games/setup", "POST", "/games/setup", json=body
+        )
+        if resp is None or resp.status_code != 201:
+            await asyncio.sleep(args.autosave)
+            continue
+        game = resp.json()["game"]
+        game_id, version = game["id"], game["version"]
+
+        resp = await rec.call(
+            client,
+            "POST /games/{id}/state",
+            "POST",
+            f"/games/{game_id}/state",
+            json={"state": "live", "expected_version": version},
+        )
+        if resp is None or resp.status_code != 200:
+            continue
+        version = resp.json()["version"]
+        live_ids.add(game_id)
+
+        events = table.events
+        while events:
+            await asyncio.sleep(args.autosave)
+            tick, events = events[: args.batch], events[args.batch :]
+            batch = [e for e in tick if e["code"] not in SEAT_CODES]
+            await rec.call(
+                client,
+                "POST /games/{id}/events:batch",
+                "POST",
+                f"/games/{game_id}/events:batch",
+                json={"events": batch},
+            )
+            for e in tick:
+                if e["code"] in SEAT_CODES:
+                    action = SEAT_ACTIONS[e["code"]]
+                    await rec.call(
+                        client,
+                        f"POST /games/{{id}}/seats/{{n}}/{action}",
+                        "POST",
+                        f"/games/{game_id}/seats/{e['payload']['target_seat']}/{action}",
+                    )
+
+        live_ids.discard(game_id)
+        await rec.call(
+            client,
+            "POST /games/{id}/state",
+            "POST",
+            f"/games/{game_id}/state",
+            json={
+                "state": "finished",
+                "expected_version": version,
+                "winner": table.winner.value,
+            },
+        )
+
+
+async def reader(
+    client: httpx.AsyncClient,
+    rec: Recorder,
+    seed: int,
+    mix: dict[str, int],
+    args: argparse.Namespace,
+    deadline: float,
+    live_ids: set[int],
+) -> None:
+    rnd = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        kind = rnd.choices(names, weights)[0]
+        if kind == "leaderboard":
+            await rec.call(
+                client, "GET /stats/leaderboard", "GET", "/stats/leaderboard"
+            )
+        elif kind == "factions":
+            await rec.call(client, "GET /stats/factions", "GET", "/stats/factions")
+        elif kind == "player_stats":
+            pid = rnd.randint(1, args.max_player_id)
+            await rec.call(
+                client, "GET /players/{id}/stats", "GET", f"/players/{pid}/stats"
+            )
+        elif kind == "search":
+            q = rnd.choice(["lt_", "ka", "ser", "wolf", "lt_1", "dim"])
+            await rec.call(
+                client, "GET /players/search", "GET", "/players/search", params={"q": q}
+            )
+        elif kind == "games_page":
+            await rec.call(
+                client, "GET /games/page", "GET", "/games/page", params={"limit": 20}
+            )
+        elif kind == "live_state" and live_ids:
+            game_id = rnd.choice(sorted(live_ids))
+            await rec.call(
+                client, "GET /games/{id}/state", "GET", f"/games/{game_id}/state"
+            )
+        await asyncio.sleep(rnd.expovariate(1 / args.think))
+
+
+# ─────────────────────────── runner ───────────────────────────
+def spawn(args: argparse.Namespace) -> subprocess.Popen:
+    port = httpx.URL(args.base_url).port or 8000
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--workers",
+            str(args.workers),
+            "--no-access-log",
+        ],
+        cwd=common.BACKEND_ROOT,
+    )
+    for _ in range(100):
+        try:
+            if httpx.get(f"{args.base_url}/healthz").status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become healthy")
+
+
+async def run(args: argparse.Namespace, gm_id: uuid.UUID) -> None:
+    mix = {k: int(v) for k, v in (p.split("=") for p in args.mix.split(","))}
+    limits = httpx.Limits(max_connections=args.tables + args.readers)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=30
+    ) as client:
+        before = parse_pool_wait((await client.get("/metrics")).text)
+        rec, live_ids = Recorder(), set()
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                gm(client, rec, gm_id, args.seed + i, args, deadline, live_ids)
+                for i in range(args.tables)
+            ),
+            *(
+                reader(
+                    client, rec, args.seed + 10_000 + i, mix, args, deadline, live_ids
+                )
+                for i in range(args.readers)
+            ),
+        )
+        elapsed = time.monotonic() - started
+        after = parse_pool_wait((await client.get("/metrics")).text)
+
+    print(f"{args.tables} tables, {args.readers} readers, {elapsed:.0f}s")
+    print(rec.report(elapsed))
+    print(pool_wait_report(before, after))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--db-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--spawn", action="store_true", help="поднять uvicorn самому")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--tables", type=int, default=20, help="одновременных live‑игр")
+    parser.add_argument("--readers", type=int, default=50, help="зрителей статистики")
+    parser.add_argument("--duration", type=float, default=60.0, help="сек")
+    parser.add_argument("--autosave", type=float, default=2.0, help="сек между батчами")
+    parser.add_argument("--batch", type=int, default=4, help="событий в автосейве")
+    parser.add_argument(
+        "--think", type=float, default=0.5, help="средняя пауза читателя, сек"
+    )
+    parser.add_argument("--mix", default=READ_MIX, help="веса эндпоинтов читателей")
+    parser.add_argument("--players", type=int, default=2000, help="ников в пуле столов")
+    parser.add_argument("--max-player-id", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    gm_id = prepare(args.db_url)
+    proc = spawn(args) if args.spawn else None
+    try:
+        asyncio.run(run(args, gm_id))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Бенчмарк‑сьют (benchmarks/test_bench_*.py) на датасете datagen.py с
+baseline и порогом регрессии.
+
+    python benchmarks/suite.py --scale 1k --save      # baseline на этой машине
+    python benchmarks/suite.py --scale 1k             # сравнить с ним
+    python benchmarks/suite.py --scale 1M --url postgresql+psycopg2://…/mafia_bench
+
+Baseline — benchmarks/baselines/<machine>/NNNN_<dialect>-<scale>.json
+(только статистика). Прогон падает, если медиана любого бенча выросла
+больше чем на --threshold процентов. Цифры машинно‑зависимы, поэтому
+baselines/ не коммитится: снимать baseline (обычно на базовой ветке) и
+сравнивать нужно на одном хосте. Каждый бенч прогревается и крутит не
+меньше MIN_ROUNDS раундов — медиана на паре десятков замеров шумит
+сильнее порога.
+"""
+
+import argparse
+import sys
+
+import common
+import pytest
+from datagen import SCALES
+from sqlalchemy.engine import make_url
+
+BASELINES = common.BACKEND_ROOT / "benchmarks" / "baselines"
+MIN_ROUNDS = 50
+FILES = sorted(
+    str(p) for p in (common.BACKEND_ROOT / "benchmarks").glob("test_bench_*.py")
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="Postgres; по умолчанию SQLite из кэша datagen")
+    parser.add_argument("--save", action="store_true", help="записать новый baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=25.0, help="допуск по медиане, %%"
+    )
+    parser.add_argument(
+        "pytest_args", nargs="*", help="доп. аргументы pytest (после --)"
+    )
+    args = parser.parse_args()
+
+    dialect = make_url(args.url).get_backend_name() if args.url else "sqlite"
+    name = f"{dialect}-{args.scale}"
+    argv = [
+        *FILES,
+        f"--rootdir={common.BACKEND_ROOT}",
+        f"--scale={args.scale}",
+        f"--seed={args.seed}",
+        f"--benchmark-storage=file://{BASELINES}",
+        "--benchmark-warmup=on",
+        f"--benchmark-min-rounds={MIN_ROUNDS}",
+        "--benchmark-columns=min,median,max,rounds",
+        "--benchmark-sort=name",
+        *args.pytest_args,
+    ]
+    if args.url:
+        argv.append(f"--bench-url={args.url}")
+
+    existing = sorted(BASELINES.glob(f"*/*_{name}.json"))
+    if args.save:
+        for old in existing:
+            old.unlink()  # один baseline на (dialect, scale)
+        argv.append(f"--benchmark-save={name}")
+    elif existing:
+        argv += [
+            f"--benchmark-compare=*/*_{name}",
+            f"--benchmark-compare-fail=median:{args.threshold:g}%",
+        ]
+    else:
+        print(f"no baseline {name!r} yet — run with --save", file=sys.stderr)
+    return pytest.main(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""Каждая функция app.crud.games на датасете datagen (см. conftest.py)."""
+
+import itertools
+import random
+import uuid
+
+import pytest
+from datagen import ROLES, Spec
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.core.cursor import encode_cursor
+from app.core.enums import Faction, GameState
+from app.crud import games as crud
+from app.crud.games import LoadProfile
+from app.models.game import Game
+from app.models.player import Player
+from app.schemas.games import GameCreate, GameSetup
+from app.services.live_state import FOUL_LIMIT
+
+pytestmark = pytest.mark.benchmark(group="crud.games")
+ROUNDS = 100
+WARMUP = 10  # прогрев кэшей/пула до замеров
+_tags = itertools.count()
+
+
+def _gm_id(session: Session) -> uuid.UUID:
+    return session.scalar(select(Game.gm_id).limit(1))
+
+
+def _setup_data(session: Session, rnd: random.Random, spec: Spec) -> GameSetup:
+    """Половина мест — существующие игроки, половина — новые ники."""
+    tag = next(_tags)
+    existing = rnd.sample(range(1, spec.n_players + 1), 5)
+    nicknames = [f"bench_{tag}_{uuid.uuid4().hex[:6]}_{i}" for i in range(5)]
+    nicknames += session.scalars(select(Player.nickname).where(Player.id.in_(existing)))
+    return GameSetup(
+        players_qty=10,
+        rule_set_id=1,
+        gm_id=_gm_id(session),
+        seats=[{"nickname": n, "role": r} for n, r in zip(nicknames, ROLES[10])],
+    )
+
+
+def _live_game(session: Session, rnd: random.Random, spec: Spec) -> int:
+    game_id = crud.setup(session, _setup_data(session, rnd, spec)).game.id
+    crud.update_state(session, game_id, GameState.live)
+    return game_id
+
+
+# ────────────────────────────── create ─────────────────────────────
+def test_create(benchmark, session: Session):
+    gm_id = _gm_id(session)
+    benchmark(crud.create, session, GameCreate(players_qty=10, rule_set_id=1), gm_id)
+
+
+def test_setup(benchmark, session: Session, rnd: random.Random, spec: Spec):
+    benchmark.pedantic(
+        crud.setup,
+        setup=lambda: ((session, _setup_data(session, rnd, spec)), {}),
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+# ─────────────────────────────── read ──────────────────────────────
+@pytest.mark.parametrize("profile", list(LoadProfile), ids=lambda p: p.value)
+def test_get(benchmark, session: Session, rnd: random.Random, spec: Spec, profile):
+    ids = [rnd.randint(1, spec.games) for _ in range(1000)]
+    it = itertools.cycle(ids)
+
+    def run():
+        session.expunge_all()  # без identity map — честный SELECT
+        return crud.get(session, next(it), profile=profile)
+
+    assert benchmark(run) is not None
+
+
+@pytest.mark.parametrize("profile", [LoadProfile.header, LoadProfile.with_players])
+def test_list_games(benchmark, session: Session, profile):
+    def run():
+        session.expunge_all()
+        return crud.list_games(session, limit=50, profile=profile)
+
+    assert len(benchmark(run)) == 50
+
+
+@pytest.mark.parametrize("where", ["first", "deep"])
+def test_list_game_headers(benchmark, session: Session, spec: Spec, where):
+    skip = 0 if where == "first" else spec.games // 2
+    assert len(benchmark(crud.list_game_headers, session, skip=skip, limit=50)) == 50
+
+
+@pytest.mark.parametrize("where", ["first", "deep"])
+def test_list_games_page(benchmark, session: Session, spec: Spec, where):
+    cursor = None
+    if where == "deep":
+        row = session.get(Game, spec.games // 2)
+        cursor = encode_cursor(row.date, row.id)
+    rows, _ = benchmark(crud.list_games_page, session, cursor=cursor, limit=50)
+    assert len(rows) == 50
+
+
+# ────────────────────────────── update ─────────────────────────────
+def test_update_state_start(
+    benchmark, session: Session, rnd: random.Random, spec: Spec
+):
+    def setup():
+        game_id = crud.setup(session, _setup_data(session, rnd, spec)).game.id
+        return (session, game_id, GameState.live), {}
+
+    benchmark.pedantic(
+        crud.update_state,
+        setup=setup,
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+def test_update_state_finish(
+    benchmark, session: Session, rnd: random.Random, spec: Spec
+):
+    """live → finished: очки, PlayerStats и роллапы в одной транзакции."""
+    benchmark.pedantic(
+        crud.update_state,
+        setup=lambda: (
+            (session, _live_game(session, rnd, spec), GameState.finished),
+            {"winner": Faction.city},
+        ),
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+def test_update_state_reopen(
+    benchmark, session: Session, rnd: random.Random, spec: Spec
+):
+    def setup():
+        game_id = _live_game(session, rnd, spec)
+        crud.update_state(session, game_id, GameState.finished, winner=Faction.mafia)
+        return (session, game_id, GameState.live), {}
+
+    benchmark.pedantic(
+        crud.update_state,
+        setup=setup,
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+def test_add_foul(benchmark, session: Session, rnd: random.Random, spec: Spec):
+    def targets():
+        while True:  # FOUL_LIMIT=4 → до удаления 3 фола на место, дальше новая игра
+            game_id = _live_game(session, rnd, spec)
+            for _ in range(FOUL_LIMIT - 1):
+                yield from ((game_id, seat) for seat in range(1, 11))
+
+    it = targets()
+    benchmark.pedantic(
+        crud.add_foul,
+        setup=lambda: ((session, *next(it)), {}),
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+def test_remove_player(benchmark, session: Session, rnd: random.Random, spec: Spec):
+    benchmark.pedantic(
+        crud.remove_player,
+        setup=lambda: (
+            (session, _live_game(session, rnd, spec), rnd.randint(1, 10)),
+            {},
+        ),
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
+
+
+# ────────────────────────────── delete ─────────────────────────────
+def test_delete(benchmark, session: Session):
+    gm_id = _gm_id(session)
+
+    def setup():
+        game = crud.create(session, GameCreate(players_qty=10, rule_set_id=1), gm_id)
+        return (session, game.id), {}
+
+    benchmark.pedantic(
+        crud.delete,
+        setup=setup,
+        rounds=ROUNDS,
+        warmup_rounds=WARMUP,
+    )
@@ -0,0 +1,79 @@
+"""
+Большие списки: обычный путь (response_model → pydantic → json) против
+``json_fast_path`` (Row → orjson, app.core.fastjson). Таймер —
+``time.process_time``: цифры — CPU на 10k строк, а не wall‑clock.
+"""
+
+import itertools
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlmodel import Session
+
+from app.api.routes.players import PLAYER_COLUMNS, PLAYER_FIELDS
+from app.core import fastjson, httpcache
+from app.core.config import get_settings
+from app.crud.games import HEADER_COLUMNS
+from app.models.player import Player
+from app.schemas.games import GameHeader
+
+pytestmark = pytest.mark.benchmark(group="json lists", timer=time.process_time)
+ROWS = 10_000
+PATHS = ["model", "fast"]
+
+
+def _repeat(items: list, n: int = ROWS) -> list:
+    """Датасет 1k меньше 10k строк — повторяем то, что есть."""
+    return list(itertools.islice(itertools.cycle(items), n))
+
+
+def _model_path(adapter: TypeAdapter, content: list) -> bytes:
+    """Что делает FastAPI с response_model: валидация, dump в JSON‑типы, json.dumps."""
+    value = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _fast_path(rows: list, fields: tuple[str, ...]) -> bytes:
+    return fastjson.rows_response(rows, fields).body
+
+
+# ─────────────────────── кодирование 10k строк ───────────────────────
+@pytest.mark.parametrize("path", PATHS)
+def test_encode_players(benchmark, session: Session, path):
+    if path == "model":
+        players = _repeat(list(session.scalars(select(Player).limit(ROWS))))
+        body = benchmark(_model_path, TypeAdapter(list[Player]), players)
+    else:
+        rows = _repeat(session.execute(select(*PLAYER_COLUMNS).limit(ROWS)).all())
+        body = benchmark(_fast_path, rows, PLAYER_FIELDS)
+    assert len(json.loads(body)) == ROWS
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_encode_game_headers(benchmark, session: Session, path):
+    rows = _repeat(session.execute(select(*HEADER_COLUMNS).limit(ROWS)).all())
+    if path == "model":
+        body = benchmark(_model_path, TypeAdapter(list[GameHeader]), rows)
+    else:
+        body = benchmark(_fast_path, rows, fastjson.fields_of(GameHeader))
+    assert len(json.loads(body)) == ROWS
+
+
+# ─────────────────────── ручка целиком ───────────────────────
+@pytest.mark.parametrize("path", PATHS)
+@pytest.mark.parametrize("url", ["/players/", "/games/"])
+def test_route(benchmark, client: TestClient, monkeypatch, url, path):
+    """До 10k строк одним запросом; кэш ответов выключен — меряем ручку."""
+    monkeypatch.setattr(get_settings(), "json_fast_path", path == "fast")
+    monkeypatch.setattr(httpcache.cache, "max_bytes", 0)
+
+    def run():
+        resp = client.get(url, params={"limit": ROWS})
+        assert resp.status_code == 200, resp.text
+
+    benchmark(run)
@@ -0,0 +1,58 @@
+"""Роуты /players на датасете datagen: списки, keyset, поиск, карточка, статистика."""
+
+import itertools
+import random
+
+import pytest
+from datagen import Spec
+from fastapi.testclient import TestClient
+
+from app.core.cursor import encode_cursor
+
+pytestmark = pytest.mark.benchmark(group="players routes")
+
+
+def _ok(client: TestClient, url: str, **params) -> None:
+    resp = client.get(url, params=params)
+    assert resp.status_code == 200, resp.text
+
+
+def test_list(benchmark, client: TestClient):
+    benchmark(_ok, client, "/players/", limit=50)
+
+
+@pytest.mark.parametrize("order", ["id", "nickname"])
+@pytest.mark.parametrize("where", ["first", "deep"])
+def test_page(benchmark, client: TestClient, spec: Spec, order, where):
+    params = {"limit": 50, "order": order}
+    if where == "deep":
+        mid = spec.n_players // 2
+        nickname = client.get(f"/players/{mid}").json()["nickname"]
+        params["cursor"] = (
+            encode_cursor(mid) if order == "id" else encode_cursor(nickname, mid)
+        )
+    benchmark(_ok, client, "/players/page", **params)
+
+
+@pytest.mark.parametrize("kind", ["prefix", "fuzzy"])
+def test_search(benchmark, client: TestClient, rnd: random.Random, spec: Spec, kind):
+    names = [
+        client.get(f"/players/{rnd.randint(1, spec.n_players)}").json()["nickname"]
+        for _ in range(50)
+    ]
+    # префикс — первые 3 буквы; опечатка — переставленные буквы в середине
+    queries = [
+        n[:3] if kind == "prefix" else n[:2] + n[3] + n[2] + n[4:] for n in names
+    ]
+    it = itertools.cycle(queries)
+    benchmark(lambda: _ok(client, "/players/search", q=next(it), limit=10))
+
+
+def test_get(benchmark, client: TestClient, rnd: random.Random, spec: Spec):
+    it = itertools.cycle([rnd.randint(1, spec.n_players) for _ in range(500)])
+    benchmark(lambda: _ok(client, f"/players/{next(it)}"))
+
+
+def test_stats(benchmark, client: TestClient, rnd: random.Random, spec: Spec):
+    it = itertools.cycle([rnd.randint(1, spec.n_players) for _ in range(500)])
+    benchmark(lambda: _ok(client, f"/players/{next(it)}/stats"))
@@ -0,0 +1,32 @@
+"""gameevent client_seq for idempotent batch ingestion
+
+Revision ID: 087c44f351eb
+Revises: af838395e4e6
+Create Date: 2026-10-18 11:02:17.530911
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "087c44f351eb"
+down_revision: Union[str, Sequence[str], None] = "af838395e4e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("gameevent", sa.Column("client_seq", sa.Integer(), nullable=True))
+    op.create_unique_constraint(
+        "uq_gameevent_game_seq", "gameevent", ["game_id", "client_seq"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("uq_gameevent_game_seq", "gameevent", type_="unique")
+    op.drop_column("gameevent", "client_seq")
@@ -0,0 +1,58 @@
+"""gameevent jsonb payload, generated seat columns and query indexes
+
+Revision ID: 3c81f0a2d9e4
+Revises: ed5ad6560060
+Create Date: 2026-10-18 19:26:44.518302
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c81f0a2d9e4"
+down_revision: Union[str, Sequence[str], None] = "ed5ad6560060"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _seat(key: str) -> str:
+    # то же выражение, что payload_int в app.models.event
+    return (
+        f"smallint GENERATED ALWAYS AS (CASE jsonb_typeof(payload -> '{key}') WHEN 'number' "
+        f"THEN CAST(CAST(payload ->> '{key}' AS NUMERIC) AS INTEGER) END) STORED"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # смена типа и обе генерируемые колонки — одна перезапись таблицы
+    op.execute(
+        "ALTER TABLE gameevent "
+        "ALTER COLUMN payload TYPE jsonb USING payload::jsonb, "
+        f"ADD COLUMN target_seat {_seat('target_seat')}, "
+        f"ADD COLUMN actor_seat {_seat('actor_seat')}"
+    )
+    op.create_index("ix_gameevent_game_ts", "gameevent", ["game_id", "ts"])
+    op.create_index("ix_gameevent_type_game", "gameevent", ["event_type_id", "game_id"])
+    op.create_index(
+        "ix_gameevent_payload",
+        "gameevent",
+        ["payload"],
+        postgresql_using="gin",
+        postgresql_ops={"payload": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_gameevent_payload", table_name="gameevent")
+    op.drop_index("ix_gameevent_type_game", table_name="gameevent")
+    op.drop_index("ix_gameevent_game_ts", table_name="gameevent")
+    op.execute(
+        "ALTER TABLE gameevent "
+        "DROP COLUMN actor_seat, "
+        "DROP COLUMN target_seat, "
+        "ALTER COLUMN payload TYPE json USING payload::json"
+    )
@@ -0,0 +1,34 @@
+"""refdataversion counter for the reference-data cache
+
+Revision ID: 3c9e7d20b6a4
+Revises: ed846e536910
+Create Date: 2026-10-18 15:02:11.318207
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9e7d20b6a4"
+down_revision: Union[str, Sequence[str], None] = "ed846e536910"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    refdataversion = op.create_table(
+        "refdataversion",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.bulk_insert(refdataversion, [{"id": 1, "version": 0}])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("refdataversion")
@@ -0,0 +1,53 @@
+"""gameevent seat columns: only integral values within smallint, NULL otherwise
+
+Revision ID: 5b1e7c3d8a20
+Revises: 9e47b2c05d13
+Create Date: 2026-10-18 21:05:37.218840
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1e7c3d8a20"
+down_revision: Union[str, Sequence[str], None] = "9e47b2c05d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# то же выражение, что payload_int в app.models.event: 2.5 и 40000 — NULL,
+# как в SQLite, а не округление и не ошибка INSERT
+SEAT = (
+    "smallint GENERATED ALWAYS AS ("
+    "CASE WHEN jsonb_typeof(payload -> '{k}') = 'number' "
+    "AND (payload ->> '{k}') ~ '^-?[0-9]{{1,5}}$' "
+    "THEN CASE WHEN CAST((payload ->> '{k}') AS INTEGER) BETWEEN -32768 AND 32767 "
+    "THEN CAST((payload ->> '{k}') AS SMALLINT) END END) STORED"
+)
+OLD_SEAT = (
+    "smallint GENERATED ALWAYS AS (CASE jsonb_typeof(payload -> '{k}') WHEN 'number' "
+    "THEN CAST(CAST(payload ->> '{k}' AS NUMERIC) AS INTEGER) END) STORED"
+)
+
+
+def _replace_seats(seat: str) -> None:
+    # выражение генерируемой колонки не меняется на месте (до PG 17) —
+    # пересоздаём обе одной перезаписью таблицы (на родителе — во всех секциях)
+    op.execute(
+        "ALTER TABLE gameevent "
+        "DROP COLUMN target_seat, "
+        "DROP COLUMN actor_seat, "
+        f"ADD COLUMN target_seat {seat.format(k='target_seat')}, "
+        f"ADD COLUMN actor_seat {seat.format(k='actor_seat')}"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_seats(SEAT)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_seats(OLD_SEAT)
@@ -0,0 +1,32 @@
+"""pg_trgm GIN index on lower(player.nickname) for search
+
+Revision ID: 6e0f2c9b8d15
+Revises: d41e8a6f93c7
+Create Date: 2026-10-18 16:47:05.221634
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6e0f2c9b8d15"
+down_revision: Union[str, Sequence[str], None] = "d41e8a6f93c7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # citext не имеет класса gin_trgm_ops — индексируем lower(nickname::text)
+    op.execute(
+        "CREATE INDEX ix_player_nickname_trgm ON player "
+        "USING gin (lower(CAST(nickname AS TEXT)) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_player_nickname_trgm", table_name="player")
@@ -0,0 +1,61 @@
+"""playerstats aggregates
+
+Revision ID: 9a5b1f7c2e08
+Revises: 3c9e7d20b6a4
+Create Date: 2026-10-18 15:40:27.512904
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9a5b1f7c2e08"
+down_revision: Union[str, Sequence[str], None] = "3c9e7d20b6a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "playerstats",
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("games", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("city_games", sa.Integer(), nullable=False),
+        sa.Column("city_wins", sa.Integer(), nullable=False),
+        sa.Column("mafia_games", sa.Integer(), nullable=False),
+        sa.Column("mafia_wins", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["player_id"], ["player.id"]),
+        sa.PrimaryKeyConstraint("player_id"),
+    )
+    # существующие игры — одной пересборкой (то же, что player_stats.rebuild)
+    op.execute("""
+        INSERT INTO playerstats
+            (player_id, games, wins, city_games, city_wins, mafia_games, mafia_wins, points)
+        SELECT gp.player_id,
+               count(*),
+               sum(CASE WHEN (gp.role IN ('citizen', 'sheriff') AND g.winner_faction = 'city')
+                          OR (gp.role IN ('mafia', 'don') AND g.winner_faction = 'mafia')
+                        THEN 1 ELSE 0 END),
+               sum(CASE WHEN gp.role IN ('citizen', 'sheriff') THEN 1 ELSE 0 END),
+               sum(CASE WHEN gp.role IN ('citizen', 'sheriff') AND g.winner_faction = 'city'
+                        THEN 1 ELSE 0 END),
+               sum(CASE WHEN gp.role IN ('mafia', 'don') THEN 1 ELSE 0 END),
+               sum(CASE WHEN gp.role IN ('mafia', 'don') AND g.winner_faction = 'mafia'
+                        THEN 1 ELSE 0 END),
+               coalesce(sum(gp.total_points), 0)
+        FROM gameplayer gp
+        JOIN game g ON g.id = gp.game_id
+        WHERE g.state = 'finished' AND NOT g.aborted
+        GROUP BY gp.player_id
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("playerstats")
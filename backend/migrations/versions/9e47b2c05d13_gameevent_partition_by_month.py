@@ -0,0 +1,159 @@
+"""gameevent range-partitioned by month, gameeventarchive for cold logs
+
+Revision ID: 9e47b2c05d13
+Revises: 3c81f0a2d9e4
+Create Date: 2026-10-18 20:12:53.604117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e47b2c05d13"
+down_revision: Union[str, Sequence[str], None] = "3c81f0a2d9e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3  # как app.services.event_archive.MONTHS_AHEAD на момент миграции
+
+SEAT = (
+    "smallint GENERATED ALWAYS AS (CASE jsonb_typeof(payload -> '{k}') WHEN 'number' "
+    "THEN CAST(CAST(payload ->> '{k}' AS NUMERIC) AS INTEGER) END) STORED"
+)
+COLUMNS = "id, game_id, ts, event_type_id, payload, client_seq"
+
+
+def _indexes() -> None:
+    op.create_index("ix_gameevent_game_ts", "gameevent", ["game_id", "ts"])
+    op.create_index("ix_gameevent_type_game", "gameevent", ["event_type_id", "game_id"])
+    op.create_index(
+        "ix_gameevent_payload",
+        "gameevent",
+        ["payload"],
+        postgresql_using="gin",
+        postgresql_ops={"payload": "jsonb_path_ops"},
+    )
+
+
+def _drop_indexes() -> None:
+    op.drop_index("ix_gameevent_payload", table_name="gameevent")
+    op.drop_index("ix_gameevent_type_game", table_name="gameevent")
+    op.drop_index("ix_gameevent_game_ts", table_name="gameevent")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # старую таблицу — в сторону; имена индексов и PK освобождаем для новой
+    _drop_indexes()
+    op.execute("ALTER TABLE gameevent DROP CONSTRAINT uq_gameevent_game_seq")
+    op.execute("ALTER TABLE gameevent RENAME TO gameevent_plain")
+    op.execute(
+        "ALTER TABLE gameevent_plain RENAME CONSTRAINT gameevent_pkey TO gameevent_plain_pkey"
+    )
+
+    # ключ секционирования обязан входить в PK и уникальные ключи; повтор
+    # автосейва с другим ts ключ не поймает — его отсеивает ingest_batch
+    op.execute(f"""
+        CREATE TABLE gameevent (
+            id integer NOT NULL DEFAULT nextval('gameevent_id_seq'),
+            game_id integer NOT NULL REFERENCES game (id),
+            ts timestamptz NOT NULL,
+            event_type_id integer NOT NULL REFERENCES eventtype (id),
+            payload jsonb NOT NULL,
+            client_seq integer,
+            target_seat {SEAT.format(k="target_seat")},
+            actor_seat {SEAT.format(k="actor_seat")},
+            CONSTRAINT gameevent_pkey PRIMARY KEY (id, ts),
+            CONSTRAINT uq_gameevent_game_seq UNIQUE (game_id, client_seq, ts)
+        ) PARTITION BY RANGE (ts)
+        """)
+    op.execute("CREATE TABLE gameevent_default PARTITION OF gameevent DEFAULT")
+    # месяцы от самого старого события до текущего + MONTHS_AHEAD (UTC)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            m date;
+            last date := (date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            m := coalesce(
+                (SELECT date_trunc('month', min(ts) AT TIME ZONE 'UTC')::date FROM gameevent_plain),
+                date_trunc('month', now() AT TIME ZONE 'UTC')::date
+            );
+            WHILE m <= last LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF gameevent FOR VALUES FROM (%L) TO (%L)',
+                    'gameevent_y' || to_char(m, 'YYYY') || 'm' || to_char(m, 'MM'),
+                    m::text || ' 00:00:00+00',
+                    (m + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$
+        """)
+    op.execute(
+        f"INSERT INTO gameevent ({COLUMNS}) SELECT {COLUMNS} FROM gameevent_plain"
+    )
+    op.execute(
+        "ALTER SEQUENCE gameevent_id_seq OWNED BY gameevent.id"
+    )  # иначе уйдёт с DROP
+    op.execute("DROP TABLE gameevent_plain")
+    _indexes()  # на родителе — сразу во всех секциях
+    op.execute("ANALYZE gameevent")
+
+    op.create_table(
+        "gameeventarchive",
+        sa.Column("game_id", sa.Integer(), nullable=False),
+        sa.Column("events", sa.Integer(), nullable=False),
+        sa.Column("first_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_ts", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("blob", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["game_id"], ["game.id"]),
+        sa.PrimaryKeyConstraint("game_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # blob'ы средствами SQL не распаковать — не теряем архив молча
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM gameeventarchive) THEN
+                RAISE EXCEPTION 'gameeventarchive is not empty: restore archived events first';
+            END IF;
+        END $$
+        """)
+    op.drop_table("gameeventarchive")
+
+    _drop_indexes()
+    op.execute("ALTER TABLE gameevent RENAME TO gameevent_parted")
+    op.execute(
+        "ALTER TABLE gameevent_parted RENAME CONSTRAINT gameevent_pkey TO gameevent_parted_pkey"
+    )
+    op.execute(
+        "ALTER TABLE gameevent_parted RENAME CONSTRAINT uq_gameevent_game_seq TO uq_gameevent_parted_seq"
+    )
+    op.execute(f"""
+        CREATE TABLE gameevent (
+            id integer NOT NULL DEFAULT nextval('gameevent_id_seq'),
+            game_id integer NOT NULL REFERENCES game (id),
+            ts timestamptz NOT NULL,
+            event_type_id integer NOT NULL REFERENCES eventtype (id),
+            payload jsonb NOT NULL,
+            client_seq integer,
+            target_seat {SEAT.format(k="target_seat")},
+            actor_seat {SEAT.format(k="actor_seat")},
+            CONSTRAINT gameevent_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_gameevent_game_seq UNIQUE (game_id, client_seq)
+        )
+        """)
+    op.execute(
+        f"INSERT INTO gameevent ({COLUMNS}) SELECT {COLUMNS} FROM gameevent_parted"
+    )
+    op.execute("ALTER SEQUENCE gameevent_id_seq OWNED BY gameevent.id")
+    op.execute("DROP TABLE gameevent_parted")  # вместе со всеми секциями
+    _indexes()
@@ -0,0 +1,29 @@
+"""game (date, id) index for keyset pagination
+
+Revision ID: af838395e4e6
+Revises: 4bdcd2511081
+Create Date: 2026-10-18 10:12:41.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "af838395e4e6"
+down_revision: Union[str, Sequence[str], None] = "4bdcd2511081"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # player (nickname, id) покрывается уникальным ix_player_nickname —
+    # nickname уникален, id в курсоре служит только тай‑брейкером.
+    op.create_index("ix_game_date_id", "game", ["date", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_game_date_id", table_name="game")
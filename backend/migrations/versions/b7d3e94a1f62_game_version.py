@@ -0,0 +1,31 @@
+"""game.version for optimistic state transitions
+
+Revision ID: b7d3e94a1f62
+Revises: 6e0f2c9b8d15
+Create Date: 2026-10-18 17:20:39.664081
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d3e94a1f62"
+down_revision: Union[str, Sequence[str], None] = "6e0f2c9b8d15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "game",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("game", "version")
@@ -0,0 +1,47 @@
+"""gamestatesnapshot: cut the log by client_seq instead of GameEvent.id
+
+Revision ID: c2f6a9d1e347
+Revises: 5b1e7c3d8a20
+Create Date: 2026-10-18 23:10:12.504318
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2f6a9d1e347"
+down_revision: Union[str, Sequence[str], None] = "5b1e7c3d8a20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # старые снимки резаны по id и могли запечь не тот порядок событий;
+    # это кэш — resume пересоберёт состояние из лога
+    op.execute("DELETE FROM gamestatesnapshot")
+    op.add_column(
+        "gamestatesnapshot", sa.Column("client_seq", sa.Integer(), nullable=False)
+    )
+    op.drop_index("ix_gamestatesnapshot_game_event", table_name="gamestatesnapshot")
+    op.create_index(
+        "ix_gamestatesnapshot_game_seq",
+        "gamestatesnapshot",
+        ["game_id", "client_seq"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_gamestatesnapshot_game_seq", table_name="gamestatesnapshot")
+    op.create_index(
+        "ix_gamestatesnapshot_game_event",
+        "gamestatesnapshot",
+        ["game_id", "event_id"],
+        unique=False,
+    )
+    op.drop_column("gamestatesnapshot", "client_seq")
@@ -0,0 +1,81 @@
+"""daily/monthly rollups for the club dashboard
+
+Revision ID: d41e8a6f93c7
+Revises: 9a5b1f7c2e08
+Create Date: 2026-10-18 16:12:48.037716
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "d41e8a6f93c7"
+down_revision: Union[str, Sequence[str], None] = "9a5b1f7c2e08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# тип создан в ed846e536910
+faction = postgresql.ENUM("city", "mafia", name="faction", create_type=False)
+
+WON = """
+    (gp.role IN ('citizen', 'sheriff') AND g.winner_faction = 'city')
+    OR (gp.role IN ('mafia', 'don') AND g.winner_faction = 'mafia')
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "playerdailystats",
+        sa.Column("span", sa.String(length=5), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("player_id", sa.Integer(), nullable=False),
+        sa.Column("games", sa.Integer(), nullable=False),
+        sa.Column("wins", sa.Integer(), nullable=False),
+        sa.Column("points", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["player_id"], ["player.id"]),
+        sa.PrimaryKeyConstraint("span", "date", "player_id"),
+    )
+    op.create_table(
+        "factiondailystats",
+        sa.Column("span", sa.String(length=5), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("winner_faction", faction, nullable=False),
+        sa.Column("players_qty", sa.Integer(), nullable=False),
+        sa.Column("games", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("span", "date", "winner_faction", "players_qty"),
+    )
+
+    # бэкфилл — то же, что rollups.rebuild, но одним проходом в SQL
+    for span, bucket in (
+        ("day", "g.date"),
+        ("month", "date_trunc('month', g.date)::date"),
+    ):
+        op.execute(f"""
+            INSERT INTO playerdailystats (span, date, player_id, games, wins, points)
+            SELECT '{span}', {bucket}, gp.player_id, count(*),
+                   sum(CASE WHEN {WON} THEN 1 ELSE 0 END),
+                   coalesce(sum(gp.total_points), 0)
+            FROM gameplayer gp
+            JOIN game g ON g.id = gp.game_id
+            WHERE g.state = 'finished' AND NOT g.aborted
+            GROUP BY 2, gp.player_id
+            """)
+        op.execute(f"""
+            INSERT INTO factiondailystats (span, date, winner_faction, players_qty, games)
+            SELECT '{span}', {bucket}, g.winner_faction, g.players_qty, count(*)
+            FROM game g
+            WHERE g.state = 'finished' AND NOT g.aborted
+              AND g.winner_faction IS NOT NULL
+            GROUP BY 2, g.winner_faction, g.players_qty
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("factiondailystats")
+    op.drop_table("playerdailystats")
@@ -0,0 +1,45 @@
+"""gameplayer.conditions: NULL for masks the scoring engine never computed
+
+Revision ID: d8e4b1f6a293
+Revises: c2f6a9d1e347
+Create Date: 2026-10-18 23:42:08.117265
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d8e4b1f6a293"
+down_revision: Union[str, Sequence[str], None] = "c2f6a9d1e347"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column(
+        "gameplayer",
+        "conditions",
+        existing_type=sa.Integer(),
+        nullable=True,
+        server_default=None,
+    )
+    # 0 от server_default неотличим от «ни одного условия»: маски заново
+    # восстанавливает python -m app.commands.backfill_conditions по логу,
+    # а до того rescore_rule_set такие места пропускает
+    op.execute("UPDATE gameplayer SET conditions = NULL WHERE conditions = 0")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE gameplayer SET conditions = 0 WHERE conditions IS NULL")
+    op.alter_column(
+        "gameplayer",
+        "conditions",
+        existing_type=sa.Integer(),
+        nullable=False,
+        server_default="0",
+    )
@@ -0,0 +1,39 @@
+"""importcheckpoint for resumable archive imports
+
+Revision ID: ed5ad6560060
+Revises: b7d3e94a1f62
+Create Date: 2026-10-18 18:41:07.250913
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ed5ad6560060"
+down_revision: Union[str, Sequence[str], None] = "b7d3e94a1f62"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "importcheckpoint",
+        sa.Column(
+            "source", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False
+        ),
+        sa.Column("records", sa.Integer(), nullable=False),
+        sa.Column("games", sa.Integer(), nullable=False),
+        sa.Column("rejected", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("importcheckpoint")
@@ -0,0 +1,44 @@
+"""game.winner_faction, gameplayer.conditions for the scoring engine
+
+Revision ID: ed846e536910
+Revises: f1abca8044f5
+Create Date: 2026-10-18 14:21:53.904472
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "ed846e536910"
+down_revision: Union[str, Sequence[str], None] = "f1abca8044f5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+faction = sa.Enum("city", "mafia", name="faction")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    faction.create(op.get_bind(), checkfirst=True)
+    op.add_column("game", sa.Column("winner_faction", faction, nullable=True))
+    op.add_column(
+        "gameplayer",
+        sa.Column("conditions", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_index(
+        op.f("ix_extrapoints_game_player_id"),
+        "extrapoints",
+        ["game_player_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_extrapoints_game_player_id"), table_name="extrapoints")
+    op.drop_column("gameplayer", "conditions")
+    op.drop_column("game", "winner_faction")
+    faction.drop(op.get_bind(), checkfirst=True)
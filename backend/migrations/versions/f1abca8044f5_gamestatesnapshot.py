@@ -0,0 +1,48 @@
+"""gamestatesnapshot table for live game resume
+
+Revision ID: f1abca8044f5
+Revises: 087c44f351eb
+Create Date: 2026-10-18 12:40:05.274416
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1abca8044f5"
+down_revision: Union[str, Sequence[str], None] = "087c44f351eb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "gamestatesnapshot",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("game_id", sa.Integer(), nullable=False),
+        sa.Column("event_id", sa.Integer(), nullable=False),
+        sa.Column("events_applied", sa.Integer(), nullable=False),
+        sa.Column("state", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["game_id"],
+            ["game.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_gamestatesnapshot_game_event",
+        "gamestatesnapshot",
+        ["game_id", "event_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_gamestatesnapshot_game_event", table_name="gamestatesnapshot")
+    op.drop_table("gamestatesnapshot")
@@ -0,0 +1,129 @@
+import csv
+import datetime as dt
+import gzip
+import io
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.enums import GameRole
+from app.crud import games as crud
+from app.models.event import EventType
+from app.models.game import Game
+from app.schemas.games import GameSetup
+
+ROLES = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [GameRole.citizen] * 6
+
+
+# ────────────── helpers ─────────────────────────────────
+def _game(session: Session, day: dt.date) -> int:
+	"""Игра на 10 мест с уникальными никами в заданный (прошлый) день."""
+	tag = uuid.uuid4().hex[:6]
+	data = GameSetup(
+		players_qty=10,
+		rule_set_id=1,
+		gm_id=uuid.uuid4(),
+		seats=[{"nickname": f"exp_{tag}_{i}", "role": r} for i, r in enumerate(ROLES)],
+	)
+	game_id = crud.setup(session, data).game.id
+	game = session.get(Game, game_id)
+	game.date = day
+	session.commit()
+	return game_id
+
+
+def _lines(body: bytes) -> list[dict]:
+	return [json.loads(line) for line in body.splitlines()]
+
+
+# ────────────── NDJSON ──────────────────────────────────
+def test_ndjson_denormalizes_seats_within_range(client: TestClient, session: Session):
+	inside = [_game(session, dt.date(1990, 1, d)) for d in (10, 11)]
+	_game(session, dt.date(1990, 2, 1))
+
+	resp = client.get(
+		"/export/games.ndjson", params={"date_from": "1990-01-01", "date_to": "1990-01-31"}
+	)
+	assert resp.status_code == 200
+	assert resp.headers["content-type"] == "application/x-ndjson"
+
+	games = _lines(resp.content)
+	assert [g["id"] for g in games] == inside
+	seats = games[0]["seats"]
+	assert [s["seat_no"] for s in seats] == list(range(1, 11))
+	assert seats[0]["role"] == "Don" and seats[0]["nickname"].startswith("exp_")
+	assert "events" not in games[0]
+
+
+def test_ndjson_with_events(client: TestClient, session: Session):
+	if not session.exec(select(EventType).where(EventType.code == "vote_out")).first():
+		session.add(EventType(code="vote_out"))
+		session.commit()
+	game_id = _game(session, dt.date(1991, 3, 3))
+	events = [
+		{"client_seq": s, "code": "vote_out", "ts": f"2025-07-23T20:00:0{s}+00:00", "payload": {"target_seat": s}}
+		for s in (1, 2)
+	]
+	assert client.post(f"/games/{game_id}/events:batch", json={"events": events}).status_code == 200
+
+	resp = client.get(
+		"/export/games.ndjson",
+		params={"date_from": "1991-03-03", "date_to": "1991-03-03", "events": True},
+	)
+	(game,) = _lines(resp.content)
+	assert [(e["seq"], e["code"]) for e in game["events"]] == [(1, "vote_out"), (2, "vote_out")]
+
+
+def test_events_follow_game_order_not_commit_order(client: TestClient, session: Session):
+	if not session.exec(select(EventType).where(EventType.code == "phase")).first():
+		session.add(EventType(code="phase"))
+		session.commit()
+	game_id = _game(session, dt.date(1991, 4, 4))
+	url = f"/games/{game_id}/events:batch"
+	# seq 2 закоммичен раньше seq 1, и часы клиента у него отстали
+	for seq, ts, phase in ((2, "20:00:01", "day"), (1, "20:00:05", "night")):
+		event = {"client_seq": seq, "code": "phase", "ts": f"2025-07-23T{ts}+00:00", "payload": {"phase": phase}}
+		assert client.post(url, json={"events": [event]}).status_code == 200
+
+	resp = client.get(
+		"/export/games.ndjson",
+		params={"date_from": "1991-04-04", "date_to": "1991-04-04", "events": True},
+	)
+	(game,) = _lines(resp.content)
+	assert [e["seq"] for e in game["events"]] == [1, 2]
+
+
+def test_gzip_stream(client: TestClient, session: Session):
+	game_id = _game(session, dt.date(1992, 5, 5))
+
+	resp = client.get(
+		"/export/games.ndjson",
+		params={"date_from": "1992-05-05", "date_to": "1992-05-05", "gzip": True},
+	)
+	assert resp.headers["content-type"] == "application/gzip"
+	assert "games.ndjson.gz" in resp.headers["content-disposition"]
+	assert [g["id"] for g in _lines(gzip.decompress(resp.content))] == [game_id]
+
+
+# ────────────── CSV ─────────────────────────────────────
+def test_csv_one_row_per_seat(client: TestClient, session: Session):
+	game_id = _game(session, dt.date(1993, 7, 7))
+
+	resp = client.get(
+		"/export/games.csv", params={"date_from": "1993-07-07", "date_to": "1993-07-07"}
+	)
+	assert resp.headers["content-type"].startswith("text/csv")
+	rows = list(csv.DictReader(io.StringIO(resp.text)))
+	assert len(rows) == 10
+	assert {r["game_id"] for r in rows} == {str(game_id)}
+	assert rows[0]["game_date"] == "1993-07-07"
+	assert (rows[0]["seat_no"], rows[0]["role"]) == ("1", "Don")
+
+
+def test_inverted_range_is_rejected(client: TestClient):
+	resp = client.get(
+		"/export/games.csv", params={"date_from": "2000-01-02", "date_to": "2000-01-01"}
+	)
+	assert resp.status_code == 400
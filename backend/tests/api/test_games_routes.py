@@ -0,0 +1,350 @@
+import json
+import uuid
+
+import pytest
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core.enums import GameRole, GameState
+from app.crud import games as crud
+from app.models.event import EventType, GameEvent
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+from app.schemas.games import GameCreate
+from app.services.broadcast import hub
+
+
+# ────────────── helpers ─────────────────────────────────
+def _game_id(session: Session) -> int:
+	game = crud.create(session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4())
+	return game.id
+
+
+def _event_types(session: Session, *codes: str) -> None:
+	existing = set(session.exec(select(EventType.code)).all())
+	session.add_all(EventType(code=c) for c in codes if c not in existing)
+	session.commit()
+
+
+def _events(*seqs: int, code: str = "vote_out") -> list[dict]:
+	return [
+		{
+			"client_seq": s,
+			"code": code,
+			"ts": f"2025-07-23T20:00:{s:02d}+00:00",
+			"payload": {"target_seat": s % 10 + 1},
+		}
+		for s in seqs
+	]
+
+
+# ────────────── events:batch ────────────────────────────
+def test_batch_is_idempotent(client: TestClient, session: Session):
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+	url = f"/games/{game_id}/events:batch"
+
+	first = client.post(url, json={"events": _events(1, 2, 3)})
+	assert first.status_code == 200
+	assert first.json() == {"acked_seq": 3, "inserted": 3}
+
+	# реконнект: клиент не знает, дошёл ли батч, и шлёт его снова + хвост
+	replay = client.post(url, json={"events": _events(2, 3, 4, 5)})
+	assert replay.json() == {"acked_seq": 5, "inserted": 2}
+
+	stored = session.exec(
+		select(GameEvent.client_seq).where(GameEvent.game_id == game_id)
+	).all()
+	assert sorted(stored) == [1, 2, 3, 4, 5]
+
+	assert client.post(url, json={"events": []}).json()["acked_seq"] == 5
+
+
+def test_retry_with_new_ts_is_not_duplicated(client: TestClient, session: Session):
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+	url = f"/games/{game_id}/events:batch"
+	client.post(url, json={"events": _events(1, 2)})
+
+	# клиент пересобрал батч и проставил ts заново — ключ (game_id, client_seq, ts) не совпадёт
+	retry = _events(2, 3)
+	retry[0]["ts"] = "2025-07-23T21:00:00+00:00"
+	assert client.post(url, json={"events": retry}).json() == {"acked_seq": 3, "inserted": 1}
+
+	stored = session.exec(select(GameEvent.client_seq).where(GameEvent.game_id == game_id)).all()
+	assert sorted(stored) == [1, 2, 3]
+
+
+def test_out_of_order_batches_are_not_lost(client: TestClient, session: Session):
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+	url = f"/games/{game_id}/events:batch"
+
+	# автосейв N+1 обогнал автосейв N: подтверждать 5 ещё рано
+	assert client.post(url, json={"events": _events(4, 5)}).json() == {"acked_seq": None, "inserted": 2}
+	assert client.post(url, json={"events": _events(1, 2, 3)}).json() == {"acked_seq": 5, "inserted": 3}
+
+	stored = session.exec(select(GameEvent.client_seq).where(GameEvent.game_id == game_id)).all()
+	assert sorted(stored) == [1, 2, 3, 4, 5]
+
+
+def test_batch_rejects_unknown_code(client: TestClient, session: Session):
+	game_id = _game_id(session)
+	resp = client.post(
+		f"/games/{game_id}/events:batch",
+		json={"events": _events(1, code="no_such_code")},
+	)
+	assert resp.status_code == 422
+
+
+def test_batch_rejects_malformed_payload(client: TestClient, session: Session):
+	_event_types(session, "kill")
+	game_id = _game_id(session)
+	events = [{"client_seq": 1, "code": "kill", "ts": "2025-07-23T20:00:01+00:00", "payload": {}}]
+
+	resp = client.post(f"/games/{game_id}/events:batch", json={"events": events})
+
+	assert resp.status_code == 422
+	assert "target_seat" in str(resp.json()["detail"])
+	assert client.get(f"/games/{game_id}/state").status_code == 200
+	assert not session.exec(select(GameEvent).where(GameEvent.game_id == game_id)).all()
+
+
+def test_batch_rejects_seat_codes(client: TestClient, session: Session):
+	# фол пишет только эндпоинт места — иначе он посчитался бы дважды
+	_event_types(session, "vote_out", "foul", "remove")
+	game_id = _game_id(session)
+	for code in ("foul", "remove"):
+		events = [*_events(1), *_events(2, code=code)]
+		resp = client.post(f"/games/{game_id}/events:batch", json={"events": events})
+		assert resp.status_code == 422
+		assert "seats" in str(resp.json()["detail"])
+	assert not session.exec(select(GameEvent).where(GameEvent.game_id == game_id)).all()
+
+
+def test_batch_requires_increasing_seq(client: TestClient, session: Session):
+	game_id = _game_id(session)
+	resp = client.post(f"/games/{game_id}/events:batch", json={"events": _events(2, 1)})
+	assert resp.status_code == 422
+
+
+def test_batch_missing_game(client: TestClient):
+	resp = client.post("/games/999999/events:batch", json={"events": []})
+	assert resp.status_code == 404
+
+
+# ────────────── replay ──────────────────────────────────
+def _finished_game(client: TestClient, session: Session, *seqs: int) -> int:
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+	client.post(f"/games/{game_id}/events:batch", json={"events": _events(*seqs)})
+	game = session.get(Game, game_id)
+	game.state = GameState.finished
+	session.add(game)
+	session.commit()
+	return game_id
+
+
+def test_replay_frame_at_position(client: TestClient, session: Session):
+	game_id = _finished_game(client, session, *range(1, 41))
+
+	resp = client.get(f"/games/{game_id}/replay", params={"at": 35})
+	assert resp.status_code == 200
+	body = resp.json()
+	assert (body["at"], body["total"], body["event"]["seq"]) == (35, 40, 35)
+	assert body["state"]["applied"] == 35
+	assert body["event"]["payload"] == {"target_seat": 6}
+	assert body["state"]["seats"]["2"]["removal"] == "vote_out"  # seq 1
+
+	assert client.get(f"/games/{game_id}/replay").json()["at"] == 40
+	assert client.get(f"/games/{game_id}/replay", params={"at": 41}).status_code == 400
+
+
+def test_replay_timeline_stream(client: TestClient, session: Session):
+	game_id = _finished_game(client, session, 1, 2, 3)
+
+	resp = client.get(f"/games/{game_id}/replay.ndjson", params={"start": 1})
+	assert resp.status_code == 200
+	frames = [json.loads(line) for line in resp.text.splitlines()]
+	assert [f["at"] for f in frames] == [1, 2, 3]
+	assert frames[-1] == client.get(f"/games/{game_id}/replay").json()
+
+
+def test_replay_requires_finished_game(client: TestClient, session: Session):
+	assert client.get(f"/games/{_game_id(session)}/replay").status_code == 409
+	assert client.get("/games/999999/replay").status_code == 404
+
+
+# ────────────── live state ──────────────────────────────
+def test_state_folds_ingested_events(client: TestClient, session: Session):
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+	client.post(f"/games/{game_id}/events:batch", json={"events": _events(2, 12, 22)})
+
+	resp = client.get(f"/games/{game_id}/state")
+	assert resp.status_code == 200
+	body = resp.json()
+	assert body["applied"] == 3
+	assert body["seats"]["3"]["removal"] == "vote_out"
+
+
+def test_live_ws_receives_ingested_events(client: TestClient, session: Session):
+	_event_types(session, "vote_out")
+	game_id = _game_id(session)
+
+	with client.websocket_connect(f"/games/{game_id}/live") as ws:
+		client.post(f"/games/{game_id}/events:batch", json={"events": _events(1, 2)})
+		message = ws.receive_json()
+
+	assert message["type"] == "events"
+	assert [e["client_seq"] for e in message["events"]] == [1, 2]
+	assert message["events"][0]["code"] == "vote_out"
+
+
+def test_live_ws_detects_disconnect_on_idle_game(client: TestClient, session: Session):
+	game_id = _game_id(session)
+
+	with client.websocket_connect(f"/games/{game_id}/live"):
+		assert hub.subscribers(game_id) == 1
+
+	assert hub.subscribers(game_id) == 0
+
+
+def test_live_ws_follows_seats_and_closes_with_game(client: TestClient, session: Session):
+	_event_types(session, "foul", "remove")
+	tag = f"lv_{uuid.uuid4().hex[:6]}"
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": _seats(tag)}
+	game_id = client.post("/games/setup", json=body).json()["game"]["id"]
+
+	with client.websocket_connect(f"/games/{game_id}/live") as ws:
+		client.post(f"/games/{game_id}/state", json={"state": "live"})
+		client.post(f"/games/{game_id}/seats/3/fouls")
+		client.post(f"/games/{game_id}/seats/5/removal")
+		client.post(f"/games/{game_id}/state", json={"state": "aborted"})
+		messages = [ws.receive_json() for _ in range(6)]
+		with pytest.raises(WebSocketDisconnect):
+			ws.receive_json()
+
+	assert [m["type"] for m in messages] == ["game", "seat", "events", "seat", "events", "game"]
+	assert messages[0]["game"]["state"] == "live"
+	assert (messages[1]["seat"]["seat_no"], messages[1]["seat"]["fouls_count"]) == (3, 1)
+	assert messages[2]["events"][0]["code"] == "foul"
+	assert messages[3]["seat"]["removed"] is True
+	assert messages[4]["events"][0]["payload"] == {"target_seat": 5}
+	assert messages[5]["game"]["state"] == "aborted"
+	assert hub.subscribers(game_id) == 0
+
+
+def test_live_sse_rejects_missing_and_closed_games(client: TestClient, session: Session):
+	game_id = _finished_game(client, session)
+
+	assert client.get("/games/999999/live.sse").status_code == 404
+	assert client.get(f"/games/{game_id}/live.sse").status_code == 409
+	assert hub.subscribers(game_id) == 0
+
+
+# ────────────── setup ───────────────────────────────────
+def _seats(tag: str) -> list[dict]:
+	roles = ["Don", "Mafia", "Mafia", "Sheriff"] + ["Citizen"] * 6
+	return [{"nickname": f"{tag}_{i}", "role": r} for i, r in enumerate(roles, start=1)]
+
+
+def test_setup_creates_game_and_missing_players(client: TestClient, session: Session):
+	tag = f"su_{uuid.uuid4().hex[:6]}"
+	session.add(Player(nickname=f"{tag}_3"))
+	session.commit()
+
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": _seats(tag)}
+	resp = client.post("/games/setup", json=body)
+	assert resp.status_code == 201
+	out = resp.json()
+	assert out["game"]["state"] == "draft"
+	assert [s["seat_no"] for s in out["seats"]] == list(range(1, 11))
+	assert [s["created"] for s in out["seats"]] == [True, True, False] + [True] * 7
+
+	seats = session.exec(
+		select(GamePlayer).where(GamePlayer.game_id == out["game"]["id"]).order_by(GamePlayer.seat_no)
+	).all()
+	assert [gp.player_id for gp in seats] == [s["player_id"] for s in out["seats"]]
+	assert seats[0].role == GameRole.don
+
+
+def test_setup_validates_roles(client: TestClient):
+	tag = f"su_{uuid.uuid4().hex[:6]}"
+	seats = _seats(tag)
+	seats[3]["role"] = "Citizen"  # без шерифа
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": seats}
+	resp = client.post("/games/setup", json=body)
+	assert resp.status_code == 422
+	assert "sheriff" in resp.text
+
+	body["seats"] = _seats(tag)
+	body["seats"][1]["nickname"] = body["seats"][0]["nickname"].upper()
+	assert client.post("/games/setup", json=body).status_code == 422
+
+
+# ────────────── state / seats ───────────────────────────
+def test_state_change_conflicts(client: TestClient, session: Session):
+	game_id = _game_id(session)
+	url = f"/games/{game_id}/state"
+
+	resp = client.post(url, json={"state": "live", "expected_version": 0})
+	assert resp.status_code == 200
+	assert resp.json()["version"] == 1
+
+	assert client.post(url, json={"state": "aborted", "expected_version": 0}).status_code == 409
+	assert client.post(url, json={"state": "draft"}).status_code == 409
+	assert client.post("/games/999999/state", json={"state": "live"}).status_code == 404
+
+
+def test_draft_to_live_is_one_update(client: TestClient, session: Session, query_budget):
+	game_id = _game_id(session)
+	with query_budget(1):
+		resp = client.post(f"/games/{game_id}/state", json={"state": "live"})
+	assert resp.json()["state"] == "live"
+
+
+def test_seat_endpoints_write_the_log(client: TestClient, session: Session):
+	_event_types(session, "foul", "remove")
+	tag = f"sl_{uuid.uuid4().hex[:6]}"
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": _seats(tag)}
+	game_id = client.post("/games/setup", json=body).json()["game"]["id"]
+	client.post(f"/games/{game_id}/state", json={"state": "live"})
+	for _ in range(2):
+		client.post(f"/games/{game_id}/seats/3/fouls")
+	client.post(f"/games/{game_id}/seats/7/removal")
+
+	state = client.get(f"/games/{game_id}/state").json()
+	assert state["applied"] == 3
+	assert state["seats"]["3"]["fouls"] == 2
+	assert state["seats"]["7"]["removed"] is True
+
+
+def test_foul_endpoint(client: TestClient, session: Session):
+	tag = f"fl_{uuid.uuid4().hex[:6]}"
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": _seats(tag)}
+	game_id = client.post("/games/setup", json=body).json()["game"]["id"]
+	url = f"/games/{game_id}/seats/3/fouls"
+
+	assert client.post(url).status_code == 409  # игра ещё draft
+	client.post(f"/games/{game_id}/state", json={"state": "live"})
+	resp = client.post(url)
+	assert resp.status_code == 200
+	assert (resp.json()["seat_no"], resp.json()["fouls_count"]) == (3, 1)
+	assert client.post(f"/games/{game_id}/seats/3/removal").json()["removed"] is True
+	assert client.post(url).status_code == 409
+
+
+# ────────────── SQL budget ──────────────────────────────
+def test_setup_query_budget(client: TestClient, query_budget):
+	tag = f"qb_{uuid.uuid4().hex[:6]}"
+	body = {"players_qty": 10, "rule_set_id": 1, "gm_id": str(uuid.uuid4()), "seats": _seats(tag)}
+	# игра, новые игроки, (существующие), места — без запроса на каждое место
+	with query_budget(4):
+		assert client.post("/games/setup", json=body).status_code == 201
+
+
+def test_list_page_query_budget(client: TestClient, query_budget):
+	with query_budget(1):
+		assert client.get("/games/page", params={"limit": 20}).status_code == 200
@@ -0,0 +1,75 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core import httpcache
+from app.core.config import get_settings
+from app.crud import games as crud
+from app.main import app
+from app.models.player import Player
+from app.schemas.games import GameCreate
+
+URLS = [
+	"/players/?limit=500",
+	"/players/page?limit=3",
+	"/players/page?limit=3&order=nickname",
+	"/games/?limit=500",
+	"/games/page?limit=3",
+]
+
+
+@pytest.fixture()
+def fast_path(monkeypatch):
+	def toggle(on: bool) -> None:
+		monkeypatch.setattr(get_settings(), "json_fast_path", on)
+		httpcache.cache.clear()  # иначе второй запрос отдаст тело из кэша
+
+	return toggle
+
+
+def _seed(session: Session) -> None:
+	tag = uuid.uuid4().hex[:6]
+	session.add_all([Player(nickname=f"fast_{tag}_{i}") for i in range(3)])
+	session.add(Player(nickname=f"Ёжик_{tag}", email="e@x.io", is_registered=True))
+	session.commit()
+	for _ in range(3):
+		crud.create(session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4())
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_fast_path_body_matches_model_path(client: TestClient, session: Session, fast_path, url):
+	_seed(session)
+
+	fast_path(False)
+	slow = client.get(url)
+	fast_path(True)
+	fast = client.get(url)
+
+	assert slow.status_code == fast.status_code == 200
+	assert fast.headers["content-type"] == "application/json"
+	assert fast.json() == slow.json()
+
+
+def test_fast_path_cursor_walks_all_pages(client: TestClient, session: Session, fast_path):
+	_seed(session)
+	fast_path(True)
+
+	ids, cursor = [], None
+	while True:
+		params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+		body = client.get("/players/page", params=params).json()
+		ids.extend(p["id"] for p in body["items"])
+		if (cursor := body["next_cursor"]) is None:
+			break
+	assert ids == sorted(ids) and len(ids) == len(set(ids)) >= 4
+
+
+def test_openapi_schema_unchanged(fast_path):
+	fast_path(False)
+	app.openapi_schema = None
+	before = app.openapi()
+	fast_path(True)
+	app.openapi_schema = None
+	assert app.openapi() == before
@@ -0,0 +1,75 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models.player import Player
+
+
+def _add_players(session: Session, *nicknames: str) -> list[Player]:
+	players = [Player(nickname=n) for n in nicknames]
+	session.add_all(players)
+	session.commit()
+	return players
+
+
+def test_page_by_nickname(client: TestClient, session: Session):
+	_add_players(session, "page_c", "page_a", "page_b")
+
+	nicknames: list[str] = []
+	cursor = None
+	while True:
+		params = {"limit": 2, "order": "nickname"}
+		if cursor:
+			params["cursor"] = cursor
+		resp = client.get("/players/page", params=params)
+		assert resp.status_code == 200
+		body = resp.json()
+		nicknames.extend(p["nickname"] for p in body["items"])
+		cursor = body["next_cursor"]
+		if cursor is None:
+			break
+
+	ours = [n for n in nicknames if n.startswith("page_")]
+	assert ours == ["page_a", "page_b", "page_c"]
+
+
+def test_page_cursor_of_other_order_is_rejected(client: TestClient, session: Session):
+	_add_players(session, "order_x", "order_y")
+
+	first = client.get("/players/page", params={"limit": 1, "order": "id"}).json()
+	resp = client.get(
+		"/players/page",
+		params={"order": "nickname", "cursor": first["next_cursor"]},
+	)
+	assert resp.status_code == 400
+
+
+def test_offset_list_still_works(client: TestClient, session: Session):
+	_add_players(session, "offset_player")
+
+	resp = client.get("/players/", params={"skip": 0, "limit": 500})
+	assert resp.status_code == 200
+	assert "offset_player" in {p["nickname"] for p in resp.json()}
+
+
+def test_player_stats_of_new_player(client: TestClient, session: Session):
+	(player,) = _add_players(session, "stats_newbie")
+
+	resp = client.get(f"/players/{player.id}/stats")
+	assert resp.status_code == 200
+	body = resp.json()
+	assert (body["games"], body["win_rate"]) == (0, 0.0)
+	assert client.get("/players/999999/stats").status_code == 404
+
+
+def test_search_prefix_then_fuzzy(client: TestClient, session: Session):
+	_add_players(session, "qadd_Vasya", "qadd_Vasilisa", "qadd_Petya")
+
+	resp = client.get("/players/search", params={"q": "QADD_vas", "limit": 5})
+	assert resp.status_code == 200
+	prefix = [m["nickname"] for m in resp.json() if m["score"] == 1.0]
+	assert prefix == ["qadd_Vasilisa", "qadd_Vasya"]
+	assert resp.json()[:2] == [m for m in resp.json() if m["score"] == 1.0]
+
+	resp = client.get("/players/search", params={"q": "qadd_petia"})
+	assert "qadd_Petya" in [m["nickname"] for m in resp.json()]
+	assert client.get("/players/search", params={"q": ""}).status_code == 422
@@ -0,0 +1,57 @@
+import datetime as dt
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.enums import Faction, GameRole, GameState
+from app.crud import games as crud
+from app.models.game import GamePlayer
+from app.models.player import Player
+from app.schemas.games import GameCreate
+
+ROLES_7 = [GameRole.don, GameRole.mafia, GameRole.sheriff] + [GameRole.citizen] * 4
+
+
+def _finished_game(session: Session, rule_set_id: int, day: dt.date, winner: Faction) -> list[Player]:
+	tag = uuid.uuid4().hex[:8]
+	players = [Player(nickname=f"st_{tag}_{i}") for i in range(7)]
+	session.add_all(players)
+	game = crud.create(session, GameCreate(players_qty=7, rule_set_id=rule_set_id), uuid.uuid4())
+	game.date = day
+	session.add_all(
+		GamePlayer(game_id=game.id, player_id=p.id, seat_no=seat, role=role)
+		for seat, (p, role) in enumerate(zip(players, ROLES_7), start=1)
+	)
+	session.commit()
+	crud.update_state(session, game.id, GameState.live)
+	crud.update_state(session, game.id, GameState.finished, winner=winner)
+	return players
+
+
+def test_faction_dashboard(client: TestClient, session: Session, rule_set):
+	_finished_game(session, rule_set.id, dt.date(1950, 3, 1), Faction.mafia)
+	_finished_game(session, rule_set.id, dt.date(1950, 4, 1), Faction.mafia)
+
+	resp = client.get(
+		"/stats/factions",
+		params={"date_from": "1950-01-01", "date_to": "1950-12-31", "players_qty": 7},
+	)
+	assert resp.status_code == 200
+	assert resp.json()["wins"] == {"city": 0, "mafia": 2}
+	assert resp.json()["total"] == 2
+
+
+def test_leaderboard(client: TestClient, session: Session, rule_set):
+	players = _finished_game(session, rule_set.id, dt.date(1951, 7, 7), Faction.city)
+
+	resp = client.get(
+		"/stats/leaderboard",
+		params={"date_from": "1951-07-07", "date_to": "1951-07-07", "limit": 50},
+	)
+	assert resp.status_code == 200
+	rows = resp.json()
+	assert {r["nickname"] for r in rows} == {p.nickname for p in players}
+	assert client.get(
+		"/stats/leaderboard", params={"date_from": "1951-02-01", "date_to": "1951-01-01"}
+	).status_code == 400
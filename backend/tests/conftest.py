@@ -5,11 +5,14 @@ import pkgutil
 import sys
 from importlib import import_module
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, create_engine
 
 # ────────── 1. Fake env для Settings ──────────
@@ -43,17 +46,23 @@ if CITEXT is not None:
 	def _compile_citext_sqlite(element, compiler, **kw):  # noqa: D401
 		return "TEXT"
 
-from app.db import get_session  # noqa: E402
+from app.db import get_async_session, get_async_session_maker, get_session  # noqa: E402
 # ────────── 5. FastAPI импорт ПОСЛЕ fixes ─────
 from app.main import app  # noqa: E402
 from app.models.rule import RuleSet  # noqa: E402
 
 
 # ────────── 6. Engine & Session fixtures ──────
+# Файл, а не :memory: — sync‑ и async‑engine должны видеть одну и ту же БД.
 @pytest.fixture(scope="session")
-def engine():
+def db_path(tmp_path_factory) -> Path:
+	return tmp_path_factory.mktemp("db") / "test.sqlite"
+
+
+@pytest.fixture(scope="session")
+def engine(db_path: Path):
 	eng = create_engine(
-		"sqlite:///:memory:",
+		f"sqlite:///{db_path}",
 		connect_args={"check_same_thread": False},
 		echo=False,
 	)
@@ -68,6 +77,13 @@ def engine():
 	return eng
 
 
+@pytest.fixture(scope="session")
+def async_engine(engine, db_path: Path) -> AsyncEngine:
+	# NullPool: TestClient гоняет каждый запрос в своём event loop,
+	# соединения aiosqlite между loop'ами переиспользовать нельзя
+	return create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+
 @pytest.fixture()
 def session(engine) -> Generator[Session, None, None]:
 	with Session(engine) as sess:
@@ -75,6 +91,18 @@ def session(engine) -> Generator[Session, None, None]:
 		sess.rollback()  # «чистая» транзакция для каждого теста
 
 
+@pytest.fixture()
+def anyio_backend() -> str:
+	return "asyncio"
+
+
+@pytest.fixture()
+async def async_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
+	async with AsyncSession(async_engine, expire_on_commit=False) as sess:
+		yield sess
+		await sess.rollback()
+
+
 # ────────── 7. rule_set fixture (без insert) ───
 @pytest.fixture()
 def rule_set(session: Session) -> RuleSet:
@@ -83,9 +111,48 @@ def rule_set(session: Session) -> RuleSet:
 
 # ────────── 8. FastAPI TestClient override ────
 @pytest.fixture()
-def client(session: Session) -> Generator[TestClient, None, None]:
+def client(session: Session, async_engine) -> Generator[TestClient, None, None]:
+	async def _async_session() -> AsyncGenerator[AsyncSession, None]:
+		async with AsyncSession(async_engine, expire_on_commit=False) as sess:
+			yield sess
+
 	app.dependency_overrides[get_session] = lambda: session  # type: ignore[attr-defined]
+	app.dependency_overrides[get_async_session] = _async_session  # type: ignore[attr-defined]
+	# стриминг (export) открывает сессию сам, внутри тела ответа
+	app.dependency_overrides[get_async_session_maker] = lambda: sessionmaker(  # type: ignore[attr-defined]
+		async_engine, class_=AsyncSession, expire_on_commit=False
+	)
 	try:
 		yield TestClient(app)
 	finally:
 		app.dependency_overrides.clear()  # type: ignore[attr-defined]
+
+
+# ────────── 9. SQL budget на запрос ───────────
+@pytest.fixture()
+def query_budget():
+	"""
+	with query_budget(3): client.get(...) — каждый HTTP‑запрос внутри
+	блока должен уложиться в max_queries SQL‑запросов.
+	"""
+	from contextlib import contextmanager
+
+	from app.core import sqltrace
+
+	@contextmanager
+	def _budget(max_queries: int):
+		seen: list[tuple[str, sqltrace.QueryStats]] = []
+		observer = lambda where, stats: seen.append((where, stats))  # noqa: E731
+		sqltrace.observers.append(observer)
+		try:
+			yield seen
+		finally:
+			sqltrace.observers.remove(observer)
+		assert seen, "no HTTP request was made inside query_budget"
+		for where, stats in seen:
+			assert stats.count <= max_queries, (
+				f"{where}: {stats.count} queries > budget {max_queries}\n"
+				+ "\n".join(f"{n}x {s}" for s, n in stats.shapes.most_common(5))
+			)
+
+	return _budget
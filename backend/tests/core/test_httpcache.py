@@ -0,0 +1,111 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlmodel import Session
+
+from app.core import httpcache
+from app.core.httpcache import ChangeLog, ResponseCache
+from app.models.player import Player
+
+
+def _player(session: Session) -> Player:
+	player = Player(nickname=f"etag_{uuid.uuid4().hex[:8]}")
+	session.add(player)
+	session.commit()
+	return player
+
+
+# ────────────── versions ────────────────────────────────
+def test_row_version_survives_eviction():
+	log = ChangeLog(max_rows=2)
+	before = log.row_version("player", 1)
+	log.apply([("player", 1, httpcache.ROW)])
+	bumped = log.row_version("player", 1)
+	assert bumped > before
+	log.apply([("player", 2, httpcache.ROW), ("player", 3, httpcache.ROW)])
+	# строка 1 вытеснена, но её версия не откатилась
+	assert log.row_version("player", 1) >= bumped
+
+
+def test_late_commit_moves_version_past_earlier_ones(monkeypatch):
+	# штамп/часы позже закоммиченной транзакции меньше — версия всё равно растёт
+	clock = iter([200, 100, 50])
+	monkeypatch.setattr(httpcache.time, "time_ns", lambda: next(clock))
+	log = ChangeLog()
+	log.apply([("player", 1, httpcache.ROW)])
+	seen = log.row_version("player", 1)
+	log.notify('{"c": [["player", 1, "row"]]}')
+	assert log.row_version("player", 1) > seen
+	assert log.table_version("player") > seen
+
+
+def test_commit_bumps_versions_and_rollback_does_not(session: Session):
+	player = _player(session)
+	table = httpcache.changes.table_version("player")
+	row = httpcache.changes.row_version("player", player.id)
+
+	player.avatar_url = "https://example.com/a.png"
+	session.add(player)
+	session.flush()
+	session.rollback()
+	assert httpcache.changes.row_version("player", player.id) == row
+
+	session.execute(update(Player).where(Player.id == player.id).values(email=None))
+	session.commit()
+	assert httpcache.changes.row_version("player", player.id) > row
+	assert httpcache.changes.table_version("player") > table
+
+
+# ────────────── TTL + LRU ───────────────────────────────
+def test_response_cache_evicts_by_size_and_etag():
+	cache = ResponseCache(ttl=60, max_entries=10, max_bytes=100)
+	cache.put("a", '"1"', [], b"x" * 60)
+	cache.put("b", '"1"', [], b"y" * 60)  # не влезает вместе с a
+	assert cache.get("a", '"1"') is None
+	assert cache.get("b", '"1"').body == b"y" * 60
+	assert cache.get("b", '"2"') is None  # версия сдвинулась
+	assert len(cache) == 0 and cache.bytes == 0
+	assert cache.hit_ratio == 1 / 3
+
+
+# ────────────── HTTP ────────────────────────────────────
+def test_player_etag_304_without_queries(client: TestClient, session: Session, query_budget):
+	player = _player(session)
+	url = f"/players/{player.id}"
+	first = client.get(url)
+	etag = first.headers["etag"]
+
+	with query_budget(0):
+		resp = client.get(url, headers={"If-None-Match": etag})
+	assert resp.status_code == 304
+	assert resp.headers["etag"] == etag
+
+	cached = client.get(url)
+	assert cached.headers.get("x-cache") == "hit"
+	assert cached.json() == first.json()
+
+	player.avatar_url = "https://example.com/b.png"
+	session.add(player)
+	session.commit()
+	fresh = client.get(url, headers={"If-None-Match": etag})
+	assert fresh.status_code == 200
+	assert fresh.headers["etag"] != etag
+	assert fresh.json()["avatar_url"] == "https://example.com/b.png"
+
+
+def test_list_cache_is_invalidated_by_insert(client: TestClient, session: Session):
+	params = {"skip": 0, "limit": 1000}
+	client.get("/players/", params=params)
+	assert client.get("/players/", params=params).headers.get("x-cache") == "hit"
+
+	player = _player(session)
+	after = client.get("/players/", params=params)
+	assert after.headers.get("x-cache") is None
+	assert player.id in {p["id"] for p in after.json()}
+
+
+def test_cache_metrics_exposed(client: TestClient):
+	text = client.get("/metrics").text
+	for name in ("http_cache_hits_total", "http_cache_hit_ratio", "http_cache_bytes"):
+		assert name in text
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+from app.core.metrics import Registry, registry
+from app.core.pool import TimedQueuePool, instrument, pool_timeouts, pool_wait
+
+
+# ────────────── text format ─────────────────────────────
+def test_histogram_renders_cumulative_buckets():
+	reg = Registry()
+	h = reg.histogram("wait_seconds", "Wait", (0.1, 1.0))
+	h.observe(0.05, engine="a")
+	h.observe(0.5, engine="a")
+	h.observe(5.0, engine="a")
+	text_ = reg.render()
+
+	assert "# TYPE wait_seconds histogram" in text_
+	assert 'wait_seconds_bucket{engine="a",le="0.1"} 1' in text_
+	assert 'wait_seconds_bucket{engine="a",le="1.0"} 2' in text_
+	assert 'wait_seconds_bucket{engine="a",le="+Inf"} 3' in text_
+	assert 'wait_seconds_count{engine="a"} 3' in text_
+
+
+def test_gauge_is_read_at_scrape_time():
+	reg = Registry()
+	value = [1]
+	reg.gauge("busy", "Busy").set_function(lambda: value[0], engine="x")
+	assert 'busy{engine="x"} 1' in reg.render()
+	value[0] = 7
+	assert 'busy{engine="x"} 7' in reg.render()
+
+
+# ────────────── pool instrumentation ────────────────────
+@pytest.fixture()
+def tiny_engine(tmp_path):
+	engine = create_engine(
+		f"sqlite:///{tmp_path / 'pool.sqlite'}",
+		poolclass=TimedQueuePool,
+		pool_size=1,
+		max_overflow=0,
+		pool_timeout=0.05,
+	)
+	instrument(engine.pool, "tiny")
+	yield engine
+	engine.dispose()
+
+
+def test_pool_wait_and_timeouts_are_recorded(tiny_engine):
+	waits = pool_wait.count(engine="tiny")
+	timeouts = pool_timeouts.value(engine="tiny")
+
+	with tiny_engine.connect() as conn:
+		conn.execute(text("SELECT 1"))
+		assert 'db_pool_checked_out{engine="tiny"} 1' in registry.render()
+		with pytest.raises(PoolTimeout):
+			tiny_engine.connect()
+
+	assert pool_wait.count(engine="tiny") == waits + 2
+	assert pool_timeouts.value(engine="tiny") == timeouts + 1
+	rendered = registry.render()
+	assert 'db_pool_checked_out{engine="tiny"} 0' in rendered
+	assert 'db_pool_size{engine="tiny"} 1' in rendered
+
+
+def test_metrics_endpoint_exposes_both_engines(client):
+	resp = client.get("/metrics")
+	assert resp.status_code == 200
+	assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+	for label in ("sync", "async"):
+		assert f'db_pool_checked_out{{engine="{label}"}}' in resp.text
+		assert f'db_pool_overflow{{engine="{label}"}}' in resp.text
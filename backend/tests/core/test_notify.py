@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from app.core import notify
+from app.core.notify import PgListener
+
+pytestmark = pytest.mark.anyio
+
+
+class _Conn:
+	"""Коннект, который обрывается сразу после LISTEN и не умеет закрыться."""
+
+	def __init__(self):
+		self.terminated = False
+
+	def add_termination_listener(self, callback):
+		self._lost = callback
+
+	async def add_listener(self, channel, callback):
+		asyncio.get_running_loop().call_soon(self._lost, self)
+
+	async def close(self, timeout=None):
+		raise ConnectionResetError("already gone")
+
+	def terminate(self):
+		self.terminated = True
+
+
+async def test_listener_survives_unexpected_errors(monkeypatch):
+	conns: list[_Conn] = []
+	calls = 0
+
+	async def connect(dsn):
+		nonlocal calls
+		calls += 1
+		if calls == 1:
+			raise ValueError("bad dsn option")  # не OSError/PostgresError
+		conns.append(_Conn())
+		return conns[-1]
+
+	real_sleep = asyncio.sleep
+
+	async def no_sleep(delay):
+		await real_sleep(0)
+
+	monkeypatch.setattr(notify.asyncpg, "connect", connect)
+	monkeypatch.setattr(notify.asyncio, "sleep", no_sleep)
+	listener = PgListener()
+	payloads: list = []
+	listener.on("refdata", payloads.append)
+
+	await listener.start("postgresql://")
+	for _ in range(100):  # упавшая задача не переподключится никогда
+		if len(conns) >= 3:
+			break
+		await asyncio.sleep(0)
+	await listener.stop()
+
+	assert len(conns) >= 3
+	assert payloads[:2] == [None, None]  # каждый новый LISTEN сбрасывает кэш
+	assert all(c.terminated for c in conns[:2])
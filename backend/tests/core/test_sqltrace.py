@@ -0,0 +1,52 @@
+import logging
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.core import sqltrace
+from app.models.game import GamePlayer
+
+
+def test_shape_collapses_in_lists_and_whitespace():
+	a = sqltrace.shape("SELECT *\n  FROM player WHERE id IN (?, ?, ?)")
+	b = sqltrace.shape("SELECT * FROM player WHERE id IN (?)")
+	assert a == b == "SELECT * FROM player WHERE id IN (?)"
+	assert sqltrace.shape("WHERE id IN ($1, $2)") == "WHERE id IN (?)"
+	assert sqltrace.shape("VALUES (?, ?), (?, ?)") == "VALUES (?)"
+
+
+def test_track_counts_repeated_shapes(session: Session):
+	with sqltrace.track() as stats:
+		for _ in range(3):
+			session.exec(select(GamePlayer).where(GamePlayer.game_id == -1)).all()
+	assert stats.count == 3
+	assert stats.seconds > 0
+	[(statement, n)] = stats.repeated(2)
+	assert n == 3 and "FROM gameplayer" in statement
+
+	# вне track() ничего не копится
+	session.exec(select(GamePlayer).where(GamePlayer.game_id == -1)).all()
+	assert stats.count == 3
+
+
+def test_middleware_sets_server_timing(client: TestClient):
+	resp = client.get("/players/page", params={"limit": 1})
+	timing = resp.headers["server-timing"]
+	assert timing.startswith("db;dur=") and 'queries", app;dur=' in timing
+
+
+def test_middleware_warns_on_repeated_shape(caplog):
+	middleware = sqltrace.SQLTraceMiddleware(None, repeat_warn=2)
+	stats = sqltrace.QueryStats()
+	stats.shapes["SELECT * FROM player WHERE id = ?"] = 5
+	with caplog.at_level(logging.WARNING, logger="app.core.sqltrace"):
+		middleware._report({"method": "GET", "path": "/games/1"}, stats)
+	assert "ran 5x in GET /games/1" in caplog.text
+
+
+def test_query_budget_fixture(client: TestClient, query_budget):
+	with query_budget(2) as seen:
+		client.get("/players/search", params={"q": f"nobody_{uuid.uuid4().hex[:6]}"})
+	[(where, stats)] = seen
+	assert where == "GET /players/search" and stats.count >= 1
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.schema import SchemaMismatch, check_head, code_heads
+
+BACKEND_ROOT = Path(__file__).resolve().parents[2]
+
+# импорт app.main + lifespan + первый запрос в свежем интерпретаторе
+_SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+import app.main
+from fastapi.testclient import TestClient
+t1 = time.perf_counter()
+with TestClient(app.main.app) as client:
+    assert client.get("/healthz").status_code == 200
+    t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "first_request": t2 - t0}))
+"""
+
+IMPORT_BUDGET_S = 5.0
+FIRST_REQUEST_BUDGET_S = 6.0
+
+
+def _cold_start() -> dict[str, float]:
+	env = {**os.environ, "SCHEMA_MODE": "off"}
+	out = subprocess.run(
+		[sys.executable, "-c", _SCRIPT],
+		cwd=BACKEND_ROOT,
+		env=env,
+		capture_output=True,
+		text=True,
+		check=True,
+	)
+	return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _set_revision(session: Session, *revisions: str) -> None:
+	session.execute(
+		text("CREATE TABLE IF NOT EXISTS alembic_version (version_num VARCHAR(32) PRIMARY KEY)")
+	)
+	session.execute(text("DELETE FROM alembic_version"))
+	for rev in revisions:
+		session.execute(text("INSERT INTO alembic_version VALUES (:v)"), {"v": rev})
+
+
+# ────────────── schema check ────────────────────────────
+def test_check_head_accepts_current_revision(session: Session):
+	_set_revision(session, *code_heads())
+	check_head(session.connection())
+
+
+def test_check_head_fails_fast_on_old_revision(session: Session):
+	_set_revision(session, "19f4261ee339")
+	with pytest.raises(SchemaMismatch) as exc:
+		check_head(session.connection())
+	assert exc.value.database == {"19f4261ee339"}
+
+	_set_revision(session)
+	with pytest.raises(SchemaMismatch):
+		check_head(session.connection())
+
+
+# ────────────── cold start benchmark ────────────────────
+@pytest.mark.slow
+def test_cold_start_time(benchmark):
+	timings = benchmark.pedantic(_cold_start, rounds=3, iterations=1)
+	benchmark.extra_info.update(timings)
+	assert timings["import"] < IMPORT_BUDGET_S
+	assert timings["first_request"] < FIRST_REQUEST_BUDGET_S
@@ -0,0 +1,154 @@
+import datetime as dt
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import Session, select
+
+from app.crud import events as crud
+from app.crud import games as games_crud
+from app.models.event import EventType, GameEvent
+from app.models.game import GamePlayer
+from app.models.player import Player
+from app.schemas.games import GameCreate
+
+TS = dt.datetime(2026, 1, 1, 19, 0, tzinfo=dt.timezone.utc)
+
+
+# ────────────── helpers ─────────────────────────────────
+def _type_id(session: Session, code: str) -> int:
+	et = session.exec(select(EventType).where(EventType.code == code)).first()
+	if et is None:
+		et = EventType(code=code)
+		session.add(et)
+		session.flush()
+	return et.id
+
+
+def _game(session: Session, rule_set_id: int, seats: int = 3) -> tuple[int, list[int]]:
+	"""Игра с ``seats`` местами; → (game_id, player_id по местам 1..seats)."""
+	game = games_crud.create(session, GameCreate(players_qty=10, rule_set_id=rule_set_id), uuid.uuid4())
+	players = [Player(nickname=f"eq_{uuid.uuid4().hex[:10]}") for _ in range(seats)]
+	session.add_all(players)
+	session.flush()
+	session.add_all(GamePlayer(game_id=game.id, player_id=p.id, seat_no=i + 1) for i, p in enumerate(players))
+	session.flush()
+	return game.id, [p.id for p in players]
+
+
+def _log(session: Session, game_id: int, *events: tuple[str, dict]) -> None:
+	session.add_all(
+		GameEvent(
+			game_id=game_id,
+			client_seq=seq,
+			ts=TS + dt.timedelta(minutes=seq),
+			event_type_id=_type_id(session, code),
+			payload=payload,
+		)
+		for seq, (code, payload) in enumerate(events, start=1)
+	)
+	session.commit()
+
+
+# ────────────── generated columns ───────────────────────
+def test_seat_columns_are_generated_from_payload(session: Session, rule_set):
+	game_id, _ = _game(session, rule_set.id)
+	foul = _type_id(session, "foul")
+	_log(session, game_id, ("foul", {"target_seat": 2, "actor_seat": 5}), ("foul", {"target_seat": "2"}))
+	session.execute(
+		insert(GameEvent.__table__),
+		[{"game_id": game_id, "client_seq": 10, "ts": TS, "event_type_id": foul, "payload": {"target_seat": 7}}],
+	)
+	session.commit()
+
+	rows = session.exec(
+		select(GameEvent.client_seq, GameEvent.target_seat, GameEvent.actor_seat)
+		.where(GameEvent.game_id == game_id)
+		.order_by(GameEvent.client_seq)
+	).all()
+	# строка вместо числа — NULL, а не ошибка INSERT
+	assert rows == [(1, 2, 5), (2, None, None), (10, 7, None)]
+
+
+def test_seat_columns_keep_only_smallint_integers(session: Session, rule_set):
+	game_id, _ = _game(session, rule_set.id)
+	_log(
+		session,
+		game_id,
+		("foul", {"target_seat": 2.5}),
+		("foul", {"target_seat": 40000}),
+		("foul", {"target_seat": -32768, "actor_seat": 32767}),
+		("foul", {"target_seat": 10**20}),
+	)
+	rows = session.exec(
+		select(GameEvent.target_seat, GameEvent.actor_seat)
+		.where(GameEvent.game_id == game_id)
+		.order_by(GameEvent.client_seq)
+	).all()
+	# дробное и вне smallint — NULL, как и на Postgres (payload_int)
+	assert rows == [(None, None), (None, None), (-32768, 32767), (None, None)]
+
+
+# ────────────── analytics ───────────────────────────────
+def test_fouls_by_player_joins_on_target_seat(session: Session, rule_set):
+	game_id, players = _game(session, rule_set.id)
+	_log(
+		session,
+		game_id,
+		("foul", {"target_seat": 1}),
+		("foul", {"target_seat": 1}),
+		("foul", {"target_seat": 3}),
+		("kill", {"target_seat": 2}),
+		("foul", {"reason": "no seat"}),
+	)
+
+	counts = dict(session.execute(crud.fouls_by_player_stmt().where(GamePlayer.game_id == game_id)).tuples().all())
+	assert counts == {players[0]: 2, players[2]: 1}
+	(only,) = session.execute(crud.fouls_by_player_stmt(player_id=players[0])).tuples().all()
+	assert only == (players[0], 2)
+	assert not session.execute(crud.fouls_by_player_stmt(players[0], date_to=dt.date(2000, 1, 1))).all()
+
+
+def test_first_night_kills(session: Session, rule_set):
+	first, _ = _game(session, rule_set.id)
+	_log(
+		session,
+		first,
+		("phase", {"phase": "night"}),
+		("kill", {"target_seat": 3}),
+		("phase", {"phase": "day"}),
+		("phase", {"phase": "night"}),
+		("kill", {"target_seat": 1}),
+	)
+	no_kill, _ = _game(session, rule_set.id)
+	_log(session, no_kill, ("phase", {"phase": "night"}), ("phase", {"phase": "day"}))
+
+	rows = session.execute(crud.first_night_kills_stmt().where(GameEvent.game_id.in_([first, no_kill]))).all()
+	assert [(r.game_id, r.target_seat) for r in rows] == [(first, 3)]
+
+
+def test_payload_contains(session: Session, rule_set):
+	game_id, _ = _game(session, rule_set.id)
+	_log(session, game_id, ("vote", {"round": 1, "final": True}), ("vote", {"round": 2, "final": False}))
+
+	stmt = crud.events_stmt("vote", game_ids=[game_id]).where(
+		crud.payload_contains(session.get_bind().dialect.name, final=True)
+	)
+	assert [e.payload["round"] for e in session.exec(stmt).scalars()] == [1]
+
+
+# ────────────── Postgres DDL ────────────────────────────
+def test_postgres_ddl_uses_jsonb_generated_columns_and_gin():
+	dialect = postgresql.dialect()
+	table = GameEvent.__table__
+	ddl = str(CreateTable(table).compile(dialect=dialect))
+	assert "payload JSONB NOT NULL" in ddl
+	assert "GENERATED ALWAYS AS (CASE WHEN jsonb_typeof(payload -> 'target_seat') = 'number'" in ddl
+	assert "(payload ->> 'target_seat') ~ '^-?[0-9]{1,5}$'" in ddl
+	assert "BETWEEN -32768 AND 32767 THEN CAST((payload ->> 'target_seat') AS SMALLINT)" in ddl
+	gin = next(i for i in table.indexes if i.name == "ix_gameevent_payload")
+	assert "USING gin (payload jsonb_path_ops)" in str(CreateIndex(gin).compile(dialect=dialect))
+
+	contains = crud.payload_contains("postgresql", final=True).compile(dialect=dialect)
+	assert "@>" in str(contains)
@@ -1,11 +1,18 @@
 import datetime as dt
 import uuid
-from typing import Sequence, cast
+from contextlib import contextmanager
+from typing import Iterator, Sequence, cast
 
-from sqlmodel import Session
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
 
+from app.core.cursor import InvalidCursor
 from app.core.enums import GameRole, GameState
 from app.crud import games as crud
+from app.crud.games import LoadProfile
+from app.models.event import EventType, GameEvent, VoteItem, VoteRound
+from app.models.extras import ExtraPoints
 from app.models.game import GamePlayer
 from app.models.player import Player
 from app.schemas.games import GameCreate
@@ -18,6 +25,45 @@ def _sample_game(session: Session, rule_set_id: int):
 	return crud.create(session, data, gm_id)
 
 
+@contextmanager
+def _statements(session: Session) -> Iterator[list[str]]:
+	"""Собирает SQL, который реально ушёл в БД внутри блока."""
+	engine = session.get_bind()
+	seen: list[str] = []
+
+	def _record(conn, cursor, statement, parameters, context, executemany):
+		seen.append(statement)
+
+	event.listen(engine, "before_cursor_execute", _record)
+	try:
+		yield seen
+	finally:
+		event.remove(engine, "before_cursor_execute", _record)
+
+
+def _full_game(session: Session, rule_set_id: int):
+	g = _sample_game(session, rule_set_id)
+	et = session.exec(select(EventType).where(EventType.code == "profile_test")).first()
+	if et is None:
+		et = EventType(code="profile_test")
+		session.add(et)
+	p = Player(nickname=f"profile_{g.id}")
+	session.add(p)
+	session.flush()
+
+	gp = GamePlayer(game_id=g.id, player_id=p.id, seat_no=1)
+	session.add(gp)
+	session.flush()
+	session.add(ExtraPoints(game_player_id=gp.id, delta=0.5, reason="test"))
+	session.add(GameEvent(game_id=g.id, event_type_id=et.id, payload={}))
+	vr = VoteRound(game_id=g.id, round_no=1)
+	session.add(vr)
+	session.flush()
+	session.add(VoteItem(vote_round_id=vr.id, target_seat=1, count=3))
+	session.commit()
+	return g.id
+
+
 # ────────────── tests ───────────────────────────────────
 def test_create_and_get(session: Session, rule_set):
 	g = _sample_game(session, rule_set.id)
@@ -69,6 +115,7 @@ def test_update_state(session: Session, rule_set):
 	aware_now = dt.datetime.now(dt.UTC)
 	finished_at = aware_now.replace(tzinfo=None)
 
+	crud.update_state(session, g.id, GameState.live)
 	updated = crud.update_state(
 		session, g.id, GameState.finished, finished_at=finished_at
 	)
@@ -77,6 +124,52 @@ def test_update_state(session: Session, rule_set):
 	assert updated.finished_at == finished_at
 
 
+def test_update_state_rejects_invalid_transition(session: Session, rule_set):
+	g = _sample_game(session, rule_set.id)
+
+	with pytest.raises(crud.InvalidTransition) as exc:
+		crud.update_state(session, g.id, GameState.finished)
+	assert exc.value.current is GameState.draft
+	assert crud.get(session, g.id).state is GameState.draft
+
+	crud.update_state(session, g.id, GameState.aborted)
+	with pytest.raises(crud.InvalidTransition):
+		crud.update_state(session, g.id, GameState.live)
+	assert crud.update_state(session, 999_999, GameState.live) is None
+
+
+def test_update_state_optimistic_version(session: Session, rule_set):
+	g = _sample_game(session, rule_set.id)
+	assert g.version == 0
+
+	# ведущий и организатор прочитали одну и ту же версию
+	crud.update_state(session, g.id, GameState.live, expected_version=0)
+	with pytest.raises(crud.StaleGameVersion) as exc:
+		crud.update_state(session, g.id, GameState.aborted, expected_version=0)
+	assert (exc.value.expected, exc.value.actual) == (0, 1)
+	assert crud.get(session, g.id).state is GameState.live
+
+
+def test_foul_limit_removes_player(session: Session, rule_set):
+	g = _sample_game(session, rule_set.id)
+	p = Player(nickname=f"foul_{uuid.uuid4().hex[:8]}")
+	session.add(p)
+	session.flush()
+	session.add(GamePlayer(game_id=g.id, player_id=p.id, seat_no=1))
+	session.commit()
+	with pytest.raises(crud.SeatConflict):
+		crud.add_foul(session, g.id, 1)  # игра ещё draft
+
+	crud.update_state(session, g.id, GameState.live)
+	rows = [crud.add_foul(session, g.id, 1).seat for _ in range(4)]
+	assert [r.fouls_count for r in rows] == [1, 2, 3, 4]
+	assert [r.removed for r in rows] == [False, False, False, True]
+	with pytest.raises(crud.SeatConflict):
+		crud.add_foul(session, g.id, 1)
+	with pytest.raises(crud.SeatConflict):
+		crud.remove_player(session, g.id, 1)
+
+
 def test_delete(session: Session, rule_set):
 	g = _sample_game(session, rule_set.id)
 	assert crud.delete(session, g.id)
@@ -85,3 +178,57 @@ def test_delete(session: Session, rule_set):
 
 def test_delete_missing(session: Session):
 	assert not crud.delete(session, 9999)
+
+
+def test_list_page_walks_all_games(session: Session, rule_set):
+	created = {_sample_game(session, rule_set.id).id for _ in range(5)}
+
+	seen: list[int] = []
+	cursor = None
+	while True:
+		page, cursor = crud.list_games_page(session, cursor=cursor, limit=2)
+		assert len(page) <= 2
+		seen.extend(g.id for g in page)
+		if cursor is None:
+			break
+
+	assert created <= set(seen)
+	assert len(seen) == len(set(seen))  # страницы не пересекаются
+	ours = [i for i in seen if i in created]
+	assert ours == sorted(created, reverse=True)  # одна дата → порядок по id DESC
+
+
+def test_list_page_rejects_garbage_cursor(session: Session):
+	with pytest.raises(InvalidCursor):
+		crud.list_games_page(session, cursor="not-a-cursor")
+
+
+@pytest.mark.parametrize(
+	"profile, expected",
+	[
+		(LoadProfile.header, 1),
+		(LoadProfile.with_players, 2),
+		(LoadProfile.with_events, 2),
+		# game, gameplayer, extrapoints, gameevent, voteround, voteitem
+		(LoadProfile.full, 6),
+	],
+)
+def test_get_profile_statement_count(session: Session, rule_set, profile, expected):
+	game_id = _full_game(session, rule_set.id)
+	session.expunge_all()
+
+	with _statements(session) as seen:
+		fetched = crud.get(session, game_id, profile=profile)
+	assert fetched and fetched.id == game_id
+	assert len(seen) == expected
+
+
+def test_list_games_header_does_not_touch_events(session: Session, rule_set):
+	_full_game(session, rule_set.id)
+	session.expunge_all()
+
+	with _statements(session) as seen:
+		crud.list_games(session, limit=10)
+		crud.list_game_headers(session, limit=10)
+	assert len(seen) == 2
+	assert not any("gameevent" in s for s in seen)
@@ -0,0 +1,66 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import GameState
+from app.crud import games_async as crud
+from app.crud.games import LoadProfile, StaleGameVersion
+from app.schemas.games import GameCreate
+
+pytestmark = pytest.mark.anyio
+
+
+# ────────────── helpers ─────────────────────────────────
+async def _sample_game(session: AsyncSession, rule_set_id: int = 1):
+	data = GameCreate(players_qty=8, rule_set_id=rule_set_id)
+	return await crud.create(session, data, uuid.uuid4())
+
+
+# ────────────── tests ───────────────────────────────────
+async def test_create_and_get(async_session: AsyncSession):
+	g = await _sample_game(async_session)
+	assert g.id is not None
+	assert g.state == GameState.draft
+
+	fetched = await crud.get(async_session, g.id)
+	assert fetched and fetched.players_qty == 8
+
+	with_players = await crud.get(async_session, g.id, profile=LoadProfile.full)
+	assert with_players and with_players.players == []
+
+
+async def test_list_and_page_match_sync_ordering(async_session: AsyncSession):
+	g1 = await _sample_game(async_session)
+	g2 = await _sample_game(async_session)
+
+	games = await crud.list_games(async_session, limit=2)
+	assert [g.id for g in games] == [g2.id, g1.id]
+
+	page, cursor = await crud.list_games_page(async_session, limit=1)
+	assert page[0].id == g2.id and cursor is not None
+	page, _ = await crud.list_games_page(async_session, cursor=cursor, limit=1)
+	assert page[0].id == g1.id
+
+
+async def test_update_state_and_delete(async_session: AsyncSession):
+	g = await _sample_game(async_session)
+	finished_at = dt.datetime(2025, 7, 23, 21, 0)
+
+	live = await crud.update_state(async_session, g.id, GameState.live)
+	assert live and live.version == 1
+	updated = await crud.update_state(
+		async_session, g.id, GameState.finished, expected_version=1, finished_at=finished_at
+	)
+	assert updated and updated.state == GameState.finished
+	assert updated.finished_at == finished_at
+	assert updated.version == 2
+
+	game_id = g.id  # rollback при конфликте expire'ит объекты сессии
+	with pytest.raises(StaleGameVersion):
+		await crud.update_state(async_session, game_id, GameState.live, expected_version=1)
+
+	assert await crud.delete(async_session, game_id)
+	assert await crud.get(async_session, game_id) is None
+	assert not await crud.delete(async_session, game_id)
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from app.services.broadcast import RESYNC, GameHub
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_publish_reaches_every_subscriber():
+	hub = GameHub(queue_size=4)
+	subs = [hub.subscribe(1) for _ in range(3)]
+	other = hub.subscribe(2)
+
+	assert hub.publish(1, {"type": "events", "events": [1]}) == 3
+
+	for sub in subs:
+		assert json.loads(sub.queue.get_nowait())["events"] == [1]
+	assert other.queue.empty()
+
+
+async def test_slow_subscriber_is_evicted_without_blocking_others():
+	hub = GameHub(queue_size=2)
+	slow = hub.subscribe(1)
+	fast = hub.subscribe(1)
+
+	for i in range(3):
+		hub.publish(1, {"n": i})
+		await fast.queue.get()  # быстрый читает всё сразу
+
+	assert hub.evictions == 1
+	assert hub.subscribers(1) == 1
+	assert [m async for m in slow] == [RESYNC]
+
+
+async def test_unsubscribe_drops_empty_game():
+	hub = GameHub()
+	sub = hub.subscribe(7)
+	hub.unsubscribe(7, sub)
+	assert hub.subscribers(7) == 0
+	assert hub.publish(7, {"n": 1}) == 0
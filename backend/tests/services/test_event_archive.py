@@ -0,0 +1,185 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session, select
+
+from app.core.enums import GameState
+from app.crud import events as events_crud
+from app.crud import games as games_crud
+from app.models.event import EventType, GameEvent, GameEventArchive
+from app.models.game import Game
+from app.schemas.events import EventIn
+from app.schemas.games import GameCreate
+from app.services import event_archive, export, live_state
+from app.services.event_archive import EventRow
+
+NOW = dt.datetime(2026, 10, 18, 12, 0, tzinfo=dt.timezone.utc)
+TS = dt.datetime(2026, 3, 1, 19, 0, tzinfo=dt.timezone.utc)
+
+
+# ────────────── helpers ─────────────────────────────────
+def _type_id(session: Session, code: str) -> int:
+	et = session.exec(select(EventType).where(EventType.code == code)).first()
+	if et is None:
+		et = EventType(code=code)
+		session.add(et)
+		session.flush()
+	return et.id
+
+
+def _game(session: Session, state: GameState, finished_at: dt.datetime | None, events: int = 6) -> int:
+	game = games_crud.create(session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4())
+	game.state, game.finished_at = state, finished_at
+	foul, phase = _type_id(session, "foul"), _type_id(session, "phase")
+	for i in range(events):
+		session.add(
+			GameEvent(
+				game_id=game.id,
+				client_seq=i,
+				ts=TS + dt.timedelta(minutes=i),
+				event_type_id=phase if i == 0 else foul,
+				payload={"phase": "night"} if i == 0 else {"target_seat": i % 3 + 1},
+			)
+		)
+	session.commit()
+	return game.id
+
+
+def _live(session: Session, game_id: int) -> int:
+	return session.scalar(select(func.count()).where(GameEvent.game_id == game_id))
+
+
+# ────────────── blob ────────────────────────────────────
+def test_pack_roundtrip_and_tail():
+	rows = [
+		EventRow(1, 0, TS, "phase", {"phase": "night"}),
+		EventRow(2, 1, TS + dt.timedelta(seconds=1), "kill", {"target_seat": 7, "note": "ё"}),
+	]
+	blob = event_archive.pack(rows)
+
+	assert event_archive.unpack(blob) == rows
+	assert event_archive.unpack(blob, after_seq=0) == rows[1:]
+
+
+# ────────────── archive ─────────────────────────────────
+def test_archives_only_old_finished_games(session: Session):
+	old = _game(session, GameState.finished, NOW - dt.timedelta(days=200))
+	recent = _game(session, GameState.finished, NOW - dt.timedelta(days=10))
+	live = _game(session, GameState.live, None)
+	before = session.execute(
+		select(GameEvent.id, GameEvent.client_seq, GameEvent.ts, EventType.code, GameEvent.payload)
+		.join(EventType)
+		.where(GameEvent.game_id == old)
+		.order_by(GameEvent.id)
+	).all()
+
+	assert event_archive.archive(session, dt.timedelta(days=90), now=NOW) >= 1
+	assert (_live(session, old), _live(session, recent), _live(session, live)) == (0, 6, 6)
+	row = session.get(GameEventArchive, old)
+	assert row.events == 6
+	assert [tuple(e) for e in event_archive.unpack(row.blob)] == [tuple(r) for r in before]
+	assert event_archive.archive(session, dt.timedelta(days=90), now=NOW) == 0
+
+
+def test_aborted_game_is_archived_by_start_time(session: Session):
+	game_id = _game(session, GameState.aborted, None, events=2)
+	session.get(Game, game_id).started_at = NOW - dt.timedelta(days=200)
+	session.commit()
+
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+
+	assert _live(session, game_id) == 0
+	assert session.get(GameEventArchive, game_id).events == 2
+
+
+def test_late_event_is_merged_into_existing_blob(session: Session):
+	game_id = _game(session, GameState.finished, NOW - dt.timedelta(days=200), events=3)
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+	session.add(GameEvent(game_id=game_id, client_seq=3, ts=TS, event_type_id=_type_id(session, "foul"), payload={}))
+	session.commit()
+
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+
+	row = session.get(GameEventArchive, game_id)
+	session.refresh(row)
+	# SQLite отдаёт id удалённых строк заново — порядок id тут не проверить
+	assert sorted(e.client_seq for e in event_archive.unpack(row.blob)) == [0, 1, 2, 3]
+	assert row.events == 4
+	assert _live(session, game_id) == 0
+
+
+def test_partitions_are_postgres_only(session: Session):
+	assert event_archive.ensure_partitions(session.connection()) == []
+	assert event_archive.drop_empty_partitions(session, NOW.date()) == []
+	assert event_archive.partition_name(event_archive._month(dt.date(2026, 11, 20), 2)) == "gameevent_y2027m01"
+
+
+# ────────────── transparent readers ─────────────────────
+@pytest.mark.anyio
+async def test_resume_and_export_read_archived_games(session: Session, async_session: AsyncSession):
+	game_id = _game(session, GameState.finished, NOW - dt.timedelta(days=200))
+
+	async def _read():
+		state, tail = await live_state.resume(async_session, game_id)
+		games = [g async for g in export.iter_games(async_session, events=True) if g["id"] == game_id]
+		return state, tail, games
+
+	hot = await _read()
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+	await async_session.commit()  # новый снимок для чтения после архивации
+	cold = await _read()
+
+	assert _live(session, game_id) == 0
+	assert cold == hot
+	assert cold[1] == 6 and [e["seq"] for e in cold[2][0]["events"]] == list(range(6))
+
+
+@pytest.mark.anyio
+async def test_reopened_game_keeps_archived_history(session: Session, async_session: AsyncSession):
+	game_id = _game(session, GameState.finished, NOW - dt.timedelta(days=200), events=4)
+	_game(session, GameState.live, None, events=1)  # SQLite не выдаст архивные id заново
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+	session.add(
+		GameEvent(
+			game_id=game_id,
+			client_seq=4,
+			ts=TS + dt.timedelta(hours=1),
+			event_type_id=_type_id(session, "foul"),
+			payload={"target_seat": 9},
+		)
+	)
+	session.commit()
+	await async_session.commit()
+
+	state, tail = await live_state.resume(async_session, game_id)
+	games = [g async for g in export.iter_games(async_session, events=True) if g["id"] == game_id]
+	log = event_archive.read_logs(session, [game_id])[game_id]
+
+	assert tail == 5 and state.applied == 5 and state.seats[9].fouls == 1
+	assert [e["seq"] for e in games[0]["events"]] == [0, 1, 2, 3, 4]
+	assert [e.client_seq for e in log] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.anyio
+async def test_reopen_restores_archived_log_for_autosave_retries(session: Session, async_session: AsyncSession):
+	game_id = _game(session, GameState.finished, NOW - dt.timedelta(days=200), events=4)
+	event_archive.archive(session, dt.timedelta(days=90), now=NOW)
+
+	games_crud.update_state(session, game_id, GameState.live)
+	session.commit()
+	await async_session.commit()
+
+	# повтор уже архивного батча (seq 2–3) вместе с новым seq 4
+	retry = [
+		EventIn(client_seq=seq, code="phase", ts=TS + dt.timedelta(minutes=seq), payload={"phase": "day"})
+		for seq in (2, 3, 4)
+	]
+	inserted, acked = await events_crud.ingest_batch(async_session, game_id, retry)
+
+	assert [e["client_seq"] for e in inserted] == [4]
+	assert acked == 4
+	assert session.get(GameEventArchive, game_id) is None
+	assert [e.client_seq for e in event_archive.read_logs(session, [game_id])[game_id]] == [0, 1, 2, 3, 4]
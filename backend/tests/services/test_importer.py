@@ -0,0 +1,175 @@
+import io
+import json
+import uuid
+
+import pytest
+from sqlmodel import Session, select
+
+from app.core.enums import Condition, UserRole
+from app.models.event import EventType, GameEvent
+from app.models.extras import ExtraPoints
+from app.models.game import Game, GamePlayer
+from app.models.imports import ImportCheckpoint
+from app.models.player import Player
+from app.models.user import User
+from app.services import importer, scoring
+from app.services.export import CSV_HEADER
+
+ROLES = ["Don", "Mafia", "Mafia", "Sheriff"] + ["Citizen"] * 6
+
+
+# ────────────── helpers ─────────────────────────────────
+@pytest.fixture()
+def gm_id(session: Session) -> uuid.UUID:
+	gm = User(id=uuid.uuid4(), email=f"{uuid.uuid4().hex}@import.test", hashed_password="x", role=UserRole.gm)
+	session.add(gm)
+	if not session.exec(select(EventType).where(EventType.code == "foul")).first():
+		session.add(EventType(code="foul"))
+	session.commit()
+	return gm.id
+
+
+def _game(tag: str, n: int, **overrides) -> dict:
+	game = {
+		"id": f"legacy-{n}",
+		"date": "2019-05-01",
+		"players_qty": 10,
+		"started_at": "2019-05-01T19:00:00",
+		"finished_at": "2019-05-01T20:00:00",
+		"winner_faction": "city",
+		"seats": [
+			{"seat_no": i + 1, "nickname": f"imp_{tag}_{i}", "role": r, "total_points": 1.0}
+			for i, r in enumerate(ROLES)
+		],
+	}
+	return {**game, **overrides}
+
+
+def _ndjson(*games: dict) -> list[str]:
+	return list(importer.read_ndjson(io.StringIO("".join(json.dumps(g) + "\n" for g in games))))
+
+
+def _run(session: Session, records, gm_id: uuid.UUID, **kw) -> importer.Progress:
+	kw.setdefault("source", f"test-{uuid.uuid4().hex}")
+	return importer.run(session, records, gm_id=gm_id, **kw)
+
+
+def _games_of(session: Session, tag: str) -> list[int]:
+	return sorted(
+		set(
+			session.exec(
+				select(GamePlayer.game_id)
+				.join(Player, Player.id == GamePlayer.player_id)
+				.where(Player.nickname.like(f"imp_{tag}_%"))
+			)
+		)
+	)
+
+
+# ────────────── NDJSON ──────────────────────────────────
+def test_loads_valid_games_and_rejects_the_rest(session: Session, gm_id):
+	tag = uuid.uuid4().hex[:6]
+	good = _game(tag, 1, events=[{"seq": 1, "ts": "2019-05-01T19:05:00+00:00", "code": "foul"}])
+	good["seats"][0]["extra_points"] = [{"delta": 0.5, "reason": "best move"}]
+	bad_roles = _game(tag, 2, seats=[{**s, "role": "Citizen"} for s in good["seats"]])
+	bad_code = _game(tag, 3, events=[{"ts": "2019-05-01T19:06:00Z", "code": "imp_nope"}])
+
+	progress = _run(session, _ndjson(good, bad_roles, bad_code), gm_id, chunk=2)
+
+	assert (progress.records, progress.games, progress.rejected) == (3, 1, 2)
+	(game_id,) = _games_of(session, tag)
+	game = session.get(Game, game_id)
+	assert (game.state.value, game.gm_id, game.rule_set_id) == ("finished", gm_id, 1)
+	seats = session.exec(select(GamePlayer).where(GamePlayer.game_id == game_id)).all()
+	assert sorted(s.seat_no for s in seats) == list(range(1, 11))
+	don = next(s for s in seats if s.seat_no == 1)
+	assert [e.delta for e in session.exec(select(ExtraPoints).where(ExtraPoints.game_player_id == don.id))] == [0.5]
+	assert len(session.exec(select(GameEvent).where(GameEvent.game_id == game_id)).all()) == 1
+
+
+def test_existing_players_are_reused(session: Session, gm_id):
+	tag = uuid.uuid4().hex[:6]
+	session.add(Player(nickname=f"imp_{tag}_0"))
+	session.commit()
+
+	_run(session, _ndjson(_game(tag, 1), _game(tag, 2)), gm_id, chunk=1)
+
+	players = session.exec(select(Player).where(Player.nickname.like(f"imp_{tag}_%"))).all()
+	assert len(players) == 10
+	assert len(_games_of(session, tag)) == 2
+
+
+def test_resumes_after_failure_without_duplicates(session: Session, gm_id):
+	tag = uuid.uuid4().hex[:6]
+	records = _ndjson(*(_game(tag, n) for n in range(5)))
+	source = f"test-{uuid.uuid4().hex}"
+
+	def crashing():
+		yield from records[:3]
+		raise OSError("disk went away")
+
+	with pytest.raises(OSError):
+		_run(session, crashing(), gm_id, source=source, chunk=2)
+	session.rollback()
+	assert session.get(ImportCheckpoint, source).records == 2
+	assert len(_games_of(session, tag)) == 2
+
+	progress = _run(session, records, gm_id, source=source, chunk=2)
+	assert (progress.records, progress.games, progress.loaded) == (5, 5, 3)
+	assert len(_games_of(session, tag)) == 5
+
+
+def test_condition_masks_come_from_source_or_events(session: Session, gm_id):
+	existing = set(session.exec(select(EventType.code)).all())
+	session.add_all(EventType(code=c) for c in ("phase", "kill") if c not in existing)
+	session.commit()
+	tag = uuid.uuid4().hex[:6]
+	with_log = _game(
+		tag,
+		1,
+		events=[
+			{"seq": 1, "ts": "2019-05-01T19:05:00Z", "code": "phase", "payload": {"phase": "night"}},
+			{"seq": 2, "ts": "2019-05-01T19:06:00Z", "code": "kill", "payload": {"target_seat": 5}},
+		],
+	)
+	with_log["seats"][1]["conditions"] = 3
+	without_log = _game(tag, 2, date="2019-05-02")
+
+	_run(session, _ndjson(with_log, without_log), gm_id)
+
+	logged, bare = _games_of(session, tag)
+	masks = dict(session.exec(select(GamePlayer.seat_no, GamePlayer.conditions).where(GamePlayer.game_id == logged)).all())
+	assert masks[2] == 3
+	assert masks[5] & scoring.COND_BIT[Condition.FIRST_NIGHT_KILLED]
+	assert masks[4] & scoring.COND_BIT[Condition.CITY_WIN]
+	# очки таблицы без лога маской не воспроизвести — NULL, rescore их не тронет
+	assert set(session.exec(select(GamePlayer.conditions).where(GamePlayer.game_id == bare)).all()) == {None}
+
+
+# ────────────── CSV ─────────────────────────────────────
+def test_csv_rows_are_grouped_into_games(session: Session, gm_id):
+	tag = uuid.uuid4().hex[:6]
+	buf = io.StringIO()
+	buf.write(",".join(CSV_HEADER) + "\n")
+	for game_id in ("a", "b"):
+		for i, role in enumerate(ROLES):
+			row = {
+				"game_id": game_id,
+				"game_date": "2018-03-0" + ("1" if game_id == "a" else "2"),
+				"game_players_qty": "10",
+				"game_started_at": "2018-03-01T19:00:00",
+				"game_finished_at": "2018-03-01T20:00:00",
+				"game_aborted": "False",
+				"seat_no": str(i + 1),
+				"nickname": f"imp_{tag}_{game_id}{i}",
+				"role": role,
+				"total_points": "0.5",
+			}
+			buf.write(",".join(row.get(c, "") for c in CSV_HEADER) + "\n")
+	buf.seek(0)
+
+	progress = _run(session, importer.read_csv(buf), gm_id)
+
+	assert (progress.games, progress.rejected) == (2, 0)
+	dates = {session.get(Game, g).date.isoformat() for g in _games_of(session, tag)}
+	assert dates == {"2018-03-01", "2018-03-02"}
@@ -0,0 +1,179 @@
+import datetime as dt
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import events as events_crud
+from app.crud import games_async as games_crud
+from app.models.event import EventType, GameEvent
+from app.models.snapshot import GameStateSnapshot
+from app.schemas.events import EventIn
+from app.schemas.games import GameCreate
+from app.services import live_state
+from app.services.live_state import FOUL_LIMIT, LiveGameState, fold
+
+
+# ────────────── reducer ─────────────────────────────────
+def test_fouls_remove_player_at_limit():
+	state = LiveGameState(game_id=1)
+	fold(state, [(None, "foul", {"target_seat": 3})] * FOUL_LIMIT)
+
+	assert state.seats[3].fouls == FOUL_LIMIT
+	assert state.seats[3].removed and state.seats[3].removal == "fouls"
+
+
+def test_first_night_kill_and_day_reset():
+	state = fold(
+		LiveGameState(game_id=1),
+		[
+			(1, "nominate", {"actor_seat": 1, "target_seat": 5}),
+			(2, "vote", {"round_no": 1, "counts": {"5": 4}}),
+			(3, "phase", {"phase": "night"}),
+			(4, "kill", {"target_seat": 7}),
+			(5, "phase", {"phase": "day"}),
+			(6, "phase", {"phase": "night"}),
+			(7, "kill", {"target_seat": 2}),
+		],
+	)
+
+	assert state.first_night_killed == 7
+	assert state.night == 2 and state.day == 2
+	assert state.nominations == [] and state.vote_rounds == []
+	assert state.applied == 7 and state.last_event_id == 7
+
+
+def test_unknown_code_is_counted_but_ignored():
+	state = fold(LiveGameState(game_id=1), [(1, "future_code", {"x": 1})])
+	assert state.applied == 1 and state.seats == {}
+
+
+def test_malformed_payload_is_skipped():
+	state = fold(
+		LiveGameState(game_id=1),
+		[(1, "foul", {}), (2, "kill", {"target_seat": None}), (3, "foul", {"target_seat": 4})],
+	)
+	assert state.applied == 3 and state.last_event_id == 3
+	assert state.seats[4].fouls == 1 and state.first_night_killed is None
+
+
+def test_roundtrip_through_dict():
+	state = fold(
+		LiveGameState(game_id=1),
+		[
+			(1, "deal_roles", {"roles": {"1": "Don", "2": "Sheriff"}}),
+			(2, "nominate", {"actor_seat": 1, "target_seat": 2}),
+			(3, "best_move", {"actor_seat": 2, "guesses": [1, 4]}),
+		],
+	)
+	assert LiveGameState.from_dict(state.to_dict()) == state
+
+
+def test_copy_is_independent():
+	state = fold(
+		LiveGameState(game_id=1),
+		[(1, "foul", {"target_seat": 2}), (2, "best_move", {"actor_seat": 2, "guesses": [1]})],
+	)
+	copy = state.copy()
+	fold(copy, [(3, "foul", {"target_seat": 2}), (4, "nominate", {"actor_seat": 1, "target_seat": 2})])
+	copy.best_move[1].append(5)
+
+	assert copy != state
+	assert state.seats[2].fouls == 1 and state.nominations == [] and state.best_move == (2, [1])
+
+
+# ────────────── snapshots / resume ──────────────────────
+@pytest.mark.anyio
+async def test_resume_from_snapshot_matches_full_replay(async_session: AsyncSession):
+	game = await games_crud.create(
+		async_session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4()
+	)
+	foul = await async_session.scalar(select(EventType).where(EventType.code == "foul"))
+	if foul is None:
+		foul = EventType(code="foul")
+		async_session.add(foul)
+		await async_session.flush()
+
+	for i in range(1, 26):
+		async_session.add(
+			GameEvent(
+				game_id=game.id, client_seq=i, event_type_id=foul.id, payload={"target_seat": i % 10 + 1}
+			)
+		)
+		await async_session.commit()
+		await live_state.snapshot_if_due(async_session, game.id, i, every=10)
+
+	snaps = await async_session.scalar(
+		select(func.count()).where(GameStateSnapshot.game_id == game.id)
+	)
+	assert snaps == 2
+
+	state, tail = await live_state.resume(async_session, game.id)
+	assert tail == 5
+	rows = (
+		await async_session.execute(
+			select(GameEvent.id, GameEvent.payload)
+			.where(GameEvent.game_id == game.id)
+			.order_by(GameEvent.client_seq)
+		)
+	).all()
+	full = fold(LiveGameState(game.id), ((r.id, "foul", r.payload) for r in rows))
+	assert state == full
+
+
+@pytest.mark.anyio
+async def test_snapshot_if_due_folds_only_when_due(async_session: AsyncSession, monkeypatch):
+	game = await games_crud.create(
+		async_session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4()
+	)
+	foul = await async_session.scalar(select(EventType).where(EventType.code == "foul"))
+	for i in range(1, 4):
+		async_session.add(GameEvent(game_id=game.id, client_seq=i, event_type_id=foul.id, payload={"target_seat": 1}))
+	await async_session.commit()
+
+	async def _no_fold(*args):
+		raise AssertionError("log folded although no snapshot is due")
+
+	with monkeypatch.context() as m:
+		m.setattr(live_state.snapshots_crud, "events_after", _no_fold)
+		assert await live_state.snapshot_if_due(async_session, game.id, 3, every=4) is None
+
+	async_session.add(GameEvent(game_id=game.id, client_seq=4, event_type_id=foul.id, payload={"target_seat": 1}))
+	await async_session.commit()
+	state = await live_state.snapshot_if_due(async_session, game.id, 4, every=4)
+	assert state.applied == 4 and state.seats[1].fouls == 4
+
+
+@pytest.mark.anyio
+async def test_late_batch_is_folded_in_seq_order(async_session: AsyncSession):
+	game = await games_crud.create(
+		async_session, GameCreate(players_qty=10, rule_set_id=1), uuid.uuid4()
+	)
+	existing = set(await async_session.scalars(select(EventType.code)))
+	async_session.add_all(EventType(code=c) for c in ("phase", "kill") if c not in existing)
+	await async_session.commit()
+
+	def _batch(seq: int, code: str, payload: dict) -> list[EventIn]:
+		ts = dt.datetime(2025, 7, 23, 20, 0, seq, tzinfo=dt.timezone.utc)
+		return [EventIn(client_seq=seq, code=code, ts=ts, payload=payload)]
+
+	# seq 3 закоммичен раньше seq 2 и получил меньший id
+	for batch in (
+		_batch(1, "phase", {"phase": "day"}),
+		_batch(3, "kill", {"target_seat": 7}),
+		_batch(2, "phase", {"phase": "night"}),
+	):
+		_, acked = await events_crud.ingest_batch(async_session, game.id, batch)
+		await live_state.snapshot_if_due(async_session, game.id, acked, every=1)
+
+	snaps = (
+		await async_session.scalars(
+			select(GameStateSnapshot.client_seq).where(GameStateSnapshot.game_id == game.id)
+		)
+	).all()
+	assert sorted(snaps) == [1, 3]  # после seq 3 без seq 2 снимать было рано
+
+	state, tail = await live_state.resume(async_session, game.id)
+	assert tail == 0
+	assert state.night == 1 and state.first_night_killed == 7
@@ -0,0 +1,48 @@
+import uuid
+
+from sqlmodel import Session
+
+from app.models.player import Player
+from app.services.nickname_search import NicknameIndex, similarity, trigrams
+
+
+def _index(*nicknames: str) -> NicknameIndex:
+	idx = NicknameIndex()
+	for i, nick in enumerate(nicknames, start=1):
+		idx.add(i, nick)
+	return idx
+
+
+def test_trigrams_like_pg_trgm():
+	assert trigrams("Cat") == {"  c", " ca", "cat", "at "}
+	assert similarity(trigrams("word"), trigrams("word")) == 1.0
+
+
+def test_prefix_is_case_insensitive_and_ordered():
+	idx = _index("Kolya", "kot", "KOSTYA", "Misha")
+	assert [m.nickname for m in idx.search("ko", 10)] == ["Kolya", "KOSTYA", "kot"]
+	assert [m.nickname for m in idx.search("ko", 2)] == ["Kolya", "KOSTYA"]
+	assert all(m.score == 1.0 for m in idx.search("ko", 10))
+
+
+def test_fuzzy_fills_after_prefix():
+	idx = _index("Sheriff_Bob", "Sherlock", "Bobby")
+	matches = idx.search("sherif", 5)
+	assert (matches[0].nickname, matches[0].score) == ("Sheriff_Bob", 1.0)  # префикс
+	assert all(m.score < 1.0 for m in matches[1:])
+
+	typo = idx.search("bobbi", 5)
+	assert [m.nickname for m in typo] == ["Bobby"]
+	assert 0.3 <= typo[0].score < 1.0
+
+
+def test_catch_up_picks_new_players(session: Session):
+	idx = NicknameIndex()
+	idx.catch_up(session)
+	tag = uuid.uuid4().hex[:6]
+	session.add(Player(nickname=f"zz{tag}_new"))
+	session.commit()
+
+	assert idx.catch_up(session) == 1
+	assert [m.nickname for m in idx.search(f"ZZ{tag}", 5)] == [f"zz{tag}_new"]
+	assert idx.catch_up(session) == 0
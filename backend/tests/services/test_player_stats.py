@@ -0,0 +1,110 @@
+import uuid
+
+from sqlmodel import Session, select
+
+from app.core.enums import Faction, GameRole, GameState
+from app.crud import games as crud
+from app.models.extras import GameAudit
+from app.models.game import GamePlayer
+from app.models.player import Player
+from app.models.stats import PlayerStats
+from app.schemas.games import GameCreate
+from app.services import player_stats
+
+ROLES_10 = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [
+	GameRole.citizen
+] * 6
+
+
+# ────────────── helpers ─────────────────────────────────
+def _players(session: Session) -> list[int]:
+	tag = uuid.uuid4().hex[:8]
+	players = [Player(nickname=f"ps_{tag}_{i}") for i in range(10)]
+	session.add_all(players)
+	session.commit()
+	return [p.id for p in players]
+
+
+def _game(session: Session, rule_set_id: int, player_ids: list[int]) -> int:
+	game = crud.create(session, GameCreate(players_qty=10, rule_set_id=rule_set_id), uuid.uuid4())
+	session.add_all(
+		GamePlayer(game_id=game.id, player_id=pid, seat_no=seat, role=role)
+		for seat, (pid, role) in enumerate(zip(player_ids, ROLES_10), start=1)
+	)
+	session.commit()
+	return game.id
+
+
+def _stats(session: Session, player_id: int) -> PlayerStats | None:
+	session.expire_all()
+	return session.get(PlayerStats, player_id)
+
+
+# ────────────── tests ───────────────────────────────────
+def test_finish_adds_game_to_aggregates(session: Session, rule_set):
+	pids = _players(session)
+	for winner in (Faction.city, Faction.mafia):
+		game_id = _game(session, rule_set.id, pids)
+		crud.update_state(session, game_id, GameState.live)
+		crud.update_state(session, game_id, GameState.finished, winner=winner)
+
+	don, sheriff = _stats(session, pids[0]), _stats(session, pids[3])
+	assert (don.games, don.wins, don.mafia_games, don.mafia_wins) == (2, 1, 2, 1)
+	assert (sheriff.city_games, sheriff.city_wins, sheriff.mafia_games) == (2, 1, 0)
+	assert not set(player_stats.check(session)) & set(pids)
+
+
+def test_reopen_reverts_delta_and_writes_audit(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _game(session, rule_set.id, pids)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.city)
+	assert _stats(session, pids[4]).wins == 1
+
+	actor = uuid.uuid4()
+	crud.update_state(session, game_id, GameState.live, actor_id=actor)
+	citizen = _stats(session, pids[4])
+	assert (citizen.games, citizen.wins, citizen.points) == (0, 0, 0.0)
+
+	audit = session.exec(select(GameAudit).where(GameAudit.game_id == game_id)).one()
+	assert (audit.user_id, audit.old_value, audit.new_value) == (actor, "finished", "live")
+
+	# организатор исправил победителя
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.mafia)
+	assert _stats(session, pids[4]).wins == 0
+	assert _stats(session, pids[1]).wins == 1
+
+
+def test_aborted_game_is_not_counted(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _game(session, rule_set.id, pids)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, aborted=True)
+	stats = _stats(session, pids[0])
+	assert stats is None or stats.games == 0
+
+
+def test_rebuild_matches_incremental(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _game(session, rule_set.id, pids)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.mafia)
+	before = {pid: _stats(session, pid).model_dump() for pid in pids}
+
+	player_stats.rebuild(session)
+	assert {pid: _stats(session, pid).model_dump() for pid in pids} == before
+	assert player_stats.check(session) == []
+
+
+def test_check_reports_drift(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _game(session, rule_set.id, pids)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.city)
+
+	stats = _stats(session, pids[5])
+	stats.wins += 1
+	session.commit()
+	assert pids[5] in player_stats.check(session)
+	player_stats.rebuild(session)
+	assert pids[5] not in player_stats.check(session)
@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import Session
+
+from app.core.enums import Condition, GameRole
+from app.crud import rules
+from app.models.event import EventType
+from app.models.rule import RuleSet
+from app.services.refcache import RefCache
+
+
+def _code() -> str:
+	return f"rc_{uuid.uuid4().hex[:8]}"
+
+
+# ────────────── sync: RuleSet ───────────────────────────
+def test_rule_set_is_served_from_memory(session: Session):
+	cache = RefCache()
+	first = cache.rule_set(session, 1)
+	assert cache.reloads == 1
+	assert cache.rule_set(session, 1) is first
+	assert cache.reloads == 1
+	assert cache.hits == 2
+
+
+def test_version_bump_invalidates(session: Session):
+	cache = RefCache()
+	cache.refresh(session)
+	rs = RuleSet(name=f"rules_{uuid.uuid4().hex[:8]}")
+	session.add(rs)
+	session.commit()
+
+	version = rules.upsert_rule_item(session, rs.id, Condition.CITY_WIN, GameRole.sheriff, 2.5)
+	cache.invalidate(str(version))  # то, что пришло бы по NOTIFY
+	assert cache.needs_refresh()
+
+	compiled = cache.rule_set(session, rs.id)
+	assert cache.version == version
+	row = compiled.table[list(Condition).index(Condition.CITY_WIN)]
+	assert row.max() == 2.5
+
+
+def test_own_version_notify_is_ignored(session: Session):
+	cache = RefCache()
+	cache.refresh(session)
+	cache.invalidate(str(cache.version))
+	assert not cache.needs_refresh()
+	cache.invalidate(None)  # реконнект listener'а
+	assert cache.needs_refresh()
+
+
+def test_version_poll_without_notify(session: Session):
+	cache = RefCache(check_interval=0)
+	cache.refresh(session)
+	version = rules.bump_version(session)
+	session.commit()
+	cache.refresh(session)
+	assert cache.version == version
+	assert cache.reloads == 2
+
+
+# ────────────── async: EventType ────────────────────────
+@pytest.mark.anyio
+async def test_unknown_code_triggers_single_reload(async_session: AsyncSession):
+	cache = RefCache()
+	code = _code()
+	assert await cache.resolve_event_types(async_session, {code}) == {}
+	assert cache.misses == 1
+	reloads = cache.reloads
+
+	et = EventType(code=code)
+	async_session.add(et)
+	await async_session.commit()  # без bump: другой воркер, NOTIFY потерян
+
+	found = await cache.resolve_event_types(async_session, {code})
+	assert found == {code: et.id}
+	assert cache.reloads == reloads + 1
+
+	await cache.resolve_event_types(async_session, {code})
+	assert cache.reloads == reloads + 1
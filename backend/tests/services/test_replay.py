@@ -0,0 +1,80 @@
+import datetime as dt
+
+import pytest
+
+from app.services import replay
+from app.services.event_archive import EventRow
+from app.services.live_state import LiveGameState, fold
+
+TS = dt.datetime(2026, 3, 1, 19, 0, tzinfo=dt.timezone.utc)
+SCRIPT = [
+	("deal_roles", {"roles": {"1": "Don", "2": "Sheriff", "3": "Citizen"}}),
+	("nominate", {"actor_seat": 1, "target_seat": 3}),
+	("foul", {"target_seat": 2}),
+	("vote", {"round_no": 1, "counts": {"3": 5}}),
+	("vote_out", {"target_seat": 3}),
+	("phase", {"phase": "night"}),
+	("kill", {"target_seat": 2}),
+	("phase", {"phase": "day"}),
+	("foul", {"target_seat": 1}),
+	("nominate", {"actor_seat": 1, "target_seat": 4}),
+	("finish", {"winner": "mafia"}),
+]
+
+
+# ────────────── helpers ─────────────────────────────────
+def _events() -> list[EventRow]:
+	return [
+		EventRow(100 + i, i, TS + dt.timedelta(minutes=i), code, payload)
+		for i, (code, payload) in enumerate(SCRIPT)
+	]
+
+
+# ────────────── engine ──────────────────────────────────
+def test_every_position_matches_full_replay():
+	events = _events()
+	game = replay.Replay(1, events, every=4)
+
+	assert len(game.checkpoints) == 3
+	for at in range(len(events) + 1):
+		full = fold(LiveGameState(1), ((e.id, e.code, e.payload) for e in events[:at]))
+		assert game.state_at(at) == full
+	with pytest.raises(IndexError):
+		game.state_at(len(events) + 1)
+
+
+def test_seek_costs_less_than_k_steps(monkeypatch):
+	game = replay.Replay(1, _events(), every=4)
+	steps = []
+	monkeypatch.setattr(replay, "apply", lambda *args: steps.append(args))
+
+	for at in range(game.total + 1):
+		steps.clear()
+		game.state_at(at)
+		assert len(steps) == at % 4
+
+
+def test_timeline_is_one_pass_and_matches_frames():
+	game = replay.Replay(1, _events(), every=4)
+
+	frames = [(f.at, f.event and f.event.seq, f.state.to_dict()) for f in game.timeline(start=3)]
+
+	assert [at for at, _, _ in frames] == list(range(3, game.total + 1))
+	for at, seq, state in frames:
+		frame = game.frame(at)
+		assert (frame.event and frame.event.seq, frame.state.to_dict()) == (seq, state)
+	assert game.frame(0).event is None
+
+
+# ────────────── cache ───────────────────────────────────
+def test_cache_is_lru_and_keyed_by_version():
+	cache = replay.ReplayCache(max_games=2)
+	a, b, c = (replay.Replay(i, []) for i in (1, 2, 3))
+	cache.put(1, 0, a)
+	cache.put(2, 0, b)
+	assert cache.get(1, 0) is a  # 1 свежее 2
+	cache.put(3, 0, c)
+
+	assert cache.get(2, 0) is None
+	assert cache.get(1, 0) is a and cache.get(3, 0) is c
+	assert cache.get(1, 1) is None  # игру переоткрыли
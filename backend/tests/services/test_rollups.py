@@ -0,0 +1,126 @@
+import datetime as dt
+import uuid
+
+from sqlmodel import Session, select
+
+from app.core.enums import Faction, GameRole, GameState
+from app.crud import games as crud
+from app.models.game import Game, GamePlayer
+from app.models.player import Player
+from app.models.stats import PlayerDailyStats
+from app.schemas.games import GameCreate
+from app.services import rollups
+
+ROLES_10 = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [
+	GameRole.citizen
+] * 6
+
+
+# ────────────── helpers ─────────────────────────────────
+def _players(session: Session) -> list[int]:
+	tag = uuid.uuid4().hex[:8]
+	players = [Player(nickname=f"ru_{tag}_{i}") for i in range(10)]
+	session.add_all(players)
+	session.commit()
+	return [p.id for p in players]
+
+
+def _finished(
+		session: Session, rule_set_id: int, pids: list[int], day: dt.date, winner: Faction
+) -> int:
+	game = crud.create(session, GameCreate(players_qty=10, rule_set_id=rule_set_id), uuid.uuid4())
+	game.date = day
+	session.add_all(
+		GamePlayer(game_id=game.id, player_id=pid, seat_no=seat, role=role)
+		for seat, (pid, role) in enumerate(zip(pids, ROLES_10), start=1)
+	)
+	session.commit()
+	crud.update_state(session, game.id, GameState.live)
+	crud.update_state(session, game.id, GameState.finished, winner=winner)
+	return game.id
+
+
+def _year_rows(session: Session, year: int) -> list[tuple]:
+	session.expire_all()
+	m = PlayerDailyStats
+	rows = session.exec(
+		select(m.span, m.date, m.player_id, m.games, m.wins, m.points)
+		.where(m.date >= dt.date(year, 1, 1), m.date <= dt.date(year, 12, 31))
+		.order_by(m.span, m.date, m.player_id)
+	).all()
+	return [tuple(r) for r in rows]
+
+
+# ────────────── tests ───────────────────────────────────
+def test_range_uses_months_and_edge_days(session: Session, rule_set):
+	pids = _players(session)
+	_finished(session, rule_set.id, pids, dt.date(1901, 1, 15), Faction.city)
+	_finished(session, rule_set.id, pids, dt.date(1901, 2, 10), Faction.mafia)
+	_finished(session, rule_set.id, pids, dt.date(1901, 3, 31), Faction.city)
+
+	assert rollups.faction_wins(session, dt.date(1901, 1, 20), dt.date(1901, 3, 31)) == {
+		Faction.city: 1,
+		Faction.mafia: 1,
+	}
+	assert rollups.faction_wins(session, dt.date(1901, 1, 1), dt.date(1901, 1, 15)) == {
+		Faction.city: 1,
+		Faction.mafia: 0,
+	}
+	top = rollups.leaderboard(session, dt.date(1901, 1, 1), dt.date(1901, 12, 31), n=3)
+	assert [r.games for r in top] == [3, 3, 3]
+	assert {r.player_id for r in top} <= set(pids[3:])  # город выиграл дважды
+	assert top[0].wins == 2
+
+
+def test_range_accepts_open_upper_bound(session: Session, rule_set):
+	pids = _players(session)
+	_finished(session, rule_set.id, pids, dt.date(1905, 5, 5), Faction.city)
+
+	wins = rollups.faction_wins(session, dt.date(1905, 5, 5), dt.date.max)
+	assert wins[Faction.city] >= 1
+	assert rollups.faction_wins(session, dt.date.max, dt.date.max) == {
+		Faction.city: 0,
+		Faction.mafia: 0,
+	}
+
+
+def test_reopen_removes_game_from_rollups(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _finished(session, rule_set.id, pids, dt.date(1902, 5, 5), Faction.mafia)
+	crud.update_state(session, game_id, GameState.live)
+
+	assert rollups.faction_wins(session, dt.date(1902, 1, 1), dt.date(1902, 12, 31)) == {
+		Faction.city: 0,
+		Faction.mafia: 0,
+	}
+	assert all(r[3] == 0 for r in _year_rows(session, 1902))
+
+
+def test_rebuild_matches_incremental(session: Session, rule_set):
+	pids = _players(session)
+	_finished(session, rule_set.id, pids, dt.date(1903, 6, 1), Faction.city)
+	_finished(session, rule_set.id, pids, dt.date(1903, 6, 2), Faction.mafia)
+	before = _year_rows(session, 1903)
+	assert len(before) == 30  # 2 дня + 1 месяц × 10 игроков
+
+	rollups.rebuild(session)
+	assert _year_rows(session, 1903) == before
+
+
+def test_leaderboard_heap_is_bounded():
+	rows = [
+		type("R", (), {"player_id": i, "points": float(i % 7), "wins": 0})()
+		for i in range(100)
+	]
+	top = rollups.top_n(rows, 3)
+	assert [r.points for r in top] == [6.0, 6.0, 6.0]
+	assert [r.player_id for r in top] == [6, 13, 20]  # при равенстве — меньший id
+
+
+def test_game_date_is_respected(session: Session, rule_set):
+	pids = _players(session)
+	game_id = _finished(session, rule_set.id, pids, dt.date(1904, 2, 29), Faction.city)
+	assert session.get(Game, game_id).date == dt.date(1904, 2, 29)
+	assert rollups.faction_wins(session, dt.date(1904, 2, 29), dt.date(1904, 2, 29))[
+		Faction.city
+	] == 1
@@ -0,0 +1,161 @@
+import uuid
+
+import numpy as np
+import pytest
+from sqlmodel import Session, select
+
+from app.core.enums import Condition, Faction, GameRole, GameState
+from app.crud import games as crud
+from app.models.event import EventType, GameEvent
+from app.models.extras import ExtraPoints
+from app.models.game import GamePlayer
+from app.models.player import Player
+from app.models.rule import RuleItem, RuleSet
+from app.schemas.games import GameCreate
+from app.services import scoring
+from app.services.scoring import COND_BIT, ROLE_INDEX, compile_rule_set
+
+ROLES_10 = [GameRole.don, GameRole.mafia, GameRole.mafia, GameRole.sheriff] + [
+	GameRole.citizen
+] * 6
+
+
+# ────────────── helpers ─────────────────────────────────
+def _rule_set(session: Session, *items: tuple[Condition, GameRole | None, float]) -> int:
+	rs = RuleSet(name=f"rules_{uuid.uuid4().hex[:8]}")
+	session.add(rs)
+	session.flush()
+	session.add_all(
+		RuleItem(rule_set_id=rs.id, condition=c, role_filter=r, delta=d) for c, r, d in items
+	)
+	session.commit()
+	return rs.id
+
+
+def _seated_game(session: Session, rule_set_id: int) -> int:
+	game = crud.create(session, GameCreate(players_qty=10, rule_set_id=rule_set_id), uuid.uuid4())
+	for seat, role in enumerate(ROLES_10, start=1):
+		p = Player(nickname=f"sc_{game.id}_{seat}")
+		session.add(p)
+		session.flush()
+		session.add(GamePlayer(game_id=game.id, player_id=p.id, seat_no=seat, role=role))
+	session.commit()
+	return game.id
+
+
+def _event(session: Session, game_id: int, code: str, payload: dict) -> None:
+	et = session.exec(select(EventType).where(EventType.code == code)).first()
+	if et is None:
+		et = EventType(code=code)
+		session.add(et)
+		session.flush()
+	session.add(GameEvent(game_id=game_id, event_type_id=et.id, payload=payload))
+	session.commit()
+
+
+def _points(session: Session, game_id: int) -> dict[int, float]:
+	rows = session.exec(
+		select(GamePlayer.seat_no, GamePlayer.total_points).where(GamePlayer.game_id == game_id)
+	).all()
+	return dict(rows)
+
+
+# ────────────── tests ───────────────────────────────────
+def test_specific_role_overrides_wildcard():
+	items = [
+		RuleItem(rule_set_id=1, condition=Condition.CITY_WIN, role_filter=None, delta=1.0),
+		RuleItem(rule_set_id=1, condition=Condition.CITY_WIN, role_filter=GameRole.sheriff, delta=1.5),
+	]
+	compiled = compile_rule_set(1, items)
+	row = compiled.table[list(Condition).index(Condition.CITY_WIN)]
+	assert row[ROLE_INDEX[GameRole.citizen]] == 1.0
+	assert row[ROLE_INDEX[GameRole.sheriff]] == 1.5
+
+	masks = np.array([COND_BIT[Condition.CITY_WIN], 0])
+	roles = np.array([ROLE_INDEX[GameRole.sheriff], ROLE_INDEX[GameRole.citizen]])
+	assert compiled.score(masks, roles, np.array([0.0, 0.3])).tolist() == [1.5, 0.3]
+
+
+def test_finish_scores_players_in_one_pass(session: Session):
+	rs_id = _rule_set(
+		session,
+		(Condition.CITY_WIN, None, 1.0),
+		(Condition.MAFIA_WIN, None, 1.0),
+		(Condition.FIRST_NIGHT_KILLED, None, 0.1),
+		(Condition.BEST_MOVE_GUESS_TRIO, None, 0.5),
+	)
+	game_id = _seated_game(session, rs_id)
+	_event(session, game_id, "phase", {"phase": "night"})
+	_event(session, game_id, "kill", {"target_seat": 5})
+	_event(session, game_id, "best_move", {"actor_seat": 5, "guesses": [1, 2, 3]})
+	gp5 = session.exec(
+		select(GamePlayer).where(GamePlayer.game_id == game_id, GamePlayer.seat_no == 5)
+	).one()
+	session.add(ExtraPoints(game_player_id=gp5.id, delta=0.2, reason="bonus"))
+	session.commit()
+
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.city)
+
+	points = _points(session, game_id)
+	assert points[1] == 0.0  # don — проиграл
+	assert points[4] == 1.0  # sheriff — победа города
+	# победа + отстрел в первую ночь + лучший ход 1,2,3 (все чёрные) + бонус
+	assert points[5] == pytest.approx(1.0 + 0.1 + 0.5 + 0.2)
+	assert points[6] == 1.0
+
+
+def test_rescore_rule_set_uses_stored_masks(session: Session):
+	rs_id = _rule_set(session, (Condition.MAFIA_WIN, None, 1.0))
+	game_id = _seated_game(session, rs_id)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.mafia)
+	assert _points(session, game_id)[2] == 1.0
+
+	item = session.exec(select(RuleItem).where(RuleItem.rule_set_id == rs_id)).one()
+	item.delta = 2.5
+	session.commit()
+
+	assert scoring.rescore_rule_set(session, rs_id, batch_size=3) == 10
+	points = _points(session, game_id)
+	assert points[1] == points[2] == 2.5
+	assert points[7] == 0.0
+
+
+def test_rescore_skips_seats_without_mask(session: Session):
+	rs_id = _rule_set(session, (Condition.MAFIA_WIN, None, 1.0))
+	game_id = _seated_game(session, rs_id)
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.mafia)
+	legacy = session.exec(
+		select(GamePlayer).where(GamePlayer.game_id == game_id, GamePlayer.seat_no == 2)
+	).one()
+	legacy.conditions, legacy.total_points = None, 7.0  # очки из старой таблицы
+	session.commit()
+
+	assert scoring.rescore_rule_set(session, rs_id) == 9
+	assert _points(session, game_id)[2] == 7.0
+
+
+def test_backfill_conditions_from_the_log(session: Session):
+	rs_id = _rule_set(session, (Condition.FIRST_NIGHT_KILLED, None, 0.1))
+	game_id = _seated_game(session, rs_id)
+	_event(session, game_id, "phase", {"phase": "night"})
+	_event(session, game_id, "kill", {"target_seat": 5})
+	crud.update_state(session, game_id, GameState.live)
+	crud.update_state(session, game_id, GameState.finished, winner=Faction.city)
+	seats = session.exec(select(GamePlayer).where(GamePlayer.game_id == game_id)).all()
+	scored = {gp.seat_no: gp.conditions for gp in seats}
+	for gp in seats:  # игра закончилась до движка очков
+		gp.conditions = None
+	session.commit()
+
+	assert scoring.backfill_conditions(session, batch_size=2) >= 1
+	session.expire_all()
+	masks = dict(
+		session.exec(
+			select(GamePlayer.seat_no, GamePlayer.conditions).where(GamePlayer.game_id == game_id)
+		).all()
+	)
+	assert masks == scored
+	assert masks[5] & COND_BIT[Condition.FIRST_NIGHT_KILLED]